@@ -1,32 +1,238 @@
 """
 Validatus v2.0 Aliases Configuration Service
 Maps friendly names to canonical IDs for 5 segments, 28 factors, 210 layers
+
+The YAML hierarchy is compiled once into an integer-indexed AliasHierarchy
+(id <-> index, parent-index arrays, CSR children lists, O(1) id lookups).
+Config and hierarchy are cached on disk as JSON keyed by the SHA-256 of the
+YAML file, so unchanged configurations skip YAML parsing at startup. The
+cache lives in a per-user directory and is only read from a directory and
+file that the current user owns and nobody else can write.
 """
-import yaml
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional
+import os
+import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import yaml
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "validatus_aliases.yaml"
+# Directory for compiled-hierarchy caches; set to an empty string to disable
+CACHE_DIR_ENV = "VALIDATUS_ALIASES_CACHE_DIR"
+CACHE_FORMAT_VERSION = 1
+
+
+def _default_cache_dir() -> str:
+    """$XDG_CACHE_HOME/validatus, or ~/.cache/validatus ('' when there is no home)"""
+    base = os.getenv("XDG_CACHE_HOME")
+    if not base:
+        try:
+            base = str(Path.home() / ".cache")
+        except (KeyError, RuntimeError):
+            return ""
+    return str(Path(base) / "validatus")
+
+
+def _is_private(path: Path) -> bool:
+    """Owned by the current user and not writable by group or others"""
+    if not hasattr(os, "getuid"):
+        return True
+    info = path.stat()
+    return info.st_uid == os.getuid() and not info.st_mode & 0o022
+
+
+def _frozen_array(values) -> np.ndarray:
+    array = np.asarray(values, dtype=np.int32)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class AliasHierarchy:
+    """Integer-indexed segment -> factor -> layer hierarchy
+
+    Ids are in configuration order; parent arrays hold -1 for entries
+    without a parent. Children of segment s are
+    segment_factor_indices[segment_factor_indptr[s]:segment_factor_indptr[s + 1]]
+    (likewise for factor -> layer).
+    """
+    segment_ids: Tuple[str, ...]
+    factor_ids: Tuple[str, ...]
+    layer_ids: Tuple[str, ...]
+    factor_segment: np.ndarray
+    layer_factor: np.ndarray
+    segment_factor_indptr: np.ndarray
+    segment_factor_indices: np.ndarray
+    factor_layer_indptr: np.ndarray
+    factor_layer_indices: np.ndarray
+    segment_index: Mapping[str, int] = field(init=False, repr=False)
+    factor_index: Mapping[str, int] = field(init=False, repr=False)
+    layer_index: Mapping[str, int] = field(init=False, repr=False)
+    segment_of_factor: Mapping[str, str] = field(init=False, repr=False)
+    factor_of_layer: Mapping[str, str] = field(init=False, repr=False)
+    segment_of_layer: Mapping[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        def index(ids):
+            return MappingProxyType({item: i for i, item in enumerate(ids)})
+
+        def parents(ids, parent_indices, parent_ids):
+            return MappingProxyType({item: parent_ids[p] for item, p in zip(ids, parent_indices.tolist())
+                                     if p >= 0})
+
+        set_field = object.__setattr__
+        set_field(self, 'segment_index', index(self.segment_ids))
+        set_field(self, 'factor_index', index(self.factor_ids))
+        set_field(self, 'layer_index', index(self.layer_ids))
+        set_field(self, 'segment_of_factor', parents(self.factor_ids, self.factor_segment, self.segment_ids))
+        set_field(self, 'factor_of_layer', parents(self.layer_ids, self.layer_factor, self.factor_ids))
+        set_field(self, 'segment_of_layer', MappingProxyType({
+            layer: self.segment_of_factor[factor] for layer, factor in self.factor_of_layer.items()
+            if factor in self.segment_of_factor
+        }))
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'AliasHierarchy':
+        """Compile the reverse/factor_groups/layer_groups sections of a config"""
+        segment_ids = tuple(config['reverse']['segments'])
+        factor_ids = tuple(config['reverse']['factors'])
+        layer_ids = tuple(config['reverse']['layers'])
+        factor_index = {factor: i for i, factor in enumerate(factor_ids)}
+        layer_index = {layer: i for i, layer in enumerate(layer_ids)}
+
+        def children(parent_ids, groups, child_index, parent_of):
+            indptr, indices = [0], []
+            for p, parent in enumerate(parent_ids):
+                for child in groups.get(parent) or []:
+                    c = child_index.get(child)
+                    if c is not None:
+                        indices.append(c)
+                        if parent_of[c] < 0:
+                            parent_of[c] = p
+                indptr.append(len(indices))
+            return _frozen_array(indptr), _frozen_array(indices)
+
+        factor_segment = [-1] * len(factor_ids)
+        layer_factor = [-1] * len(layer_ids)
+        segment_factor_indptr, segment_factor_indices = children(
+            segment_ids, config.get('factor_groups') or {}, factor_index, factor_segment)
+        factor_layer_indptr, factor_layer_indices = children(
+            factor_ids, config.get('layer_groups') or {}, layer_index, layer_factor)
+        return cls(segment_ids, factor_ids, layer_ids,
+                   _frozen_array(factor_segment), _frozen_array(layer_factor),
+                   segment_factor_indptr, segment_factor_indices,
+                   factor_layer_indptr, factor_layer_indices)
+
+    def factors_of_segment(self, segment: int) -> np.ndarray:
+        """Factor indices of segment index ``segment``"""
+        return self.segment_factor_indices[self.segment_factor_indptr[segment]:self.segment_factor_indptr[segment + 1]]
+
+    def layers_of_factor(self, factor: int) -> np.ndarray:
+        """Layer indices of factor index ``factor``"""
+        return self.factor_layer_indices[self.factor_layer_indptr[factor]:self.factor_layer_indptr[factor + 1]]
+
+    _ARRAYS = ('factor_segment', 'layer_factor', 'segment_factor_indptr', 'segment_factor_indices',
+               'factor_layer_indptr', 'factor_layer_indices')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'segment_ids': list(self.segment_ids), 'factor_ids': list(self.factor_ids),
+                'layer_ids': list(self.layer_ids)}
+        data.update({name: getattr(self, name).tolist() for name in self._ARRAYS})
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AliasHierarchy':
+        return cls(tuple(data['segment_ids']), tuple(data['factor_ids']), tuple(data['layer_ids']),
+                   *(_frozen_array(data[name]) for name in cls._ARRAYS))
+
+
 class ValidatusAliasesConfig:
     """Central configuration for all layer-factor-segment mappings"""
     
-    def __init__(self):
-        self.config = self._load_aliases_config()
+    def __init__(self, config_path: Optional[Path] = None, cache_dir: Optional[str] = None):
+        self.config_path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+        if cache_dir is None:
+            cache_dir = os.getenv(CACHE_DIR_ENV, _default_cache_dir())
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.config, self.hierarchy = self._load_aliases_config()
         logger.info(f"✅ Loaded Validatus v2.0 configuration: {self.config['metadata']}")
         
-    def _load_aliases_config(self) -> Dict:
-        """Load the aliases configuration from YAML"""
+    def _load_aliases_config(self) -> Tuple[Dict, AliasHierarchy]:
+        """Load the aliases configuration, from the compiled cache when the YAML is unchanged"""
         try:
-            config_path = Path(__file__).parent / "validatus_aliases.yaml"
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            raw = self.config_path.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            cached = self._read_cache(digest)
+            if cached is not None:
+                return cached
+            config = yaml.safe_load(raw)
+            hierarchy = AliasHierarchy.from_config(config)
         except Exception as e:
             logger.error(f"Failed to load aliases configuration: {e}")
             # Return minimal fallback config
-            return self._get_fallback_config()
+            config = self._get_fallback_config()
+            return config, AliasHierarchy.from_config(config)
+        self._write_cache(digest, config, hierarchy)
+        return config, hierarchy
+    
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{self.config_path.stem}.{digest[:16]}.json"
+    
+    def _read_cache(self, digest: str) -> Optional[Tuple[Dict, AliasHierarchy]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            path = self._cache_path(digest)
+            # Another user able to plant a file here could change the mapping
+            if not (_is_private(self.cache_dir) and _is_private(path)):
+                logger.warning(f"Ignoring aliases cache in a directory or file other users can write: {path}")
+                return None
+            with open(path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('format') != CACHE_FORMAT_VERSION or cached.get('sha256') != digest:
+                return None
+            return cached['config'], AliasHierarchy.from_dict(cached['hierarchy'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable aliases cache: {e}")
+            return None
+    
+    def _write_cache(self, digest: str, config: Dict, hierarchy: AliasHierarchy):
+        """Store config and hierarchy for this YAML hash, replacing caches of older versions"""
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(digest)
+        payload = {'format': CACHE_FORMAT_VERSION, 'sha256': digest,
+                   'config': config, 'hierarchy': hierarchy.to_dict()}
+        temporary = None
+        try:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not _is_private(self.cache_dir):
+                logger.debug(f"Aliases cache not written: {self.cache_dir} is writable by other users")
+                return
+            fd, temporary = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f)
+            os.replace(temporary, path)
+            temporary = None
+            for stale in self.cache_dir.glob(f"{self.config_path.stem}.*.json"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        except (OSError, TypeError, ValueError) as e:
+            # Not JSON-serializable or not writable: parse the YAML next time
+            logger.debug(f"Aliases cache not written: {e}")
+        finally:
+            if temporary is not None:
+                Path(temporary).unlink(missing_ok=True)
     
     def _get_fallback_config(self) -> Dict:
         """Fallback configuration if YAML loading fails"""
@@ -53,9 +259,9 @@ class ValidatusAliasesConfig:
         """Get all segment mappings {friendly_name: segment_id}"""
         return self.config['aliases']['segments']
     
-    def get_all_segment_ids(self) -> List[str]:
+    def get_all_segment_ids(self) -> Tuple[str, ...]:
         """Get all segment IDs [S1, S2, S3, S4, S5]"""
-        return list(self.config['reverse']['segments'].keys())
+        return self.hierarchy.segment_ids
     
     # ===== Factor Methods =====
     
@@ -71,9 +277,9 @@ class ValidatusAliasesConfig:
         """Get all factor IDs for a specific segment"""
         return self.config['factor_groups'].get(segment_id, [])
     
-    def get_all_factor_ids(self) -> List[str]:
+    def get_all_factor_ids(self) -> Tuple[str, ...]:
         """Get all factor IDs [F1, F2, ..., F28]"""
-        return list(self.config['reverse']['factors'].keys())
+        return self.hierarchy.factor_ids
     
     # ===== Layer Methods =====
     
@@ -89,9 +295,9 @@ class ValidatusAliasesConfig:
         """Get all layer IDs for a specific factor"""
         return self.config['layer_groups'].get(factor_id, [])
     
-    def get_all_layer_ids(self) -> List[str]:
+    def get_all_layer_ids(self) -> Tuple[str, ...]:
         """Get all layer IDs [L1_1, L1_2, ..., L28_10]"""
-        return list(self.config['reverse']['layers'].keys())
+        return self.hierarchy.layer_ids
     
     # ===== Hierarchy Navigation =====
     
@@ -126,7 +332,10 @@ class ValidatusAliasesConfig:
     
     def get_factor_for_layer(self, layer_id: str) -> Optional[str]:
         """Get parent factor ID for a given layer"""
-        # Layer IDs format: L{factor_num}_{layer_num}
+        factor_id = self.hierarchy.factor_of_layer.get(layer_id)
+        if factor_id is not None:
+            return factor_id
+        # Layers outside the configuration: IDs have the format L{factor_num}_{layer_num}
         # e.g., L1_1 → F1, L11_5 → F11
         try:
             parts = layer_id.split('_')
@@ -139,14 +348,13 @@ class ValidatusAliasesConfig:
     
     def get_segment_for_factor(self, factor_id: str) -> Optional[str]:
         """Get parent segment ID for a given factor"""
-        # Search through factor_groups
-        for segment_id, factor_list in self.config['factor_groups'].items():
-            if factor_id in factor_list:
-                return segment_id
-        return None
+        return self.hierarchy.segment_of_factor.get(factor_id)
     
     def get_segment_for_layer(self, layer_id: str) -> Optional[str]:
         """Get segment ID for a given layer (through its factor)"""
+        segment_id = self.hierarchy.segment_of_layer.get(layer_id)
+        if segment_id is not None:
+            return segment_id
         factor_id = self.get_factor_for_layer(layer_id)
         if factor_id:
             return self.get_segment_for_factor(factor_id)
@@ -0,0 +1,177 @@
+# backend/app/core/correlated_sampling.py
+"""
+Correlated sampling for vectorized Monte Carlo engines
+
+- correlation_matrix: symmetric matrix from pairwise driver correlations
+- nearest_correlation: closest valid correlation matrix (Higham, 2002)
+- cholesky_factor: Cholesky factor, repairing matrices that are not PSD
+- correlated_normals: (runs x variables) standard normals with a given
+  correlation structure
+- to_marginal: Gaussian copula mapping of correlated normals onto the
+  target marginal distribution of each variable
+"""
+
+import logging
+from typing import List, Mapping
+
+import numpy as np
+from scipy import special
+
+logger = logging.getLogger(__name__)
+
+# Above this many samples, inverse CDFs without a closed form are
+# interpolated from a table on a uniform grid in normal space
+# (max error ~1e-7 for typical shape parameters)
+TABULATE_ABOVE = 50_000
+_TABLE_NORMALS = np.linspace(-8.5, 8.5, 8193)
+
+
+def correlation_matrix(variable_ids: List[str],
+                       correlations: Mapping[str, Mapping[str, float]]) -> np.ndarray:
+    """Symmetric correlation matrix for ``variable_ids``
+
+    ``correlations`` maps a variable to its partners; a pair may be listed
+    in either or both directions (both directions are averaged). Pairs not
+    listed are uncorrelated.
+    """
+    index = {variable_id: i for i, variable_id in enumerate(variable_ids)}
+    size = len(variable_ids)
+    totals = np.zeros((size, size))
+    counts = np.zeros((size, size))
+
+    for variable_id, partners in correlations.items():
+        row = index.get(variable_id)
+        if row is None:
+            continue
+        for partner_id, value in partners.items():
+            column = index.get(partner_id)
+            if column is None or column == row:
+                continue
+            totals[row, column] += value
+            totals[column, row] += value
+            counts[row, column] += 1
+            counts[column, row] += 1
+
+    matrix = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    np.fill_diagonal(matrix, 1.0)
+    if np.any(np.abs(matrix) > 1.0):
+        raise ValueError("Correlations must lie in [-1, 1]")
+    return matrix
+
+
+def _psd_projection(matrix: np.ndarray, min_eigenvalue: float = 0.0) -> np.ndarray:
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    eigenvalues = np.maximum(eigenvalues, min_eigenvalue)
+    projected = (eigenvectors * eigenvalues) @ eigenvectors.T
+    return (projected + projected.T) / 2
+
+
+def nearest_correlation(matrix: np.ndarray,
+                        tolerance: float = 1e-10,
+                        max_iterations: int = 100,
+                        min_eigenvalue: float = 1e-8) -> np.ndarray:
+    """Nearest positive definite correlation matrix
+
+    Alternating projections with Dykstra's correction (Higham, 2002) onto
+    PSD matrices and unit-diagonal matrices, followed by an eigenvalue
+    floor so the result has a Cholesky factor.
+    """
+    current = (np.asarray(matrix, dtype=float) + np.asarray(matrix, dtype=float).T) / 2
+    correction = np.zeros_like(current)
+
+    for _ in range(max_iterations):
+        residual = current - correction
+        projected = _psd_projection(residual)
+        correction = projected - residual
+        updated = projected.copy()
+        np.fill_diagonal(updated, 1.0)
+        change = np.linalg.norm(updated - current) / max(np.linalg.norm(current), 1e-12)
+        current = updated
+        if change < tolerance:
+            break
+
+    current = _psd_projection(current, min_eigenvalue)
+    scale = np.sqrt(np.diag(current))
+    current = current / np.outer(scale, scale)
+    np.fill_diagonal(current, 1.0)
+    return current
+
+
+def cholesky_factor(matrix: np.ndarray) -> np.ndarray:
+    """Lower Cholesky factor of a correlation matrix
+
+    Matrices that are not positive definite (e.g. inconsistent pairwise
+    estimates) are replaced by their nearest correlation matrix first.
+    """
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        logger.warning("Correlation matrix is not positive definite; using nearest correlation matrix")
+        return np.linalg.cholesky(nearest_correlation(matrix))
+
+
+def correlated_normals(rng: np.random.Generator, factor: np.ndarray, runs: int) -> np.ndarray:
+    """(runs x variables) standard normals with correlation ``factor @ factor.T``
+
+    Drawn variable-major, so each returned column is contiguous in memory.
+    """
+    independent = rng.standard_normal((factor.shape[0], runs))
+    return (factor @ independent).T
+
+
+def _beta_from_normals(alpha: float, beta: float, normals: np.ndarray) -> np.ndarray:
+    if normals.size <= TABULATE_ABOVE:
+        return special.betaincinv(alpha, beta, special.ndtr(normals))
+
+    grid = _TABLE_NORMALS
+    table = special.betaincinv(alpha, beta, special.ndtr(grid))
+    steps = np.diff(table)
+    position = (normals - grid[0]) / (grid[1] - grid[0])
+    np.clip(position, 0, len(grid) - 1 - 1e-9, out=position)
+    index = position.astype(np.intp)
+    position -= index
+    position *= steps[index]
+    position += table[index]
+    return position
+
+
+def to_marginal(distribution_type: str,
+                params: Mapping[str, float],
+                normals: np.ndarray) -> np.ndarray:
+    """Map standard normals onto a marginal distribution (Gaussian copula)
+
+    Supports the FactorConfig distributions: normal (mean, std), lognormal
+    (mu, sigma), beta (alpha, beta), triangular (low, mode, high) and
+    uniform (low, high; default [0, 1], also used for unknown types).
+    Rank correlations between columns are preserved by the mapping.
+    """
+    if distribution_type == 'normal':
+        return params['mean'] + params['std'] * normals
+    if distribution_type == 'lognormal':
+        values = params['mu'] + params['sigma'] * normals
+        return np.exp(values, out=values)
+    if distribution_type == 'beta':
+        return _beta_from_normals(params['alpha'], params['beta'], normals)
+
+    uniforms = special.ndtr(normals)
+    if distribution_type == 'triangular':
+        # Inverse CDF, split at the mode
+        low, mode, high = params['low'], params['mode'], params['high']
+        width = high - low
+        split = (mode - low) / width if width > 0 else 0.0
+        values = high - np.sqrt((1.0 - uniforms) * width * (high - mode))
+        below = uniforms < split
+        values[below] = low + np.sqrt(uniforms[below] * width * (mode - low))
+        return values
+
+    if distribution_type == 'uniform':
+        low, high = params.get('low', 0.0), params.get('high', 1.0)
+        uniforms *= high - low
+        uniforms += low
+    return uniforms
+
+
+__all__ = [
+    'correlation_matrix', 'nearest_correlation', 'cholesky_factor',
+    'correlated_normals', 'to_marginal'
+]
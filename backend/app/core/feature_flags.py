@@ -45,6 +45,7 @@ class FeatureFlags:
     CIRCUIT_BREAKER_ENABLED = os.getenv('ENABLE_CIRCUIT_BREAKER', 'false').lower() == 'true'
     MULTI_LEVEL_CACHE_ENABLED = os.getenv('ENABLE_MULTI_LEVEL_CACHE', 'false').lower() == 'true'
     REDIS_CACHE_ENABLED = os.getenv('ENABLE_REDIS_CACHE', 'false').lower() == 'true'
+    DISTRIBUTED_SINGLE_FLIGHT_ENABLED = os.getenv('ENABLE_DISTRIBUTED_SINGLE_FLIGHT', 'false').lower() == 'true'
     EVENT_DRIVEN_PUBLISHER_ENABLED = os.getenv('ENABLE_EVENT_DRIVEN_PUBLISHER', 'false').lower() == 'true'
     COMPREHENSIVE_MONITORING_ENABLED = os.getenv('ENABLE_COMPREHENSIVE_MONITORING', 'true').lower() == 'true'
     
@@ -104,6 +105,7 @@ class FeatureFlags:
             'circuit_breaker': cls.CIRCUIT_BREAKER_ENABLED,
             'multi_level_cache': cls.MULTI_LEVEL_CACHE_ENABLED,
             'redis_cache': cls.REDIS_CACHE_ENABLED,
+            'distributed_single_flight': cls.DISTRIBUTED_SINGLE_FLIGHT_ENABLED,
             'event_driven_publisher': cls.EVENT_DRIVEN_PUBLISHER_ENABLED,
             'comprehensive_monitoring': cls.COMPREHENSIVE_MONITORING_ENABLED,
             
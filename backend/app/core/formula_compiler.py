@@ -0,0 +1,241 @@
+# backend/app/core/formula_compiler.py
+"""
+Compiled arithmetic formulas
+
+Formula strings such as '(market_size * growth_rate) / competitive_intensity'
+are parsed once into a restricted AST, validated and lowered to a tree of
+closures. The compiled formula evaluates scalars or whole numpy arrays of
+inputs (one entry per sample) in a single call.
+
+Only arithmetic is accepted: numeric constants, variable names, + - * / **,
+unary +/- and a few whitelisted functions (abs, min, max, sqrt, log, exp).
+Attribute access, subscripts, keyword arguments, comparisons and any other
+syntax are rejected at compile time. Division by zero yields 0.0, matching
+the engine's previous parser.
+
+Compiled formulas are cached by the hash of their whitespace-normalized text.
+"""
+
+import ast
+import operator
+from typing import Any, Callable, Dict, Mapping, Tuple, Union
+
+import numpy as np
+
+from .memoization import MISSING, MemoCache, stable_hash
+
+Value = Union[float, np.ndarray]
+Node = Callable[[Mapping[str, Value]], Value]
+
+# Bounds on what a formula may contain
+MAX_FORMULA_LENGTH = 2000
+MAX_NODES = 256
+
+
+class FormulaError(ValueError):
+    """Raised for formulas outside the supported grammar or missing inputs"""
+
+
+def _divide(numerator: Value, denominator: Value) -> Value:
+    """numerator / denominator, 0.0 where the denominator is zero"""
+    if type(numerator) is float and type(denominator) is float:
+        return numerator / denominator if denominator != 0 else 0.0
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=float),
+                                                 np.asarray(denominator, dtype=float))
+    out = np.zeros(numerator.shape)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+def _power(base: Value, exponent: Value) -> Value:
+    with np.errstate(over='ignore', invalid='ignore'):
+        return np.power(np.asarray(base, dtype=float), exponent)[()]
+
+
+def _reduce(function: Callable) -> Callable:
+    def reduced(*values: Value) -> Value:
+        result = values[0]
+        for value in values[1:]:
+            result = function(result, value)
+        return result
+    return reduced
+
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide,
+    ast.Pow: _power,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# name -> (function, minimum arguments, maximum arguments)
+_FUNCTIONS = {
+    'abs': (np.abs, 1, 1),
+    'sqrt': (np.sqrt, 1, 1),
+    'log': (np.log, 1, 1),
+    'exp': (np.exp, 1, 1),
+    'min': (_reduce(np.minimum), 2, 8),
+    'max': (_reduce(np.maximum), 2, 8),
+}
+
+
+class CompiledFormula:
+    """A validated formula lowered to closures
+
+    ``variables`` are the input names the formula reads, in order of first
+    use. Calling the formula with a mapping of scalars returns a float;
+    arrays (or a mix of arrays and scalars) broadcast and return an array.
+    """
+
+    def __init__(self, source: str, root: Node, variables: Tuple[str, ...]):
+        self.source = source
+        self.variables = variables
+        self._root = root
+
+    def __call__(self, values: Mapping[str, Any]) -> Value:
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise FormulaError(f"Missing formula inputs: {', '.join(missing)}")
+        env: Dict[str, Value] = {}
+        for name in self.variables:
+            value = values[name]
+            if type(value) is not float:
+                value = float(value) if np.ndim(value) == 0 else np.asarray(value, dtype=float)
+            env[name] = value
+        result = self._root(env)
+        return result if type(result) is float or np.ndim(result) else float(result)
+
+    evaluate = __call__
+
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.source!r})"
+
+
+class _Lowering:
+    """Validates a parsed formula and builds its closure tree"""
+
+    def __init__(self):
+        self.nodes = 0
+        self.variables: Dict[str, None] = {}
+
+    def lower(self, node: ast.AST) -> Tuple[Node, Any]:
+        """(closure, constant value or MISSING); constant subtrees are folded"""
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise FormulaError(f"Formula has more than {MAX_NODES} nodes")
+
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise FormulaError(f"Unsupported constant {node.value!r}")
+            value = float(node.value)
+            return (lambda env: value), value
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name.startswith('_'):
+                raise FormulaError(f"Invalid variable name {name!r}")
+            self.variables.setdefault(name)
+            return (lambda env: env[name]), MISSING
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            function = _BINARY_OPERATORS[type(node.op)]
+            (left, left_value), (right, right_value) = self.lower(node.left), self.lower(node.right)
+            if left_value is not MISSING and right_value is not MISSING:
+                return self._constant(function(left_value, right_value))
+            return (lambda env: function(left(env), right(env))), MISSING
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            function = _UNARY_OPERATORS[type(node.op)]
+            operand, operand_value = self.lower(node.operand)
+            if operand_value is not MISSING:
+                return self._constant(function(operand_value))
+            return (lambda env: function(operand(env))), MISSING
+
+        if isinstance(node, ast.Call):
+            return self._lower_call(node)
+
+        raise FormulaError(f"Unsupported syntax: {type(node).__name__}")
+
+    def _lower_call(self, node: ast.Call) -> Tuple[Node, Any]:
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise FormulaError(f"Unsupported function: {ast.unparse(node.func)}")
+        if node.keywords:
+            raise FormulaError("Keyword arguments are not supported")
+        function, minimum, maximum = _FUNCTIONS[node.func.id]
+        if not minimum <= len(node.args) <= maximum:
+            raise FormulaError(f"{node.func.id}() takes {minimum}-{maximum} arguments")
+        arguments = [self.lower(argument) for argument in node.args]
+        closures = [closure for closure, _ in arguments]
+        if all(value is not MISSING for _, value in arguments):
+            return self._constant(function(*(value for _, value in arguments)))
+        if len(closures) == 1:
+            only = closures[0]
+            return (lambda env: function(only(env))), MISSING
+        return (lambda env: function(*(closure(env) for closure in closures))), MISSING
+
+    @staticmethod
+    def _constant(value: Any) -> Tuple[Node, Any]:
+        value = float(value)
+        return (lambda env: value), value
+
+
+def normalize_formula(formula: str) -> str:
+    """Formula text with whitespace removed (the cache key's basis)"""
+    return ''.join(formula.split())
+
+
+def _compile(formula: str) -> CompiledFormula:
+    if len(formula) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"Formula longer than {MAX_FORMULA_LENGTH} characters")
+    try:
+        tree = ast.parse(formula.strip(), mode='eval')
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula syntax: {e.msg}") from e
+    except (RecursionError, MemoryError) as e:
+        raise FormulaError("Formula nested too deeply") from e
+    lowering = _Lowering()
+    root, _ = lowering.lower(tree.body)
+    return CompiledFormula(formula, root, tuple(lowering.variables))
+
+
+_cache = MemoCache('formula_compiler', max_entries=1024)
+# Exact text -> compiled formula, so repeated calls skip normalizing and
+# hashing; cleared whenever it outgrows the main cache
+_by_text: Dict[str, CompiledFormula] = {}
+
+
+def compile_formula(formula: str) -> CompiledFormula:
+    """Compiled form of ``formula``, from the cache when seen before
+
+    Raises FormulaError for anything outside the supported grammar.
+    """
+    compiled = _by_text.get(formula)
+    if compiled is not None:
+        return compiled
+    key = stable_hash(normalize_formula(formula))
+    compiled = _cache.get(key)
+    if compiled is MISSING:
+        compiled = _compile(formula)
+        _cache.put(key, compiled)
+    if len(_by_text) >= _cache.max_entries:
+        _by_text.clear()
+    _by_text[formula] = compiled
+    return compiled
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    return _cache.get_stats()
+
+
+def clear_cache():
+    _by_text.clear()
+    _cache.clear()
+
+
+__all__ = [
+    'CompiledFormula', 'FormulaError', 'compile_formula', 'normalize_formula',
+    'get_cache_stats', 'clear_cache'
+]
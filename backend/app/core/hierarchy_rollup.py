@@ -0,0 +1,274 @@
+# backend/app/core/hierarchy_rollup.py
+"""
+Matrix roll-up of the 210 -> 28 -> 5 Validatus hierarchy
+
+The layer -> factor -> segment hierarchy from validatus_aliases.yaml is
+compiled into two weight matrices:
+
+- layer_factor (factors x layers): each factor is the equal-weighted mean
+  of its scored layers (the V2 factor engine's method)
+- segment_outputs (segments * outputs x factors): per segment, the four
+  linear metric formulas of the V2 segment engine and the overall score
+
+A full roll-up is two mat-vecs; a batch of sessions or simulation draws
+(one row each) is two mat-mats. The matrices are small (28 x 210 and
+25 x 28), so they are kept dense. Missing layers are NaN and
+drop out of their factor's mean; a factor with no scored layers takes
+DEFAULT_SCORE. RollupState keeps one session's roll-up current under
+single-layer updates, propagating only the change to the affected factor
+and segment.
+"""
+
+import math
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_SCORE = 0.5
+
+SEGMENT_METRICS = ('attractiveness', 'competitiveness', 'market_size', 'growth')
+SEGMENT_OUTPUTS = SEGMENT_METRICS + ('overall',)
+
+# segment -> metric -> {factor: weight}
+SEGMENT_METRIC_WEIGHTS: Dict[str, Dict[str, Dict[str, float]]] = {
+    'S1': {  # Product Intelligence
+        'attractiveness': {'F7': 0.4, 'F8': 0.3, 'F10': 0.3},
+        'competitiveness': {'F2': 0.5, 'F9': 0.5},
+        'market_size': {'F1': 0.6, 'F4': 0.4},
+        'growth': {'F8': 0.5, 'F5': 0.5},
+    },
+    'S2': {  # Consumer Intelligence
+        'attractiveness': {'F11': 0.4, 'F13': 0.3, 'F15': 0.3},
+        'competitiveness': {'F12': 0.6, 'F14': 0.4},
+        'market_size': {'F11': 0.7, 'F13': 0.3},
+        'growth': {'F13': 0.5, 'F14': 0.5},
+    },
+    'S3': {  # Market Intelligence
+        'attractiveness': {'F18': 0.5, 'F16': 0.5},
+        'competitiveness': {'F17': 0.7, 'F19': 0.3},
+        'market_size': {'F18': 0.8, 'F20': 0.2},
+        'growth': {'F18': 0.4, 'F16': 0.6},
+    },
+    'S4': {  # Brand Intelligence
+        'attractiveness': {'F22': 0.4, 'F23': 0.3, 'F25': 0.3},
+        'competitiveness': {'F21': 0.6, 'F24': 0.4},
+        'market_size': {'F23': 0.6, 'F22': 0.4},
+        'growth': {'F25': 0.5, 'F24': 0.5},
+    },
+    'S5': {  # Experience Intelligence
+        'attractiveness': {'F26': 0.4, 'F27': 0.4, 'F28': 0.2},
+        'competitiveness': {'F27': 0.6, 'F26': 0.4},
+        'market_size': {'F26': 0.5, 'F28': 0.5},
+        'growth': {'F26': 0.7, 'F27': 0.3},
+    },
+}
+
+# overall = 0.35 * attractiveness + 0.25 * (1 - competitiveness)
+#           + 0.20 * market_size + 0.20 * growth
+OVERALL_SCORE_WEIGHTS = {'attractiveness': 0.35, 'competitiveness': -0.25,
+                         'market_size': 0.20, 'growth': 0.20}
+OVERALL_SCORE_OFFSET = 0.25
+
+
+def overall_segment_score(metrics: Mapping[str, float]) -> float:
+    """Overall segment score from its four metrics"""
+    return OVERALL_SCORE_OFFSET + sum(weight * metrics[metric]
+                                      for metric, weight in OVERALL_SCORE_WEIGHTS.items())
+
+
+class HierarchyRollup:
+    """Layer -> factor -> segment roll-up as weight matrices
+
+    ``layer_groups`` maps each factor to its layers and ``factor_groups``
+    each segment to its factors, in output order. Layers and factors
+    outside the groups are not part of the roll-up.
+    """
+
+    def __init__(self, layer_groups: Mapping[str, Sequence[str]],
+                 factor_groups: Mapping[str, Sequence[str]],
+                 metric_weights: Mapping[str, Mapping[str, Mapping[str, float]]] = SEGMENT_METRIC_WEIGHTS):
+        self.factor_ids: List[str] = list(layer_groups)
+        self.segment_ids: List[str] = list(factor_groups)
+        self.layer_ids: List[str] = [layer for factor in self.factor_ids for layer in layer_groups[factor]]
+        self.factor_index = {factor: i for i, factor in enumerate(self.factor_ids)}
+        self.segment_index = {segment: i for i, segment in enumerate(self.segment_ids)}
+        self.layer_index = {layer: i for i, layer in enumerate(self.layer_ids)}
+
+        # Layer -> factor: row-normalized, so a fully scored vector needs one mat-vec
+        self.layer_factors = np.array([self.factor_index[factor] for factor in self.factor_ids
+                                       for _ in layer_groups[factor]], dtype=np.intp)
+        sizes = np.bincount(self.layer_factors, minlength=len(self.factor_ids))
+        self.layer_weights = 1.0 / sizes[self.layer_factors]
+        self.layer_factor = np.zeros((len(self.factor_ids), len(self.layer_ids)))
+        self.layer_factor[self.layer_factors, np.arange(len(self.layer_ids))] = self.layer_weights
+        self.factor_sizes = sizes
+
+        self.factor_segments = np.full(len(self.factor_ids), -1, dtype=np.intp)
+        for segment, factors in factor_groups.items():
+            for factor in factors:
+                if factor in self.factor_index:
+                    self.factor_segments[self.factor_index[factor]] = self.segment_index[segment]
+
+        # Factor -> segment outputs, with the overall score folded in
+        outputs = len(SEGMENT_OUTPUTS)
+        rows, columns, weights = [], [], []
+        self.segment_offsets = np.zeros(len(self.segment_ids) * outputs)
+        for s, segment in enumerate(self.segment_ids):
+            formulas = metric_weights.get(segment, {})
+            overall_row = s * outputs + SEGMENT_OUTPUTS.index('overall')
+            self.segment_offsets[overall_row] = OVERALL_SCORE_OFFSET
+            for m, metric in enumerate(SEGMENT_METRICS):
+                for factor, weight in formulas.get(metric, {}).items():
+                    f = self.factor_index[factor]
+                    rows += [s * outputs + m, overall_row]
+                    columns += [f, f]
+                    weights += [weight, weight * OVERALL_SCORE_WEIGHTS[metric]]
+        # Duplicate (row, factor) pairs are summed
+        self.segment_outputs = np.zeros((len(self.segment_ids) * outputs, len(self.factor_ids)))
+        np.add.at(self.segment_outputs, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)),
+                  weights)
+
+        # Per factor, the span of output rows it feeds (its segment's block)
+        # and its weights there, for single-factor updates
+        dense = self.segment_outputs
+        self._factor_blocks = []
+        for f in range(len(self.factor_ids)):
+            used = np.flatnonzero(dense[:, f])
+            start, stop = (used[0], used[-1] + 1) if len(used) else (0, 0)
+            self._factor_blocks.append((start, stop, dense[start:stop, f].copy()))
+
+    @classmethod
+    def from_aliases(cls, aliases,
+                     metric_weights: Mapping[str, Mapping[str, Mapping[str, float]]] = SEGMENT_METRIC_WEIGHTS) -> 'HierarchyRollup':
+        """Roll-up for a ValidatusAliasesConfig"""
+        layer_groups = {factor: aliases.get_layers_for_factor(factor) for factor in aliases.get_all_factor_ids()}
+        factor_groups = {segment: aliases.get_factors_for_segment(segment)
+                         for segment in aliases.get_all_segment_ids()}
+        return cls(layer_groups, factor_groups, metric_weights)
+
+    def layer_vector(self, scores: Mapping[str, float]) -> np.ndarray:
+        """Layer scores by id as a vector in layer order (NaN where missing)
+
+        Ids outside the hierarchy are ignored.
+        """
+        vector = np.full(len(self.layer_ids), np.nan)
+        index = self.layer_index
+        for layer_id, score in scores.items():
+            i = index.get(layer_id)
+            if i is not None:
+                vector[i] = score
+        return vector
+
+    def factor_scores(self, layer_values: np.ndarray) -> np.ndarray:
+        """Factor scores from (layers,) or (runs x layers) layer values"""
+        layer_values = np.asarray(layer_values, dtype=float)
+        present = ~np.isnan(layer_values)
+        if present.all():
+            return self._apply(self.layer_factor, layer_values)
+        totals = self._apply(self.layer_factor, np.where(present, layer_values, 0.0))
+        coverage = self._apply(self.layer_factor, present.astype(float))
+        scored = coverage > 0
+        return np.where(scored, totals / np.where(scored, coverage, 1.0), DEFAULT_SCORE)
+
+    def segment_scores(self, factor_values: np.ndarray) -> np.ndarray:
+        """Segment outputs, shaped (..., segments, SEGMENT_OUTPUTS)"""
+        factor_values = np.asarray(factor_values, dtype=float)
+        flat = self._apply(self.segment_outputs, factor_values) + self.segment_offsets
+        return flat.reshape(factor_values.shape[:-1] + (len(self.segment_ids), len(SEGMENT_OUTPUTS)))
+
+    def rollup(self, layer_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(factor scores, segment outputs) for layer values"""
+        factors = self.factor_scores(layer_values)
+        return factors, self.segment_scores(factors)
+
+    def state(self, layer_values: Optional[np.ndarray] = None) -> 'RollupState':
+        """Incrementally updatable roll-up of one session"""
+        if layer_values is None:
+            layer_values = np.full(len(self.layer_ids), np.nan)
+        return RollupState(self, layer_values)
+
+    @staticmethod
+    def _apply(matrix: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # (runs x columns) rows go through as one mat-mat
+        return values @ matrix.T
+
+
+class RollupState:
+    """One session's roll-up, kept current under single-layer updates
+
+    ``factors`` and ``segments`` (segments x SEGMENT_OUTPUTS) always reflect
+    ``layers``. update_layer touches one factor and the rows of its
+    segment; refresh() recomputes everything from the layers.
+    """
+
+    def __init__(self, rollup: HierarchyRollup, layer_values: np.ndarray):
+        self.rollup = rollup
+        self.layers = np.array(layer_values, dtype=float)
+        if self.layers.shape != (len(rollup.layer_ids),):
+            raise ValueError(f"Expected {len(rollup.layer_ids)} layer values, got shape {self.layers.shape}")
+        self.refresh()
+
+    def refresh(self):
+        rollup = self.rollup
+        present = ~np.isnan(self.layers)
+        self._totals = rollup.layer_factor @ np.where(present, self.layers, 0.0)
+        self._counts = np.bincount(rollup.layer_factors[present], minlength=len(rollup.factor_ids))
+        self.factors = np.where(self._counts > 0,
+                                self._totals * rollup.factor_sizes / np.maximum(self._counts, 1),
+                                DEFAULT_SCORE)
+        self._segments = rollup.segment_outputs @ self.factors + rollup.segment_offsets
+
+    @property
+    def segments(self) -> np.ndarray:
+        return self._segments.reshape(len(self.rollup.segment_ids), len(SEGMENT_OUTPUTS))
+
+    def update_layer(self, layer_id: str, score: Optional[float]) -> Tuple[str, Optional[str]]:
+        """Set (or, with None, clear) one layer score
+
+        Returns the ids of the factor and segment whose scores changed.
+        """
+        rollup = self.rollup
+        i = rollup.layer_index.get(layer_id)
+        if i is None:
+            raise KeyError(f"Unknown layer {layer_id}")
+        f = int(rollup.layer_factors[i])
+        weight = float(rollup.layer_weights[i])
+        totals, counts = self._totals, self._counts
+
+        previous = float(self.layers[i])
+        if not math.isnan(previous):
+            totals[f] -= weight * previous
+            counts[f] -= 1
+        if score is None:
+            self.layers[i] = np.nan
+        else:
+            self.layers[i] = score
+            totals[f] += weight * score
+            counts[f] += 1
+        if counts[f] == 0:
+            totals[f] = 0.0
+            value = DEFAULT_SCORE
+        else:
+            value = float(totals[f]) * float(rollup.factor_sizes[f]) / int(counts[f])
+
+        delta = value - float(self.factors[f])
+        self.factors[f] = value
+        start, stop, column = rollup._factor_blocks[f]
+        self._segments[start:stop] += column * delta
+
+        s = rollup.factor_segments[f]
+        return rollup.factor_ids[f], rollup.segment_ids[s] if s >= 0 else None
+
+    def factor_dict(self) -> Dict[str, float]:
+        return dict(zip(self.rollup.factor_ids, self.factors.tolist()))
+
+    def segment_dict(self) -> Dict[str, Dict[str, float]]:
+        return {segment: dict(zip(SEGMENT_OUTPUTS, row))
+                for segment, row in zip(self.rollup.segment_ids, self.segments.tolist())}
+
+
+__all__ = [
+    'DEFAULT_SCORE', 'SEGMENT_METRICS', 'SEGMENT_OUTPUTS', 'SEGMENT_METRIC_WEIGHTS',
+    'OVERALL_SCORE_WEIGHTS', 'OVERALL_SCORE_OFFSET', 'overall_segment_score',
+    'HierarchyRollup', 'RollupState'
+]
@@ -0,0 +1,232 @@
+# backend/app/core/memoization.py
+"""
+Argument-aware memoization for PerformanceOptimizer
+
+- stable_hash: content hash of call arguments that is stable across
+  processes (dicts, lists, sets, numpy arrays, dataclasses, pydantic models)
+- MemoCache: per-function LRU store with TTL, entry and byte bounds and
+  hit/miss/eviction statistics
+- Concurrent identical async calls are coalesced into one execution
+"""
+
+import dataclasses
+import enum
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from .single_flight import SingleFlight
+from .size_estimation import estimate_size
+
+_MAX_DEPTH = 32
+_REPR_TYPES = (datetime, date, dt_time, timedelta, Decimal, UUID)
+
+
+class UnhashableArgument(TypeError):
+    """Raised when an argument has no stable content hash"""
+
+
+def _feed(update: Callable[[bytes], None], value: Any, depth: int):
+    if depth > _MAX_DEPTH:
+        raise UnhashableArgument("Arguments nested too deeply to hash")
+    value_type = type(value)
+
+    if value is None:
+        update(b'N')
+    elif value_type is bool:
+        update(b'T' if value else b'F')
+    elif value_type is int:
+        encoded = str(value).encode()
+        update(b'i' + struct.pack('>I', len(encoded)) + encoded)
+    elif value_type is float:
+        update(b'f' + struct.pack('>d', value))
+    elif value_type is str:
+        encoded = value.encode('utf-8', 'surrogatepass')
+        update(b's' + struct.pack('>Q', len(encoded)) + encoded)
+    elif value_type is bytes or value_type is bytearray:
+        update(b'b' + struct.pack('>Q', len(value)) + bytes(value))
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            update(b'A' + str(value.shape).encode())
+            _feed(update, value.tolist(), depth + 1)
+        else:
+            header = f"{value.dtype.str}{value.shape}".encode()
+            update(b'a' + struct.pack('>I', len(header)) + header)
+            update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.generic):
+        update(b'g' + value.dtype.str.encode() + value.tobytes())
+    elif isinstance(value, dict):
+        update(b'd' + struct.pack('>Q', len(value)))
+        if all(type(key) is str for key in value):
+            for key in sorted(value):
+                _feed(update, key, depth + 1)
+                _feed(update, value[key], depth + 1)
+        else:
+            # Mixed keys are not orderable: order by each key's own digest
+            keyed = sorted(((_digest(key, depth + 1), key) for key in value), key=lambda pair: pair[0])
+            for key_digest, key in keyed:
+                update(key_digest)
+                _feed(update, value[key], depth + 1)
+    elif isinstance(value, (list, tuple)):
+        update((b'l' if isinstance(value, list) else b't') + struct.pack('>Q', len(value)))
+        for item in value:
+            _feed(update, item, depth + 1)
+    elif isinstance(value, (set, frozenset)):
+        update(b'S' + struct.pack('>Q', len(value)))
+        for item_digest in sorted(_digest(item, depth + 1) for item in value):
+            update(item_digest)
+    elif isinstance(value, enum.Enum):
+        _feed(update, ('enum', value_type.__qualname__, value.value), depth + 1)
+    elif isinstance(value, (int, float, str)):
+        base = int if isinstance(value, int) else float if isinstance(value, float) else str
+        _feed(update, (value_type.__qualname__, base(value)), depth + 1)
+    elif isinstance(value, _REPR_TYPES):
+        _feed(update, ('repr', value_type.__qualname__, repr(value)), depth + 1)
+    elif hasattr(value, '__memo_key__'):
+        _feed(update, ('memo', value_type.__qualname__, value.__memo_key__()), depth + 1)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+        _feed(update, ('dataclass', value_type.__qualname__, fields), depth + 1)
+    elif hasattr(value, 'model_dump') and callable(value.model_dump):
+        _feed(update, ('model', value_type.__qualname__, value.model_dump()), depth + 1)
+    else:
+        raise UnhashableArgument(f"No stable hash for argument of type {value_type.__qualname__}")
+
+
+def _digest(value: Any, depth: int = 0) -> bytes:
+    hasher = hashlib.blake2b(digest_size=16)
+    _feed(hasher.update, value, depth)
+    return hasher.digest()
+
+
+def stable_hash(value: Any) -> str:
+    """Content hash of ``value``; equal values hash equally in every process.
+
+    Dicts and sets hash independently of insertion order; numpy arrays hash
+    their dtype, shape and data. Objects can opt in by defining
+    ``__memo_key__()``; anything else raises UnhashableArgument.
+    """
+    return _digest(value).hex()
+
+
+@dataclass
+class MemoStats:
+    """Memoization counters for one function"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    uncacheable: int = 0        # Calls whose arguments could not be hashed
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        total = self.hits + self.misses
+        data['hit_rate'] = self.hits / total if total else 0.0
+        return data
+
+
+MISSING = object()
+
+
+class MemoCache:
+    """Bounded memo store for one function"""
+
+    def __init__(self,
+                 name: str,
+                 ttl_seconds: Optional[float] = None,
+                 max_entries: int = 1000,
+                 max_bytes: Optional[int] = None,
+                 skip_self: bool = False):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.skip_self = skip_self
+        self.stats = MemoStats()
+        self.single_flight = SingleFlight()
+        self.total_bytes = 0
+        # key -> (value, expires_at, size_bytes), least recently used first
+        self._entries: 'OrderedDict[str, Tuple[Any, Optional[float], int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, args: tuple, kwargs: dict) -> str:
+        if self.skip_self:
+            args = args[1:]
+        return stable_hash((args, kwargs) if kwargs else args)
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value, or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return MISSING
+            value, expires_at, size = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.total_bytes -= size
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def trim(self, fraction: float) -> int:
+        """Evict the least recently used ``fraction`` of entries; returns the count"""
+        with self._lock:
+            count = int(len(self._entries) * fraction)
+            for _ in range(count):
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self.total_bytes -= size
+            self.stats.evictions += count
+            return count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            # Async callers that joined an identical in-flight call
+            'coalesced': self.single_flight.stats.coalesced_waiters,
+            'entries': len(self._entries),
+            'bytes': self.total_bytes if self.max_bytes is not None else None,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+
+__all__ = ['MISSING', 'MemoCache', 'MemoStats', 'UnhashableArgument', 'stable_hash']
@@ -0,0 +1,207 @@
+# backend/app/core/near_duplicates.py
+"""
+Near-duplicate search with MinHash signatures and LSH banding
+
+- MinHasher: character k-shingles of whitespace-normalized lowercase text,
+  hashed with a vectorized rolling hash, and a fixed-length signature by
+  one-permutation hashing: each shingle is hashed once and binned, and each
+  bin keeps its minimum (empty bins borrow from the next filled bin, the
+  "densification" of Shrivastava, 2017). The fraction of equal signature
+  positions estimates the Jaccard similarity of the shingle sets.
+- LSHIndex: signatures split into ``bands`` of ``rows`` values; documents
+  sharing any band bucket become candidates. A pair with Jaccard similarity
+  J is a candidate with probability 1 - (1 - J**rows)**bands.
+
+- NearDuplicateIndex: incremental search over accepted texts. Only LSH
+  candidates whose estimated Jaccard similarity reaches
+  ``candidate_threshold`` are verified with the exact measure
+  (sequence_similarity by default), in acceptance order.
+
+Candidates are approximate, so a duplicate is missed only when its pair
+fails the LSH or estimate filter; pairs above the verification threshold
+have high shingle overlap, which both filters pass with near certainty.
+"""
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Odd multiplier of the polynomial rolling hash
+_ROLLING_BASE = np.uint64(0x100000001B3)
+_EMPTY = np.uint64(1 << 32)
+# Added per bin of distance when an empty bin borrows a value
+_BORROW_STEP = np.uint64(0x9E3779B1)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads every input bit over the whole word"""
+    values = values ^ (values >> np.uint64(30))
+    values *= np.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> np.uint64(27)
+    values *= np.uint64(0x94D049BB133111EB)
+    values ^= values >> np.uint64(31)
+    return values
+
+
+class MinHasher:
+    """Shingles text and computes MinHash signatures"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        if num_perm < 1 or shingle_size < 1:
+            raise ValueError("num_perm and shingle_size must be positive")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._seed = np.uint64(np.random.default_rng(seed).integers(0, 2 ** 63))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Distinct 64-bit hashes of the k-character shingles of normalized text"""
+        hashes = np.sort(self._shingle_hashes(text))
+        return hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))] if len(hashes) else hashes
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        # Repeats are left in: they do not change a minimum
+        data = np.frombuffer(self.normalize(text).encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        if len(data) == 0:
+            return np.empty(0, dtype=np.uint64)
+        k = min(self.shingle_size, len(data))
+        count = len(data) - k + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(k):
+                hashes *= _ROLLING_BASE
+                hashes += data[offset:offset + count]
+        return hashes
+
+    def signature(self, text: str) -> np.ndarray:
+        """(num_perm,) uint32 MinHash signature of ``text``"""
+        return self.signature_of_shingles(self._shingle_hashes(text))
+
+    def signature_of_shingles(self, shingles: np.ndarray) -> np.ndarray:
+        signature = np.full(self.num_perm, _EMPTY, dtype=np.uint64)
+        if len(shingles) == 0:
+            return (signature - np.uint64(1)).astype(np.uint32)
+        with np.errstate(over='ignore'):
+            mixed = _mix(shingles ^ self._seed)
+            bins = ((mixed >> np.uint64(32)) % np.uint64(self.num_perm)).astype(np.intp)
+            np.minimum.at(signature, bins, mixed & np.uint64(0xFFFFFFFF))
+
+            empty = signature == _EMPTY
+            if empty.any():
+                filled = np.flatnonzero(~empty)
+                missing = np.flatnonzero(empty)
+                source = filled[np.searchsorted(filled, missing) % len(filled)]
+                distance = ((source - missing) % self.num_perm).astype(np.uint64)
+                signature[missing] = (signature[source] + distance * _BORROW_STEP) & np.uint64(0xFFFFFFFF)
+        return signature.astype(np.uint32)
+
+
+def estimate_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """Jaccard similarity estimated from two signatures of the same MinHasher"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures
+
+    Uses the first bands * rows signature values; the rest still sharpen
+    estimate_jaccard.
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 3):
+        if bands < 1 or rows < 1:
+            raise ValueError("bands and rows must be positive")
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        width = self.bands * self.rows
+        if len(signature) < width:
+            raise ValueError(f"Signature of {len(signature)} values is shorter than bands * rows = {width}")
+        banded = np.ascontiguousarray(signature[:width]).reshape(self.bands, self.rows)
+        return [row.tobytes() for row in banded]
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        for buckets, band in zip(self._buckets, self._band_keys(signature)):
+            buckets[band].append(key)
+        self._size += 1
+
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        """Keys sharing at least one band with ``signature``"""
+        candidates: Set[Hashable] = set()
+        for buckets, band in zip(self._buckets, self._band_keys(signature)):
+            keys = buckets.get(band)
+            if keys:
+                candidates.update(keys)
+        return candidates
+
+    def candidate_probability(self, jaccard: float) -> float:
+        """Chance that a pair with this Jaccard similarity becomes a candidate"""
+        return 1.0 - (1.0 - jaccard ** self.rows) ** self.bands
+
+
+def sequence_similarity(text: str, existing: str, threshold: float) -> float:
+    """difflib ratio of two texts, or 0.0 once its upper bounds rule out > threshold"""
+    matcher = SequenceMatcher(None, text, existing)
+    if matcher.real_quick_ratio() <= threshold or matcher.quick_ratio() <= threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+class NearDuplicateIndex:
+    """Finds, for each new text, the first accepted text it nearly duplicates
+
+    Texts are compared lowercased. ``similarity(text, existing, threshold)``
+    is the exact measure; a pair is a duplicate when it exceeds
+    ``threshold``.
+    """
+
+    def __init__(self, threshold: float = 0.95, candidate_threshold: float = 0.5,
+                 num_perm: int = 128, shingle_size: int = 5, bands: int = 32, rows: int = 3,
+                 similarity: Callable[[str, str, float], float] = sequence_similarity):
+        self.threshold = threshold
+        self.candidate_threshold = candidate_threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.lsh = LSHIndex(bands=bands, rows=rows)
+        self.similarity = similarity
+        self._texts: List[str] = []
+        self._signatures: List[np.ndarray] = []
+        self.verified_pairs = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def check(self, text: str) -> Tuple[Optional[int], float]:
+        """(position of the matched accepted text, similarity), or (None, 0.0)
+
+        Unmatched texts are accepted; positions count accepted texts from 0.
+        """
+        text = text.lower()
+        signature = self.hasher.signature(text)
+        for position in sorted(self.lsh.query(signature)):
+            if estimate_jaccard(signature, self._signatures[position]) < self.candidate_threshold:
+                continue
+            self.verified_pairs += 1
+            similarity = self.similarity(text, self._texts[position], self.threshold)
+            if similarity > self.threshold:
+                return position, similarity
+
+        self.lsh.insert(len(self._texts), signature)
+        self._texts.append(text)
+        self._signatures.append(signature)
+        return None, 0.0
+
+
+__all__ = [
+    'MinHasher', 'LSHIndex', 'NearDuplicateIndex', 'estimate_jaccard', 'sequence_similarity'
+]
@@ -4,13 +4,17 @@ import asyncio
 import logging
 import time
 import psutil
-from typing import Dict, List, Any, Optional, Callable
+from collections import deque
+from typing import Deque, Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
 from functools import wraps
 import gc
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+from .memoization import MISSING, MemoCache, UnhashableArgument
+from .streaming_stats import DDSketch, RingBuffer
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -34,14 +38,124 @@ class OptimizationConfig:
     max_concurrent_tasks: int = 10
     enable_gc: bool = True
     gc_threshold: float = 0.8
+    metrics_history_size: int = 100
+    sample_interval_seconds: float = 1.0
+    sample_history_size: int = 600
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """Process/system resource sample published by SystemSampler"""
+    monotonic: float
+    timestamp: str
+    cpu_percent: float
+    rss_mb: float
+    loop_lag_ms: Optional[float] = None
+
+class SystemSampler:
+    """Background thread sampling CPU, RSS and event loop lag
+
+    Samples are published into a ring buffer; readers only look at the
+    latest snapshot and never call psutil themselves, so instrumented code
+    paths do not block. Loop lag is the delay between scheduling a callback
+    from this thread with call_soon_threadsafe and the loop running it.
+    """
+
+    def __init__(self, interval: float = 1.0, capacity: int = 600):
+        self.interval = interval
+        self.snapshots = RingBuffer(capacity)
+        self._process = psutil.Process()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lag_ms: Optional[float] = None
+        self._probe_pending = False
+        self._probe_sent = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """Measure scheduling lag of ``loop`` from now on"""
+        if loop is not self._loop:
+            self._loop = loop
+            self._loop_lag_ms = None
+            self._probe_pending = False
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        # Prime the non-blocking CPU counters; the first reading is meaningless
+        psutil.cpu_percent(interval=None)
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self) -> Optional[SystemSnapshot]:
+        return self.snapshots.latest()
+
+    def history(self, last: Optional[int] = None) -> List[SystemSnapshot]:
+        return self.snapshots.snapshot(last)
+
+    def sample(self) -> SystemSnapshot:
+        """Take one sample now and publish it"""
+        try:
+            cpu = psutil.cpu_percent(interval=None)
+            rss_mb = self._process.memory_info().rss / 1024 / 1024
+        except Exception:
+            cpu, rss_mb = 0.0, 0.0
+        loop_lag_ms = self._loop_lag_ms
+        if self._probe_pending:
+            # Loop has not run the last probe yet: lag is at least this long
+            loop_lag_ms = max(loop_lag_ms or 0.0, (time.perf_counter() - self._probe_sent) * 1000)
+        snapshot = SystemSnapshot(
+            monotonic=time.monotonic(),
+            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            cpu_percent=cpu,
+            rss_mb=rss_mb,
+            loop_lag_ms=loop_lag_ms
+        )
+        self.snapshots.append(snapshot)
+        self._probe_loop()
+        return snapshot
+
+    def _probe_loop(self):
+        loop = self._loop
+        if loop is None or self._probe_pending:
+            return
+        if loop.is_closed():
+            self._loop = None
+            return
+        def _received():
+            self._loop_lag_ms = (time.perf_counter() - self._probe_sent) * 1000
+            self._probe_pending = False
+
+        self._probe_sent = time.perf_counter()
+        self._probe_pending = True
+        try:
+            loop.call_soon_threadsafe(_received)
+        except RuntimeError:
+            self._probe_pending = False
+            self._loop = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
 
 class PerformanceOptimizer:
     """Advanced performance optimization utilities"""
     
     def __init__(self, config: OptimizationConfig = None):
         self.config = config or OptimizationConfig()
-        self.metrics_history: List[PerformanceMetrics] = []
-        self.cache: Dict[str, Any] = {}
+        self.metrics_history: Deque[PerformanceMetrics] = deque(maxlen=self.config.metrics_history_size)
+        self.memo_caches: Dict[str, MemoCache] = {}
         self.cache_hits = 0
         self.cache_misses = 0
         self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_tasks)
@@ -51,53 +165,153 @@ class PerformanceOptimizer:
         self._task_count = 0
         self._error_count = 0
         
+        # Resource sampling happens off the hot path; per-operation latency
+        # is aggregated into fixed-memory sketches
+        self.sampler = SystemSampler(
+            interval=self.config.sample_interval_seconds,
+            capacity=self.config.sample_history_size
+        )
+        self.operation_stats: Dict[str, DDSketch] = {}
+        self.operation_errors: Dict[str, int] = {}
+        self._sampler_started = False
+        self._snapshot_max_age = 3 * self.sampler.interval
+        
+    def _ensure_sampler(self):
+        self._sampler_started = True
+        self.sampler.start()
+    
+    def _latest_snapshot(self) -> Optional[SystemSnapshot]:
+        """Latest sampler snapshot, or None when sampling stopped or lags behind"""
+        snapshot = self.sampler.snapshots.latest()
+        if snapshot is None or time.monotonic() - snapshot.monotonic > self._snapshot_max_age:
+            return None
+        return snapshot
+    
+    def shutdown(self):
+        """Stop the background sampler and the worker pool"""
+        self._sampler_started = False
+        self.sampler.stop()
+        self.executor.shutdown(wait=False)
+    
     def optimize_function(self, 
                          cache_key: Optional[str] = None,
                          batch_processing: bool = False,
-                         memory_monitoring: bool = True):
-        """Decorator for function performance optimization"""
+                         memory_monitoring: bool = True,
+                         memoize: Optional[bool] = None,
+                         ttl_seconds: Optional[float] = None,
+                         max_entries: Optional[int] = None,
+                         max_bytes: Optional[int] = None,
+                         skip_self: bool = False):
+        """Decorator for function performance optimization
+        
+        Results are memoized per distinct arguments when ``memoize`` is set
+        (or a ``cache_key`` is given, which then names the memo cache).
+        ``skip_self`` leaves the first positional argument out of the key
+        for methods of stateless engines. Calls whose arguments have no
+        stable hash simply run uncached.
+        """
         
         def decorator(func: Callable):
+            operation = getattr(func, '__qualname__', repr(func))
+            memo = None
+            if memoize or (memoize is None and cache_key):
+                memo = self._register_memo(
+                    cache_key or operation,
+                    ttl_seconds=ttl_seconds,
+                    max_entries=max_entries or self.config.cache_size,
+                    max_bytes=max_bytes,
+                    skip_self=skip_self
+                )
+            
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
                 return await self._execute_optimized_function(
-                    func, args, kwargs, cache_key, batch_processing, memory_monitoring
+                    func, args, kwargs, memo, batch_processing, memory_monitoring,
+                    operation
                 )
             
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
                 return self._execute_sync_optimized_function(
-                    func, args, kwargs, cache_key, batch_processing, memory_monitoring
+                    func, args, kwargs, memo, batch_processing, memory_monitoring,
+                    operation
                 )
             
-            if asyncio.iscoroutinefunction(func):
-                return async_wrapper
-            else:
-                return sync_wrapper
+            wrapper = async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+            wrapper.memo_cache = memo
+            return wrapper
         
         return decorator
     
+    def _register_memo(self, name: str, **options) -> MemoCache:
+        if name in self.memo_caches:
+            # Same name from another function would share entries across functions
+            name = f"{name}#{len(self.memo_caches)}"
+        memo = MemoCache(name, **options)
+        self.memo_caches[name] = memo
+        return memo
+    
+    def _lookup_memo(self, memo: MemoCache, args: tuple, kwargs: dict):
+        """(key, cached value or MISSING); key is None when arguments cannot be hashed"""
+        try:
+            key = memo.make_key(args, kwargs)
+        except UnhashableArgument as e:
+            memo.stats.uncacheable += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Not memoizing {memo.name}: {e}")
+            return None, MISSING
+        
+        cached = memo.get(key)
+        if cached is MISSING:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Cache hit for {memo.name}")
+        return key, cached
+    
     async def _execute_optimized_function(self, 
                                         func: Callable,
                                         args: tuple,
                                         kwargs: dict,
-                                        cache_key: Optional[str],
+                                        memo: Optional[MemoCache],
                                         batch_processing: bool,
-                                        memory_monitoring: bool):
+                                        memory_monitoring: bool,
+                                        operation: Optional[str] = None):
         """Execute async function with optimization"""
         
+        if memo is None:
+            return await self._invoke_async(func, args, kwargs, None, None,
+                                            batch_processing, memory_monitoring, operation)
+        
+        key, cached = self._lookup_memo(memo, args, kwargs)
+        if cached is not MISSING:
+            return cached
+        if key is None:
+            return await self._invoke_async(func, args, kwargs, None, None,
+                                            batch_processing, memory_monitoring, operation)
+        
+        # Concurrent identical calls share one execution
+        return await memo.single_flight.do(key, lambda: self._invoke_async(
+            func, args, kwargs, memo, key, batch_processing, memory_monitoring, operation
+        ))
+    
+    async def _invoke_async(self,
+                            func: Callable,
+                            args: tuple,
+                            kwargs: dict,
+                            memo: Optional[MemoCache],
+                            memo_key: Optional[str],
+                            batch_processing: bool,
+                            memory_monitoring: bool,
+                            operation: Optional[str]):
+        if not self._sampler_started:
+            self._ensure_sampler()
+        self.sampler.attach_loop(asyncio.get_running_loop())
         start_time = time.time()
         start_memory = self._get_memory_usage()
         
         try:
-            # Check cache first
-            if cache_key and cache_key in self.cache:
-                self.cache_hits += 1
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return self.cache[cache_key]
-            
-            self.cache_misses += 1
-            
             # Monitor memory before execution
             if memory_monitoring:
                 await self._monitor_memory_usage()
@@ -108,42 +322,42 @@ class PerformanceOptimizer:
             else:
                 result = await func(*args, **kwargs)
             
-            # Cache result if cache key provided
-            if cache_key:
-                self._update_cache(cache_key, result)
+            if memo is not None:
+                memo.put(memo_key, result)
             
             # Record metrics
-            await self._record_metrics(start_time, start_memory, success=True)
+            await self._record_metrics(start_time, start_memory, success=True, operation=operation)
             
             return result
             
         except Exception as e:
             self._error_count += 1
             logger.error(f"Function execution failed: {e}")
-            await self._record_metrics(start_time, start_memory, success=False)
+            await self._record_metrics(start_time, start_memory, success=False, operation=operation)
             raise
     
     def _execute_sync_optimized_function(self, 
                                        func: Callable,
                                        args: tuple,
                                        kwargs: dict,
-                                       cache_key: Optional[str],
+                                       memo: Optional[MemoCache],
                                        batch_processing: bool,
-                                       memory_monitoring: bool):
+                                       memory_monitoring: bool,
+                                       operation: Optional[str] = None):
         """Execute sync function with optimization"""
         
+        key = None
+        if memo is not None:
+            key, cached = self._lookup_memo(memo, args, kwargs)
+            if cached is not MISSING:
+                return cached
+        
+        if not self._sampler_started:
+            self._ensure_sampler()
         start_time = time.time()
         start_memory = self._get_memory_usage()
         
         try:
-            # Check cache first
-            if cache_key and cache_key in self.cache:
-                self.cache_hits += 1
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return self.cache[cache_key]
-            
-            self.cache_misses += 1
-            
             # Monitor memory before execution
             if memory_monitoring:
                 self._monitor_memory_usage_sync()
@@ -154,19 +368,18 @@ class PerformanceOptimizer:
             else:
                 result = func(*args, **kwargs)
             
-            # Cache result if cache key provided
-            if cache_key:
-                self._update_cache(cache_key, result)
+            if key is not None:
+                memo.put(key, result)
             
             # Record metrics
-            self._record_metrics_sync(start_time, start_memory, success=True)
+            self._record_metrics_sync(start_time, start_memory, success=True, operation=operation)
             
             return result
             
         except Exception as e:
             self._error_count += 1
             logger.error(f"Function execution failed: {e}")
-            self._record_metrics_sync(start_time, start_memory, success=False)
+            self._record_metrics_sync(start_time, start_memory, success=False, operation=operation)
             raise
     
     async def _execute_batch_processing(self, func: Callable, args: tuple, kwargs: dict):
@@ -230,9 +443,8 @@ class PerformanceOptimizer:
             if self.config.enable_gc:
                 gc.collect()
                 logger.info("Garbage collection triggered")
-        
-        # Check cache size and cleanup if needed
-        if len(self.cache) > self.config.cache_size:
+            
+            # Memo caches are bounded already; under memory pressure shed their oldest entries
             await self._cleanup_cache()
     
     def _monitor_memory_usage_sync(self):
@@ -246,119 +458,84 @@ class PerformanceOptimizer:
             if self.config.enable_gc:
                 gc.collect()
                 logger.info("Garbage collection triggered")
-        
-        # Check cache size and cleanup if needed
-        if len(self.cache) > self.config.cache_size:
+            
+            # Memo caches are bounded already; under memory pressure shed their oldest entries
             self._cleanup_cache_sync()
     
     async def _cleanup_cache(self):
-        """Clean up cache by removing least recently used items"""
-        
-        # Simple cleanup: remove oldest 25% of cache
-        items_to_remove = len(self.cache) // 4
-        cache_items = list(self.cache.items())
-        
-        for i in range(items_to_remove):
-            key, _ = cache_items[i]
-            del self.cache[key]
+        """Clean up memo caches by removing least recently used items"""
         
-        logger.info(f"Cache cleanup: removed {items_to_remove} items")
+        self._cleanup_cache_sync()
     
     def _cleanup_cache_sync(self):
-        """Clean up cache synchronously"""
+        """Clean up memo caches synchronously"""
         
-        # Simple cleanup: remove oldest 25% of cache
-        items_to_remove = len(self.cache) // 4
-        cache_items = list(self.cache.items())
+        # Simple cleanup: remove oldest 25% of every memo cache
+        items_removed = sum(memo.trim(0.25) for memo in list(self.memo_caches.values()))
         
-        for i in range(items_to_remove):
-            key, _ = cache_items[i]
-            del self.cache[key]
-        
-        logger.info(f"Cache cleanup: removed {items_to_remove} items")
+        logger.info(f"Cache cleanup: removed {items_removed} items")
     
-    def _update_cache(self, key: str, value: Any):
-        """Update cache with new value"""
-        
-        self.cache[key] = value
+    def get_memoization_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction statistics per memoized function"""
         
-        # Maintain cache size limit
-        if len(self.cache) > self.config.cache_size:
-            # Remove oldest item
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
+        return {name: memo.get_stats() for name, memo in list(self.memo_caches.items())}
     
-    async def _record_metrics(self, start_time: float, start_memory: float, success: bool):
+    async def _record_metrics(self, start_time: float, start_memory: float, success: bool,
+                              operation: Optional[str] = None):
         """Record performance metrics"""
         
-        execution_time = time.time() - start_time
-        end_memory = self._get_memory_usage()
-        cpu_usage = psutil.cpu_percent(interval=0.1)
-        
-        # Calculate throughput
-        self._task_count += 1
-        total_time = time.time() - self._start_time
-        throughput = self._task_count / total_time if total_time > 0 else 0
-        
-        # Calculate cache hit rate
-        total_cache_requests = self.cache_hits + self.cache_misses
-        cache_hit_rate = self.cache_hits / total_cache_requests if total_cache_requests > 0 else 0
-        
-        metrics = PerformanceMetrics(
-            execution_time=execution_time,
-            memory_usage=end_memory,
-            cpu_usage=cpu_usage,
-            throughput=throughput,
-            error_count=self._error_count,
-            cache_hit_rate=cache_hit_rate,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
-        )
-        
-        self.metrics_history.append(metrics)
-        
-        # Keep only last 100 metrics
-        if len(self.metrics_history) > 100:
-            self.metrics_history = self.metrics_history[-100:]
-        
-        logger.debug(f"Performance metrics recorded: {execution_time:.3f}s, {end_memory:.2f}MB, {cpu_usage:.1f}% CPU")
+        self._record_metrics_sync(start_time, start_memory, success, operation)
     
-    def _record_metrics_sync(self, start_time: float, start_memory: float, success: bool):
-        """Record performance metrics synchronously"""
-        
-        execution_time = time.time() - start_time
-        end_memory = self._get_memory_usage()
-        cpu_usage = psutil.cpu_percent(interval=0.1)
+    def _record_metrics_sync(self, start_time: float, start_memory: float, success: bool,
+                             operation: Optional[str] = None):
+        """Record performance metrics synchronously
+        
+        Only reads the sampler's latest snapshot, so recording costs a few
+        microseconds and never waits on psutil.
+        """
+        
+        now = time.time()
+        execution_time = now - start_time
+        snapshot = self._latest_snapshot()
+        if snapshot is not None:
+            end_memory, cpu_usage, timestamp = snapshot.rss_mb, snapshot.cpu_percent, snapshot.timestamp
+        else:
+            end_memory, cpu_usage = self._get_memory_usage(), 0.0
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         
         # Calculate throughput
         self._task_count += 1
-        total_time = time.time() - self._start_time
+        total_time = now - self._start_time
         throughput = self._task_count / total_time if total_time > 0 else 0
         
         # Calculate cache hit rate
         total_cache_requests = self.cache_hits + self.cache_misses
         cache_hit_rate = self.cache_hits / total_cache_requests if total_cache_requests > 0 else 0
         
-        metrics = PerformanceMetrics(
-            execution_time=execution_time,
-            memory_usage=end_memory,
-            cpu_usage=cpu_usage,
-            throughput=throughput,
-            error_count=self._error_count,
-            cache_hit_rate=cache_hit_rate,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
-        )
-        
-        self.metrics_history.append(metrics)
-        
-        # Keep only last 100 metrics
-        if len(self.metrics_history) > 100:
-            self.metrics_history = self.metrics_history[-100:]
-        
-        logger.debug(f"Performance metrics recorded: {execution_time:.3f}s, {end_memory:.2f}MB, {cpu_usage:.1f}% CPU")
+        # Bounded: deque drops the oldest entry. Positional for speed: execution_time,
+        # memory_usage, cpu_usage, throughput, error_count, cache_hit_rate, timestamp
+        self.metrics_history.append(PerformanceMetrics(
+            execution_time, end_memory, cpu_usage, throughput,
+            self._error_count, cache_hit_rate, timestamp
+        ))
+        
+        if operation is not None:
+            sketch = self.operation_stats.get(operation)
+            if sketch is None:
+                sketch = self.operation_stats.setdefault(operation, DDSketch())
+            sketch.add(execution_time)
+            if not success:
+                self.operation_errors[operation] = self.operation_errors.get(operation, 0) + 1
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Performance metrics recorded: {execution_time:.3f}s, {end_memory:.2f}MB, {cpu_usage:.1f}% CPU")
     
     def _get_memory_usage(self) -> float:
         """Get current memory usage in MB"""
         
+        snapshot = self._latest_snapshot()
+        if snapshot is not None:
+            return snapshot.rss_mb
         try:
             process = psutil.Process()
             memory_info = process.memory_info()
@@ -366,13 +543,29 @@ class PerformanceOptimizer:
         except Exception:
             return 0.0
     
+    def _get_cpu_usage(self) -> float:
+        """Get latest sampled system CPU usage in percent (never blocks)"""
+        
+        snapshot = self._latest_snapshot()
+        if snapshot is not None:
+            return snapshot.cpu_percent
+        return psutil.cpu_percent(interval=None)
+    
+    def get_operation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency quantiles (ms) and error counts per instrumented operation"""
+        
+        return {
+            operation: {**sketch.to_dict(scale=1000), 'errors': self.operation_errors.get(operation, 0)}
+            for operation, sketch in list(self.operation_stats.items())
+        }
+    
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get comprehensive performance summary"""
         
         if not self.metrics_history:
             return {"error": "No metrics available"}
         
-        recent_metrics = self.metrics_history[-10:]  # Last 10 executions
+        recent_metrics = list(self.metrics_history)[-10:]  # Last 10 executions
         
         avg_execution_time = sum(m.execution_time for m in recent_metrics) / len(recent_metrics)
         avg_memory_usage = sum(m.memory_usage for m in recent_metrics) / len(recent_metrics)
@@ -380,6 +573,8 @@ class PerformanceOptimizer:
         avg_throughput = sum(m.throughput for m in recent_metrics) / len(recent_metrics)
         avg_cache_hit_rate = sum(m.cache_hit_rate for m in recent_metrics) / len(recent_metrics)
         
+        snapshot = self.sampler.latest()
+        
         return {
             "performance_summary": {
                 "average_execution_time": round(avg_execution_time, 3),
@@ -389,15 +584,18 @@ class PerformanceOptimizer:
                 "average_cache_hit_rate": round(avg_cache_hit_rate, 3),
                 "total_tasks_executed": self._task_count,
                 "total_errors": self._error_count,
-                "cache_size": len(self.cache),
+                "cache_size": sum(len(memo) for memo in list(self.memo_caches.values())),
                 "cache_hits": self.cache_hits,
                 "cache_misses": self.cache_misses
             },
             "system_health": {
                 "memory_usage_mb": self._get_memory_usage(),
-                "cpu_usage_percent": psutil.cpu_percent(interval=1),
+                "cpu_usage_percent": self._get_cpu_usage(),
+                "event_loop_lag_ms": snapshot.loop_lag_ms if snapshot else None,
                 "uptime_seconds": time.time() - self._start_time
             },
+            "operations": self.get_operation_stats(),
+            "memoization": self.get_memoization_stats(),
             "recommendations": self._generate_recommendations(recent_metrics)
         }
     
@@ -431,8 +629,10 @@ class PerformanceOptimizer:
     def clear_cache(self):
         """Clear all cached data"""
         
-        cache_size = len(self.cache)
-        self.cache.clear()
+        cache_size = 0
+        for memo in list(self.memo_caches.values()):
+            cache_size += len(memo)
+            memo.clear()
         self.cache_hits = 0
         self.cache_misses = 0
         
@@ -442,6 +642,8 @@ class PerformanceOptimizer:
         """Reset performance metrics"""
         
         self.metrics_history.clear()
+        self.operation_stats.clear()
+        self.operation_errors.clear()
         self._start_time = time.time()
         self._task_count = 0
         self._error_count = 0
@@ -454,12 +656,22 @@ performance_optimizer = PerformanceOptimizer()
 # Decorator for easy use
 def optimize_performance(cache_key: Optional[str] = None, 
                         batch_processing: bool = False,
-                        memory_monitoring: bool = True):
+                        memory_monitoring: bool = True,
+                        memoize: Optional[bool] = None,
+                        ttl_seconds: Optional[float] = None,
+                        max_entries: Optional[int] = None,
+                        max_bytes: Optional[int] = None,
+                        skip_self: bool = False):
     """Convenience decorator for performance optimization"""
     return performance_optimizer.optimize_function(
         cache_key=cache_key,
         batch_processing=batch_processing,
-        memory_monitoring=memory_monitoring
+        memory_monitoring=memory_monitoring,
+        memoize=memoize,
+        ttl_seconds=ttl_seconds,
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        skip_self=skip_self
     )
 
 # Export the classes and functions
@@ -467,6 +679,8 @@ __all__ = [
     'PerformanceOptimizer', 
     'PerformanceMetrics', 
     'OptimizationConfig',
+    'SystemSnapshot',
+    'SystemSampler',
     'performance_optimizer',
     'optimize_performance'
 ]
@@ -0,0 +1,98 @@
+# backend/app/core/semantic_duplicates.py
+"""
+Blocked cosine-similarity duplicate search over embeddings
+
+- normalize_embeddings: rows scaled to unit length (with the 1e-8 guard the
+  semantic deduplication stage used)
+- threshold_neighbors: for a block of rows, the later rows whose cosine
+  similarity exceeds the threshold, from one block x n matrix product and a
+  vectorized mask. Only the upper triangle is computed.
+- resolve_semantic_duplicates: the greedy pass of the semantic stage (the
+  shorter document of a pair is the duplicate) fed from those neighbor
+  lists instead of a full n x n matrix
+
+Memory is block_size x n for the products plus the pairs above the
+threshold, so it grows linearly in the number of documents.
+"""
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# Rows per matrix product: 1024 x 10k float64 similarities is ~80 MB
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    if embeddings.ndim != 2:
+        raise ValueError(f"Expected a 2-D embedding matrix, got shape {embeddings.shape}")
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / (norms + 1e-8)
+
+
+def threshold_neighbors(normalized: np.ndarray,
+                        threshold: float,
+                        block_size: int = DEFAULT_BLOCK_SIZE
+                        ) -> Iterator[Tuple[int, List[Tuple[np.ndarray, np.ndarray]]]]:
+    """Yield (block start, [(columns, similarities) per row]) for row blocks
+
+    Columns of row i are the indices j > i with similarity > threshold, in
+    ascending order.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+    count = len(normalized)
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        # Columns before ``start`` belong to the lower triangle of every row
+        similarities = normalized[start:stop] @ normalized[start:].T
+        mask = similarities > threshold
+        mask[:, :stop - start] &= np.triu(np.ones((stop - start, stop - start), dtype=bool), k=1)
+
+        rows, columns = np.nonzero(mask)
+        values = similarities[rows, columns]
+        bounds = np.searchsorted(rows, np.arange(stop - start + 1))
+        yield start, [
+            (columns[bounds[r]:bounds[r + 1]] + start, values[bounds[r]:bounds[r + 1]])
+            for r in range(stop - start)
+        ]
+
+
+def resolve_semantic_duplicates(embeddings: np.ndarray,
+                                lengths: Sequence[int],
+                                threshold: float,
+                                block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[int, Tuple[int, float]]:
+    """Duplicate index -> (source index, similarity)
+
+    Document i, unless already a duplicate, is compared with each later
+    non-duplicate j in order: above the threshold, j becomes a duplicate of
+    i when i is at least as long, otherwise i becomes a duplicate of j and
+    its comparisons stop.
+    """
+    if len(embeddings) != len(lengths):
+        raise ValueError("embeddings and lengths must have the same length")
+    duplicates: Dict[int, Tuple[int, float]] = {}
+    if len(embeddings) <= 1:
+        return duplicates
+
+    normalized = normalize_embeddings(embeddings)
+    for start, neighbors in threshold_neighbors(normalized, threshold, block_size):
+        for offset, (columns, similarities) in enumerate(neighbors):
+            i = start + offset
+            if i in duplicates or len(columns) == 0:
+                continue
+            for j, similarity in zip(columns.tolist(), similarities.tolist()):
+                if j in duplicates:
+                    continue
+                if lengths[i] >= lengths[j]:
+                    duplicates[j] = (i, similarity)
+                else:
+                    duplicates[i] = (j, similarity)
+                    break
+    return duplicates
+
+
+__all__ = [
+    'DEFAULT_BLOCK_SIZE', 'normalize_embeddings', 'threshold_neighbors', 'resolve_semantic_duplicates'
+]
@@ -0,0 +1,176 @@
+# backend/app/core/sentence_overlap.py
+"""
+Partial-overlap search over documents' key sentences
+
+The overlap of two documents is the Jaccard similarity of the lowercase
+word sets of their key sentences. Instead of comparing every document with
+every accepted one:
+
+- Every distinct word is hashed once into an integer id, ordered rarest
+  first across the batch.
+- OverlapIndex keeps an inverted index (word id -> accepted positions) of
+  each accepted document's prefix, its first |x| - ceil(t * |x|) + 1 ids.
+  Two sets with Jaccard similarity above t always share a prefix id, so
+  probing the postings of a document's own prefix finds every possible
+  match; the postings lists are short because prefixes hold rare words.
+- Candidates outside the size range a Jaccard similarity above t allows
+  are skipped, and the rest are verified exactly, in acceptance order.
+- simhash: optional 64-bit fingerprint pre-filter. It can drop true
+  matches, so it is only applied when ``simhash_distance`` is set.
+"""
+
+import hashlib
+import math
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Keeps float error in t * n from shortening prefixes or size ranges
+_EPSILON = 1e-9
+
+
+def word_set(sentences: Iterable[str]) -> FrozenSet[str]:
+    words = set()
+    for sentence in sentences:
+        words.update(sentence.lower().split())
+    return frozenset(words)
+
+
+def word_overlap(first: FrozenSet, second: FrozenSet) -> float:
+    """Jaccard similarity of two word sets (0.0 if either is empty)"""
+    if not first or not second:
+        return 0.0
+    intersection = len(first & second)
+    return intersection / (len(first) + len(second) - intersection)
+
+
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(word_hashes: np.ndarray) -> int:
+    """64-bit SimHash of a set of 64-bit word hashes"""
+    if len(word_hashes) == 0:
+        return 0
+    bits = np.unpackbits(np.ascontiguousarray(word_hashes, dtype='<u8').view(np.uint8), bitorder='little')
+    votes = bits.reshape(-1, 64).sum(axis=0)
+    return int.from_bytes(np.packbits(votes * 2 > len(word_hashes), bitorder='little').tobytes(), 'little')
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count('1')
+
+
+class WordVocabulary:
+    """Integer ids for the words of a batch, rarest (by document count) first"""
+
+    def __init__(self, word_sets: Sequence[FrozenSet[str]]):
+        frequencies = Counter(word for words in word_sets for word in words)
+        ordered = sorted(frequencies, key=lambda word: (frequencies[word], word))
+        self.ids: Dict[str, int] = {word: rank for rank, word in enumerate(ordered)}
+        self._hashes: Optional[np.ndarray] = None
+        self._words = ordered
+
+    def encode(self, words: FrozenSet[str]) -> np.ndarray:
+        """Sorted ids of ``words``"""
+        return np.sort(np.fromiter((self.ids[word] for word in words), dtype=np.int64, count=len(words)))
+
+    def fingerprint(self, ids: np.ndarray) -> int:
+        if self._hashes is None:
+            self._hashes = np.array([_word_hash(word) for word in self._words], dtype=np.uint64)
+        return simhash(self._hashes[ids])
+
+
+class OverlapIndex:
+    """Finds, for each document, the first accepted document it partially duplicates
+
+    Documents are sorted word-id arrays from one WordVocabulary; a pair is a
+    duplicate when its word overlap exceeds ``threshold``.
+    """
+
+    def __init__(self, vocabulary: WordVocabulary, threshold: float = 0.80,
+                 simhash_distance: Optional[int] = None):
+        if not 0.0 < threshold < 1.0:
+            raise ValueError("threshold must be between 0 and 1")
+        self.vocabulary = vocabulary
+        self.threshold = threshold
+        self.simhash_distance = simhash_distance
+        self._postings: Dict[int, List[int]] = {}
+        self._sets: List[FrozenSet[int]] = []
+        self._fingerprints: List[int] = []
+        self.verified_pairs = 0
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _prefix_length(self, size: int) -> int:
+        return size - math.ceil(self.threshold * size - _EPSILON) + 1
+
+    def check(self, ids: np.ndarray) -> Tuple[Optional[int], float]:
+        """(position of the matched accepted document, overlap), or (None, 0.0)
+
+        Unmatched documents are accepted; positions count accepted
+        documents from 0.
+        """
+        size = len(ids)
+        words = frozenset(ids.tolist())
+        fingerprint = None
+        if self.simhash_distance is not None:
+            fingerprint = self.vocabulary.fingerprint(ids)
+
+        prefix = ids[:self._prefix_length(size)].tolist() if size else []
+        candidates = set()
+        for word in prefix:
+            postings = self._postings.get(word)
+            if postings:
+                candidates.update(postings)
+
+        # Jaccard similarity is at most the ratio of the smaller to the larger set
+        smallest = self.threshold * size - _EPSILON
+        largest = size / self.threshold + _EPSILON
+        for position in sorted(candidates):
+            existing = self._sets[position]
+            if not smallest < len(existing) < largest:
+                continue
+            if fingerprint is not None and hamming_distance(
+                    fingerprint, self._fingerprints[position]) > self.simhash_distance:
+                continue
+            self.verified_pairs += 1
+            overlap = word_overlap(words, existing)
+            if overlap > self.threshold:
+                return position, overlap
+
+        position = len(self._sets)
+        for word in prefix:
+            self._postings.setdefault(word, []).append(position)
+        self._sets.append(words)
+        self._fingerprints.append(fingerprint if fingerprint is not None else 0)
+        return None, 0.0
+
+
+def find_partial_duplicates(word_sets: Sequence[FrozenSet[str]], threshold: float = 0.80,
+                            simhash_distance: Optional[int] = None) -> List[Tuple[Optional[int], float]]:
+    """Per document, (index of the first earlier accepted document it duplicates, overlap)
+
+    Matches what comparing each document with every accepted one, in
+    acceptance order, decides; unmatched documents get (None, 0.0).
+    """
+    vocabulary = WordVocabulary(word_sets)
+    index = OverlapIndex(vocabulary, threshold, simhash_distance)
+    accepted: List[int] = []
+    decisions = []
+    for document, words in enumerate(word_sets):
+        position, overlap = index.check(vocabulary.encode(words))
+        if position is None:
+            accepted.append(document)
+            decisions.append((None, 0.0))
+        else:
+            decisions.append((accepted[position], overlap))
+    return decisions
+
+
+__all__ = [
+    'OverlapIndex', 'WordVocabulary', 'find_partial_duplicates', 'hamming_distance',
+    'simhash', 'word_overlap', 'word_set'
+]
@@ -0,0 +1,176 @@
+# backend/app/core/sequential_monte_carlo.py
+"""
+Sequential (early-stopping) Monte Carlo
+
+Simulates in fixed-size batches until the standard error of every tracked
+metric is within tolerance, instead of running a fixed iteration count:
+
+- Means: standard error from the pooled moments (s / sqrt(n))
+- Quantiles: batch (sectioning) method, the spread of per-batch quantiles
+  divided by sqrt(batches); needs no density estimate
+
+A metric has converged when its standard error is at most
+max(tolerance, relative_tolerance * |estimate|). Runs stop at
+max_iterations either way; the report says whether the target was met.
+"""
+
+import asyncio
+import logging
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .streaming_stats import Moments
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConvergenceCriteria:
+    """When a sequential run may stop"""
+    tolerance: float = 0.0
+    relative_tolerance: float = 0.01
+    quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95)
+    batch_size: int = 2000
+    # At least four batches, so quantile errors have a spread to go on
+    min_iterations: int = 8000
+    max_iterations: int = 200_000
+
+    def __post_init__(self):
+        if self.tolerance <= 0 and self.relative_tolerance <= 0:
+            raise ValueError("Set tolerance or relative_tolerance")
+        if self.batch_size < 1 or self.max_iterations < self.batch_size:
+            raise ValueError("batch_size must be positive and at most max_iterations")
+
+    def target(self, estimate: float) -> float:
+        return max(self.tolerance, self.relative_tolerance * abs(estimate))
+
+
+@dataclass
+class ConvergenceReport:
+    """Achieved precision of a sequential run"""
+    converged: bool
+    iterations: int
+    batches: int
+    # metric -> {'estimate', 'standard_error', 'target'}
+    metrics: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def worst_ratio(self) -> float:
+        """Largest standard error / target over all metrics (<= 1 when converged)"""
+        ratios = [m['standard_error'] / m['target'] if m['target'] > 0 else math.inf
+                  for m in self.metrics.values()]
+        return max(ratios) if ratios else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['worst_ratio'] = self.worst_ratio
+        return data
+
+
+class _MetricTracker:
+    """Running moments and per-batch quantiles of one tracked array"""
+
+    def __init__(self, quantiles: Sequence[float]):
+        self.levels = list(quantiles)
+        self.moments = Moments()
+        self.batch_quantiles: List[np.ndarray] = []
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        self.moments.update(values)
+        if self.levels:
+            self.batch_quantiles.append(np.quantile(values, self.levels))
+
+    def errors(self) -> Dict[str, Tuple[float, float]]:
+        """(estimate, standard error) per statistic"""
+        moments = self.moments
+        result = {'mean': (moments.mean, moments.std / math.sqrt(moments.count))}
+        if self.levels and len(self.batch_quantiles) > 1:
+            table = np.vstack(self.batch_quantiles)
+            estimates = table.mean(axis=0)
+            errors = table.std(axis=0, ddof=1) / math.sqrt(len(table))
+            for level, estimate, error in zip(self.levels, estimates, errors):
+                result[f"q{level:g}"] = (float(estimate), float(error))
+        return result
+
+
+class SequentialMonteCarlo:
+    """Runs a batch simulation until the tracked metrics converge
+
+    ``simulate_batch(size)`` returns any batch object; ``track(batch)``
+    maps it to the arrays to watch (default: the batch is that mapping).
+    """
+
+    def __init__(self, criteria: Optional[ConvergenceCriteria] = None):
+        self.criteria = criteria or ConvergenceCriteria()
+
+    def _check(self, trackers: Dict[str, _MetricTracker], iterations: int,
+               batches: int) -> ConvergenceReport:
+        criteria = self.criteria
+        metrics: Dict[str, Dict[str, float]] = {}
+        for name, tracker in trackers.items():
+            for statistic, (estimate, error) in tracker.errors().items():
+                metrics[f"{name}.{statistic}"] = {
+                    'estimate': estimate,
+                    'standard_error': error,
+                    'target': criteria.target(estimate),
+                }
+        # Quantile errors need several batches
+        enough = iterations >= criteria.min_iterations and batches >= 2
+        converged = enough and all(m['standard_error'] <= m['target'] for m in metrics.values())
+        return ConvergenceReport(converged, iterations, batches, metrics)
+
+    def _advance(self, state: Dict[str, Any], simulate_batch: Callable[[int], Any],
+                 track: Callable[[Any], Mapping[str, np.ndarray]]) -> bool:
+        """Simulate one batch; True when the run is done"""
+        size = min(self.criteria.batch_size, self.criteria.max_iterations - state['iterations'])
+        batch = simulate_batch(size)
+        state['batches'].append(batch)
+        state['iterations'] += size
+
+        trackers = state['trackers']
+        for name, values in track(batch).items():
+            tracker = trackers.get(name)
+            if tracker is None:
+                tracker = trackers[name] = _MetricTracker(self.criteria.quantiles)
+            tracker.update(values)
+
+        report = state['report'] = self._check(trackers, state['iterations'], len(state['batches']))
+        return report.converged or state['iterations'] >= self.criteria.max_iterations
+
+    def run(self, simulate_batch: Callable[[int], Any],
+            track: Callable[[Any], Mapping[str, np.ndarray]] = lambda batch: batch) -> Tuple[List[Any], ConvergenceReport]:
+        """Batches simulated until convergence (or max_iterations), and the report"""
+        state = {'trackers': {}, 'batches': [], 'iterations': 0, 'report': None}
+        while not self._advance(state, simulate_batch, track):
+            pass
+        return state['batches'], self._finish(state['report'])
+
+    async def run_async(self, simulate_batch: Callable[[int], Any],
+                        track: Callable[[Any], Mapping[str, np.ndarray]] = lambda batch: batch) -> Tuple[List[Any], ConvergenceReport]:
+        """run() that yields to the event loop between batches"""
+        state = {'trackers': {}, 'batches': [], 'iterations': 0, 'report': None}
+        while not self._advance(state, simulate_batch, track):
+            await asyncio.sleep(0)
+        return state['batches'], self._finish(state['report'])
+
+    def _finish(self, report: ConvergenceReport) -> ConvergenceReport:
+        if not report.converged:
+            logger.warning(f"Monte Carlo run stopped at {report.iterations} iterations without "
+                           f"converging (worst standard error {report.worst_ratio:.2f}x target)")
+        return report
+
+
+def concatenate_batches(batches: Sequence[Mapping[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Join per-batch arrays into one array per key"""
+    if not batches:
+        return {}
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+__all__ = [
+    'ConvergenceCriteria', 'ConvergenceReport', 'SequentialMonteCarlo', 'concatenate_batches'
+]
@@ -0,0 +1,428 @@
+# backend/app/core/serialization.py
+"""
+Pluggable binary codecs for cache tiers and stored analysis results
+
+Every payload is framed with a small versioned header so the codec,
+compression and (zstd) dictionary can change without breaking entries that
+are already stored; payloads without the header are handed to a caller
+supplied legacy decoder (gzip/pickle/json written by earlier releases).
+
+- msgpack with extensions for numpy arrays/scalars, datetimes, tuples and
+  sets; values msgpack cannot represent fall back to pickle automatically
+- zstd (optional ``zstandard`` dependency) with trained dictionaries for the
+  repetitive layer/factor payloads; gzip when zstd is not installed
+- per-tier bytes-on-wire and encode/decode timings
+"""
+
+import gzip
+import json
+import logging
+import pickle
+import struct
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import msgpack
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Header: magic, format version, codec id, compression id, dictionary id
+MAGIC = b'VZ'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('>2sBBBI')
+HEADER_SIZE = _HEADER.size
+
+CODEC_IDS = {'msgpack': 1, 'pickle': 2, 'json': 3}
+COMPRESSION_IDS = {'none': 0, 'gzip': 1, 'zstd': 2}
+_CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+_COMPRESSION_NAMES = {v: k for k, v in COMPRESSION_IDS.items()}
+
+# msgpack extension type codes (0-127 are application defined)
+_EXT_NDARRAY = 1
+_EXT_NUMPY_SCALAR = 2
+_EXT_DATETIME = 3
+_EXT_TUPLE = 4
+_EXT_SET = 5
+_EXT_DATE = 6
+_EXT_REGISTERED_BASE = 32
+
+_registered_types: Dict[type, Tuple[int, Callable[[Any], Any]]] = {}
+_registered_decoders: Dict[int, Callable[[Any], Any]] = {}
+_dictionaries: Dict[int, Any] = {}
+
+
+def register_extension(code: int, cls: type,
+                       to_payload: Callable[[Any], Any],
+                       from_payload: Callable[[Any], Any]):
+    """Teach the msgpack codec an application type (e.g. cache envelopes)"""
+    ext_code = _EXT_REGISTERED_BASE + code
+    if not 0 <= ext_code <= 127:
+        raise ValueError(f"Extension code {code} out of range")
+    _registered_types[cls] = (ext_code, to_payload)
+    _registered_decoders[ext_code] = from_payload
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_default, use_bin_type=True, strict_types=True)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def _default(obj: Any) -> Any:
+    obj_type = type(obj)
+    registered = _registered_types.get(obj_type)
+    if registered is not None:
+        ext_code, to_payload = registered
+        return msgpack.ExtType(ext_code, _pack(to_payload(obj)))
+    if obj_type is tuple:
+        return msgpack.ExtType(_EXT_TUPLE, _pack(list(obj)))
+    if np is not None:
+        if obj_type is np.ndarray:
+            if obj.dtype.hasobject:
+                return msgpack.ExtType(_EXT_TUPLE, _pack(obj.tolist()))
+            array = np.ascontiguousarray(obj)
+            return msgpack.ExtType(
+                _EXT_NDARRAY, _pack([array.dtype.str, list(array.shape), array.tobytes()])
+            )
+        if isinstance(obj, np.generic):
+            return msgpack.ExtType(_EXT_NUMPY_SCALAR, _pack([obj.dtype.str, obj.tobytes()]))
+    if obj_type is datetime:
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode('ascii'))
+    if obj_type is date:
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode('ascii'))
+    if obj_type in (set, frozenset):
+        return msgpack.ExtType(_EXT_SET, _pack(list(obj)))
+    # strict_types routes subclasses here; keep their plain container form
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, bool):
+        return bool(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    raise TypeError(f"Cannot msgpack-encode {obj_type.__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_TUPLE:
+        return tuple(_unpack(data))
+    if code == _EXT_NDARRAY:
+        dtype, shape, buffer = _unpack(data)
+        # Copy so the array is writable and does not pin the message buffer
+        return np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape).copy()
+    if code == _EXT_NUMPY_SCALAR:
+        dtype, buffer = _unpack(data)
+        return np.frombuffer(buffer, dtype=np.dtype(dtype))[0]
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode('ascii'))
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode('ascii'))
+    if code == _EXT_SET:
+        return set(_unpack(data))
+    decoder = _registered_decoders.get(code)
+    if decoder is not None:
+        return decoder(_unpack(data))
+    return msgpack.ExtType(code, data)
+
+
+def _json_default(obj: Any) -> Any:
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps_json(value: Any) -> bytes:
+    """JSON bytes; uses orjson when installed (numpy-aware, ~5x faster)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_json_default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(value, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def loads_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_ENCODERS: Dict[int, Callable[[Any], bytes]] = {
+    1: _pack,
+    2: lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+    3: dumps_json,
+}
+_DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    1: _unpack,
+    2: pickle.loads,
+    3: loads_json,
+}
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def train_dictionary(samples: Iterable[Any], dict_size: int = 16 * 1024,
+                     codec: str = 'msgpack') -> Optional[int]:
+    """Train and register a zstd dictionary from representative values.
+
+    Returns the dictionary id to pass as ``dictionary_id`` to ``StorageCodec``
+    (None when zstd is not installed). Payloads record the id in their
+    header, so the same dictionary must be registered before decoding.
+    """
+    if zstandard is None:
+        logger.info("zstandard not installed - dictionary training skipped")
+        return None
+    encode = _ENCODERS[CODEC_IDS[codec]]
+    dictionary = zstandard.train_dictionary(dict_size, [encode(sample) for sample in samples])
+    return register_dictionary(dictionary.as_bytes())
+
+
+def register_dictionary(dictionary_bytes: bytes) -> Optional[int]:
+    """Register a previously trained dictionary (e.g. loaded from storage)"""
+    if zstandard is None:
+        return None
+    dictionary = zstandard.ZstdCompressionDict(dictionary_bytes)
+    dictionary_id = dictionary.dict_id()
+    _dictionaries[dictionary_id] = dictionary
+    return dictionary_id
+
+
+@dataclass
+class CodecStats:
+    """Serialization counters for one tier"""
+    tier: str
+    encodes: int = 0
+    decodes: int = 0
+    legacy_decodes: int = 0
+    pickle_fallbacks: int = 0
+    raw_bytes: int = 0        # Serialized size before compression
+    wire_bytes: int = 0       # Bytes actually stored/sent, header included
+    encode_seconds: float = 0.0
+    decode_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['compression_ratio'] = self.raw_bytes / self.wire_bytes if self.wire_bytes else 0.0
+        data['avg_wire_bytes'] = self.wire_bytes / self.encodes if self.encodes else 0.0
+        data['avg_encode_ms'] = self.encode_seconds * 1000 / self.encodes if self.encodes else 0.0
+        data['avg_decode_ms'] = self.decode_seconds * 1000 / self.decodes if self.decodes else 0.0
+        return data
+
+
+_stats_lock = threading.Lock()
+_tier_stats: Dict[str, CodecStats] = {}
+
+
+def get_tier_stats(tier: str) -> CodecStats:
+    with _stats_lock:
+        stats = _tier_stats.get(tier)
+        if stats is None:
+            stats = _tier_stats[tier] = CodecStats(tier=tier)
+        return stats
+
+
+def get_serialization_stats() -> Dict[str, Dict[str, Any]]:
+    """Bytes-on-wire and encode/decode time for every tier"""
+    with _stats_lock:
+        return {tier: stats.to_dict() for tier, stats in _tier_stats.items()}
+
+
+class StorageCodec:
+    """Header-framed codec (msgpack/pickle/json + gzip/zstd) for one storage tier"""
+
+    def __init__(self,
+                 tier: str,
+                 codec: str = 'msgpack',
+                 compression: Optional[str] = 'zstd',
+                 level: int = 3,
+                 min_compress_bytes: int = 512,
+                 dictionary_id: Optional[int] = None,
+                 legacy_decoder: Optional[Callable[[bytes], Any]] = None):
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown codec: {codec}")
+        compression = compression or 'none'
+        if compression == 'zstd' and zstandard is None:
+            compression = 'gzip'
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        self.tier = tier
+        self.codec = codec
+        self.compression = compression
+        self.level = level
+        self.min_compress_bytes = min_compress_bytes
+        self.dictionary_id = dictionary_id if compression == 'zstd' else None
+        self.legacy_decoder = legacy_decoder
+        self.stats = get_tier_stats(tier)
+        self._codec_id = CODEC_IDS[codec]
+        # zstd contexts are not thread-safe; keep one per thread
+        self._local = threading.local()
+
+    def _compressor(self):
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            kwargs = {'level': self.level}
+            if self.dictionary_id is not None:
+                kwargs['dict_data'] = _dictionaries[self.dictionary_id]
+            compressor = self._local.compressor = zstandard.ZstdCompressor(**kwargs)
+        return compressor
+
+    def encode(self, value: Any) -> bytes:
+        started = time.perf_counter()
+        codec_id = self._codec_id
+        try:
+            payload = _ENCODERS[codec_id](value)
+        except (TypeError, ValueError, OverflowError):
+            # Arbitrary objects (dataclasses, models) keep working through pickle
+            codec_id = CODEC_IDS['pickle']
+            payload = _ENCODERS[codec_id](value)
+            self.stats.pickle_fallbacks += 1
+
+        raw_size = len(payload)
+        compression_id = 0
+        dictionary_id = 0
+        if self.compression != 'none' and raw_size >= self.min_compress_bytes:
+            if self.compression == 'zstd':
+                payload = self._compressor().compress(payload)
+                compression_id = COMPRESSION_IDS['zstd']
+                dictionary_id = self.dictionary_id or 0
+            else:
+                payload = gzip.compress(payload, compresslevel=min(self.level, 9) or 1)
+                compression_id = COMPRESSION_IDS['gzip']
+
+        data = _HEADER.pack(MAGIC, FORMAT_VERSION, codec_id, compression_id, dictionary_id) + payload
+
+        stats = self.stats
+        stats.encodes += 1
+        stats.raw_bytes += raw_size
+        stats.wire_bytes += len(data)
+        stats.encode_seconds += time.perf_counter() - started
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        started = time.perf_counter()
+        try:
+            if not is_framed(data):
+                if self.legacy_decoder is None:
+                    raise ValueError(f"Unframed payload for tier {self.tier}")
+                self.stats.legacy_decodes += 1
+                return self.legacy_decoder(data)
+            return decode_framed(data)
+        finally:
+            self.stats.decodes += 1
+            self.stats.decode_seconds += time.perf_counter() - started
+
+
+_decompressors = threading.local()
+
+
+def _decompressor(dictionary_id: int):
+    # Loading a dictionary is expensive; reuse one decompressor per thread and id
+    cache = getattr(_decompressors, 'by_id', None)
+    if cache is None:
+        cache = _decompressors.by_id = {}
+    decompressor = cache.get(dictionary_id)
+    if decompressor is None:
+        kwargs = {}
+        if dictionary_id:
+            dictionary = _dictionaries.get(dictionary_id)
+            if dictionary is None:
+                raise KeyError(f"zstd dictionary {dictionary_id} is not registered")
+            kwargs['dict_data'] = dictionary
+        decompressor = cache[dictionary_id] = zstandard.ZstdDecompressor(**kwargs)
+    return decompressor
+
+
+def is_framed(data: bytes) -> bool:
+    return len(data) >= HEADER_SIZE and data[:2] == MAGIC
+
+
+def decode_framed(data: bytes) -> Any:
+    """Decode any header-framed payload regardless of the tier that wrote it"""
+    _, version, codec_id, compression_id, dictionary_id = _HEADER.unpack_from(data)
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported serialization format version {version}")
+    payload = memoryview(data)[HEADER_SIZE:]
+
+    if compression_id == COMPRESSION_IDS['gzip']:
+        payload = gzip.decompress(payload)
+    elif compression_id == COMPRESSION_IDS['zstd']:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to decode this payload")
+        payload = _decompressor(dictionary_id).decompress(payload)
+    elif compression_id != COMPRESSION_IDS['none']:
+        raise ValueError(f"Unknown compression id {compression_id}")
+
+    decoder = _DECODERS.get(codec_id)
+    if decoder is None:
+        raise ValueError(f"Unknown codec id {codec_id}")
+    return decoder(payload if codec_id == CODEC_IDS['msgpack'] else bytes(payload))
+
+
+def describe(data: bytes) -> Dict[str, Any]:
+    """Header fields of a framed payload (diagnostics)"""
+    if not is_framed(data):
+        return {'framed': False, 'size': len(data)}
+    _, version, codec_id, compression_id, dictionary_id = _HEADER.unpack_from(data)
+    return {
+        'framed': True,
+        'version': version,
+        'codec': _CODEC_NAMES.get(codec_id, codec_id),
+        'compression': _COMPRESSION_NAMES.get(compression_id, compression_id),
+        'dictionary_id': dictionary_id or None,
+        'size': len(data)
+    }
+
+
+def encode_json_text(value: Any, tier: str = 'json') -> str:
+    """JSON text for JSONB columns, with numpy support and per-tier timings"""
+    started = time.perf_counter()
+    data = dumps_json(value)
+    stats = get_tier_stats(tier)
+    stats.encodes += 1
+    stats.raw_bytes += len(data)
+    stats.wire_bytes += len(data)
+    stats.encode_seconds += time.perf_counter() - started
+    return data.decode('utf-8')
+
+
+__all__ = [
+    'StorageCodec', 'CodecStats', 'register_extension', 'train_dictionary',
+    'register_dictionary', 'zstd_available', 'is_framed', 'decode_framed', 'describe',
+    'get_serialization_stats', 'encode_json_text', 'dumps_json', 'loads_json'
+]
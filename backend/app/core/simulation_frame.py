@@ -0,0 +1,237 @@
+# backend/app/core/simulation_frame.py
+"""
+Columnar container for Monte Carlo results
+
+One contiguous numpy column per variable (driver values, KPIs, scores)
+instead of a list of per-iteration dicts:
+
+- Row slices are zero-copy views; boolean masks and index arrays copy
+- downsample() thins a frame for API responses (a strided view when
+  evenly spaced)
+- Columns that would take the frame past its memory budget are allocated
+  as memory-mapped .npy files and removed when the frame is closed or
+  garbage collected
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Columns past this many bytes per frame spill to disk (0 disables spilling)
+DEFAULT_MEMORY_BUDGET_BYTES = int(float(os.getenv("SIMULATION_FRAME_MEMORY_BUDGET_MB", "512")) * 1024 * 1024)
+
+
+class SimulationFrame:
+    """Named, equally long 1-D numpy columns; one row per simulation run"""
+
+    def __init__(self,
+                 columns: Optional[Mapping[str, Any]] = None,
+                 length: Optional[int] = None,
+                 dtype: Any = np.float64,
+                 memory_budget_bytes: Optional[int] = None,
+                 spill_dir: Optional[str] = None,
+                 attrs: Optional[Dict[str, Any]] = None):
+        self.dtype = np.dtype(dtype)
+        self.memory_budget_bytes = (DEFAULT_MEMORY_BUDGET_BYTES if memory_budget_bytes is None
+                                    else memory_budget_bytes)
+        self.spill_dir = spill_dir
+        # Free-form metadata (e.g. which columns are drivers)
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self._columns: Dict[str, np.ndarray] = {}
+        self._length = length
+        self._spill_path: Optional[str] = None
+        self._finalizer = None
+        self._parent: Optional['SimulationFrame'] = None
+        for name, values in (columns or {}).items():
+            self.add_column(name, values)
+
+    # Construction
+
+    def allocate(self, name: str, dtype: Any = None, fill_value: Optional[float] = None) -> np.ndarray:
+        """Create an empty column and return it for writing in place
+
+        The column is a memory-mapped file when it does not fit in the
+        remaining memory budget (pages written through the map stay
+        resident until the OS reclaims them; add_column avoids that).
+        """
+        if self._length is None:
+            raise ValueError("Frame length is unknown; pass length= or add a column first")
+        if name in self._columns:
+            raise KeyError(f"Column {name!r} already exists")
+        dtype = np.dtype(dtype or self.dtype)
+        nbytes = self._length * dtype.itemsize
+        if self.memory_budget_bytes and self.memory_nbytes + nbytes > self.memory_budget_bytes:
+            column = np.lib.format.open_memmap(self._spill_file(name), mode='w+',
+                                               dtype=dtype, shape=(self._length,))
+        else:
+            column = np.empty(self._length, dtype=dtype)
+        if fill_value is not None:
+            column.fill(fill_value)
+        self._columns[name] = column
+        return column
+
+    def add_column(self, name: str, values: Any, dtype: Any = None):
+        """Add a column (scalars are broadcast to the frame length)"""
+        values = np.asarray(values)
+        if self._length is None:
+            if values.ndim != 1:
+                raise ValueError("The first column must be 1-D")
+            self._length = len(values)
+        if values.ndim == 0:
+            values = np.broadcast_to(values, (self._length,))
+        elif values.shape != (self._length,):
+            raise ValueError(f"Column {name!r} has shape {values.shape}, expected ({self._length},)")
+
+        if dtype is None:
+            # Masks stay boolean; numbers take the frame dtype
+            dtype = values.dtype if values.dtype.kind == 'b' else self.dtype
+        dtype = np.dtype(dtype)
+        nbytes = self._length * dtype.itemsize
+        spill = bool(self.memory_budget_bytes) and self.memory_nbytes + nbytes > self.memory_budget_bytes
+        if spill:
+            # Written through the file API so the pages are not resident in
+            # this process; mapped back lazily
+            path = self._spill_file(name)
+            np.save(path, values.astype(dtype, copy=False))
+            self._columns[name] = np.load(path, mmap_mode='r+')
+        elif (values.dtype == dtype and values.flags.c_contiguous
+                and values.flags.writeable and values.base is None):
+            # Owned, contiguous arrays are adopted without copying
+            self._columns[name] = values
+        else:
+            self.allocate(name, dtype)[:] = values
+
+    @classmethod
+    def concat(cls, frames: Sequence['SimulationFrame'], **kwargs: Any) -> 'SimulationFrame':
+        """One frame with the rows of ``frames`` in order (columns of the first)"""
+        if not frames:
+            return cls(**kwargs)
+        first = frames[0]
+        kwargs.setdefault('dtype', first.dtype)
+        kwargs.setdefault('attrs', first.attrs)
+        frame = cls(length=sum(len(part) for part in frames), **kwargs)
+        for name in first.columns:
+            column = frame.allocate(name, first[name].dtype)
+            np.concatenate([part[name] for part in frames], out=column)
+        return frame
+
+    def _spill_file(self, name: str) -> str:
+        if self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(prefix='simulation_frame_', dir=self.spill_dir)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._spill_path, True)
+            logger.info(f"SimulationFrame over memory budget; spilling columns to {self._spill_path}")
+        safe_name = ''.join(ch if ch.isalnum() or ch in '-_.' else '_' for ch in name)
+        return os.path.join(self._spill_path, f"{len(self._columns):04d}_{safe_name}.npy")
+
+    # Access
+
+    def __len__(self) -> int:
+        return self._length or 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._columns.get(name, default)
+
+    def __getitem__(self, key: Union[str, slice, np.ndarray, Sequence[int]]) -> Any:
+        """Column by name, or the rows selected by a slice, mask or index array"""
+        if isinstance(key, str):
+            return self._columns[key]
+        return self.take(key)
+
+    def take(self, rows: Union[slice, np.ndarray, Sequence[int]]) -> 'SimulationFrame':
+        """Frame of the selected rows; slices share memory with this frame"""
+        frame = SimulationFrame(dtype=self.dtype, memory_budget_bytes=0, attrs=self.attrs)
+        selected = {name: column[rows] for name, column in self._columns.items()}
+        frame._columns = selected
+        frame._length = len(next(iter(selected.values()))) if selected \
+            else len(np.arange(len(self))[rows])
+        # Views keep the parent (and any spill files) alive
+        frame._parent = self
+        return frame
+
+    # Memory
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    @property
+    def memory_nbytes(self) -> int:
+        """Bytes held in memory (excludes memory-mapped columns)"""
+        return sum(column.nbytes for column in self._columns.values()
+                   if not isinstance(column, np.memmap))
+
+    @property
+    def spilled_columns(self) -> List[str]:
+        return [name for name, column in self._columns.items() if isinstance(column, np.memmap)]
+
+    def close(self):
+        """Drop columns and delete spill files"""
+        self._columns = {}
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self) -> 'SimulationFrame':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Summaries and responses
+
+    def quantiles(self, name: str, levels: Sequence[float]) -> np.ndarray:
+        """Quantiles of one column in a single pass"""
+        return np.quantile(self._columns[name], levels)
+
+    def downsample(self, max_rows: int, method: str = 'stride',
+                   seed: Optional[int] = None) -> 'SimulationFrame':
+        """At most ``max_rows`` rows for responses and plots
+
+        'stride' keeps every k-th row (a zero-copy view); 'random' keeps a
+        uniform sample of rows in their original order.
+        """
+        length = len(self)
+        if length <= max_rows:
+            return self[:]
+        if method == 'stride':
+            step = -(-length // max_rows)
+            return self[::step]
+        if method == 'random':
+            rows = np.sort(np.random.default_rng(seed).choice(length, size=max_rows, replace=False))
+            return self.take(rows)
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    def to_dict(self, max_rows: Optional[int] = None) -> Dict[str, List[Any]]:
+        """Columns as lists (downsampled to ``max_rows``)"""
+        frame = self.downsample(max_rows) if max_rows is not None else self
+        return {name: column.tolist() for name, column in frame._columns.items()}
+
+    def to_records(self, max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
+        """One dict per row (downsampled to ``max_rows``)"""
+        columns = self.to_dict(max_rows)
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+    def __repr__(self) -> str:
+        spilled = len(self.spilled_columns)
+        return (f"SimulationFrame(rows={len(self)}, columns={self.columns}, "
+                f"nbytes={self.nbytes}{f', spilled={spilled}' if spilled else ''})")
+
+
+__all__ = ['SimulationFrame', 'DEFAULT_MEMORY_BUDGET_BYTES']
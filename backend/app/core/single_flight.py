@@ -0,0 +1,216 @@
+# backend/app/core/single_flight.py
+"""
+Cache stampede protection (multi-level cache manager, memoization)
+
+- SingleFlight: per-key in-process coalescing of concurrent loads
+- RedisLease: optional cross-instance single flight using a Redis lease
+  (SET NX PX + compare-and-delete release)
+- xfetch_should_refresh: probabilistic early refresh (XFetch) so hot keys
+  are recomputed shortly before expiry by a single caller
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SingleFlightStats:
+    """Stampede protection counters"""
+    leaders: int = 0               # Loads actually executed
+    coalesced_waiters: int = 0     # Callers that reused an in-flight load
+    leader_failures: int = 0
+    early_refreshes: int = 0       # XFetch-triggered background refreshes
+    leases_acquired: int = 0
+    lease_waits: int = 0           # Callers that waited on another instance's lease
+    lease_wait_hits: int = 0       # ...and found the value once the holder finished
+    lease_timeouts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        total = self.leaders + self.coalesced_waiters
+        data['coalescing_ratio'] = self.coalesced_waiters / total if total else 0.0
+        return data
+
+
+async def _resolve(result: Any) -> Any:
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same key into one execution"""
+
+    def __init__(self, stats: Optional[SingleFlightStats] = None):
+        self.stats = stats or SingleFlightStats()
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once for all concurrent callers of ``key``"""
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                return await self._lead(key, fn)
+
+            self.stats.coalesced_waiters += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                cancelling = getattr(task, 'cancelling', None)
+                waiter_cancelled = cancelling() if cancelling else not future.cancelled()
+                if future.cancelled() and not waiter_cancelled:
+                    # The leader was cancelled, not us: take over the load
+                    continue
+                raise
+
+    def _register(self, key: Hashable) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats.leaders += 1
+        return future
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        return await self._run(key, fn, self._register(key))
+
+    async def _run(self, key: Hashable, fn: Callable[[], Any], future: asyncio.Future) -> Any:
+        try:
+            result = await _resolve(fn())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            self.stats.leader_failures += 1
+            future.set_exception(e)
+            # Mark retrieved so a failure without waiters does not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def refresh_in_background(self, key: Hashable, fn: Callable[[], Any]) -> bool:
+        """Start a background load unless one is already in flight"""
+        if key in self._calls:
+            return False
+        self.stats.early_refreshes += 1
+        # Register synchronously so concurrent hits see the refresh in flight
+        task = asyncio.ensure_future(self._run(key, fn, self._register(key)))
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+        return True
+
+    def _on_background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Background cache refresh failed: {task.exception()}")
+
+    async def drain(self):
+        """Wait for background refreshes (used on shutdown)"""
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+
+class RedisLease:
+    """Distributed single flight across instances via a short Redis lease"""
+
+    _RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self,
+                 redis_client,
+                 stats: Optional[SingleFlightStats] = None,
+                 lease_ttl_ms: int = 10000,
+                 poll_interval: float = 0.02,
+                 max_poll_interval: float = 0.25,
+                 max_wait_seconds: float = 10.0,
+                 key_prefix: str = 'lease:'):
+        self.redis_client = redis_client
+        self.stats = stats or SingleFlightStats()
+        self.lease_ttl_ms = lease_ttl_ms
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.key_prefix = key_prefix
+
+    def _lease_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    async def acquire(self, key: str) -> Optional[str]:
+        """Try to take the lease; returns the owner token or None"""
+        token = uuid.uuid4().hex
+        acquired = await self.redis_client.set(
+            self._lease_key(key), token, nx=True, px=self.lease_ttl_ms
+        )
+        if acquired:
+            self.stats.leases_acquired += 1
+            return token
+        return None
+
+    async def release(self, key: str, token: str):
+        """Release only if we still own the lease"""
+        try:
+            await self.redis_client.eval(self._RELEASE_SCRIPT, 1, self._lease_key(key), token)
+        except Exception as e:
+            logger.debug(f"Lease release failed for {key}: {e}")
+
+    async def wait_for_value(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Poll for the holder's result until the lease disappears or times out"""
+        self.stats.lease_waits += 1
+        deadline = time.monotonic() + self.max_wait_seconds
+        interval = self.poll_interval
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            value = await fetch()
+            if value is not None:
+                self.stats.lease_wait_hits += 1
+                return value
+            if not await self.redis_client.exists(self._lease_key(key)):
+                # Holder finished (or died) without publishing; one last look
+                value = await fetch()
+                if value is not None:
+                    self.stats.lease_wait_hits += 1
+                return value
+            interval = min(interval * 2, self.max_poll_interval)
+        self.stats.lease_timeouts += 1
+        return None
+
+
+def xfetch_should_refresh(created_at: float,
+                          ttl_seconds: Optional[float],
+                          delta_seconds: float,
+                          now: Optional[float] = None,
+                          beta: float = 1.0,
+                          rand: Callable[[], float] = random.random) -> bool:
+    """XFetch early-expiration test (Vattani et al., 2015).
+
+    Refresh when ``now - delta * beta * ln(U) >= created_at + ttl``; the
+    probability rises smoothly towards expiry and with recompute cost.
+    """
+    if not ttl_seconds or delta_seconds <= 0 or beta <= 0:
+        return False
+    if now is None:
+        now = time.monotonic()
+    # 1 - U keeps the argument in (0, 1]
+    return now - delta_seconds * beta * math.log(1.0 - rand()) >= created_at + ttl_seconds
+
+
+__all__ = ['SingleFlight', 'SingleFlightStats', 'RedisLease', 'xfetch_should_refresh']
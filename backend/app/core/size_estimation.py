@@ -0,0 +1,71 @@
+# backend/app/core/size_estimation.py
+"""
+Approximate in-memory sizes for cache byte budgets
+
+Used by the L1 cache and memoization to charge entries against their byte
+limits without serializing values.
+"""
+
+import sys
+from typing import Any
+
+_SCALAR_TYPES = frozenset((type(None), bool, int, float))
+_SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Cheap approximate in-memory size of a value in bytes.
+
+    Large containers are sampled (first 16 items) and extrapolated so that
+    sizing stays O(1)-ish instead of serializing the whole value.
+    """
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return 24
+    if value_type is str or value_type is bytes or value_type is bytearray:
+        return sys.getsizeof(value)
+
+    if value_type is dict or isinstance(value, dict):
+        count = len(value)
+        if not count:
+            return 64
+        if _depth >= 3:
+            return 64 + count * 64
+        sample = 0
+        sampled = 0
+        for k, v in value.items():
+            sample += (sys.getsizeof(k) if type(k) is str else estimate_size(k, _depth + 1))
+            sample += estimate_size(v, _depth + 1)
+            sampled += 1
+            if sampled == 16:
+                break
+        return 64 + count * 8 + (sample * count) // sampled
+
+    if isinstance(value, _SEQUENCE_TYPES):
+        count = len(value)
+        if not count:
+            return 56
+        if _depth >= 3:
+            return 56 + count * 32
+        sample = 0
+        sampled = 0
+        for item in value:
+            sample += estimate_size(item, _depth + 1)
+            sampled += 1
+            if sampled == 16:
+                break
+        return 56 + count * 8 + (sample * count) // sampled
+
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes + 112
+    if isinstance(value, (str, bytes, bytearray, int, float)):
+        return sys.getsizeof(value)
+
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None and _depth < 3:
+        return sys.getsizeof(value) + estimate_size(attributes, _depth + 1)
+    return sys.getsizeof(value)
+
+
+__all__ = ['estimate_size']
@@ -0,0 +1,464 @@
+# backend/app/core/streaming_stats.py
+"""
+Fixed-memory streaming aggregates for metrics collection and Monte Carlo
+summaries
+
+- RingBuffer: preallocated single-writer ring; readers copy without locking
+- DDSketch: mergeable quantile sketch with a relative-error guarantee
+  (Masson et al., 2019); bounded number of buckets
+- Moments: count, mean, variance, skewness and kurtosis updated chunk by
+  chunk (Welford/Pebay); mergeable
+- FixedHistogram: counts and sums on fixed bins over a known range, with
+  quantiles and tail means within one bin width; mergeable
+
+Everything here is picklable, so worker processes can summarize their share
+of a simulation and the parent merges the results.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer for one writer thread and any number of readers.
+
+    The writer stores the slot before publishing the new count, so readers
+    never see an unwritten slot; a reader racing a wrap-around may see one
+    value newer than the window it asked for, which is fine for metrics.
+    """
+
+    __slots__ = ('capacity', '_items', '_count')
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._items: List[Any] = [None] * self.capacity
+        self._count = 0
+
+    def append(self, item: Any):
+        count = self._count
+        self._items[count % self.capacity] = item
+        self._count = count + 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Items ever appended (including overwritten ones)"""
+        return self._count
+
+    def latest(self) -> Any:
+        count = self._count
+        return self._items[(count - 1) % self.capacity] if count else None
+
+    def snapshot(self, last: Optional[int] = None) -> List[Any]:
+        """Oldest-to-newest copy of the (last ``last``) buffered items"""
+        count = self._count
+        size = min(count, self.capacity)
+        if last is not None:
+            size = min(size, last)
+        start = count - size
+        items = self._items
+        capacity = self.capacity
+        return [items[i % capacity] for i in range(start, count)]
+
+    def clear(self):
+        self._items = [None] * self.capacity
+        self._count = 0
+
+
+class DDSketch:
+    """Quantile sketch: every quantile is within ``relative_accuracy`` of the true value"""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048,
+                 min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self.gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) * self._inv_log_gamma)
+
+    def _bin_value(self, index: int) -> float:
+        return 2.0 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1):
+        self.count += weight
+        self.sum += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value > self.min_value:
+            bins = self._positive
+            index = math.ceil(math.log(value) * self._inv_log_gamma)
+        elif value < -self.min_value:
+            bins = self._negative
+            index = math.ceil(math.log(-value) * self._inv_log_gamma)
+        else:
+            self.zero_count += weight
+            return
+        bins[index] = bins.get(index, 0) + weight
+        if len(bins) > self.max_bins:
+            self._collapse(bins)
+
+    def add_array(self, values: np.ndarray):
+        """Add a chunk of values (same result as adding them one by one)"""
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        self.count += values.size
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > self.min_value]
+        negative = -values[values < -self.min_value]
+        self.zero_count += values.size - positive.size - negative.size
+        for bins, magnitudes in ((self._positive, positive), (self._negative, negative)):
+            if not magnitudes.size:
+                continue
+            indices, counts = np.unique(np.ceil(np.log(magnitudes) * self._inv_log_gamma),
+                                        return_counts=True)
+            for index, count in zip(indices.astype(np.int64).tolist(), counts.tolist()):
+                bins[index] = bins.get(index, 0) + count
+            if len(bins) > self.max_bins:
+                self._collapse(bins)
+
+    def _collapse(self, bins: Dict[int, int]):
+        # Fold the smallest-magnitude buckets together; keeps the upper tail exact
+        keys = sorted(bins)
+        excess = len(bins) - self.max_bins + 1
+        folded = sum(bins.pop(key) for key in keys[:excess])
+        target = keys[excess]
+        bins[target] += folded
+
+    def merge(self, other: 'DDSketch'):
+        if abs(other.gamma - self.gamma) > 1e-12:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for mine, theirs in ((self._positive, other._positive), (self._negative, other._negative)):
+            for index, count in theirs.items():
+                mine[index] = mine.get(index, 0) + count
+            if len(mine) > self.max_bins:
+                self._collapse(mine)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # Negative values: largest magnitude first
+        for index in sorted(self._negative, reverse=True):
+            seen += self._negative[index]
+            if seen > rank:
+                return max(self.min, -self._bin_value(index))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self._positive):
+            seen += self._positive[index]
+            if seen > rank:
+                return min(self.max, self._bin_value(index))
+        return self.max
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def bin_count(self) -> int:
+        return len(self._positive) + len(self._negative)
+
+    def to_dict(self, scale: float = 1.0) -> Dict[str, Any]:
+        """Summary; ``scale`` converts units (e.g. 1000 for seconds -> ms)"""
+        if not self.count:
+            return {'count': 0}
+        p50, p90, p95, p99 = self.quantiles([0.5, 0.9, 0.95, 0.99])
+        return {
+            'count': self.count,
+            'mean': self.mean * scale,
+            'min': self.min * scale,
+            'max': self.max * scale,
+            'p50': p50 * scale,
+            'p90': p90 * scale,
+            'p95': p95 * scale,
+            'p99': p99 * scale,
+        }
+
+
+class Moments:
+    """Streaming count, mean and central moments (population definitions)
+
+    Each chunk is reduced with numpy and combined with the running totals
+    using the pairwise update of Pebay (2008), so chunked, merged and
+    one-shot summaries agree to rounding. Skewness and excess kurtosis match
+    scipy.stats.skew / kurtosis with their default (biased) estimators.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sums of 2nd-4th powers of deviations from the mean
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'Moments':
+        moments = cls()
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size:
+            mean = float(values.mean())
+            deviations = values - mean
+            squared = deviations * deviations
+            moments.count = values.size
+            moments.mean = mean
+            moments.m2 = float(squared.sum())
+            moments.m3 = float(np.dot(squared, deviations))
+            moments.m4 = float(np.dot(squared, squared))
+            moments.min = float(values.min())
+            moments.max = float(values.max())
+        return moments
+
+    def update(self, values: np.ndarray):
+        self.merge(Moments.from_array(values))
+
+    def merge(self, other: 'Moments'):
+        if not other.count:
+            return
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return
+
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+        m3 = (self.m3 + other.m3
+              + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+              + 3 * delta_n * (n_a * other.m2 - n_b * self.m2))
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+              + 6 * delta_n ** 2 * (n_a * n_a * other.m2 + n_b * n_b * self.m2)
+              + 4 * delta_n * (n_a * other.m3 - n_b * self.m3))
+
+        self.count = n
+        self.mean += delta_n * n_b
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    @property
+    def skewness(self) -> float:
+        if not self.count or self.m2 <= 0:
+            return math.nan
+        return math.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def kurtosis(self) -> float:
+        """Excess (Fisher) kurtosis"""
+        if not self.count or self.m2 <= 0:
+            return math.nan
+        return self.count * self.m4 / (self.m2 * self.m2) - 3.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count, 'mean': self.mean, 'variance': self.variance,
+            'std': self.std, 'skewness': self.skewness, 'kurtosis': self.kurtosis,
+            'min': self.min, 'max': self.max,
+        }
+
+
+class FixedHistogram:
+    """Counts, sums and sums of squares on equal-width bins over [low, high]
+
+    Values outside the range go to an underflow and an overflow bin that
+    extend to the observed minimum and maximum. Quantiles interpolate the
+    order statistics within their bins, so for values inside the range the
+    error against np.quantile is at most one bin width; tail counts and
+    means split the bin holding the threshold assuming uniform density.
+    """
+
+    def __init__(self, low: float = 0.0, high: float = 1.0, bins: int = 8192):
+        if not high > low or bins < 1:
+            raise ValueError("FixedHistogram needs high > low and at least one bin")
+        self.low = float(low)
+        self.high = float(high)
+        self.bins = bins
+        self.width = (self.high - self.low) / bins
+        # Index 0 is underflow, bins + 1 overflow
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+        self.sums = np.zeros(bins + 2)
+        self.sq_sums = np.zeros(bins + 2)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def _bin_indices(self, values: np.ndarray) -> np.ndarray:
+        position = (values - self.low) / self.width
+        np.clip(position, -1, self.bins, out=position)
+        indices = np.floor(position).astype(np.intp) + 1
+        # The upper edge belongs to the last in-range bin
+        indices[values == self.high] = self.bins
+        return indices
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        indices = self._bin_indices(values)
+        size = self.bins + 2
+        self.counts += np.bincount(indices, minlength=size)
+        self.sums += np.bincount(indices, weights=values, minlength=size)
+        self.sq_sums += np.bincount(indices, weights=values * values, minlength=size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: 'FixedHistogram'):
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.sums += other.sums
+        self.sq_sums += other.sq_sums
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def edges(self) -> np.ndarray:
+        """Bin edges including the under/overflow bins (bins + 3 values)"""
+        inner = np.linspace(self.low, self.high, self.bins + 1)
+        return np.concatenate(([min(self.min, self.low)], inner, [max(self.max, self.high)]))
+
+    def quantiles(self, levels: Sequence[float]) -> np.ndarray:
+        """Quantiles with np.quantile's (linear) definition, one bin width accuracy"""
+        total = self.count
+        levels = np.asarray(levels, dtype=float)
+        if not total:
+            return np.full(levels.shape, np.nan)
+        cumulative = np.cumsum(self.counts)
+        edges = self.edges()
+
+        def order_statistic(rank: np.ndarray) -> np.ndarray:
+            # k-th smallest value (0-based), placed uniformly inside its bin
+            index = np.searchsorted(cumulative, rank, side='right')
+            before = cumulative[index] - self.counts[index]
+            fraction = (rank - before + 0.5) / self.counts[index]
+            values = edges[index] + fraction * (edges[index + 1] - edges[index])
+            np.clip(values, self.min, self.max, out=values)
+            # The extremes are tracked exactly
+            values[rank == 0] = self.min
+            values[rank == total - 1] = self.max
+            return values
+
+        rank = np.clip(levels, 0.0, 1.0) * (total - 1)
+        below = np.floor(rank)
+        lower = order_statistic(below)
+        upper = order_statistic(np.minimum(below + 1, total - 1))
+        return lower + (rank - below) * (upper - lower)
+
+    def _below(self, threshold: float) -> Tuple[float, float, float]:
+        """(count, sum, sum of squares) of values below ``threshold`` (approximate)"""
+        edges = self.edges()
+        index = int(np.clip(np.searchsorted(edges, threshold, side='right') - 1, 0, self.bins + 1))
+        count = float(self.counts[:index].sum())
+        total = float(self.sums[:index].sum())
+        squares = float(self.sq_sums[:index].sum())
+        bin_count = self.counts[index]
+        low, high = edges[index], edges[index + 1]
+        fraction = (threshold - low) / (high - low) if high > low else 1.0
+        if bin_count and fraction >= 1:
+            count += bin_count
+            total += self.sums[index]
+            squares += self.sq_sums[index]
+        elif bin_count and fraction > 0:
+            # Uniform density inside the bin
+            partial = bin_count * fraction
+            part_mean = (low + threshold) / 2
+            count += partial
+            total += partial * part_mean
+            squares += partial * part_mean * part_mean
+        return count, total, squares
+
+    def fraction_below(self, threshold: float) -> float:
+        total = self.count
+        return self._below(threshold)[0] / total if total else math.nan
+
+    def fraction_at_least(self, threshold: float) -> float:
+        total = self.count
+        return 1.0 - self._below(threshold)[0] / total if total else math.nan
+
+    def mean_below(self, threshold: float) -> Optional[float]:
+        count, total, _ = self._below(threshold)
+        return total / count if count > 0 else None
+
+    def mean_above(self, threshold: float) -> Optional[float]:
+        count, total, _ = self._below(threshold)
+        count = self.count - count
+        return (float(self.sums.sum()) - total) / count if count > 0 else None
+
+    def std_below(self, threshold: float) -> Optional[float]:
+        count, total, squares = self._below(threshold)
+        if count <= 0:
+            return None
+        mean = total / count
+        return math.sqrt(max(squares / count - mean * mean, 0.0))
+
+    def edge_cdf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Upper bin edges and the exact empirical CDF at each of them"""
+        total = self.count
+        return self.edges()[1:], np.cumsum(self.counts) / max(total, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Non-empty in-range bins as [left edge, count] pairs, plus out-of-range counts"""
+        occupied = np.flatnonzero(self.counts[1:-1])
+        return {
+            'low': self.low, 'high': self.high, 'bin_width': self.width,
+            'bins': [[self.low + int(i) * self.width, int(self.counts[i + 1])] for i in occupied],
+            'underflow': int(self.counts[0]), 'overflow': int(self.counts[-1]),
+        }
+
+
+__all__ = ['RingBuffer', 'DDSketch', 'Moments', 'FixedHistogram']
@@ -2,6 +2,7 @@
 Validatus Backend - Main Application Entry Point
 Consolidated FastAPI application with proper database integration
 """
+import asyncio
 import os
 import logging
 from fastapi import FastAPI, HTTPException
@@ -11,6 +12,8 @@ from contextlib import asynccontextmanager
 
 # Import database manager
 from .core.database_config import db_manager
+from .core.simulation_pool import shutdown_simulation_pool
+from .middleware.metrics_exporter import get_metrics_exporter
 
 # Configure logging FIRST (before any logger usage)
 logging.basicConfig(level=logging.INFO)
@@ -131,6 +134,17 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 Shutting down Validatus Backend...")
     await db_manager.close()
     logger.info("✅ Database connections closed")
+    
+    try:
+        await get_metrics_exporter().stop(flush=True)
+    except Exception as e:
+        logger.error(f"❌ Final metrics flush failed: {e}")
+    
+    try:
+        await asyncio.to_thread(shutdown_simulation_pool)
+        logger.info("✅ Simulation workers stopped")
+    except Exception as e:
+        logger.error(f"❌ Simulation pool shutdown failed: {e}")
 
 # Create FastAPI app with lifespan management
 app = FastAPI(
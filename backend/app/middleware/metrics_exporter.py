@@ -0,0 +1,416 @@
+# backend/app/middleware/metrics_exporter.py
+"""
+Batched, asynchronous metrics export
+
+Recording a point only updates an in-memory aggregate (counter, gauge or
+distribution) keyed by metric type and labels; nothing touches the network
+on the request path. A background task flushes the series that changed
+since the last flush to a sink in batches (Cloud Monitoring accepts at most
+200 time series per request).
+
+Counters and distributions are exported as CUMULATIVE series since the
+exporter started, so a failed batch loses nothing: its series are simply
+marked dirty again and the next flush sends the newer totals. The number of
+distinct series is bounded; points for new series beyond the bound are
+dropped and counted.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOUD_MONITORING_BATCH_LIMIT = 200
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+DISTRIBUTION = 'distribution'
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+@dataclass
+class BucketOptions:
+    """Exponential bucket layout (Cloud Monitoring ``exponential_buckets``)"""
+    num_finite_buckets: int = 24
+    growth_factor: float = 2.0
+    scale: float = 0.001
+
+    def index(self, value: float) -> int:
+        # Bucket 0 is underflow, bucket num_finite_buckets + 1 is overflow
+        if value < self.scale:
+            return 0
+        index = int(math.log(value / self.scale) / math.log(self.growth_factor)) + 1
+        return min(index, self.num_finite_buckets + 1)
+
+
+@dataclass
+class MetricSeries:
+    """One exported point: current value of a series at ``end_time``"""
+    metric_type: str
+    labels: Dict[str, str]
+    kind: str
+    value: Any
+    start_time: float
+    end_time: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Series:
+    __slots__ = ('kind', 'value', 'count', 'mean', 'm2', 'buckets')
+
+    def __init__(self, kind: str, num_buckets: int = 0):
+        self.kind = kind
+        self.value = 0.0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.buckets = [0] * num_buckets if kind == DISTRIBUTION else None
+
+    def snapshot(self, bucket_options: BucketOptions) -> Any:
+        if self.kind != DISTRIBUTION:
+            return self.value
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'sum_of_squared_deviation': self.m2,
+            'bucket_options': asdict(bucket_options),
+            'bucket_counts': list(self.buckets),
+        }
+
+
+@dataclass
+class ExporterStats:
+    """Export counters"""
+    points_recorded: int = 0
+    points_dropped: int = 0        # New series rejected because max_series was reached
+    series_exported: int = 0
+    batches_exported: int = 0
+    export_failures: int = 0
+    flushes: int = 0
+    last_flush_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MetricSink:
+    """Destination for exported batches"""
+
+    async def write(self, batch: List[MetricSeries]):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InMemorySink(MetricSink):
+    """Keeps the most recent batches in memory (tests, benchmarks, local runs)"""
+
+    def __init__(self, max_batches: int = 1000):
+        self.batches: Deque[List[MetricSeries]] = deque(maxlen=max_batches)
+
+    async def write(self, batch: List[MetricSeries]):
+        self.batches.append(batch)
+
+    @property
+    def series(self) -> List[MetricSeries]:
+        return [series for batch in self.batches for series in batch]
+
+    def latest(self, metric_type: str, **labels: str) -> Optional[MetricSeries]:
+        """Most recently exported point of one series"""
+        for series in reversed(self.series):
+            if series.metric_type == metric_type and all(
+                    series.labels.get(key) == str(value) for key, value in labels.items()):
+                return series
+        return None
+
+
+class FileSink(MetricSink):
+    """Appends batches as JSON lines to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _append(self, lines: List[str]):
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            handle.write('\n'.join(lines) + '\n')
+
+    async def write(self, batch: List[MetricSeries]):
+        lines = [json.dumps(series.to_dict(), default=str) for series in batch]
+        await asyncio.get_running_loop().run_in_executor(None, self._append, lines)
+
+
+class CloudMonitoringSink(MetricSink):
+    """Writes batches with one shared MetricServiceClient, off the event loop"""
+
+    def __init__(self, project_id: Optional[str] = None, client=None):
+        self.project_id = project_id
+        self._client = client
+
+    def _get_client(self):
+        if self._client is None:
+            from google.cloud import monitoring_v3
+            self._client = monitoring_v3.MetricServiceClient()
+        return self._client
+
+    def _project(self) -> str:
+        if self.project_id is None:
+            from ..core.gcp_config import get_gcp_settings
+            self.project_id = get_gcp_settings().project_id
+        return self.project_id
+
+    def to_time_series(self, series: MetricSeries):
+        from google.api import metric_pb2
+        from google.cloud import monitoring_v3
+
+        def timestamp(value: float) -> Dict[str, int]:
+            seconds = int(value)
+            return {'seconds': seconds, 'nanos': int((value - seconds) * 10**9)}
+
+        time_series = monitoring_v3.TimeSeries()
+        time_series.metric.type = series.metric_type
+        for key, value in series.labels.items():
+            time_series.metric.labels[key] = value
+        time_series.resource.type = "global"
+        time_series.resource.labels["project_id"] = self._project()
+
+        interval = {'end_time': timestamp(series.end_time)}
+        if series.kind == GAUGE:
+            time_series.metric_kind = metric_pb2.MetricDescriptor.MetricKind.GAUGE
+        else:
+            time_series.metric_kind = metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE
+            interval['start_time'] = timestamp(series.start_time)
+
+        if series.kind == DISTRIBUTION:
+            value = {
+                'distribution_value': {
+                    'count': series.value['count'],
+                    'mean': series.value['mean'],
+                    'sum_of_squared_deviation': series.value['sum_of_squared_deviation'],
+                    'bucket_options': {'exponential_buckets': series.value['bucket_options']},
+                    'bucket_counts': series.value['bucket_counts'],
+                }
+            }
+        else:
+            value = {'double_value': float(series.value)}
+        time_series.points = [monitoring_v3.Point({'interval': interval, 'value': value})]
+        return time_series
+
+    def _write(self, batch: List[MetricSeries]):
+        client = self._get_client()
+        client.create_time_series(
+            name=f"projects/{self._project()}",
+            time_series=[self.to_time_series(series) for series in batch]
+        )
+
+    async def write(self, batch: List[MetricSeries]):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+
+
+class MetricsExporter:
+    """Process-wide in-memory aggregation with periodic batched export"""
+
+    def __init__(self,
+                 sink: Optional[MetricSink] = None,
+                 flush_interval_seconds: float = 10.0,
+                 batch_size: int = CLOUD_MONITORING_BATCH_LIMIT,
+                 max_series: int = 5000,
+                 bucket_options: Optional[BucketOptions] = None):
+        self.sink = sink if sink is not None else sink_from_env()
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = min(batch_size, CLOUD_MONITORING_BATCH_LIMIT)
+        self.max_series = max_series
+        self.bucket_options = bucket_options or BucketOptions()
+        self.stats = ExporterStats()
+        self.start_time = time.time()
+
+        self._series: Dict[SeriesKey, _Series] = {}
+        self._dirty: Set[SeriesKey] = set()
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # Recording (any thread, never blocks on I/O)
+
+    def _point(self, metric_type: str, labels: Optional[Dict[str, Any]], kind: str) -> Optional[_Series]:
+        key = (metric_type, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ())
+        series = self._series.get(key)
+        if series is None:
+            if len(self._series) >= self.max_series:
+                self.stats.points_dropped += 1
+                return None
+            series = self._series[key] = _Series(kind, self.bucket_options.num_finite_buckets + 2)
+        elif series.kind != kind:
+            raise ValueError(f"Metric {metric_type} already recorded as {series.kind}")
+        self._dirty.add(key)
+        self.stats.points_recorded += 1
+        return series
+
+    def increment(self, metric_type: str, value: float = 1.0, labels: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            series = self._point(metric_type, labels, COUNTER)
+            if series is not None:
+                series.value += value
+        self._ensure_flusher()
+
+    def set_gauge(self, metric_type: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            series = self._point(metric_type, labels, GAUGE)
+            if series is not None:
+                series.value = value
+        self._ensure_flusher()
+
+    def observe(self, metric_type: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Add one sample to a distribution"""
+        with self._lock:
+            series = self._point(metric_type, labels, DISTRIBUTION)
+            if series is not None:
+                series.count += 1
+                delta = value - series.mean
+                series.mean += delta / series.count
+                series.m2 += delta * (value - series.mean)
+                series.buckets[self.bucket_options.index(value)] += 1
+        self._ensure_flusher()
+
+    # Export
+
+    def _ensure_flusher(self):
+        task = self._task
+        if task is not None and not task.done() and not self._loop.is_closed():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop in this thread: the next record from async code starts the flusher
+            return
+        self.start(loop)
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start the periodic flush task on ``loop`` (default: the running loop)"""
+        if self._task is not None and not self._task.done() and not self._loop.is_closed():
+            return
+        loop = loop or asyncio.get_running_loop()
+        self._loop = loop
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Metrics flush failed: {e}")
+
+    def _collect(self) -> List[MetricSeries]:
+        now = time.time()
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return [
+                MetricSeries(
+                    metric_type=key[0],
+                    labels=dict(key[1]),
+                    kind=self._series[key].kind,
+                    value=self._series[key].snapshot(self.bucket_options),
+                    start_time=self.start_time,
+                    end_time=now
+                )
+                for key in dirty
+            ]
+
+    def _mark_dirty(self, batch: List[MetricSeries]):
+        with self._lock:
+            for series in batch:
+                self._dirty.add((series.metric_type, tuple(sorted(series.labels.items()))))
+
+    async def flush(self) -> int:
+        """Export every series that changed since the last flush; returns series written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            start = time.perf_counter()
+            pending = self._collect()
+            written = 0
+            for offset in range(0, len(pending), self.batch_size):
+                batch = pending[offset:offset + self.batch_size]
+                try:
+                    await self.sink.write(batch)
+                except Exception as e:
+                    self.stats.export_failures += 1
+                    logger.warning(f"Metrics export of {len(batch)} series failed, will retry: {e}")
+                    self._mark_dirty(pending[offset:])
+                    break
+                written += len(batch)
+                self.stats.batches_exported += 1
+            self.stats.series_exported += written
+            self.stats.flushes += 1
+            self.stats.last_flush_ms = (time.perf_counter() - start) * 1000
+            return written
+
+    async def stop(self, flush: bool = True):
+        """Cancel the flush task and export what is left"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+        if flush:
+            await self.flush()
+        await self.sink.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            'series': len(self._series),
+            'pending_series': len(self._dirty),
+            'max_series': self.max_series,
+            'sink': type(self.sink).__name__,
+        }
+
+
+def sink_from_env() -> MetricSink:
+    """METRICS_SINK=cloud (default) | memory | file:<path>"""
+    setting = os.getenv("METRICS_SINK", "cloud")
+    if setting == "memory":
+        return InMemorySink()
+    if setting.startswith("file:"):
+        return FileSink(setting[len("file:"):])
+    return CloudMonitoringSink()
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+def get_metrics_exporter() -> MetricsExporter:
+    """Process-wide exporter shared by performance_monitor and services"""
+    global _exporter
+    if _exporter is None:
+        _exporter = MetricsExporter()
+    return _exporter
+
+
+def set_metrics_exporter(exporter: Optional[MetricsExporter]):
+    """Replace the process-wide exporter (tests, alternative sinks)"""
+    global _exporter
+    _exporter = exporter
+
+
+__all__ = [
+    'MetricsExporter', 'MetricSeries', 'MetricSink', 'InMemorySink', 'FileSink',
+    'CloudMonitoringSink', 'BucketOptions', 'ExporterStats',
+    'get_metrics_exporter', 'set_metrics_exporter', 'CLOUD_MONITORING_BATCH_LIMIT'
+]
@@ -1,123 +1,111 @@
 # backend/app/middleware/monitoring.py
 
+import inspect
 import time
 import logging
 from functools import wraps
-from typing import Any, Callable
-from google.cloud import monitoring_v3
-from google.cloud.monitoring_v3 import query
+from typing import Any, Callable, Optional
+
+from .metrics_exporter import get_metrics_exporter
+from .tracing import tracer
 
 logger = logging.getLogger(__name__)
 
-def performance_monitor(func: Callable) -> Callable:
-    """Decorator for performance monitoring with GCP Cloud Monitoring"""
+# Distribution/counter series; the older per-call GAUGE metrics
+# (function/execution_time, function/error_count) cannot change kind
+LATENCY_METRIC = "custom.googleapis.com/validatus/function/latency"
+ERROR_METRIC = "custom.googleapis.com/validatus/function/errors"
+
+def performance_monitor(func: Optional[Callable] = None, *,
+                        sample_rate: Optional[float] = None) -> Callable:
+    """Decorator for performance monitoring with GCP Cloud Monitoring
+    
+    Every call is recorded as a latency point; sampled calls also open a
+    span nested under the caller's span (see middleware.tracing). Use as
+    ``@performance_monitor`` or ``@performance_monitor(sample_rate=0.1)``;
+    ``sample_rate`` applies when the call starts a new trace.
+    """
+    
+    if func is None:
+        return lambda f: performance_monitor(f, sample_rate=sample_rate)
+    
+    function_name = f"{func.__module__}.{func.__name__}"
+    span_name = func.__qualname__
     
     @wraps(func)
     async def async_wrapper(*args, **kwargs) -> Any:
-        start_time = time.time()
-        function_name = f"{func.__module__}.{func.__name__}"
+        start_time = time.perf_counter()
+        span, token = tracer.start(span_name, sample_rate)
         
         try:
             result = await func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            
-            # Record success metrics
-            await _record_metric(
-                metric_type="custom.googleapis.com/validatus/function/execution_time",
-                value=execution_time,
-                labels={
-                    "function_name": function_name,
-                    "status": "success"
-                }
-            )
-            
-            logger.info(f"✅ {function_name} completed in {execution_time:.2f}s")
-            return result
-            
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             
             # Record error metrics
-            await _record_metric(
-                metric_type="custom.googleapis.com/validatus/function/execution_time",
-                value=execution_time,
-                labels={
-                    "function_name": function_name,
-                    "status": "error"
-                }
-            )
-            
-            await _record_metric(
-                metric_type="custom.googleapis.com/validatus/function/error_count",
-                value=1,
-                labels={
-                    "function_name": function_name,
-                    "error_type": type(e).__name__
-                }
-            )
+            _record_call(function_name, execution_time, error=e)
             
             logger.error(f"❌ {function_name} failed after {execution_time:.2f}s: {e}")
             raise
+        finally:
+            tracer.finish(span, token)
+        
+        execution_time = time.perf_counter() - start_time
+        
+        # Record success metrics (in-memory; exported in batches)
+        _record_call(function_name, execution_time, error=None)
+        
+        logger.info(f"✅ {function_name} completed in {execution_time:.2f}s")
+        return result
     
     @wraps(func)
     def sync_wrapper(*args, **kwargs) -> Any:
-        start_time = time.time()
-        function_name = f"{func.__module__}.{func.__name__}"
+        start_time = time.perf_counter()
+        span, token = tracer.start(span_name, sample_rate)
         
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            
-            # Record success metrics (sync version)
-            logger.info(f"✅ {function_name} completed in {execution_time:.2f}s")
-            return result
-            
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
+            _record_call(function_name, execution_time, error=e)
             logger.error(f"❌ {function_name} failed after {execution_time:.2f}s: {e}")
             raise
+        finally:
+            tracer.finish(span, token)
+        
+        execution_time = time.perf_counter() - start_time
+        _record_call(function_name, execution_time, error=None)
+        logger.info(f"✅ {function_name} completed in {execution_time:.2f}s")
+        return result
     
-    # Return appropriate wrapper based on function type
-    if func.__name__.startswith('_') or func.__name__.endswith('_async'):
+    # Coroutine functions are timed until their result is available
+    if inspect.iscoroutinefunction(func):
         return async_wrapper
     else:
         return sync_wrapper
 
-async def _record_metric(metric_type: str, value: float, labels: dict) -> None:
-    """Record custom metric to Cloud Monitoring"""
+def _record_call(function_name: str, execution_time: float, error: Exception = None) -> None:
+    """Record call latency (and the error, if any) with the process-wide exporter"""
     try:
-        client = monitoring_v3.MetricServiceClient()
-        project_name = f"projects/validatus-prod"  # This should come from config
-        
-        series = monitoring_v3.TimeSeries()
-        series.metric.type = metric_type
-        
-        # Add labels
-        for key, val in labels.items():
-            series.metric.labels[key] = str(val)
-        
-        # Set resource
-        series.resource.type = "global"
-        
-        # Set data point
-        now = time.time()
-        seconds = int(now)
-        nanos = int((now - seconds) * 10**9)
-        
-        interval = monitoring_v3.TimeInterval(
-            {"end_time": {"seconds": seconds, "nanos": nanos}}
+        exporter = get_metrics_exporter()
+        exporter.observe(
+            LATENCY_METRIC,
+            execution_time,
+            labels={
+                "function_name": function_name,
+                "status": "error" if error is not None else "success"
+            }
         )
-        
-        point = monitoring_v3.Point(
-            {"interval": interval, "value": {"double_value": value}}
-        )
-        series.points = [point]
-        
-        # Write the time series
-        client.create_time_series(name=project_name, time_series=[series])
-        
+        if error is not None:
+            exporter.increment(
+                ERROR_METRIC,
+                labels={
+                    "function_name": function_name,
+                    "error_type": type(error).__name__
+                }
+            )
     except Exception as e:
-        logger.error(f"Failed to record metric {metric_type}: {e}")
+        logger.error(f"Failed to record metrics for {function_name}: {e}")
 
 # Export for use in other modules
 __all__ = ['performance_monitor']
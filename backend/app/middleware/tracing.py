@@ -0,0 +1,201 @@
+# backend/app/middleware/tracing.py
+"""
+In-process span tracing with flame-style aggregation
+
+Spans nest through a ContextVar, so parent/child relations survive awaits
+and asyncio tasks (tasks copy the context they were created in). Each
+finished span adds its wall time and self time (wall time minus children)
+to the aggregate of its call path; the aggregate can be rendered as a tree
+or as folded stacks for flame graph tools.
+
+Sampling is decided once per root span; children of an unsampled root cost
+a single ContextVar lookup.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Path = Tuple[str, ...]
+
+
+class Span:
+    """One timed call; ``path`` is the chain of span names from the root"""
+
+    __slots__ = ('name', 'path', 'parent', 'start', 'child_time')
+
+    def __init__(self, name: str, path: Path, parent: Optional['Span']):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+
+
+# Marker for "inside an unsampled trace"
+_UNSAMPLED = Span('unsampled', (), None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('validatus_current_span', default=None)
+
+
+class FlameAggregator:
+    """Calls, wall time and self time per call path (bounded number of paths)"""
+
+    def __init__(self, max_paths: int = 5000):
+        self.max_paths = max_paths
+        self.dropped_spans = 0
+        # path -> [calls, total_seconds, self_seconds]
+        self._paths: Dict[Path, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: Path, wall_seconds: float, self_seconds: float):
+        with self._lock:
+            entry = self._paths.get(path)
+            if entry is None:
+                if len(self._paths) >= self.max_paths:
+                    self.dropped_spans += 1
+                    return
+                entry = self._paths[path] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += wall_seconds
+            entry[2] += self_seconds
+
+    def _select(self, root: Optional[str]) -> Dict[Path, List[float]]:
+        with self._lock:
+            items = {path: list(entry) for path, entry in self._paths.items()}
+        if root is None:
+            return items
+        # Paths below ``root`` wherever it occurs, re-rooted at it
+        selected: Dict[Path, List[float]] = {}
+        for path, (calls, total, own) in items.items():
+            if root not in path:
+                continue
+            sub = path[path.index(root):]
+            entry = selected.setdefault(sub, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += total
+            entry[2] += own
+        return selected
+
+    def folded(self, root: Optional[str] = None) -> str:
+        """Folded stacks ("root;child;leaf <self microseconds>"), one per line"""
+        lines = [
+            f"{';'.join(path)} {int(own * 1e6)}"
+            for path, (_, _, own) in sorted(self._select(root).items())
+        ]
+        return '\n'.join(lines)
+
+    def tree(self, root: str) -> Optional[Dict[str, Any]]:
+        """Nested wall/self time (ms) below ``root``; children sorted by total time"""
+        paths = self._select(root)
+        if (root,) not in paths:
+            return None
+        nodes: Dict[Path, Dict[str, Any]] = {}
+        for path in sorted(paths, key=len):
+            calls, total, own = paths[path]
+            node = {
+                'name': path[-1],
+                'calls': int(calls),
+                'total_ms': round(total * 1000, 3),
+                'self_ms': round(own * 1000, 3),
+                'children': [],
+            }
+            nodes[path] = node
+            parent = nodes.get(path[:-1])
+            if parent is not None:
+                parent['children'].append(node)
+
+        def sort(node: Dict[str, Any]):
+            node['children'].sort(key=lambda child: child['total_ms'], reverse=True)
+            for child in node['children']:
+                sort(child)
+
+        tree = nodes[(root,)]
+        sort(tree)
+        return tree
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'paths': len(self._paths), 'max_paths': self.max_paths,
+                'dropped_spans': self.dropped_spans}
+
+    def reset(self):
+        with self._lock:
+            self._paths.clear()
+            self.dropped_spans = 0
+
+
+class Tracer:
+    """Creates spans and feeds finished ones to a FlameAggregator"""
+
+    def __init__(self, sample_rate: float = 1.0, flame: Optional[FlameAggregator] = None):
+        self.sample_rate = sample_rate
+        self.flame = flame or FlameAggregator()
+
+    def start(self, name: str, sample_rate: Optional[float] = None) -> Tuple[Optional[Span], Optional[Token]]:
+        parent = _current_span.get()
+        if parent is None:
+            rate = self.sample_rate if sample_rate is None else sample_rate
+            if rate < 1.0 and random.random() >= rate:
+                return None, _current_span.set(_UNSAMPLED)
+            path = (name,)
+        elif parent is _UNSAMPLED:
+            return None, None
+        else:
+            path = parent.path + (name,)
+        span = Span(name, path, parent)
+        return span, _current_span.set(span)
+
+    def finish(self, span: Optional[Span], token: Optional[Token]) -> Optional[float]:
+        """End ``span``; returns its wall time in seconds (None when unsampled)"""
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Finished in another context (e.g. a generator resumed elsewhere)
+                _current_span.set(span.parent if span is not None else None)
+        if span is None:
+            return None
+        duration = time.perf_counter() - span.start
+        parent = span.parent
+        if parent is not None:
+            parent.child_time += duration
+        self.flame.record(span.path, duration, max(0.0, duration - span.child_time))
+        return duration
+
+    @contextmanager
+    def span(self, name: str, sample_rate: Optional[float] = None) -> Iterator[Optional[Span]]:
+        span, token = self.start(name, sample_rate)
+        try:
+            yield span
+        finally:
+            self.finish(span, token)
+
+
+def current_span() -> Optional[Span]:
+    span = _current_span.get()
+    return None if span is _UNSAMPLED else span
+
+
+tracer = Tracer(sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")))
+
+
+def trace_span(name: str, sample_rate: Optional[float] = None):
+    """Context manager timing a block as a child of the current span"""
+    return tracer.span(name, sample_rate)
+
+
+def get_flame_graph(root: str) -> Optional[Dict[str, Any]]:
+    """Where wall time goes below spans named ``root``"""
+    return tracer.flame.tree(root)
+
+
+__all__ = [
+    'Span', 'FlameAggregator', 'Tracer', 'tracer', 'trace_span', 'current_span',
+    'get_flame_graph'
+]
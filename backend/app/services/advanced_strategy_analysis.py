@@ -9,6 +9,12 @@ import logging
 import json
 from pathlib import Path
 
+from ..core.correlated_sampling import (
+    cholesky_factor, correlated_normals, correlation_matrix, to_marginal
+)
+from ..core.sequential_monte_carlo import ConvergenceCriteria, ConvergenceReport, SequentialMonteCarlo
+from ..core.simulation_frame import SimulationFrame
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -40,23 +46,36 @@ class ScenarioResult:
     key_drivers: List[str]
     risk_level: str
 
+# KPIs whose estimates must converge in sequential runs
+CONVERGENCE_KPIS = ('roi', 'adoption_rate', 'margin', 'revenue')
+
 class AdvancedStrategyAnalysisEngine:
     """Main strategy analysis engine"""
     
-    def __init__(self):
+    def __init__(self, random_seed: Optional[int] = None):
         self.factors_library = self._load_factors_library()
         self.patterns_library = self._load_patterns_library()
+        self.rng = np.random.default_rng(random_seed)
         
     def analyze_strategy(self, session_id: str, topic_data: Dict, 
-                        client_inputs: Dict) -> Dict[str, Any]:
-        """Execute complete strategic analysis workflow"""
+                        client_inputs: Dict, num_runs: int = 10000,
+                        convergence: Optional[ConvergenceCriteria] = None) -> Dict[str, Any]:
+        """Execute complete strategic analysis workflow
+        
+        With ``convergence``, runs are added in batches until the KPI
+        estimates are within tolerance and ``num_runs`` is ignored.
+        """
         
         try:
             # Step 1: Build simulation pack
             simulation_pack = self._build_simulation_pack(topic_data, client_inputs)
             
             # Step 2: Run Monte Carlo simulation
-            simulation_results = self._run_monte_carlo_simulation(simulation_pack)
+            convergence_report = None
+            if convergence is not None:
+                simulation_results, convergence_report = self._run_until_converged(simulation_pack, convergence)
+            else:
+                simulation_results = self._run_monte_carlo_simulation(simulation_pack, num_runs)
             
             # Step 3: Generate scenarios
             scenarios = self._cluster_scenarios(simulation_results)
@@ -67,16 +86,20 @@ class AdvancedStrategyAnalysisEngine:
             # Step 5: Generate business case score
             business_case_score = self._calculate_business_case_score(simulation_results)
             
+            simulation_metadata = {
+                'runs': len(simulation_results),
+                'confidence_level': 0.95,
+                'analysis_type': 'advanced_monte_carlo'
+            }
+            if convergence_report is not None:
+                simulation_metadata['convergence'] = convergence_report.to_dict()
+            
             return {
                 'session_id': session_id,
                 'business_case_score': business_case_score,
                 'scenarios': scenarios,
                 'driver_sensitivities': sensitivities,
-                'simulation_metadata': {
-                    'runs': len(simulation_results),
-                    'confidence_level': 0.95,
-                    'analysis_type': 'advanced_monte_carlo'
-                },
+                'simulation_metadata': simulation_metadata,
                 'financial_projections': self._generate_financial_projections(simulation_results),
                 'assumptions': self._extract_assumptions(simulation_pack)
             }
@@ -247,67 +270,53 @@ class AdvancedStrategyAnalysisEngine:
         }
     
     def _run_monte_carlo_simulation(self, pack: SimulationPack, 
-                                   num_runs: int = 10000) -> List[Dict]:
-        """Execute Monte Carlo simulation"""
-        results = []
-        
-        for run_id in range(num_runs):
-            # Sample from distributions
-            driver_values = {}
-            for driver in pack.drivers:
-                value = self._sample_distribution(driver)
-                driver_values[driver.factor_id] = value
-            
-            # Apply correlations
-            correlated_values = self._apply_correlations(driver_values, pack.correlations)
-            
-            # Calculate KPIs
-            kpis = self._calculate_kpis(correlated_values, pack.business_case_inputs)
-            
-            # Apply constraints
-            constrained_kpis = self._apply_constraints_to_kpis(kpis, pack.constraints)
-            
-            results.append({
-                'run_id': run_id,
-                'drivers': correlated_values,
-                'kpis': constrained_kpis
-            })
-        
+                                   num_runs: int = 10000) -> SimulationFrame:
+        """Execute Monte Carlo simulation
+        
+        All runs are drawn at once: correlated standard normals from the
+        Cholesky factor of the driver correlation matrix, mapped onto each
+        driver's distribution (Gaussian copula), then KPIs and constraints
+        evaluated over the whole block. Results are one column per driver
+        and per KPI.
+        """
+        driver_ids = [driver.factor_id for driver in pack.drivers]
+        results = SimulationFrame(length=num_runs, attrs={'driver_ids': driver_ids})
+        
+        # Correlated normals (nearest valid matrix if the pairs are inconsistent)
+        correlations = correlation_matrix(driver_ids, pack.correlations)
+        normals = correlated_normals(self.rng, cholesky_factor(correlations), num_runs)
+        
+        # Map to driver marginals
+        for column, driver in enumerate(pack.drivers):
+            results.add_column(driver.factor_id,
+                               to_marginal(driver.distribution_type, driver.config_range, normals[:, column]))
+        del normals
+        
+        # Calculate KPIs
+        kpis = self._calculate_kpis({driver_id: results[driver_id] for driver_id in driver_ids},
+                                    pack.business_case_inputs)
+        
+        # Apply constraints
+        constrained_kpis = self._apply_constraints_to_kpis(kpis, pack.constraints)
+        
+        for name, values in constrained_kpis.items():
+            results.add_column(name, values)
         return results
     
-    def _sample_distribution(self, driver: FactorConfig) -> float:
-        """Sample value from driver's distribution"""
-        config = driver.config_range
-        
-        if driver.distribution_type == 'normal':
-            return np.random.normal(config['mean'], config['std'])
-        elif driver.distribution_type == 'beta':
-            return np.random.beta(config['alpha'], config['beta'])
-        elif driver.distribution_type == 'lognormal':
-            return np.random.lognormal(config['mu'], config['sigma'])
-        elif driver.distribution_type == 'triangular':
-            return np.random.triangular(config['low'], config['mode'], config['high'])
-        else:
-            return np.random.uniform(0, 1)
-    
-    def _apply_correlations(self, driver_values: Dict[str, float], 
-                          correlations: Dict[str, Dict[str, float]]) -> Dict[str, float]:
-        """Apply correlations between drivers"""
-        correlated_values = driver_values.copy()
-        
-        for driver_id, value in driver_values.items():
-            if driver_id in correlations:
-                for correlated_driver, correlation in correlations[driver_id].items():
-                    if correlated_driver in driver_values:
-                        # Simple correlation adjustment
-                        adjustment = correlation * 0.1 * value
-                        correlated_values[correlated_driver] += adjustment
-        
-        return correlated_values
+    def _run_until_converged(self, pack: SimulationPack,
+                             criteria: ConvergenceCriteria) -> Tuple[SimulationFrame, ConvergenceReport]:
+        """Simulate batches until the CONVERGENCE_KPIS estimates are within tolerance"""
+        runner = SequentialMonteCarlo(criteria)
+        frames, report = runner.run(
+            lambda size: self._run_monte_carlo_simulation(pack, size),
+            track=lambda frame: {name: frame[name] for name in CONVERGENCE_KPIS if name in frame}
+        )
+        logger.info(f"Simulation converged={report.converged} after {report.iterations} runs")
+        return SimulationFrame.concat(frames), report
     
-    def _calculate_kpis(self, driver_values: Dict[str, float], 
-                       business_inputs: Dict[str, float]) -> Dict[str, float]:
-        """Calculate KPIs from driver values"""
+    def _calculate_kpis(self, driver_values: Dict[str, np.ndarray], 
+                       business_inputs: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """Calculate KPIs from driver values (scalars or arrays of runs)"""
         # Base calculations
         unit_price = business_inputs.get('unit_price', 100)
         unit_cost = business_inputs.get('unit_cost', 60)
@@ -328,105 +337,100 @@ class AdvancedStrategyAnalysisEngine:
         # Financial projections
         revenue = unit_price * volume * adoption_rate
         cost = unit_cost * volume * adoption_rate
-        profit = revenue - cost
+        profit = np.asarray(revenue - cost, dtype=float)
         
         # ROI and payback
         initial_investment = business_inputs.get('initial_investment', 100000)
-        roi = profit / initial_investment if initial_investment > 0 else 0
-        payback_period = initial_investment / profit if profit > 0 else 999
+        roi = profit / initial_investment if initial_investment > 0 else np.zeros_like(profit)
+        profitable = profit > 0
+        payback_period = np.divide(initial_investment, profit,
+                                   out=np.full_like(profit, 999.0), where=profitable)
         
         return {
-            'roi': max(0, roi),
-            'payback_period': min(payback_period, 10),
-            'adoption_rate': max(0, min(adoption_rate, 1)),
-            'margin': max(0, min(margin, 1)),
-            'conversion': max(0, min(conversion, 1)),
-            'revenue': max(0, revenue),
+            'roi': np.maximum(roi, 0),
+            'payback_period': np.minimum(payback_period, 10),
+            'adoption_rate': np.clip(adoption_rate, 0, 1),
+            'margin': np.clip(margin, 0, 1),
+            'conversion': np.clip(conversion, 0, 1),
+            'revenue': np.maximum(revenue, 0),
             'profit': profit,
             'npv': profit * 0.9  # Simplified NPV
         }
     
-    def _apply_constraints_to_kpis(self, kpis: Dict[str, float], 
-                                  constraints: Dict[str, Any]) -> Dict[str, float]:
+    def _apply_constraints_to_kpis(self, kpis: Dict[str, np.ndarray], 
+                                  constraints: Dict[str, Any]) -> Dict[str, np.ndarray]:
         """Apply business constraints to KPIs"""
         constrained_kpis = kpis.copy()
         
         # Apply minimum ROI constraint
-        if kpis['roi'] < constraints['min_roi']:
-            constrained_kpis['roi'] = constraints['min_roi']
+        constrained_kpis['roi'] = np.maximum(kpis['roi'], constraints['min_roi'])
         
         # Apply maximum payback constraint
-        if kpis['payback_period'] > constraints['max_payback_period']:
-            constrained_kpis['payback_period'] = constraints['max_payback_period']
+        constrained_kpis['payback_period'] = np.minimum(kpis['payback_period'],
+                                                        constraints['max_payback_period'])
         
         # Apply minimum adoption constraint
-        if kpis['adoption_rate'] < constraints['min_adoption_rate']:
-            constrained_kpis['adoption_rate'] = constraints['min_adoption_rate']
+        constrained_kpis['adoption_rate'] = np.maximum(kpis['adoption_rate'],
+                                                       constraints['min_adoption_rate'])
         
         return constrained_kpis
     
-    def _cluster_scenarios(self, simulation_results: List[Dict]) -> List[ScenarioResult]:
+    def _cluster_scenarios(self, simulation_results: SimulationFrame) -> List[ScenarioResult]:
         """Cluster simulation results into scenarios"""
-        if not simulation_results:
+        if not len(simulation_results):
             return self._generate_default_scenarios()
         
         # Extract KPI values for clustering
-        roi_values = [r['kpis']['roi'] for r in simulation_results]
-        adoption_values = [r['kpis']['adoption_rate'] for r in simulation_results]
+        roi_values = simulation_results['roi']
+        adoption_values = simulation_results['adoption_rate']
+        
+        # Quartiles of both KPIs in one pass each
+        roi_p25, roi_median, roi_p75 = np.quantile(roi_values, [0.25, 0.5, 0.75])
+        adoption_p25, adoption_median, adoption_p75 = np.quantile(adoption_values, [0.25, 0.5, 0.75])
         
         scenarios = []
         
         # Base Case - median values
-        roi_median = np.percentile(roi_values, 50)
-        adoption_median = np.percentile(adoption_values, 50)
         base_mask = self._create_scenario_mask(roi_values, adoption_values, 
                                              roi_median, adoption_median, tolerance=0.2)
         scenarios.append(self._create_scenario('Base Case', base_mask, simulation_results))
         
         # Aggressive Growth - high ROI and adoption
-        roi_p75 = np.percentile(roi_values, 75)
-        adoption_p75 = np.percentile(adoption_values, 75)
-        aggressive_mask = [(r >= roi_p75 and a >= adoption_p75) 
-                          for r, a in zip(roi_values, adoption_values)]
+        aggressive_mask = (roi_values >= roi_p75) & (adoption_values >= adoption_p75)
         scenarios.append(self._create_scenario('Aggressive Growth', aggressive_mask, simulation_results))
         
         # Crisis - low performance
-        roi_p25 = np.percentile(roi_values, 25)
-        adoption_p25 = np.percentile(adoption_values, 25)
-        crisis_mask = [(r <= roi_p25 and a <= adoption_p25) 
-                      for r, a in zip(roi_values, adoption_values)]
+        crisis_mask = (roi_values <= roi_p25) & (adoption_values <= adoption_p25)
         scenarios.append(self._create_scenario('Crisis', crisis_mask, simulation_results))
         
         return scenarios
     
-    def _create_scenario_mask(self, roi_values: List[float], adoption_values: List[float],
-                            target_roi: float, target_adoption: float, tolerance: float) -> List[bool]:
+    def _create_scenario_mask(self, roi_values: np.ndarray, adoption_values: np.ndarray,
+                            target_roi: float, target_adoption: float, tolerance: float) -> np.ndarray:
         """Create boolean mask for scenario clustering"""
-        return [
-            ((abs(r - target_roi) / target_roi <= tolerance if target_roi != 0 else abs(r - target_roi) <= tolerance) and 
-             (abs(a - target_adoption) / target_adoption <= tolerance if target_adoption != 0 else abs(a - target_adoption) <= tolerance))
-            for r, a in zip(roi_values, adoption_values)
-        ]
+        def within(values: np.ndarray, target: float) -> np.ndarray:
+            distance = np.abs(values - target)
+            return distance / abs(target) <= tolerance if target != 0 else distance <= tolerance
+        
+        return within(roi_values, target_roi) & within(adoption_values, target_adoption)
     
-    def _create_scenario(self, name: str, mask: List[bool], 
-                        simulation_results: List[Dict]) -> Dict[str, Any]:
+    def _create_scenario(self, name: str, mask: np.ndarray, 
+                        simulation_results: SimulationFrame) -> Dict[str, Any]:
         """Create scenario result from mask"""
-        masked_results = [r for r, m in zip(simulation_results, mask) if m]
+        matched = int(np.count_nonzero(mask))
         
-        if not masked_results:
+        if not matched:
             return self._create_default_scenario(name)
         
         # Calculate scenario metrics
-        roi_values = [r['kpis']['roi'] for r in masked_results]
-        adoption_values = [r['kpis']['adoption_rate'] for r in masked_results]
-        
-        probability = len(masked_results) / len(simulation_results)
+        kpi_values = simulation_results
+        probability = matched / len(simulation_results)
         
         kpis = {
-            'roi': np.mean(roi_values),
-            'adoption_rate': np.mean(adoption_values),
-            'payback_period': np.mean([r['kpis']['payback_period'] for r in masked_results]),
-            'npv': np.mean([r['kpis']['npv'] for r in masked_results])
+            'roi': float(np.mean(kpi_values['roi'][mask])),
+            'adoption_rate': float(np.mean(kpi_values['adoption_rate'][mask])),
+            'payback_period': float(np.mean(kpi_values['payback_period'][mask])),
+            'npv': float(np.mean(kpi_values['npv'][mask]))
         }
         
         # Determine risk level
@@ -436,7 +440,7 @@ class AdvancedStrategyAnalysisEngine:
         narrative = self._generate_scenario_narrative(name, kpis, risk_level)
         
         # Identify key drivers
-        key_drivers = self._identify_key_drivers(masked_results)
+        key_drivers = self._identify_key_drivers(simulation_results, mask)
         
         return {
             'name': name,
@@ -458,17 +462,18 @@ class AdvancedStrategyAnalysisEngine:
         
         return narratives.get(name, f"Scenario with {risk_level.lower()} risk profile and {kpis['roi']*100:.1f}% ROI.")
     
-    def _identify_key_drivers(self, masked_results: List[Dict]) -> List[str]:
-        """Identify key drivers for scenario"""
-        if not masked_results:
+    def _identify_key_drivers(self, simulation_results: SimulationFrame,
+                             mask: Optional[np.ndarray] = None) -> List[str]:
+        """Identify key drivers for scenario (runs selected by ``mask``)"""
+        if not len(simulation_results) or (mask is not None and not np.any(mask)):
             return ['Market Growth', 'Competitive Position']
         
-        # Calculate driver variance
+        # Calculate driver variance (drivers that were not simulated are constant)
         driver_variance = {}
         for driver_id in ['F1', 'F2', 'F3', 'F4', 'F5']:
-            values = [r['drivers'].get(driver_id, 0) for r in masked_results]
-            if values:
-                driver_variance[driver_id] = np.var(values)
+            values = simulation_results.get(driver_id)
+            driver_variance[driver_id] = float(np.var(values if mask is None else values[mask])) \
+                if values is not None else 0.0
         
         # Return top 3 drivers by variance
         top_drivers = sorted(driver_variance.items(), key=lambda x: x[1], reverse=True)[:3]
@@ -483,50 +488,50 @@ class AdvancedStrategyAnalysisEngine:
         
         return [driver_names.get(driver_id, driver_id) for driver_id, _ in top_drivers]
     
-    def _calculate_driver_sensitivities(self, simulation_results: List[Dict]) -> Dict[str, float]:
+    def _calculate_driver_sensitivities(self, simulation_results: SimulationFrame) -> Dict[str, float]:
         """Calculate driver sensitivities"""
-        if not simulation_results:
+        if not len(simulation_results):
             return {'F1': 0.3, 'F2': 0.2, 'F3': 0.25, 'F4': 0.15, 'F5': 0.1}
         
         sensitivities = {}
+        roi_values = simulation_results['roi']
         
         for driver_id in ['F1', 'F2', 'F3', 'F4', 'F5']:
             # Calculate correlation between driver and ROI
-            driver_values = [r['drivers'].get(driver_id, 0) for r in simulation_results]
-            roi_values = [r['kpis']['roi'] for r in simulation_results]
+            driver_values = simulation_results.get(driver_id)
             
-            if len(driver_values) > 1 and len(roi_values) > 1:
-                correlation = np.corrcoef(driver_values, roi_values)[0, 1]
-                sensitivities[driver_id] = abs(correlation) if not np.isnan(correlation) else 0.1
+            if driver_values is not None and len(driver_values) > 1:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    correlation = np.corrcoef(driver_values, roi_values)[0, 1]
+                sensitivities[driver_id] = float(abs(correlation)) if not np.isnan(correlation) else 0.1
             else:
                 sensitivities[driver_id] = 0.1
         
         return sensitivities
     
-    def _calculate_business_case_score(self, simulation_results: List[Dict]) -> Dict[str, Any]:
+    def _calculate_business_case_score(self, simulation_results: SimulationFrame) -> Dict[str, Any]:
         """Calculate business case score"""
-        if not simulation_results:
+        if not len(simulation_results):
             return {
                 'score': 0.6,
                 'confidence_band': [0.4, 0.8],
                 'components': {'roi': 0.3, 'adoption': 0.2, 'risk': 0.1}
             }
         
-        roi_values = [r['kpis']['roi'] for r in simulation_results]
-        adoption_values = [r['kpis']['adoption_rate'] for r in simulation_results]
+        roi_values = simulation_results['roi']
+        adoption_values = simulation_results['adoption_rate']
+        roi_mean = float(np.mean(roi_values))
         
         # Calculate weighted score
-        roi_score = min(np.mean(roi_values) / 0.3, 1.0)  # Normalize to 30% target ROI
-        adoption_score = min(np.mean(adoption_values) / 0.2, 1.0)  # Normalize to 20% target adoption
-        risk_score = 1.0 - (np.std(roi_values) / np.mean(roi_values)) if np.mean(roi_values) > 0 else 0.5
+        roi_score = min(roi_mean / 0.3, 1.0)  # Normalize to 30% target ROI
+        adoption_score = min(float(np.mean(adoption_values)) / 0.2, 1.0)  # Normalize to 20% target adoption
+        risk_score = 1.0 - (float(np.std(roi_values)) / roi_mean) if roi_mean > 0 else 0.5
         
         overall_score = (roi_score * 0.5 + adoption_score * 0.3 + risk_score * 0.2)
         
         # Calculate confidence band
-        confidence_band = [
-            np.percentile(roi_values, 25) / 0.3,
-            np.percentile(roi_values, 75) / 0.3
-        ]
+        roi_p25, roi_p75 = np.quantile(roi_values, [0.25, 0.75])
+        confidence_band = [float(roi_p25) / 0.3, float(roi_p75) / 0.3]
         
         return {
             'score': min(max(overall_score, 0), 1),
@@ -538,9 +543,9 @@ class AdvancedStrategyAnalysisEngine:
             }
         }
     
-    def _generate_financial_projections(self, simulation_results: List[Dict]) -> Dict[str, Any]:
+    def _generate_financial_projections(self, simulation_results: SimulationFrame) -> Dict[str, Any]:
         """Generate financial projections"""
-        if not simulation_results:
+        if not len(simulation_results):
             return {
                 'year_1': {'revenue': 100000, 'profit': 20000, 'roi': 0.2},
                 'year_2': {'revenue': 120000, 'profit': 30000, 'roi': 0.3},
@@ -548,13 +553,9 @@ class AdvancedStrategyAnalysisEngine:
             }
         
         # Calculate projections based on simulation results
-        revenue_values = [r['kpis']['revenue'] for r in simulation_results]
-        profit_values = [r['kpis']['profit'] for r in simulation_results]
-        roi_values = [r['kpis']['roi'] for r in simulation_results]
-        
-        base_revenue = np.mean(revenue_values)
-        base_profit = np.mean(profit_values)
-        base_roi = np.mean(roi_values)
+        base_revenue = float(np.mean(simulation_results['revenue']))
+        base_profit = float(np.mean(simulation_results['profit']))
+        base_roi = float(np.mean(simulation_results['roi']))
         
         return {
             'year_1': {
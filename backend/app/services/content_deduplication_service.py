@@ -5,12 +5,15 @@ import hashlib
 import logging
 from typing import List, Dict, Any, Set, Tuple, Optional
 from dataclasses import dataclass
-from difflib import SequenceMatcher
 import numpy as np
 
 from google.cloud import aiplatform
 # from langchain_google_vertexai import VertexAIEmbeddings
 
+from ..core.memoization import MISSING, MemoCache
+from ..core.near_duplicates import NearDuplicateIndex
+from ..core.semantic_duplicates import resolve_semantic_duplicates
+from ..core.sentence_overlap import find_partial_duplicates, word_set
 from ..models.analysis_models import DuplicationResult, DuplicateType
 from ..middleware.monitoring import performance_monitor
 
@@ -34,17 +37,48 @@ class ContentDeduplicationService:
     def __init__(self):
         # self.embeddings = VertexAIEmbeddings(model_name="text-embedding-004")
         self.processed_hashes: Set[str] = set()
-        self.semantic_embeddings_cache: Dict[str, np.ndarray] = {}
+        # md5 of content -> embedding vector, least recently used evicted first
+        self.semantic_embeddings_cache = MemoCache(
+            'semantic_embeddings', max_entries=4096, max_bytes=64 * 1024 * 1024
+        )
         self.content_hash_cache: Dict[str, str] = {}
         
         # Similarity thresholds
         self.thresholds = {
             'exact': 1.0,
             'near_exact': 0.95,
+            # Estimated shingle Jaccard a near-exact candidate needs before
+            # its sequence similarity is computed
+            'near_exact_candidate': 0.5,
             'semantic': 0.85,
             'partial': 0.80
         }
         
+        # MinHash/LSH candidate search for the near-exact stage: a pair with
+        # shingle Jaccard J becomes a candidate with probability
+        # 1 - (1 - J**rows)**bands (0.99 at J = 0.5)
+        self.near_exact_lsh = {
+            'num_perm': 128,
+            'shingle_size': 5,
+            'bands': 32,
+            'rows': 3
+        }
+        
+        # Semantic stage: documents per aembed_documents call, and rows per
+        # block of the blocked cosine-similarity search
+        self.semantic_search = {
+            'embedding_batch_size': 20,
+            'block_size': 1024,
+            'embedding_dimension': 768
+        }
+        
+        # Partial stage: maximum SimHash Hamming distance a candidate may
+        # have before its overlap is computed (None keeps every candidate;
+        # the pre-filter can skip true partial duplicates)
+        self.partial_overlap = {
+            'simhash_distance': None
+        }
+        
     @performance_monitor
     async def deduplicate_content_batch(self, 
                                       documents: List[Dict[str, Any]],
@@ -146,32 +180,27 @@ class ContentDeduplicationService:
     async def _remove_near_exact_duplicates(self, 
                                           documents: List[Dict[str, Any]], 
                                           threshold: float = 0.95) -> Tuple[List[Dict[str, Any]], int]:
-        """Remove near-exact duplicates using sequence matching"""
+        """Remove near-exact duplicates using sequence matching
+        
+        Each document is verified only against the accepted documents that
+        MinHash/LSH proposes as candidates, in acceptance order.
+        """
         
         if len(documents) <= 1:
             return documents, 0
             
         unique_documents = []
         duplicates_removed = 0
+        index = NearDuplicateIndex(
+            threshold=threshold,
+            candidate_threshold=self.thresholds['near_exact_candidate'],
+            **self.near_exact_lsh
+        )
         
-        for i, doc in enumerate(documents):
-            is_duplicate = False
-            max_similarity = 0.0
-            source_doc = None
-            
-            # Compare with all previously accepted documents
-            for existing_doc in unique_documents:
-                similarity = SequenceMatcher(
-                    None, 
-                    doc['content'].lower(), 
-                    existing_doc['content'].lower()
-                ).ratio()
-                
-                if similarity > threshold:
-                    is_duplicate = True
-                    max_similarity = similarity
-                    source_doc = existing_doc
-                    break
+        for doc in documents:
+            position, max_similarity = index.check(doc['content'])
+            is_duplicate = position is not None
+            source_doc = unique_documents[position] if is_duplicate else None
             
             if not is_duplicate:
                 # Mark as unique
@@ -198,7 +227,12 @@ class ContentDeduplicationService:
     async def _remove_semantic_duplicates(self, 
                                         documents: List[Dict[str, Any]], 
                                         threshold: float = 0.85) -> Tuple[List[Dict[str, Any]], int]:
-        """Remove semantically similar documents using embeddings"""
+        """Remove semantically similar documents using embeddings
+        
+        Pairs above the threshold come from blocked matrix products over
+        the normalized embeddings; the shorter document of a pair is the
+        duplicate.
+        """
         
         if len(documents) <= 1:
             return documents, 0
@@ -210,52 +244,28 @@ class ContentDeduplicationService:
             contents = [doc['content'] for doc in documents]
             embeddings = await self._generate_batch_embeddings(contents)
             
-            # Compute pairwise similarities
-            similarity_matrix = self._compute_cosine_similarity_matrix(embeddings)
+            duplicates = resolve_semantic_duplicates(
+                embeddings,
+                [len(content) for content in contents],
+                threshold,
+                block_size=self.semantic_search['block_size']
+            )
             
             unique_documents = []
-            duplicate_indices = set()
-            duplicates_removed = 0
-            
             for i, doc in enumerate(documents):
-                if i in duplicate_indices:
-                    continue
-                
-                # Find duplicates for current document
-                for j in range(i + 1, len(documents)):
-                    if j in duplicate_indices:
-                        continue
-                        
-                    similarity = similarity_matrix[i][j]
-                    
-                    if similarity > threshold:
-                        # Mark the shorter document as duplicate
-                        if len(documents[i]['content']) >= len(documents[j]['content']):
-                            duplicate_indices.add(j)
-                            documents[j]['deduplication_info'] = {
-                                'is_duplicate': True,
-                                'duplicate_type': DuplicateType.SEMANTIC.value,
-                                'similarity_score': similarity,
-                                'source_document': documents[i].get('url', 'Unknown'),
-                                'deduplication_stage': 'semantic_check'
-                            }
-                            duplicates_removed += 1
-                        else:
-                            duplicate_indices.add(i)
-                            documents[i]['deduplication_info'] = {
-                                'is_duplicate': True,
-                                'duplicate_type': DuplicateType.SEMANTIC.value, 
-                                'similarity_score': similarity,
-                                'source_document': documents[j].get('url', 'Unknown'),
-                                'deduplication_stage': 'semantic_check'
-                            }
-                            duplicates_removed += 1
-                            break
-                
-                if i not in duplicate_indices:
+                if i not in duplicates:
                     unique_documents.append(doc)
+                    continue
+                source, similarity = duplicates[i]
+                doc['deduplication_info'] = {
+                    'is_duplicate': True,
+                    'duplicate_type': DuplicateType.SEMANTIC.value,
+                    'similarity_score': similarity,
+                    'source_document': documents[source].get('url', 'Unknown'),
+                    'deduplication_stage': 'semantic_check'
+                }
                     
-            return unique_documents, duplicates_removed
+            return unique_documents, len(duplicates)
             
         except Exception as e:
             logger.error(f"Semantic deduplication failed: {e}")
@@ -264,7 +274,12 @@ class ContentDeduplicationService:
     async def _remove_partial_duplicates(self, 
                                        documents: List[Dict[str, Any]], 
                                        threshold: float = 0.80) -> Tuple[List[Dict[str, Any]], int]:
-        """Remove documents with significant partial overlap"""
+        """Remove documents with significant partial overlap
+        
+        Overlap is the Jaccard similarity of the key sentences' word sets.
+        Each document is compared only with the accepted documents an
+        inverted word index proposes, in acceptance order.
+        """
         
         if len(documents) <= 1:
             return documents, 0
@@ -273,30 +288,14 @@ class ContentDeduplicationService:
         duplicates_removed = 0
         
         # Extract key sentences from each document for comparison
-        document_sentences = []
-        for doc in documents:
-            sentences = self._extract_key_sentences(doc['content'])
-            document_sentences.append(sentences)
+        word_sets = [word_set(self._extract_key_sentences(doc['content'])) for doc in documents]
+        decisions = find_partial_duplicates(
+            word_sets, threshold, simhash_distance=self.partial_overlap['simhash_distance']
+        )
         
-        for i, doc in enumerate(documents):
-            is_duplicate = False
-            max_overlap = 0.0
-            source_doc = None
-            
-            # Compare with previously accepted documents
-            for j, existing_doc in enumerate(unique_documents):
-                existing_sentences = document_sentences[j]
-                current_sentences = document_sentences[i]
-                
-                overlap_score = self._calculate_sentence_overlap(
-                    existing_sentences, current_sentences
-                )
-                
-                if overlap_score > threshold:
-                    is_duplicate = True
-                    max_overlap = overlap_score
-                    source_doc = existing_doc
-                    break
+        for doc, (source, max_overlap) in zip(documents, decisions):
+            is_duplicate = source is not None
+            source_doc = documents[source] if is_duplicate else None
             
             if not is_duplicate:
                 doc['deduplication_info'] = {
@@ -320,57 +319,45 @@ class ContentDeduplicationService:
         return unique_documents, duplicates_removed
 
     async def _generate_batch_embeddings(self, contents: List[str]) -> np.ndarray:
-        """Generate embeddings for a batch of content"""
+        """Generate embeddings for a batch of content
+        
+        Cached embeddings are reused; the rest are requested in batches of
+        ``embedding_batch_size`` documents, each distinct content once.
+        """
+        dimension = self.semantic_search['embedding_dimension']
         try:
-            embeddings_list = []
+            keys = [hashlib.md5(content.encode()).hexdigest() for content in contents]
+            
+            # Check cache first
+            vectors: Dict[str, np.ndarray] = {}
+            pending: Dict[str, str] = {}
+            for key, content in zip(keys, contents):
+                if key in vectors or key in pending:
+                    continue
+                cached = self.semantic_embeddings_cache.get(key)
+                if cached is MISSING:
+                    pending[key] = content
+                else:
+                    vectors[key] = cached
             
             # Process in batches to avoid rate limits
-            batch_size = 20
-            for i in range(0, len(contents), batch_size):
-                batch = contents[i:i + batch_size]
-                
-                # Check cache first
-                batch_embeddings = []
-                for content in batch:
-                    content_hash = hashlib.md5(content.encode()).hexdigest()
-                    if content_hash in self.semantic_embeddings_cache:
-                        batch_embeddings.append(self.semantic_embeddings_cache[content_hash])
-                    else:
-                        # Generate new embedding
-                        embedding = await self.embeddings.aembed_documents([content])
-                        if embedding:
-                            embedding_vector = np.array(embedding[0])
-                            self.semantic_embeddings_cache[content_hash] = embedding_vector
-                            batch_embeddings.append(embedding_vector)
-                        else:
-                            # Fallback to zero vector
-                            batch_embeddings.append(np.zeros(768))  # Default embedding size
-                
-                embeddings_list.extend(batch_embeddings)
-                
-            return np.array(embeddings_list)
+            pending_keys = list(pending)
+            batch_size = self.semantic_search['embedding_batch_size']
+            for i in range(0, len(pending_keys), batch_size):
+                batch = pending_keys[i:i + batch_size]
+                embedded = await self.embeddings.aembed_documents([pending[key] for key in batch])
+                for key, embedding in zip(batch, embedded or []):
+                    vector = np.array(embedding)
+                    self.semantic_embeddings_cache.put(key, vector)
+                    vectors[key] = vector
+            
+            # Fallback to zero vector for documents the model returned nothing for
+            return np.array([vectors[key] if key in vectors else np.zeros(dimension) for key in keys])
             
         except Exception as e:
             logger.error(f"Failed to generate batch embeddings: {e}")
             # Return zero embeddings as fallback
-            return np.zeros((len(contents), 768))
-    
-    def _compute_cosine_similarity_matrix(self, embeddings: np.ndarray) -> np.ndarray:
-        """Compute cosine similarity matrix for embeddings"""
-        try:
-            # Normalize embeddings
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            normalized_embeddings = embeddings / (norms + 1e-8)
-            
-            # Compute similarity matrix
-            similarity_matrix = np.dot(normalized_embeddings, normalized_embeddings.T)
-            
-            return similarity_matrix
-            
-        except Exception as e:
-            logger.error(f"Failed to compute similarity matrix: {e}")
-            # Return identity matrix as fallback
-            return np.eye(len(embeddings))
+            return np.zeros((len(contents), dimension))
     
     def _extract_key_sentences(self, content: str, max_sentences: int = 10) -> List[str]:
         """Extract key sentences from content for partial matching"""
@@ -400,37 +387,6 @@ class ContentDeduplicationService:
             logger.error(f"Failed to extract key sentences: {e}")
             return []
     
-    def _calculate_sentence_overlap(self, 
-                                  sentences1: List[str], 
-                                  sentences2: List[str]) -> float:
-        """Calculate overlap between two sets of sentences"""
-        try:
-            if not sentences1 or not sentences2:
-                return 0.0
-            
-            # Create word sets for each sentence set
-            words1 = set()
-            words2 = set()
-            
-            for sentence in sentences1:
-                words1.update(sentence.lower().split())
-            
-            for sentence in sentences2:
-                words2.update(sentence.lower().split())
-            
-            # Calculate Jaccard similarity
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            
-            if union == 0:
-                return 0.0
-            
-            return intersection / union
-            
-        except Exception as e:
-            logger.error(f"Failed to calculate sentence overlap: {e}")
-            return 0.0
-
     async def get_deduplication_summary(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate a summary of deduplication results"""
         
@@ -6,7 +6,9 @@ from datetime import datetime, timezone
 from .analysis_optimization_service import AnalysisOptimizationService
 from .enhanced_orchestration.advanced_orchestrator import AdvancedOrchestrator, OperationPriority
 from .enhanced_orchestration.multi_level_cache_manager import MultiLevelCacheManager, CacheStrategy
+from .enhanced_orchestration.cache_tags import cache_tags
 from ..core.feature_flags import FeatureFlags
+from ..core.performance_optimizer import performance_optimizer
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +84,8 @@ class EnhancedAnalysisOptimizationService(AnalysisOptimizationService):
                     cache_key, 
                     result, 
                     ttl_seconds=1800,  # 30 minutes
-                    strategy=CacheStrategy.WRITE_THROUGH
+                    strategy=CacheStrategy.WRITE_THROUGH,
+                    tags=cache_tags(session_id=session_id)
                 )
             
             return result
@@ -147,7 +150,8 @@ class EnhancedAnalysisOptimizationService(AnalysisOptimizationService):
                     cache_key,
                     result,
                     ttl_seconds=3600,  # 1 hour for knowledge data
-                    strategy=CacheStrategy.WRITE_THROUGH
+                    strategy=CacheStrategy.WRITE_THROUGH,
+                    tags=cache_tags(topic=topic)
                 )
             
             return result
@@ -208,6 +212,9 @@ class EnhancedAnalysisOptimizationService(AnalysisOptimizationService):
             except Exception as e:
                 enhanced_metrics['cache'] = {'error': str(e)}
         
+        # In-process memoization of formula/aggregation/pattern functions
+        enhanced_metrics['memoization'] = performance_optimizer.get_memoization_stats()
+        
         return enhanced_metrics
     
     async def get_cache_performance_analysis(self) -> Dict[str, Any]:
@@ -265,17 +272,17 @@ class EnhancedAnalysisOptimizationService(AnalysisOptimizationService):
             if pattern:
                 invalidated_count = await self.cache_manager.invalidate_by_pattern(pattern)
             else:
-                # Invalidate common optimization patterns
-                patterns = [
-                    'analysis_optimization:*',
-                    'knowledge_loading:*',
-                    'vector_operations:*',
-                    'parallel_processing:*'
+                # Invalidate common optimization namespaces (O(1) each, all levels)
+                namespaces = [
+                    'analysis_optimization',
+                    'knowledge_loading',
+                    'vector_operations',
+                    'parallel_processing'
                 ]
                 
                 total_invalidated = 0
-                for p in patterns:
-                    count = await self.cache_manager.invalidate_by_pattern(p)
+                for namespace in namespaces:
+                    count = await self.cache_manager.invalidate_namespace(namespace)
                     total_invalidated += count
                 
                 invalidated_count = total_invalidated
@@ -294,6 +301,29 @@ class EnhancedAnalysisOptimizationService(AnalysisOptimizationService):
                 'success': False
             }
     
+    async def invalidate_session_cache(self, session_id: str) -> Dict[str, Any]:
+        """Invalidate every cache entry tagged with a session on all levels"""
+        
+        if not self.cache_manager:
+            return {'error': 'Cache manager not available'}
+        
+        try:
+            tags = cache_tags(session_id=session_id)
+            shared = await self.cache_manager.invalidate_tags(*tags)
+            return {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'session_id': session_id,
+                # False when other instances may still serve the session's entries
+                'success': shared == len(tags)
+            }
+            
+        except Exception as e:
+            return {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'error': str(e),
+                'success': False
+            }
+    
     async def get_orchestrator_health_summary(self) -> Dict[str, Any]:
         """Get orchestrator health summary for monitoring"""
         
@@ -15,7 +15,7 @@ Components:
 """
 
 from .mathematical_models import MathematicalModels, NormalizationMethod, RobustnessMultipliers, FactorWeight
-from .pdf_formula_engine import PDFFormulaEngine, FactorInput, FactorResult, PDFAnalysisResult
+from .pdf_formula_engine import PDFFormulaEngine, FactorInput, FactorResult, PDFAnalysisResult, FactorBatch, FactorBatchResult
 from .action_layer_calculator import ActionLayerCalculator, ActionLayerAnalysis, ActionLayerResult, ActionRecommendation
 from .monte_carlo_simulator import MonteCarloSimulator, SimulationParameters, SimulationResult
 from .pattern_library import PatternLibrary, PatternMatch, PatternType
@@ -40,6 +40,8 @@ __all__ = [
     'FactorInput',
     'FactorResult', 
     'PDFAnalysisResult',
+    'FactorBatch',
+    'FactorBatchResult',
     
     # Action Layer Calculator
     'ActionLayerCalculator',
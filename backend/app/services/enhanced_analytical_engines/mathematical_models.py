@@ -1,7 +1,7 @@
 # backend/app/services/enhanced_analytical_engines/mathematical_models.py
 import math
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Mapping, Tuple, Any, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+ArrayLike = Union[float, List[float], np.ndarray]
+
 class NormalizationMethod(Enum):
     """Normalization methods for factor scores"""
     LOGISTIC = "logistic"
@@ -120,6 +122,13 @@ class MathematicalModels:
             logger.warning(f"Logistic normalization error for score {raw_score}: {e}")
             return 0.5  # Return neutral score on error
     
+    def logistic_normalize_array(self, raw_scores: ArrayLike, sensitivity: float = 5.0) -> np.ndarray:
+        """logistic_normalize over an array of raw scores (any shape)"""
+        clamped = np.clip(np.asarray(raw_scores, dtype=float), -10, 10)
+        normalized = 1.0 / (1.0 + np.exp(-sensitivity * (clamped - 0.5)))
+        normalized *= self.robustness.s_gen
+        return np.clip(normalized, 0.0, 1.0, out=normalized)
+    
     def sigmoid_normalize(self, raw_score: float, steepness: float = 2.0) -> float:
         """Alternative sigmoid normalization for specific factors"""
         try:
@@ -155,6 +164,27 @@ class MathematicalModels:
         decay_factor = self.robustness.temporal_decay ** (days_old / 30.0)  # Monthly decay
         return score * decay_factor
     
+    def robust_normalize_array(self, scores: ArrayLike, axis: int = -1) -> np.ndarray:
+        """robust_normalize applied independently along ``axis``
+        
+        Each slice (e.g. one row of factor scores per session or sample) is
+        scaled by its own quartiles; slices without spread become 0.5.
+        """
+        scores_array = np.asarray(scores, dtype=float)
+        if scores_array.size == 0:
+            return scores_array.copy()
+        q25, q75 = np.percentile(scores_array, [25, 75], axis=axis, keepdims=True)
+        iqr = q75 - q25
+        flat = iqr == 0
+        robust = (scores_array - q25) / np.where(flat, 1.0, iqr)
+        normalized = self.logistic_normalize_array(np.clip(robust, 0, 1))
+        return np.where(flat, 0.5, normalized)
+    
+    def apply_temporal_decay_array(self, scores: ArrayLike, days_old: ArrayLike) -> np.ndarray:
+        """apply_temporal_decay with broadcasting scores and ages"""
+        decay_factor = np.power(self.robustness.temporal_decay, np.asarray(days_old, dtype=float) / 30.0)
+        return np.asarray(scores, dtype=float) * decay_factor
+    
     def calculate_confidence_interval(self, score: float, sample_size: int, confidence_level: float = 0.95) -> Tuple[float, float]:
         """Calculate confidence interval for factor scores"""
         # Standard error estimation
@@ -189,6 +219,30 @@ class MathematicalModels:
         
         return total_score / total_weight if total_weight > 0 else 0.5
     
+    def calculate_composite_score_array(self, factor_scores: Mapping[str, ArrayLike], category: str) -> np.ndarray:
+        """calculate_composite_score for arrays of factor scores
+        
+        Each factor maps to scores that broadcast together (one per session
+        or sample); NaN marks a factor missing for that entry, which is left
+        out of its weighted average as an absent key would be.
+        """
+        category_factors = [factor_id for factor_id in self._get_category_factors(category)
+                            if factor_id in factor_scores]
+        if not category_factors:
+            return np.asarray(0.5)
+        
+        scores = np.broadcast_arrays(*(np.asarray(factor_scores[factor_id], dtype=float)
+                                       for factor_id in category_factors))
+        total_score = np.zeros(scores[0].shape)
+        total_weight = np.zeros(scores[0].shape)
+        for factor_id, score in zip(category_factors, scores):
+            weight = self.factor_weights[factor_id].effective_weight
+            present = ~np.isnan(score)
+            total_score += np.where(present, score, 0.0) * weight
+            total_weight += present * weight
+        
+        return np.where(total_weight > 0, total_score / np.where(total_weight > 0, total_weight, 1.0), 0.5)
+    
     def _get_category_factors(self, category: str) -> List[str]:
         """Get factor IDs for a specific category"""
         category_mappings = {
@@ -1,13 +1,19 @@
 # backend/app/services/enhanced_analytical_engines/monte_carlo_simulator.py
 import asyncio
 import logging
-import random
 import numpy as np
 from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from scipy import stats
 import math
 
+from ...core.samplers import (
+    control_variate_mean, distribution_mean, from_uniforms, sample_uniforms, validate_method
+)
+from ...core.sequential_monte_carlo import ConvergenceCriteria, SequentialMonteCarlo
+from ...core.streaming_stats import FixedHistogram, Moments
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -16,10 +22,22 @@ class SimulationParameters:
     iterations: int = 10000
     confidence_levels: List[float] = None
     random_seed: Optional[int] = 42
+    # Runs with more iterations are simulated in chunks of this size and
+    # summarized in constant memory (None keeps every sample)
+    chunk_size: Optional[int] = None
+    # Stop once the score mean and quantiles are this precise; iterations
+    # then come from the criteria instead of ``iterations``
+    convergence: Optional[ConvergenceCriteria] = None
+    # Uniform point set behind the draws (see core.samplers): 'random',
+    # 'sobol', 'lhs' or 'antithetic'
+    sampling: str = 'random'
+    # Adjust the mean with the linear part of the score as a control variate
+    control_variates: bool = False
     
     def __post_init__(self):
         if self.confidence_levels is None:
             self.confidence_levels = [0.90, 0.95, 0.99]
+        self.sampling = validate_method(self.sampling)
 
 @dataclass
 class SimulationResult:
@@ -34,19 +52,48 @@ class SimulationResult:
     confidence_intervals: Dict[float, Tuple[float, float]]
     distribution_params: Dict[str, Any]
     risk_metrics: Dict[str, float]
+    # Sequential runs: iterations used and achieved standard errors
+    convergence: Optional[Dict[str, Any]] = None
+
+# Weight of each uncertainty variable in the combined score; other
+# variables are sampled but do not move the score
+ADJUSTMENT_WEIGHTS = {
+    'market_conditions': 0.3,
+    'competitive_dynamics': 0.25,
+    'financial_performance': 0.25,
+    'execution_risk': 0.2,
+}
+
+PERCENTILE_LEVELS = [('1st', 1), ('5th', 5), ('10th', 10), ('25th', 25), ('50th', 50),
+                     ('75th', 75), ('90th', 90), ('95th', 95), ('99th', 99)]
+
+# Scores are clipped to [0, 1]; streamed quantiles are within one bin width
+STREAMING_HISTOGRAM_BINS = 8192
+
+# Elements of one (scenarios x iterations x variables) chunk in scenario
+# analysis (32 MB of float64)
+SCENARIO_TENSOR_ELEMENTS = 4_000_000
+
+# Score counted as a success, and the risk-free rate of the Sharpe ratio
+SUCCESS_THRESHOLD = 0.6
+RISK_FREE_RATE = 0.02
+
 
 class MonteCarloSimulator:
     """
     Advanced Monte Carlo simulator for strategic pattern analysis
     Supports multiple probability distributions and risk assessment
+    
+    Sampling and scoring run on whole (iterations x variables) arrays drawn
+    from a seeded np.random.Generator, so a fixed random_seed reproduces
+    results exactly without touching the global random state.
     """
     
     def __init__(self, simulation_params: SimulationParameters = None):
         self.params = simulation_params or SimulationParameters()
         
-        # Set random seeds for reproducibility
-        random.seed(self.params.random_seed)
-        np.random.seed(self.params.random_seed)
+        # Private generator for reproducibility
+        self.rng = np.random.default_rng(self.params.random_seed)
         
         logger.info(f"✅ Monte Carlo Simulator initialized with {self.params.iterations} iterations")
     
@@ -67,11 +114,32 @@ class MonteCarloSimulator:
             start_time = datetime.now(timezone.utc)
             logger.info(f"Starting Monte Carlo simulation with {self.params.iterations} iterations")
             
-            # Generate simulation samples
-            simulation_samples = await self._generate_simulation_samples(pattern_data, input_uncertainties)
-            
-            # Calculate statistics
-            result = self._calculate_simulation_statistics(simulation_samples)
+            chunk_size = self.params.chunk_size
+            if self.params.convergence is not None:
+                # Batches until the estimates are within tolerance
+                runner = SequentialMonteCarlo(self.params.convergence)
+                batches, report = await runner.run_async(
+                    lambda size: self._simulate_scores(pattern_data, input_uncertainties, size),
+                    track=lambda scores: {'score': scores}
+                )
+                result = self._calculate_simulation_statistics(np.concatenate(batches))
+                result.convergence = report.to_dict()
+            elif chunk_size and self.params.iterations > chunk_size:
+                # Constant memory: summarize chunk by chunk
+                moments, histogram = await self._summarize_simulation_chunks(
+                    pattern_data, input_uncertainties, chunk_size
+                )
+                result = self._calculate_streaming_statistics(moments, histogram)
+            else:
+                # Generate simulation samples
+                sample_matrix = self._sample_uncertainties(input_uncertainties, self.params.iterations)
+                simulation_samples = self._simulate_scores(pattern_data, input_uncertainties,
+                                                           self.params.iterations, sample_matrix)
+                
+                # Calculate statistics
+                result = self._calculate_simulation_statistics(simulation_samples)
+                if self.params.control_variates:
+                    self._apply_control_variate(result, simulation_samples, sample_matrix, input_uncertainties)
             
             processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
             logger.info(f"✅ Monte Carlo simulation completed in {processing_time:.2f}s")
@@ -84,81 +152,184 @@ class MonteCarloSimulator:
     
     async def _generate_simulation_samples(self, 
                                          pattern_data: Dict[str, Any], 
-                                         uncertainties: Dict[str, Dict[str, float]]) -> List[float]:
+                                         uncertainties: Dict[str, Dict[str, float]]) -> np.ndarray:
         """Generate simulation samples based on pattern data and uncertainties"""
+        return self._simulate_scores(pattern_data, uncertainties, self.params.iterations)
+    
+    def _simulate_scores(self,
+                         pattern_data: Dict[str, Any],
+                         uncertainties: Dict[str, Dict[str, float]],
+                         iterations: int,
+                         sample_matrix: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores of ``iterations`` runs drawn from this simulator's generator"""
         
-        samples = []
         base_score = pattern_data.get('expected_score', 0.5)
         
-        for i in range(self.params.iterations):
-            # Sample from uncertainty distributions
-            sampled_adjustments = {}
+        # One column per uncertainty variable
+        if sample_matrix is None:
+            sample_matrix = self._sample_uncertainties(uncertainties, iterations)
+        adjustments = {
+            variable: sample_matrix[:, column]
+            for column, variable in enumerate(uncertainties)
+        }
+        
+        # Apply business logic to combine adjustments
+        scores = self._apply_business_logic(base_score, adjustments, pattern_data)
+        if scores.shape != (iterations,):
+            # No uncertainties: every iteration scores the same
+            scores = np.full(iterations, scores)
+        return scores
+    
+    async def _summarize_simulation_chunks(self,
+                                           pattern_data: Dict[str, Any],
+                                           uncertainties: Dict[str, Dict[str, float]],
+                                           chunk_size: int) -> Tuple[Moments, FixedHistogram]:
+        """Moments and score histogram of all iterations, one chunk in memory at a time"""
+        moments = Moments()
+        histogram = FixedHistogram(0.0, 1.0, STREAMING_HISTOGRAM_BINS)
+        remaining = self.params.iterations
+        while remaining > 0:
+            scores = self._simulate_scores(pattern_data, uncertainties, min(chunk_size, remaining))
+            moments.update(scores)
+            histogram.update(scores)
+            remaining -= len(scores)
+            # Let other tasks run between chunks
+            await asyncio.sleep(0)
+        return moments, histogram
+    
+    def _sample_uncertainties(self,
+                              uncertainties: Dict[str, Dict[str, float]],
+                              iterations: int) -> np.ndarray:
+        """Draw an (iterations x variables) matrix, one generator call per distribution type"""
+        
+        if self.params.sampling != 'random':
+            return self._sample_uncertainties_from_uniforms(uncertainties, iterations)
+        
+        # Drawn variable-major so each variable's samples are contiguous;
+        # returned as an (iterations x variables) view
+        samples = np.empty((len(uncertainties), iterations))
+        
+        # Group variables by distribution so each group is drawn in one call
+        groups: Dict[str, List[Tuple[int, Dict[str, float]]]] = {}
+        for column, uncertainty_params in enumerate(uncertainties.values()):
+            distribution_type = uncertainty_params.get('distribution', 'normal')
+            groups.setdefault(distribution_type, []).append((column, uncertainty_params))
+        
+        for distribution_type, members in groups.items():
+            columns = [column for column, _ in members]
+            size = (len(columns), iterations)
+            
+            def param(name: str, default: float) -> np.ndarray:
+                return np.array([[p.get(name, default)] for _, p in members], dtype=float)
             
-            for variable, uncertainty_params in uncertainties.items():
-                distribution_type = uncertainty_params.get('distribution', 'normal')
+            # Location/scale families are drawn standardized and shifted in place
+            if distribution_type == 'normal':
+                block = self.rng.standard_normal(size)
+                block *= param('std', 0.1)
+                block += param('mean', 0.0)
+                
+            elif distribution_type == 'triangular':
+                block = self.rng.triangular(param('low', -0.2), param('mode', 0.0), param('high', 0.2), size)
                 
-                if distribution_type == 'normal':
-                    mean = uncertainty_params.get('mean', 0.0)
-                    std = uncertainty_params.get('std', 0.1)
-                    sample = np.random.normal(mean, std)
-                    
-                elif distribution_type == 'triangular':
-                    low = uncertainty_params.get('low', -0.2)
-                    high = uncertainty_params.get('high', 0.2)
-                    mode = uncertainty_params.get('mode', 0.0)
-                    sample = np.random.triangular(low, mode, high)
-                    
-                elif distribution_type == 'beta':
-                    alpha = uncertainty_params.get('alpha', 2)
-                    beta = uncertainty_params.get('beta', 2)
-                    scale = uncertainty_params.get('scale', 1.0)
-                    sample = np.random.beta(alpha, beta) * scale
-                    
-                elif distribution_type == 'lognormal':
-                    mu = uncertainty_params.get('mu', 0.0)
-                    sigma = uncertainty_params.get('sigma', 0.3)
-                    sample = np.random.lognormal(mu, sigma)
-                    
-                elif distribution_type == 'uniform':
-                    low = uncertainty_params.get('low', -0.1)
-                    high = uncertainty_params.get('high', 0.1)
-                    sample = np.random.uniform(low, high)
-                    
-                else:
-                    # Default to normal distribution
-                    sample = np.random.normal(0.0, 0.1)
+            elif distribution_type == 'beta':
+                block = self.rng.beta(param('alpha', 2), param('beta', 2), size)
+                block *= param('scale', 1.0)
                 
-                sampled_adjustments[variable] = sample
+            elif distribution_type == 'lognormal':
+                block = self.rng.standard_normal(size)
+                block *= param('sigma', 0.3)
+                block += param('mu', 0.0)
+                np.exp(block, out=block)
+                
+            elif distribution_type == 'uniform':
+                low = param('low', -0.1)
+                block = self.rng.random(size)
+                block *= param('high', 0.1) - low
+                block += low
+                
+            else:
+                # Default to normal distribution
+                block = self.rng.standard_normal(size)
+                block *= 0.1
             
-            # Apply business logic to combine adjustments
-            final_sample = self._apply_business_logic(base_score, sampled_adjustments, pattern_data)
-            samples.append(final_sample)
+            if len(groups) == 1:
+                samples = block
+            else:
+                samples[columns] = block
         
-        return samples
+        return samples.T
+    
+    @staticmethod
+    def _distribution_spec(uncertainty_params: Dict[str, Any]) -> Tuple[str, Dict[str, float]]:
+        """Uncertainty spec with this simulator's defaults, in core.samplers keys"""
+        distribution_type = uncertainty_params.get('distribution', 'normal')
+        get = uncertainty_params.get
+        if distribution_type == 'normal':
+            return 'normal', {'mean': get('mean', 0.0), 'std': get('std', 0.1)}
+        if distribution_type == 'triangular':
+            return 'triangular', {'low': get('low', -0.2), 'mode': get('mode', 0.0), 'high': get('high', 0.2)}
+        if distribution_type == 'beta':
+            return 'beta', {'alpha': get('alpha', 2), 'beta': get('beta', 2), 'scale': get('scale', 1.0)}
+        if distribution_type == 'lognormal':
+            return 'lognormal', {'mu': get('mu', 0.0), 'sigma': get('sigma', 0.3)}
+        if distribution_type == 'uniform':
+            return 'uniform', {'low': get('low', -0.1), 'high': get('high', 0.1)}
+        # Default to normal distribution
+        return 'normal', {'mean': 0.0, 'std': 0.1}
+    
+    def _sample_uncertainties_from_uniforms(self,
+                                            uncertainties: Dict[str, Dict[str, float]],
+                                            iterations: int) -> np.ndarray:
+        """(iterations x variables) matrix from the configured point set via inverse CDFs"""
+        uniforms = sample_uniforms(self.params.sampling, self.rng, iterations, len(uncertainties))
+        samples = np.empty((len(uncertainties), iterations))
+        for column, uncertainty_params in enumerate(uncertainties.values()):
+            distribution_type, spec = self._distribution_spec(uncertainty_params)
+            samples[column] = from_uniforms(distribution_type, spec, uniforms[:, column])
+        return samples.T
+    
+    def _apply_control_variate(self,
+                               result: SimulationResult,
+                               scores: np.ndarray,
+                               sample_matrix: np.ndarray,
+                               uncertainties: Dict[str, Dict[str, float]]):
+        """Replace the mean with its control-variate estimate
+        
+        The control is the weighted sum of adjustments (the score before
+        multipliers and clipping), whose expectation is known exactly.
+        """
+        columns, weights, means = [], [], []
+        for column, (variable, uncertainty_params) in enumerate(uncertainties.items()):
+            if variable in ADJUSTMENT_WEIGHTS:
+                columns.append(column)
+                weights.append(ADJUSTMENT_WEIGHTS[variable])
+                means.append(distribution_mean(*self._distribution_spec(uncertainty_params)))
+        if not columns:
+            return
+        control = sample_matrix[:, columns] @ np.asarray(weights)
+        estimate = control_variate_mean(scores, control, np.asarray([np.dot(weights, means)]))
+        result.mean = estimate['mean']
+        result.distribution_params['control_variate'] = estimate
     
     def _apply_business_logic(self, 
                             base_score: float, 
-                            adjustments: Dict[str, float], 
-                            pattern_data: Dict[str, Any]) -> float:
-        """Apply business logic to combine uncertainty adjustments"""
-        
-        adjusted_score = base_score
-        
-        # Market condition adjustments
-        market_adjustment = adjustments.get('market_conditions', 0.0)
-        adjusted_score += market_adjustment * 0.3
+                            adjustments: Dict[str, Any], 
+                            pattern_data: Dict[str, Any]) -> np.ndarray:
+        """Apply business logic to combine uncertainty adjustments
         
-        # Competitive dynamics adjustments
-        competition_adjustment = adjustments.get('competitive_dynamics', 0.0)
-        adjusted_score += competition_adjustment * 0.25
+        Adjustments may be scalars or equally sized arrays (one entry per
+        iteration); the result has the same shape.
+        """
         
-        # Financial performance adjustments
-        financial_adjustment = adjustments.get('financial_performance', 0.0)
-        adjusted_score += financial_adjustment * 0.25
+        shape = np.broadcast_shapes(*(np.shape(value) for value in adjustments.values()))
+        adjusted_score = np.full(shape, base_score, dtype=float)
+        weighted = np.empty(shape)
         
-        # Execution risk adjustments
-        execution_adjustment = adjustments.get('execution_risk', 0.0)
-        adjusted_score += execution_adjustment * 0.2
+        # Market, competitive, financial and execution adjustments (in place)
+        for variable, weight in ADJUSTMENT_WEIGHTS.items():
+            if variable in adjustments:
+                np.multiply(adjustments[variable], weight, out=weighted)
+                adjusted_score += weighted
         
         # Apply pattern-specific multipliers
         pattern_multiplier = pattern_data.get('pattern_multiplier', 1.0)
@@ -173,51 +344,47 @@ class MonteCarloSimulator:
         adjusted_score *= time_decay
         
         # Clamp to valid range [0, 1]
-        return max(0.0, min(1.0, adjusted_score))
+        return np.clip(adjusted_score, 0.0, 1.0, out=adjusted_score)
     
-    def _calculate_simulation_statistics(self, samples: List[float]) -> SimulationResult:
+    def _calculate_simulation_statistics(self, samples: np.ndarray) -> SimulationResult:
         """Calculate comprehensive statistics from simulation samples"""
         
-        samples_array = np.array(samples)
+        samples_array = np.asarray(samples, dtype=float)
         
-        # Basic statistics
-        mean = np.mean(samples_array)
-        median = np.median(samples_array)
-        std_dev = np.std(samples_array)
-        variance = np.var(samples_array)
-        
-        # Distribution shape statistics
-        skewness = stats.skew(samples_array)
-        kurtosis = stats.kurtosis(samples_array)
+        # All percentiles, confidence bounds and VaR levels in one pass
+        quantile_levels = [level / 100 for _, level in PERCENTILE_LEVELS]
+        for confidence_level in self.params.confidence_levels:
+            alpha = 1 - confidence_level
+            quantile_levels.extend([alpha / 2, 1 - alpha / 2])
+        quantiles = np.quantile(samples_array, quantile_levels)
         
         # Percentiles
         percentiles = {
-            '1st': np.percentile(samples_array, 1),
-            '5th': np.percentile(samples_array, 5),
-            '10th': np.percentile(samples_array, 10),
-            '25th': np.percentile(samples_array, 25),
-            '50th': np.percentile(samples_array, 50),
-            '75th': np.percentile(samples_array, 75),
-            '90th': np.percentile(samples_array, 90),
-            '95th': np.percentile(samples_array, 95),
-            '99th': np.percentile(samples_array, 99)
+            name: quantiles[index] for index, (name, _) in enumerate(PERCENTILE_LEVELS)
         }
         
         # Confidence intervals
         confidence_intervals = {}
-        for confidence_level in self.params.confidence_levels:
-            alpha = 1 - confidence_level
-            lower_percentile = (alpha / 2) * 100
-            upper_percentile = (1 - alpha / 2) * 100
-            
-            lower_bound = np.percentile(samples_array, lower_percentile)
-            upper_bound = np.percentile(samples_array, upper_percentile)
+        offset = len(PERCENTILE_LEVELS)
+        for index, confidence_level in enumerate(self.params.confidence_levels):
+            lower_bound = quantiles[offset + 2 * index]
+            upper_bound = quantiles[offset + 2 * index + 1]
             confidence_intervals[confidence_level] = (lower_bound, upper_bound)
         
+        # Basic statistics
+        mean = np.mean(samples_array)
+        median = percentiles['50th']
+        variance = np.var(samples_array)
+        std_dev = np.sqrt(variance)
+        
+        # Distribution shape statistics
+        skewness = stats.skew(samples_array)
+        kurtosis = stats.kurtosis(samples_array)
+        
         # Distribution parameters (attempt to fit normal distribution)
         try:
-            # Fit normal distribution
-            mu, sigma = stats.norm.fit(samples_array)
+            # Normal MLE is the sample mean and (biased) standard deviation
+            mu, sigma = mean, std_dev
             distribution_params = {
                 'normal_mu': mu,
                 'normal_sigma': sigma,
@@ -237,7 +404,11 @@ class MonteCarloSimulator:
             distribution_params = {'normal_mu': mean, 'normal_sigma': std_dev}
         
         # Risk metrics
-        risk_metrics = self._calculate_risk_metrics(samples_array, mean)
+        risk_metrics = self._calculate_risk_metrics(
+            samples_array, mean,
+            var_levels=(percentiles['5th'], percentiles['1st']),
+            volatility=std_dev
+        )
         
         return SimulationResult(
             mean=mean,
@@ -252,6 +423,79 @@ class MonteCarloSimulator:
             risk_metrics=risk_metrics
         )
     
+    def _calculate_streaming_statistics(self, moments: Moments, histogram: FixedHistogram) -> SimulationResult:
+        """SimulationResult from streamed summaries
+        
+        Moments are exact; quantile-based values are within one histogram
+        bin of the exact statistics, and tail means/probabilities assume
+        uniform density within the bin holding the threshold.
+        """
+        
+        quantile_levels = [level / 100 for _, level in PERCENTILE_LEVELS]
+        for confidence_level in self.params.confidence_levels:
+            alpha = 1 - confidence_level
+            quantile_levels.extend([alpha / 2, 1 - alpha / 2])
+        quantiles = histogram.quantiles(quantile_levels)
+        
+        percentiles = {
+            name: quantiles[index] for index, (name, _) in enumerate(PERCENTILE_LEVELS)
+        }
+        offset = len(PERCENTILE_LEVELS)
+        confidence_intervals = {
+            confidence_level: (quantiles[offset + 2 * index], quantiles[offset + 2 * index + 1])
+            for index, confidence_level in enumerate(self.params.confidence_levels)
+        }
+        
+        mean = moments.mean
+        variance = moments.variance
+        std_dev = moments.std
+        
+        # Kolmogorov-Smirnov distance to the fitted normal, at the bin edges
+        edges, cdf = histogram.edge_cdf()
+        distribution_params = {
+            'normal_mu': mean,
+            'normal_sigma': std_dev,
+            'normal_goodness_of_fit': 1.0 - float(np.max(np.abs(cdf - stats.norm.cdf(edges, mean, std_dev))))
+            if std_dev > 0 else 0.5
+        }
+        # Beta by the method of moments (on [0, 1], as the exact path fits)
+        if variance > 0:
+            common = mean * (1 - mean) / variance - 1
+            if common > 0:
+                distribution_params['beta_params'] = (mean * common, (1 - mean) * common, 0, 1)
+        
+        var_5, var_1 = percentiles['5th'], percentiles['1st']
+        es_5 = histogram.mean_below(var_5)
+        es_1 = histogram.mean_below(var_1)
+        downside_risk = histogram.std_below(mean)
+        upside_mean = histogram.mean_above(mean)
+        risk_metrics = {
+            'value_at_risk_5': var_5,
+            'value_at_risk_1': var_1,
+            'expected_shortfall_5': es_5 if es_5 is not None else var_5,
+            'expected_shortfall_1': es_1 if es_1 is not None else var_1,
+            'downside_risk': downside_risk if downside_risk is not None else 0.0,
+            'upside_potential': upside_mean - mean if upside_mean is not None else 0.0,
+            'success_probability': histogram.fraction_at_least(SUCCESS_THRESHOLD),
+            # Cumulative sums of sorted differences never decline
+            'maximum_drawdown': 0.0,
+            'volatility': std_dev,
+            'sharpe_ratio': (mean - RISK_FREE_RATE) / std_dev if std_dev > 0 else 0.0
+        }
+        
+        return SimulationResult(
+            mean=mean,
+            median=percentiles['50th'],
+            std_dev=std_dev,
+            variance=variance,
+            skewness=moments.skewness,
+            kurtosis=moments.kurtosis,
+            percentiles=percentiles,
+            confidence_intervals=confidence_intervals,
+            distribution_params=distribution_params,
+            risk_metrics=risk_metrics
+        )
+    
     def _calculate_goodness_of_fit(self, samples: np.ndarray, distribution: str, *params) -> float:
         """Calculate goodness of fit for distribution"""
         try:
@@ -265,12 +509,21 @@ class MonteCarloSimulator:
         except:
             return 0.5
     
-    def _calculate_risk_metrics(self, samples: np.ndarray, mean: float) -> Dict[str, float]:
-        """Calculate comprehensive risk metrics"""
+    def _calculate_risk_metrics(self,
+                                samples: np.ndarray,
+                                mean: float,
+                                var_levels: Optional[Tuple[float, float]] = None,
+                                volatility: Optional[float] = None) -> Dict[str, float]:
+        """Calculate comprehensive risk metrics
+        
+        ``var_levels`` (5th and 1st percentiles) and ``volatility`` can be
+        passed in when the caller has already computed them.
+        """
         
         # Value at Risk (VaR) - 5% and 1% levels
-        var_5 = np.percentile(samples, 5)
-        var_1 = np.percentile(samples, 1)
+        if var_levels is None:
+            var_levels = tuple(np.quantile(samples, [0.05, 0.01]))
+        var_5, var_1 = var_levels
         
         # Expected Shortfall (Conditional VaR)
         es_5 = np.mean(samples[samples <= var_5]) if np.sum(samples <= var_5) > 0 else var_5
@@ -285,18 +538,17 @@ class MonteCarloSimulator:
         upside_potential = np.mean(upside_samples) - mean if len(upside_samples) > 0 else 0.0
         
         # Probability of success (above certain threshold)
-        success_threshold = 0.6  # Configurable success threshold
-        success_probability = np.mean(samples >= success_threshold)
+        success_probability = np.mean(samples >= SUCCESS_THRESHOLD)
         
         # Maximum drawdown simulation
         max_drawdown = self._calculate_maximum_drawdown(samples)
         
         # Volatility (same as std dev but labeled for clarity)
-        volatility = np.std(samples)
+        if volatility is None:
+            volatility = np.std(samples)
         
         # Sharpe ratio approximation (assuming risk-free rate of 0.02)
-        risk_free_rate = 0.02
-        sharpe_ratio = (mean - risk_free_rate) / volatility if volatility > 0 else 0.0
+        sharpe_ratio = (mean - RISK_FREE_RATE) / volatility if volatility > 0 else 0.0
         
         return {
             'value_at_risk_5': var_5,
@@ -326,25 +578,135 @@ class MonteCarloSimulator:
     async def run_scenario_analysis(self, 
                                   base_scenario: Dict[str, Any],
                                   scenario_variations: List[Dict[str, Any]]) -> Dict[str, SimulationResult]:
-        """Run scenario analysis with multiple scenarios"""
-        
-        scenario_results = {}
+        """Run scenario analysis with multiple scenarios
+        
+        Scenarios share one set of draws (common random numbers): each
+        chunk of uniforms is mapped through every scenario's distribution
+        specs at once, as a (scenarios x iterations x variables) tensor, so
+        differences between scenarios come from their parameters rather
+        than from sampling noise. Sequential (convergence) runs simulate
+        each scenario on its own.
+        """
         
+        names, scenarios = [], []
         for i, scenario in enumerate(scenario_variations):
-            scenario_name = scenario.get('name', f'Scenario_{i+1}')
-            
+            names.append(scenario.get('name', f'Scenario_{i+1}'))
             # Merge base scenario with variations
-            combined_scenario = {**base_scenario, **scenario}
-            uncertainties = combined_scenario.get('uncertainties', {})
-            
-            # Run simulation for this scenario
-            result = await self.run_pattern_simulation(combined_scenario, uncertainties)
-            scenario_results[scenario_name] = result
-            
-            logger.info(f"✅ Completed scenario analysis: {scenario_name}")
+            scenarios.append({**base_scenario, **scenario})
+        
+        if not scenarios:
+            return {}
+        if self.params.convergence is not None:
+            return await self._run_scenarios_independently(names, scenarios)
+        
+        scenario_results = {}
+        for name, result in zip(names, await self._simulate_scenarios(scenarios)):
+            scenario_results[name] = result
+            logger.info(f"✅ Completed scenario analysis: {name}")
         
         return scenario_results
-
-from datetime import datetime, timezone
+    
+    async def _run_scenarios_independently(self,
+                                           names: List[str],
+                                           scenarios: List[Dict[str, Any]]) -> Dict[str, SimulationResult]:
+        """One full simulation per scenario, each with fresh draws"""
+        scenario_results = {}
+        for name, combined_scenario in zip(names, scenarios):
+            uncertainties = combined_scenario.get('uncertainties', {})
+            scenario_results[name] = await self.run_pattern_simulation(combined_scenario, uncertainties)
+            logger.info(f"✅ Completed scenario analysis: {name}")
+        return scenario_results
+    
+    async def _simulate_scenarios(self, scenarios: List[Dict[str, Any]]) -> List[SimulationResult]:
+        """Statistics of every scenario from common random numbers"""
+        
+        # Only weighted variables move the score
+        variables = [variable for variable in ADJUSTMENT_WEIGHTS
+                     if any(variable in scenario.get('uncertainties', {}) for scenario in scenarios)]
+        weights = np.array([ADJUSTMENT_WEIGHTS[variable] for variable in variables])
+        groups = self._scenario_spec_groups(scenarios, variables)
+        
+        base_scores = np.array([scenario.get('expected_score', 0.5) for scenario in scenarios], dtype=float)
+        factors = np.array([
+            scenario.get('pattern_multiplier', 1.0) * scenario.get('industry_factor', 1.0)
+            * scenario.get('time_decay_factor', 1.0)
+            for scenario in scenarios
+        ], dtype=float)
+        
+        iterations = self.params.iterations
+        streaming = bool(self.params.chunk_size) and iterations > self.params.chunk_size
+        # Bound the tensor, and streamed chunks by the configured chunk size
+        chunk_size = max(1, SCENARIO_TENSOR_ELEMENTS // (len(scenarios) * max(len(variables), 1)))
+        if streaming:
+            chunk_size = min(chunk_size, self.params.chunk_size)
+            summaries = [(Moments(), FixedHistogram(0.0, 1.0, STREAMING_HISTOGRAM_BINS)) for _ in scenarios]
+        else:
+            all_scores = np.empty((len(scenarios), iterations))
+        
+        done = 0
+        while done < iterations:
+            runs = min(chunk_size, iterations - done)
+            uniforms = sample_uniforms(self.params.sampling, self.rng, runs, max(len(variables), 1))
+            adjustments = self._scenario_adjustments(groups, uniforms, len(scenarios), len(variables))
+            scores = adjustments @ weights
+            scores += base_scores[:, None]
+            scores *= factors[:, None]
+            np.clip(scores, 0.0, 1.0, out=scores)
+            
+            if streaming:
+                for (moments, histogram), row in zip(summaries, scores):
+                    moments.update(row)
+                    histogram.update(row)
+            else:
+                all_scores[:, done:done + runs] = scores
+            done += runs
+            # Let other tasks run between chunks
+            await asyncio.sleep(0)
+        
+        if streaming:
+            return [self._calculate_streaming_statistics(moments, histogram) for moments, histogram in summaries]
+        return [self._calculate_simulation_statistics(row) for row in all_scores]
+    
+    def _scenario_spec_groups(self,
+                              scenarios: List[Dict[str, Any]],
+                              variables: List[str]) -> List[Tuple[int, str, List[int], np.ndarray, Dict[str, np.ndarray]]]:
+        """Distinct distribution specs per variable and type, with the scenarios using each
+        
+        Each entry is (column, distribution type, scenario rows, index of
+        each row's spec, stacked specs); parameters are (specs x 1) arrays
+        so one inverse-CDF call covers every distinct spec of that type.
+        Scenarios that share a spec share its draws.
+        """
+        groups = []
+        for column, variable in enumerate(variables):
+            by_type: Dict[str, Tuple[List[int], List[int], Dict[Tuple, int]]] = {}
+            for row, scenario in enumerate(scenarios):
+                uncertainty_params = scenario.get('uncertainties', {}).get(variable)
+                if uncertainty_params is None:
+                    continue
+                distribution_type, spec = self._distribution_spec(uncertainty_params)
+                rows, spec_index, specs = by_type.setdefault(distribution_type, ([], [], {}))
+                rows.append(row)
+                spec_index.append(specs.setdefault(tuple(spec.items()), len(specs)))
+            for distribution_type, (rows, spec_index, specs) in by_type.items():
+                keys = [key for key, _ in next(iter(specs))]
+                stacked = {
+                    key: np.array([dict(spec)[key] for spec in specs], dtype=float)[:, None]
+                    for key in keys
+                }
+                groups.append((column, distribution_type, rows, np.array(spec_index), stacked))
+        return groups
+    
+    @staticmethod
+    def _scenario_adjustments(groups: List[Tuple[int, str, List[int], np.ndarray, Dict[str, np.ndarray]]],
+                              uniforms: np.ndarray,
+                              scenarios: int,
+                              variables: int) -> np.ndarray:
+        """(scenarios x runs x variables) adjustments; variables a scenario lacks stay 0"""
+        adjustments = np.zeros((scenarios, len(uniforms), variables))
+        for column, distribution_type, rows, spec_index, stacked in groups:
+            values = from_uniforms(distribution_type, stacked, uniforms[None, :, column])
+            adjustments[rows, :, column] = values[spec_index]
+        return adjustments
 
 __all__ = ['MonteCarloSimulator', 'SimulationParameters', 'SimulationResult']
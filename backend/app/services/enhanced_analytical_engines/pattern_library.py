@@ -10,13 +10,141 @@ Pattern Coverage:
 Total: 41 patterns across ALL segments (Consumer, Market, Product, Brand, Experience)
 """
 import logging
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Where each trigger condition's score comes from: ('segment', key),
+# ('factor', key) or ('constant', value). Unlisted conditions score 0.0,
+# so they never meet a '>' threshold.
+CONDITION_SOURCES: Dict[str, Tuple[str, Any]] = {
+    "consumer_demand": ("segment", "consumer"),
+    "experience_adoption": ("segment", "experience"),
+    "brand_loyalty": ("factor", "F13"),
+    "consumer_adoption": ("factor", "F15"),
+    "product_differentiation": ("factor", "F8"),
+    "innovation_capability": ("factor", "F9"),
+    "market_awareness": ("factor", "F1"),
+    "market_access": ("factor", "F2"),
+    "brand_equity": ("factor", "F22"),
+    "brand_trust": ("factor", "F24"),
+    "social_influence": ("factor", "F14"),  # Assuming F14 is social/perception
+    # Could be derived from content analysis or set based on time of year
+    "seasonal_factor": ("constant", 0.5),  # Neutral default
+}
+UNMAPPED_SOURCE = ("constant", 0.0)
+
+# Operator codes of the condition matrix; unknown operators are never met
+_OPERATOR_CODES = {">": 0, "<": 1, ">=": 2, "<=": 3}
+_UNKNOWN_OPERATOR = 4
+_PADDING = -1
+
+# Score rows given as arrays (one entry per session or simulation run)
+ScoreInput = Mapping[str, Union[float, np.ndarray]]
+
+
+@dataclass(frozen=True)
+class PatternConditionMatrix:
+    """Trigger conditions of a pattern list compiled over a fixed feature index
+    
+    ``features`` lists the score sources (see CONDITION_SOURCES) in column
+    order. The (patterns x conditions) arrays hold the feature column,
+    threshold and operator code of each condition, padded with -1
+    operators; ``condition_counts`` and ``base_confidence`` are per pattern.
+    """
+    features: Tuple[Tuple[str, Any], ...]
+    feature_index: np.ndarray
+    thresholds: np.ndarray
+    operators: np.ndarray
+    condition_counts: np.ndarray
+    base_confidence: np.ndarray
+    
+    def feature_matrix(self, segment_scores: ScoreInput, factor_scores: ScoreInput) -> np.ndarray:
+        """(entries x features) scores; values may be scalars or equal-length arrays"""
+        columns = []
+        for source, key in self.features:
+            if source == "segment":
+                columns.append(np.asarray(segment_scores.get(key, 0.0), dtype=float))
+            elif source == "factor":
+                columns.append(np.asarray(factor_scores.get(key, 0.0), dtype=float))
+            else:
+                columns.append(np.asarray(key, dtype=float))
+        columns = np.broadcast_arrays(*columns)
+        return np.stack([np.atleast_1d(column) for column in columns], axis=1)
+    
+    def confidences(self, features: np.ndarray) -> np.ndarray:
+        """(entries x patterns) match confidence, as _calculate_pattern_match_confidence"""
+        values = features[:, self.feature_index]
+        thresholds, operators = self.thresholds, self.operators
+        met = (((operators == 0) & (values > thresholds))
+               | ((operators == 1) & (values < thresholds))
+               | ((operators == 2) & (values >= thresholds))
+               | ((operators == 3) & (values <= thresholds)))
+        counts = self.condition_counts
+        ratio = met.sum(axis=2) / np.where(counts > 0, counts, 1)
+        
+        base = self.base_confidence
+        confidence = np.select(
+            [ratio >= 0.8, ratio >= 0.6, ratio >= 0.4],
+            [np.minimum(1.0, base * 1.2), base, base * 0.7],
+            base * 0.3
+        )
+        return np.where(counts > 0, confidence, base * 0.5)
+
+
+def _condition_spec(patterns: List[Dict[str, Any]]) -> Tuple:
+    """Hashable projection of what matching reads from each pattern"""
+    return tuple(
+        (pattern["confidence"], tuple(
+            (name, condition["threshold"], condition["operator"])
+            for name, condition in pattern.get("trigger_conditions", {}).items()
+        ))
+        for pattern in patterns
+    )
+
+
+@lru_cache(maxsize=8)
+def _compile_conditions(spec: Tuple) -> PatternConditionMatrix:
+    """Condition matrix of a pattern list (cached: the library is built at import)"""
+    features: Dict[Tuple[str, Any], int] = {}
+    unmapped = set()
+    width = max([len(conditions) for _, conditions in spec] + [1])
+    feature_index = np.zeros((len(spec), width), dtype=np.intp)
+    thresholds = np.zeros((len(spec), width))
+    operators = np.full((len(spec), width), _PADDING, dtype=np.int8)
+    
+    for row, (_, conditions) in enumerate(spec):
+        for column, (name, threshold, operator) in enumerate(conditions):
+            source = CONDITION_SOURCES.get(name)
+            if source is None:
+                unmapped.add(name)
+                source = UNMAPPED_SOURCE
+            feature_index[row, column] = features.setdefault(source, len(features))
+            thresholds[row, column] = threshold
+            operators[row, column] = _OPERATOR_CODES.get(operator, _UNKNOWN_OPERATOR)
+    
+    if unmapped:
+        logger.warning(f"{len(unmapped)} pattern conditions have no score mapping and score 0.0: "
+                       f"{', '.join(sorted(unmapped))}")
+    
+    matrix = PatternConditionMatrix(
+        features=tuple(features),
+        feature_index=feature_index,
+        thresholds=thresholds,
+        operators=operators,
+        condition_counts=np.array([len(conditions) for _, conditions in spec], dtype=np.intp),
+        base_confidence=np.array([confidence for confidence, _ in spec], dtype=float),
+    )
+    # Shared between library instances
+    for array in (matrix.feature_index, matrix.thresholds, matrix.operators,
+                  matrix.condition_counts, matrix.base_confidence):
+        array.setflags(write=False)
+    return matrix
+
 class PatternType(Enum):
     SUCCESS = "Success"
     FRAGILITY = "Fragility"
@@ -48,6 +176,7 @@ class PatternLibrary:
     
     def __init__(self):
         self.patterns = self._load_pattern_definitions()
+        self.condition_matrix = _compile_conditions(_condition_spec(self.patterns))
         logger.info(f"Pattern Library initialized with {len(self.patterns)} patterns (P001-P041 complete)")
     
     def _load_pattern_definitions(self) -> List[Dict[str, Any]]:
@@ -1040,14 +1169,36 @@ class PatternLibrary:
         Returns:
             List of matched patterns with confidence scores
         """
+        confidences = self.pattern_confidences(segment_scores, factor_scores)[0]
+        matches = self._matches_from_confidences(confidences)
+        
+        logger.info(f"Matched {len(matches)} patterns from {len(self.patterns)} total patterns")
+        return matches
+    
+    def pattern_confidences(self,
+                            segment_scores: ScoreInput,
+                            factor_scores: ScoreInput) -> np.ndarray:
+        """
+        (entries x patterns) match confidence of one or many score vectors
+        
+        Scores may be scalars or equal-length arrays (one entry per session
+        or simulation run); patterns are in library order. A pattern matches
+        where its confidence is at least 0.6.
+        """
+        matrix = self.condition_matrix
+        return matrix.confidences(matrix.feature_matrix(segment_scores, factor_scores))
+    
+    def match_patterns_batch(self,
+                             segment_scores: ScoreInput,
+                             factor_scores: ScoreInput) -> List[List[PatternMatch]]:
+        """match_patterns for every entry of array-valued scores"""
+        return [self._matches_from_confidences(row)
+                for row in self.pattern_confidences(segment_scores, factor_scores)]
+    
+    def _matches_from_confidences(self, confidences: np.ndarray) -> List[PatternMatch]:
         matches = []
         
-        for pattern in self.patterns:
-            # Calculate pattern match confidence using ACTUAL scores
-            match_confidence = self._calculate_pattern_match_confidence(
-                pattern, segment_scores, factor_scores
-            )
-            
+        for pattern, match_confidence in zip(self.patterns, confidences.tolist()):
             # Only include patterns with sufficient confidence
             if match_confidence >= 0.6:
                 matches.append(PatternMatch(
@@ -1067,8 +1218,6 @@ class PatternLibrary:
         
         # Sort by confidence descending
         matches.sort(key=lambda x: x.confidence, reverse=True)
-        
-        logger.info(f"Matched {len(matches)} patterns from {len(self.patterns)} total patterns")
         return matches
     
     def _calculate_pattern_match_confidence(self,
@@ -1133,36 +1282,18 @@ class PatternLibrary:
         Map condition name to actual score from data
         NO defaults - uses actual scores only
         """
-        # Map to segment scores
-        if condition_name == "consumer_demand":
-            return segment_scores.get("consumer", 0.0)
-        elif condition_name == "experience_adoption":
-            return segment_scores.get("experience", 0.0)
-        elif condition_name == "brand_loyalty":
-            return factor_scores.get("F13", 0.0)
-        elif condition_name == "consumer_adoption":
-            return factor_scores.get("F15", 0.0)
-        elif condition_name == "product_differentiation":
-            return factor_scores.get("F8", 0.0)
-        elif condition_name == "innovation_capability":
-            return factor_scores.get("F9", 0.0)
-        elif condition_name == "market_awareness":
-            return factor_scores.get("F1", 0.0)
-        elif condition_name == "market_access":
-            return factor_scores.get("F2", 0.0)
-        elif condition_name == "brand_equity":
-            return factor_scores.get("F22", 0.0)
-        elif condition_name == "brand_trust":
-            return factor_scores.get("F24", 0.0)
-        elif condition_name == "social_influence":
-            return factor_scores.get("F14", 0.0)  # Assuming F14 is social/perception
-        elif condition_name == "seasonal_factor":
-            # Could be derived from content analysis or set based on time of year
-            return 0.5  # Neutral default
+        source = CONDITION_SOURCES.get(condition_name)
+        if source is None:
+            # If condition not mapped, return 0 (pattern won't match)
+            logger.warning(f"Unmapped condition: {condition_name}")
+            return 0.0
         
-        # If condition not mapped, return 0 (pattern won't match)
-        logger.warning(f"Unmapped condition: {condition_name}")
-        return 0.0
+        kind, key = source
+        if kind == "segment":
+            return segment_scores.get(key, 0.0)
+        if kind == "factor":
+            return factor_scores.get(key, 0.0)
+        return key
     
     def get_patterns_for_segment(self, segment: str) -> List[Dict[str, Any]]:
         """Get all patterns applicable to a specific segment"""
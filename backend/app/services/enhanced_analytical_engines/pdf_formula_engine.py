@@ -1,7 +1,7 @@
 # backend/app/services/enhanced_analytical_engines/pdf_formula_engine.py
 import asyncio
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Mapping, Sequence, Tuple, Any, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 import math
@@ -63,6 +63,144 @@ class PDFAnalysisResult:
     confidence_metrics: Dict[str, float]
     processing_metadata: Dict[str, Any]
 
+@dataclass
+class FactorBatch:
+    """Raw factor data of many sessions or samples packed into arrays
+    
+    ``columns[factor_id][key]`` holds one value per input row (NaN where a
+    row lacks the key, so the calculator's default applies) and
+    ``sessions[factor_id]`` the entry each row belongs to. Entries may have
+    several rows for a factor, as a session may have several FactorInputs.
+    """
+    size: int
+    columns: Dict[str, Dict[str, np.ndarray]]
+    sessions: Dict[str, np.ndarray]
+    
+    @classmethod
+    def from_arrays(cls, samples: Mapping[str, Mapping[str, Any]], size: Optional[int] = None) -> 'FactorBatch':
+        """One row per sample: factor_id -> raw_data key -> array (scalars broadcast)"""
+        if size is None:
+            lengths = [np.size(values) for data in samples.values() for values in data.values() if np.ndim(values)]
+            size = max(lengths) if lengths else 1
+        columns = {
+            factor_id: {key: np.broadcast_to(np.asarray(values, dtype=float), (size,)) for key, values in data.items()}
+            for factor_id, data in samples.items()
+        }
+        rows = np.arange(size)
+        return cls(size, columns, {factor_id: rows for factor_id in samples})
+    
+    @classmethod
+    def from_inputs(cls, sessions: Sequence[Sequence[FactorInput]]) -> 'FactorBatch':
+        """Pack the FactorInputs of several sessions (non-numeric values count as missing)"""
+        rows: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for session_index, inputs in enumerate(sessions):
+            for input_data in inputs:
+                rows.setdefault(input_data.factor_id, []).append((session_index, input_data.raw_data))
+        
+        columns, session_rows = {}, {}
+        for factor_id, factor_rows in rows.items():
+            keys = {key for _, raw_data in factor_rows for key in raw_data}
+            columns[factor_id] = {
+                key: np.array([_numeric(raw_data.get(key)) for _, raw_data in factor_rows])
+                for key in keys
+            }
+            session_rows[factor_id] = np.array([session_index for session_index, _ in factor_rows], dtype=np.intp)
+        return cls(len(sessions), columns, session_rows)
+
+
+@dataclass
+class FactorBatchResult:
+    """F1-F28 scores of every entry in a FactorBatch
+    
+    Score matrices are (entries x factors) in ``factor_ids`` order; NaN
+    marks a factor an entry has no input for.
+    """
+    factor_ids: List[str]
+    raw_scores: np.ndarray
+    normalized_scores: np.ndarray
+    category_scores: Dict[str, np.ndarray]
+    overall_scores: np.ndarray
+    
+    def factor_scores(self, factor_id: str) -> np.ndarray:
+        return self.normalized_scores[:, self.factor_ids.index(factor_id)]
+
+
+def _numeric(value: Any) -> float:
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+class _FactorRows:
+    """Rows of one factor in a FactorBatch, reduced per entry"""
+    
+    def __init__(self, columns: Dict[str, np.ndarray], sessions: np.ndarray, size: int):
+        self.columns = columns
+        self.sessions = sessions
+        self.size = size
+        self.counts = np.bincount(sessions, minlength=size)
+        # Fast path: row i is entry i
+        self.one_per_entry = len(sessions) == size and bool(np.array_equal(sessions, np.arange(size)))
+    
+    def column(self, key: str, default: float) -> np.ndarray:
+        values = self.columns.get(key)
+        if values is None:
+            return np.full(len(self.sessions), float(default))
+        return np.where(np.isnan(values), default, values)
+    
+    def mean(self, values: np.ndarray, where: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-entry mean of row values (NaN for entries without rows)"""
+        if self.one_per_entry and where is None:
+            return values
+        sessions = self.sessions if where is None else self.sessions[where]
+        values = values if where is None else values[where]
+        counts = np.bincount(sessions, minlength=self.size)
+        totals = np.bincount(sessions, weights=values, minlength=self.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
+    
+    def maximum(self, values: np.ndarray, initial: float) -> np.ndarray:
+        if self.one_per_entry:
+            return np.maximum(values, initial)
+        result = np.full(self.size, float(initial))
+        np.maximum.at(result, self.sessions, values)
+        return result
+
+
+# Factors scored as the mean of one raw_data value (key, default)
+_PASSTHROUGH_FACTORS = {
+    'F8_product_differentiation': ('product_differentiation', 0.5),
+    'F9_innovation_capability': ('innovation_capability', 0.5),
+    'F10_quality_reliability': ('quality_reliability', 0.5),
+    'F11_scalability_potential': ('scalability_potential', 0.5),
+    'F12_customer_stickiness': ('customer_stickiness', 0.5),
+    'F13_pricing_power': ('pricing_power', 0.5),
+    'F14_lifecycle_position': ('lifecycle_position', 0.5),
+    'F17_cash_flow_generation': ('cash_flow_quality', 0.5),
+    'F18_capital_efficiency': ('capital_efficiency', 0.5),
+    'F19_financial_stability': ('financial_stability', 0.5),
+    'F20_cost_structure': ('cost_efficiency', 0.5),
+    'F21_working_capital': ('working_capital_efficiency', 0.5),
+    'F23_management_quality': ('management_quality', 0.5),
+    'F24_strategic_positioning': ('strategic_positioning', 0.5),
+    'F25_operational_excellence': ('operational_excellence', 0.5),
+    'F26_digital_transformation': ('digital_maturity', 0.5),
+    'F27_sustainability_esg': ('esg_score', 0.5),
+    'F28_strategic_flexibility': ('strategic_flexibility', 0.5),
+}
+
+# Category weights for the overall score
+CATEGORY_WEIGHTS = {
+    'market': 0.25,
+    'product': 0.25,
+    'financial': 0.25,
+    'strategic': 0.25
+}
+
+# Market maturity stage (embryonic, growth, mature, decline) -> score
+_MATURITY_STAGE_SCORES = np.array([0.2, 0.8, 0.6, 0.3])
+
+
 class PDFFormulaEngine:
     """
     PDF Formula Engine implementing F1-F28 factor calculations with mathematical precision
@@ -137,18 +275,17 @@ class PDFFormulaEngine:
                 factor_input_map[input_data.factor_id].append(input_data)
             
             # Calculate factors in parallel
-            calculation_tasks = []
-            for factor_id, inputs in factor_input_map.items():
-                if factor_id in self.factor_calculators:
-                    task = self._calculate_single_factor(factor_id, inputs)
-                    calculation_tasks.append(task)
+            factor_ids = [factor_id for factor_id in factor_input_map if factor_id in self.factor_calculators]
+            calculation_tasks = [
+                self._calculate_single_factor(factor_id, factor_input_map[factor_id])
+                for factor_id in factor_ids
+            ]
             
             factor_results = await asyncio.gather(*calculation_tasks, return_exceptions=True)
             
             # Process results
             final_factor_results = {}
-            for i, result in enumerate(factor_results):
-                factor_id = list(factor_input_map.keys())[i]
+            for factor_id, result in zip(factor_ids, factor_results):
                 if isinstance(result, Exception):
                     logger.error(f"Factor {factor_id} calculation failed: {result}")
                     # Create fallback result
@@ -735,6 +872,100 @@ class PDFFormulaEngine:
         calculation_steps.append({'step': 'flexibility_analysis', 'scores': flexibility_scores})
         return raw_score, calculation_steps
     
+    # Batch calculation (F1-F28 over arrays)
+    
+    def calculate_factor_batch(self, batch: FactorBatch) -> FactorBatchResult:
+        """F1-F28 raw, normalized, category and overall scores of every batch entry
+        
+        Same formulas as calculate_all_factors, evaluated with numpy over all
+        sessions or samples at once (no calculation steps or confidence).
+        Use for factor sensitivity sweeps and Monte Carlo over factors.
+        """
+        factor_ids = list(self.factor_calculators)
+        raw_scores = np.full((batch.size, len(factor_ids)), np.nan)
+        for column, factor_id in enumerate(factor_ids):
+            if factor_id not in batch.columns:
+                continue
+            rows = _FactorRows(batch.columns[factor_id], batch.sessions[factor_id], batch.size)
+            scores = self._vector_raw_score(factor_id, rows)
+            raw_scores[:, column] = np.where(rows.counts > 0, scores, np.nan)
+        
+        normalized_scores = self.math_models.logistic_normalize_array(raw_scores)
+        normalized_scores[np.isnan(raw_scores)] = np.nan
+        
+        by_factor = dict(zip(factor_ids, normalized_scores.T))
+        category_scores = {
+            category: np.broadcast_to(self.math_models.calculate_composite_score_array(by_factor, category),
+                                      (batch.size,))
+            for category in CATEGORY_WEIGHTS
+        }
+        overall_scores = sum(category_scores[category] * weight for category, weight in CATEGORY_WEIGHTS.items())
+        
+        return FactorBatchResult(factor_ids, raw_scores, normalized_scores, category_scores, overall_scores)
+    
+    def _vector_raw_score(self, factor_id: str, rows: _FactorRows) -> np.ndarray:
+        """Raw score per entry; mirrors the _calculate_f* methods"""
+        if factor_id in _PASSTHROUGH_FACTORS:
+            key, default = _PASSTHROUGH_FACTORS[factor_id]
+            return rows.mean(rows.column(key, default))
+        
+        if factor_id == 'F1_market_size':
+            tam = rows.column('total_addressable_market', 0)
+            avg_tam = rows.mean(tam, where=tam > 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tam_score = np.where(avg_tam > 0, np.minimum(1.0, np.log10(avg_tam) / 12.0), 0.0)
+            market_penetration = rows.maximum(rows.column('market_penetration', 0.5), 0.5)
+            growth_multiplier = rows.maximum(
+                1.0 + np.minimum(0.5, rows.column('market_growth_rate', 0.1) / 20.0), 1.0)
+            return np.minimum(1.0, tam_score * (1.0 - market_penetration) * growth_multiplier)
+        
+        if factor_id == 'F2_market_growth':
+            avg_growth = rows.mean(rows.column('market_growth_rate', 0.1))
+            avg_sustainability = rows.mean(rows.column('growth_sustainability', 0.5))
+            with np.errstate(over='ignore'):
+                normalized_growth = 1.0 / (1.0 + np.exp(-0.2 * (avg_growth * 100 - 10)))
+            return normalized_growth * avg_sustainability
+        
+        if factor_id == 'F3_market_maturity':
+            stage = np.trunc(rows.column('market_maturity_stage', 2.0))
+            index = np.clip(stage, 0, len(_MATURITY_STAGE_SCORES) - 1).astype(np.intp)
+            return rows.mean(_MATURITY_STAGE_SCORES[index])
+        
+        if factor_id == 'F4_competitive_intensity':
+            concentration_score = 1.0 - rows.column('market_concentration', 0.5)
+            competitor_score = np.maximum(0.2, 1.0 - rows.column('competitor_count', 10) / 100)
+            price_score = 1.0 - rows.column('price_competition_level', 0.5)
+            return rows.mean((concentration_score + competitor_score + price_score) / 3.0)
+        
+        if factor_id == 'F5_barrier_to_entry':
+            barriers = (rows.column('capital_requirements', 0.5) + rows.column('regulatory_barriers', 0.5)
+                        + rows.column('technology_barriers', 0.5) + rows.column('brand_barriers', 0.5))
+            return rows.mean(barriers / 4.0)
+        
+        if factor_id == 'F6_regulatory_environment':
+            regulatory = (rows.column('regulatory_clarity', 0.5) + rows.column('regulatory_stability', 0.5)
+                          + (1.0 - rows.column('compliance_cost', 0.5)))
+            return rows.mean(regulatory / 3.0)
+        
+        if factor_id == 'F7_economic_sensitivity':
+            sensitivity = (rows.column('recession_resilience', 0.5) + (1.0 - rows.column('income_elasticity', 0.5))
+                           + (1.0 - rows.column('cyclical_dependency', 0.5)))
+            return rows.mean(sensitivity / 3.0)
+        
+        if factor_id == 'F15_revenue_growth':
+            return rows.mean(np.clip(rows.column('revenue_growth_rate', 0.1) / 0.5, 0.0, 1.0))
+        
+        if factor_id == 'F16_profitability_margins':
+            return rows.mean(np.clip(rows.column('profit_margin', 0.1) / 0.2, 0.0, 1.0))
+        
+        if factor_id == 'F22_brand_strength':
+            brand = (rows.column('brand_recognition', 0.5) * 0.3 + rows.column('customer_loyalty', 0.5) * 0.3
+                     + rows.column('brand_equity_value', 0.5) * 0.2
+                     + np.minimum(1.0, rows.column('market_share', 0.1) * 5) * 0.2)
+            return rows.mean(brand)
+        
+        raise KeyError(f"No vectorized calculator for {factor_id}")
+    
     # Helper methods
     
     def _calculate_factor_confidence(self, inputs: List[FactorInput], calculation_steps: List[Dict[str, Any]]) -> float:
@@ -785,16 +1016,8 @@ class PDFFormulaEngine:
     
     def _calculate_overall_score(self, factor_results: Dict[str, FactorResult], category_scores: Dict[str, float]) -> float:
         """Calculate overall weighted score"""
-        # Category weights for overall score
-        category_weights = {
-            'market': 0.25,
-            'product': 0.25, 
-            'financial': 0.25,
-            'strategic': 0.25
-        }
-        
         overall_score = sum(category_scores[cat] * weight 
-                           for cat, weight in category_weights.items() 
+                           for cat, weight in CATEGORY_WEIGHTS.items() 
                            if cat in category_scores)
         
         return overall_score
@@ -860,4 +1083,4 @@ class PDFFormulaEngine:
             metadata={'status': 'fallback', 'timestamp': datetime.now(timezone.utc).isoformat()}
         )
 
-__all__ = ['PDFFormulaEngine', 'FactorInput', 'FactorResult', 'PDFAnalysisResult']
\ No newline at end of file
+__all__ = ['PDFFormulaEngine', 'FactorInput', 'FactorResult', 'PDFAnalysisResult', 'FactorBatch', 'FactorBatchResult']
\ No newline at end of file
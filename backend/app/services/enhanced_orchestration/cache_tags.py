@@ -0,0 +1,214 @@
+"""
+Tag and Namespace Invalidation for the Multi-Level Cache Manager
+
+Values are stamped at write time with the generation of every tag they belong
+to (session, topic, analysis id, plus the key's namespace). Invalidating a tag
+only increments its generation counter; entries carrying an older stamp are
+treated as misses on read on every level and expire through their TTL. This
+makes invalidation O(1) regardless of keyspace size and needs no scans of
+Redis, Memcached or Firestore.
+
+Generations live in Redis when available (shared by all instances, re-read
+at most every ``refresh_seconds`` per tag) and in process memory otherwise.
+A generation never goes backwards in one process: Redis values lower than
+the local one (a failed INCR, a flushed or expired counter) are republished
+instead of adopted. Counters expire after ``counter_ttl_seconds`` without a
+bump, which must exceed the longest TTL entries are written with; only the
+``max_tags`` most recently used tags are kept in memory.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ...core.serialization import register_extension
+
+logger = logging.getLogger(__name__)
+
+Stamp = Tuple[Tuple[str, int], ...]
+
+
+class TaggedValue:
+    """Cached value together with the tag generations it was written under"""
+
+    __slots__ = ('value', 'generations')
+
+    def __init__(self, value: Any, generations: Stamp):
+        self.value = value
+        self.generations = generations
+
+    def __reduce__(self):
+        return (TaggedValue, (self.value, self.generations))
+
+    @property
+    def tags(self) -> List[str]:
+        return [tag for tag, _ in self.generations]
+
+
+register_extension(
+    0, TaggedValue,
+    lambda tagged: [tagged.value, tagged.generations],
+    lambda payload: TaggedValue(payload[0], tuple(payload[1]))
+)
+
+
+def cache_tags(session_id: Optional[str] = None,
+               topic: Optional[str] = None,
+               analysis_id: Optional[str] = None,
+               *extra: str) -> List[str]:
+    """Standard tag names for the identifiers cached values are grouped by"""
+    tags = []
+    if session_id:
+        tags.append(f"session:{session_id}")
+    if topic:
+        tags.append(f"topic:{topic}")
+    if analysis_id:
+        tags.append(f"analysis:{analysis_id}")
+    tags.extend(extra)
+    return tags
+
+
+def namespace_of(key: str) -> Optional[str]:
+    """Namespace of a cache key: the prefix before the first ':'"""
+    namespace, sep, _ = key.partition(':')
+    return namespace if sep and namespace else None
+
+
+def namespace_tag(namespace: str) -> str:
+    return f"ns:{namespace}"
+
+
+class TagGenerations:
+    """Generation counters per tag, optionally shared through Redis"""
+
+    def __init__(self,
+                 redis_client=None,
+                 refresh_seconds: float = 1.0,
+                 key_prefix: str = 'tag_gen:',
+                 max_tags: int = 10_000,
+                 counter_ttl_seconds: int = 7 * 86400):
+        self.redis_client = redis_client
+        self.refresh_seconds = refresh_seconds
+        self.key_prefix = key_prefix
+        self.max_tags = max(1, max_tags)
+        self.counter_ttl_seconds = counter_ttl_seconds
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._checked_at: Dict[str, float] = {}
+        # Local generations Redis has not caught up with yet, retried on refresh
+        self._unshared: Dict[str, int] = {}
+        # Highest generation of an evicted tag; stands in for unknown tags
+        # without Redis so an eviction never revalidates old stamps
+        self._floor = 0
+        self.invalidations = 0
+        self.stale_reads = 0
+
+    def _redis_key(self, tag: str) -> str:
+        return f"{self.key_prefix}{tag}"
+
+    def _generation(self, tag: str) -> int:
+        generation = self._generations.get(tag)
+        if generation is None:
+            return self._floor
+        self._generations.move_to_end(tag)
+        return generation
+
+    def _remember(self, tag: str, generation: int, checked_at: Optional[float] = None):
+        self._generations[tag] = generation
+        self._generations.move_to_end(tag)
+        if checked_at is not None:
+            self._checked_at[tag] = checked_at
+        while len(self._generations) > self.max_tags:
+            # Unshared tags stay until Redis has them; nothing else could restore them
+            evicted = next((tag for tag in self._generations if tag not in self._unshared), None)
+            if evicted is None:
+                break
+            self._floor = max(self._floor, self._generations.pop(evicted))
+            self._checked_at.pop(evicted, None)
+
+    async def _publish(self, tag: str) -> bool:
+        """Raise the shared counter of ``tag`` to at least its local generation"""
+        key = self._redis_key(tag)
+        target = self._unshared[tag]
+        try:
+            generation = int(await self.redis_client.incr(key))
+            if generation < target:
+                generation = int(await self.redis_client.incrby(key, target - generation))
+            await self.redis_client.expire(key, self.counter_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared invalidation of tag {tag} failed, applied locally: {e}")
+            return False
+        if self._unshared.get(tag) == target:
+            del self._unshared[tag]
+        self._remember(tag, max(generation, self._generations.get(tag, 0)), time.monotonic())
+        return True
+
+    async def _refresh(self, tags: Iterable[str]):
+        if self.redis_client is None:
+            return
+        now = time.monotonic()
+        stale = [tag for tag in tags
+                 if now - self._checked_at.get(tag, float('-inf')) >= self.refresh_seconds]
+        if not stale:
+            return
+        try:
+            values = await self.redis_client.mget([self._redis_key(tag) for tag in stale])
+        except Exception as e:
+            logger.debug(f"Tag generation refresh failed: {e}")
+            return
+        for tag, value in zip(stale, values):
+            shared = int(value) if value is not None else 0
+            local = self._generations.get(tag)
+            if local is not None and local > shared:
+                self._unshared[tag] = max(local, self._unshared.get(tag, 0))
+                self._remember(tag, local, now)
+            else:
+                self._remember(tag, shared, now)
+        for tag in list(self._unshared):
+            await self._publish(tag)
+
+    async def stamp(self, tags: Iterable[str]) -> Stamp:
+        """Current generations of ``tags`` for stamping a write"""
+        tags = list(dict.fromkeys(tags))
+        await self._refresh(tags)
+        return tuple((tag, self._generation(tag)) for tag in tags)
+
+    async def is_current(self, generations: Stamp) -> bool:
+        """True when no tag in the stamp was invalidated after the write"""
+        if self.redis_client is not None:
+            await self._refresh(tag for tag, _ in generations)
+        for tag, generation in generations:
+            if self._generation(tag) != generation:
+                self.stale_reads += 1
+                return False
+        return True
+
+    async def bump(self, tag: str) -> bool:
+        """Invalidate every entry stamped with ``tag``
+
+        Returns False when the new generation could not be written to Redis:
+        the invalidation then holds in this process only until a later
+        refresh republishes it.
+        """
+        self.invalidations += 1
+        if self.redis_client is None:
+            self._remember(tag, self._generation(tag) + 1)
+            return True
+        generation = self._generations.get(tag, 0) + 1
+        self._unshared[tag] = generation
+        self._remember(tag, generation)
+        return await self._publish(tag)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'tracked_tags': len(self._generations),
+            'unshared_tags': len(self._unshared),
+            'invalidations': self.invalidations,
+            'stale_reads': self.stale_reads,
+            'shared': self.redis_client is not None
+        }
+
+
+__all__ = [
+    'TaggedValue', 'TagGenerations', 'cache_tags', 'namespace_of', 'namespace_tag'
+]
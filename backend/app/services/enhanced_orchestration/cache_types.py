@@ -0,0 +1,77 @@
+"""
+Shared cache types for the Multi-Level Cache Manager
+
+Kept free of GCP imports so the in-process cache components can be used
+(and tested) without the cloud client libraries.
+"""
+
+from typing import Any, List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+
+class CacheLevel(Enum):
+    """Cache levels in order of access speed"""
+    L1_MEMORY = 1      # In-memory cache (fastest)
+    L2_REDIS = 2       # Distributed Redis cache
+    L3_MEMCACHED = 3   # GCP Memorystore Memcached
+    L4_PERSISTENT = 4  # Firestore/Storage (slowest)
+
+class CacheStrategy(Enum):
+    """Cache storage strategies"""
+    WRITE_THROUGH = "write_through"       # Write to cache and storage simultaneously
+    WRITE_BACK = "write_back"            # Write to cache, lazy write to storage
+    WRITE_AROUND = "write_around"        # Skip cache, write directly to storage
+    CACHE_ASIDE = "cache_aside"          # Manual cache management
+
+class EvictionPolicy(Enum):
+    """Cache eviction policies"""
+    LRU = "lru"                          # Least Recently Used
+    LFU = "lfu"                          # Least Frequently Used
+    TTL = "ttl"                          # Time To Live
+    FIFO = "fifo"                        # First In, First Out
+
+@dataclass
+class CacheConfig:
+    """Configuration for cache levels"""
+    enabled: bool = True
+    max_size: int = 1000
+    ttl_seconds: int = 3600
+    eviction_policy: EvictionPolicy = EvictionPolicy.LRU
+    compression: bool = False
+    serialization: str = 'json'  # 'json', 'pickle', 'msgpack'
+    max_bytes: Optional[int] = None  # Byte budget (L1 memory cache)
+    shards: int = 1                  # Lock shards (L1 memory cache)
+    tinylfu_admission: bool = True   # W-TinyLFU admission for LRU (L1 memory cache)
+
+@dataclass
+class CacheItem:
+    """Cached item with metadata"""
+    key: str
+    value: Any
+    created_at: datetime
+    last_accessed: datetime
+    access_count: int = 0
+    size_bytes: int = 0
+    ttl_seconds: Optional[int] = None
+    tags: List[str] = None
+
+@dataclass
+class CacheStats:
+    """Cache statistics"""
+    level: CacheLevel
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    deletes: int = 0
+    evictions: int = 0
+    total_items: int = 0
+    memory_usage_bytes: int = 0
+    avg_response_time_ms: float = 0.0
+    hit_ratio: float = 0.0
+
+
+__all__ = [
+    'CacheLevel', 'CacheStrategy', 'EvictionPolicy',
+    'CacheConfig', 'CacheItem', 'CacheStats'
+]
@@ -0,0 +1,630 @@
+"""
+L1 In-Memory Cache for the Multi-Level Cache Manager
+
+Sharded, byte-budgeted in-process cache with O(1) operations:
+- LRU policy uses W-TinyLFU (admission window + segmented LRU main space),
+  so one-off scans of scraped content cannot flush hot layer/factor entries
+- LFU policy uses constant-time frequency lists
+- FIFO/TTL policies evict in insertion order
+
+Admission is driven by a count-min sketch with a bloom-filter doorkeeper
+and periodic aging (halving) so frequencies follow the recent workload.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+from ...core.size_estimation import estimate_size
+from .cache_types import EvictionPolicy
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_COUNTER_MAX = 15
+_HALVE_TABLE = bytes(i >> 1 for i in range(256))
+
+# Segment markers for W-TinyLFU entries
+_WINDOW = 0
+_PROBATION = 1
+_PROTECTED = 2
+
+
+def _next_power_of_two(value: int) -> int:
+    return 1 << max(0, int(value) - 1).bit_length()
+
+
+class CountMinSketch:
+    """4-row count-min sketch with 4-bit saturating counters and halving"""
+
+    def __init__(self, width: int):
+        self.width = _next_power_of_two(max(16, width))
+        self._mask = self.width - 1
+        self._rows = [bytearray(self.width) for _ in _ROW_SEEDS]
+
+    def _indexes(self, key_hash: int):
+        # Two 64-bit multiplicative mixes give four independent row indexes
+        mask = self._mask
+        x = (key_hash * _ROW_SEEDS[0]) & _MASK64
+        y = (key_hash * _ROW_SEEDS[1]) & _MASK64
+        return (x >> 32) & mask, (x >> 8) & mask, (y >> 32) & mask, (y >> 8) & mask
+
+    def increment(self, key_hash: int):
+        """Conservative update: only the minimal counters are incremented"""
+        i0, i1, i2, i3 = self._indexes(key_hash)
+        r0, r1, r2, r3 = self._rows
+        current = min(r0[i0], r1[i1], r2[i2], r3[i3])
+        if current >= _COUNTER_MAX:
+            return
+        current_plus = current + 1
+        if r0[i0] == current:
+            r0[i0] = current_plus
+        if r1[i1] == current:
+            r1[i1] = current_plus
+        if r2[i2] == current:
+            r2[i2] = current_plus
+        if r3[i3] == current:
+            r3[i3] = current_plus
+
+    def estimate(self, key_hash: int) -> int:
+        i0, i1, i2, i3 = self._indexes(key_hash)
+        r0, r1, r2, r3 = self._rows
+        return min(r0[i0], r1[i1], r2[i2], r3[i3])
+
+    def halve(self):
+        """Age all counters so old popularity decays"""
+        for row in self._rows:
+            row[:] = row.translate(_HALVE_TABLE)
+
+
+class Doorkeeper:
+    """Bloom filter that absorbs first-time keys before they reach the sketch"""
+
+    def __init__(self, bits: int):
+        self._bits_count = _next_power_of_two(max(64, bits))
+        self._mask = self._bits_count - 1
+        self._bits = bytearray(self._bits_count >> 3)
+
+    def _positions(self, key_hash: int):
+        mixed = (key_hash * _ROW_SEEDS[2]) & _MASK64
+        return (mixed >> 40) & self._mask, (mixed >> 16) & self._mask
+
+    def contains(self, key_hash: int) -> bool:
+        bits = self._bits
+        h1, h2 = self._positions(key_hash)
+        return bool(bits[h1 >> 3] & (1 << (h1 & 7))) and bool(bits[h2 >> 3] & (1 << (h2 & 7)))
+
+    def put(self, key_hash: int) -> bool:
+        """Add the key; return True if it was (probably) already present"""
+        bits = self._bits
+        mixed = (key_hash * _ROW_SEEDS[2]) & _MASK64
+        h1 = (mixed >> 40) & self._mask
+        h2 = (mixed >> 16) & self._mask
+        b1 = 1 << (h1 & 7)
+        b2 = 1 << (h2 & 7)
+        present = bool(bits[h1 >> 3] & b1) and bool(bits[h2 >> 3] & b2)
+        if not present:
+            bits[h1 >> 3] |= b1
+            bits[h2 >> 3] |= b2
+        return present
+
+    def clear(self):
+        self._bits = bytearray(self._bits_count >> 3)
+
+
+class TinyLFUAdmission:
+    """TinyLFU frequency filter (doorkeeper + count-min sketch with aging)"""
+
+    def __init__(self, expected_entries: int, sample_factor: int = 10):
+        expected_entries = max(16, expected_entries)
+        self.sketch = CountMinSketch(expected_entries)
+        self.doorkeeper = Doorkeeper(expected_entries * 8)
+        self.sample_size = sample_factor * expected_entries
+        self._additions = 0
+
+    def record(self, key_hash: int):
+        if self.doorkeeper.put(key_hash):
+            self.sketch.increment(key_hash)
+        additions = self._additions = self._additions + 1
+        if additions >= self.sample_size:
+            self.sketch.halve()
+            self.doorkeeper.clear()
+            self._additions //= 2
+
+    def frequency(self, key_hash: int) -> int:
+        return self.sketch.estimate(key_hash) + (1 if self.doorkeeper.contains(key_hash) else 0)
+
+
+class CacheEntry:
+    """Internal L1 entry (slots keep per-entry overhead small)"""
+    __slots__ = ('key', 'value', 'size', 'created_at', 'expires_at', 'ttl_seconds',
+                 'compute_seconds', 'access_count', 'segment', 'freq_node', 'key_hash')
+
+    def __init__(self, key: Hashable, value: Any, size: int, ttl_seconds: Optional[float],
+                 key_hash: int, now: float):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.key_hash = key_hash
+        self.created_at = now
+        self.ttl_seconds = ttl_seconds
+        self.expires_at = now + ttl_seconds if ttl_seconds else None
+        self.compute_seconds = 0.0  # Recompute cost, used for XFetch early refresh
+        self.access_count = 0
+        self.segment = _WINDOW
+        self.freq_node = None
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+
+class _Shard:
+    """Base shard: index, byte/entry accounting and counters"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max(1, max_bytes)
+        self.max_entries = max(1, max_entries)
+        self.lock = threading.Lock()
+        self.admission: Optional[TinyLFUAdmission] = None
+        self.index: Dict[Hashable, CacheEntry] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    # Policy hooks
+    def _on_hit(self, entry: CacheEntry):
+        raise NotImplementedError
+
+    def _link(self, entry: CacheEntry):
+        raise NotImplementedError
+
+    def _unlink(self, entry: CacheEntry):
+        raise NotImplementedError
+
+    def _resize(self, entry: CacheEntry, delta: int):
+        """Entry size changed in place"""
+        self.bytes += delta
+
+    def _victim(self) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def _evict(self):
+        while self.index and (self.bytes > self.max_bytes or len(self.index) > self.max_entries):
+            victim = self._victim()
+            if victim is None:
+                break
+            self._remove(victim)
+            self.evictions += 1
+
+    def _remove(self, entry: CacheEntry):
+        self._unlink(entry)
+        del self.index[entry.key]
+
+    def lookup(self, key: Hashable, key_hash: int, now: float) -> Optional[CacheEntry]:
+        if self.admission is not None:
+            self.admission.record(key_hash)
+        entry = self.index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.is_expired(now):
+            self._remove(entry)
+            self.misses += 1
+            return None
+        entry.access_count += 1
+        self._on_hit(entry)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: Hashable, now: float) -> Optional[CacheEntry]:
+        entry = self.index.get(key)
+        if entry is None or entry.is_expired(now):
+            return None
+        return entry
+
+    def set(self, key: Hashable, key_hash: int, value: Any, size: int,
+            ttl_seconds: Optional[float], now: float, compute_seconds: float = 0.0) -> bool:
+        existing = self.index.get(key)
+        if size > self.max_bytes:
+            if existing is not None:
+                self._remove(existing)
+            self.rejections += 1
+            return False
+
+        if self.admission is not None:
+            self.admission.record(key_hash)
+        if existing is not None:
+            delta = size - existing.size
+            existing.value = value
+            existing.size = size
+            existing.created_at = now
+            existing.ttl_seconds = ttl_seconds
+            existing.expires_at = now + ttl_seconds if ttl_seconds else None
+            existing.compute_seconds = compute_seconds
+            self._resize(existing, delta)
+            self._on_hit(existing)
+            self._evict()
+            return True
+
+        entry = CacheEntry(key, value, size, ttl_seconds, key_hash, now)
+        entry.compute_seconds = compute_seconds
+        self._insert(entry)
+        return key in self.index
+
+    def _insert(self, entry: CacheEntry):
+        """Make room first so a new entry is never its own eviction victim"""
+        while self.index and (self.bytes + entry.size > self.max_bytes
+                              or len(self.index) >= self.max_entries):
+            victim = self._victim()
+            if victim is None:
+                break
+            self._remove(victim)
+            self.evictions += 1
+        self.index[entry.key] = entry
+        self._link(entry)
+
+    def delete(self, key: Hashable) -> bool:
+        entry = self.index.get(key)
+        if entry is None:
+            return False
+        self._remove(entry)
+        return True
+
+    def clear(self):
+        for entry in list(self.index.values()):
+            self._remove(entry)
+
+
+class _LRUShard(_Shard):
+    """Plain LRU (used when TinyLFU admission is disabled)"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        super().__init__(max_bytes, max_entries)
+        self._order: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def _on_hit(self, entry):
+        self._order.move_to_end(entry.key)
+
+    def _link(self, entry):
+        self._order[entry.key] = entry
+        self.bytes += entry.size
+
+    def _unlink(self, entry):
+        del self._order[entry.key]
+        self.bytes -= entry.size
+
+    def _victim(self):
+        return next(iter(self._order.values()), None)
+
+
+class _FIFOShard(_LRUShard):
+    """Insertion-order eviction; hits do not reorder"""
+
+    def _on_hit(self, entry):
+        pass
+
+
+class _FrequencyNode:
+    __slots__ = ('freq', 'entries', 'prev', 'next')
+
+    def __init__(self, freq: int):
+        self.freq = freq
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.prev: Optional["_FrequencyNode"] = None
+        self.next: Optional["_FrequencyNode"] = None
+
+
+class _LFUShard(_Shard):
+    """O(1) LFU using a doubly linked list of frequency buckets"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        super().__init__(max_bytes, max_entries)
+        self._head = _FrequencyNode(0)
+        self._head.prev = self._head.next = self._head
+
+    def _insert_after(self, node: _FrequencyNode, freq: int) -> _FrequencyNode:
+        new_node = _FrequencyNode(freq)
+        new_node.prev = node
+        new_node.next = node.next
+        node.next.prev = new_node
+        node.next = new_node
+        return new_node
+
+    def _drop_if_empty(self, node: _FrequencyNode):
+        if node is not self._head and not node.entries:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+
+    def _on_hit(self, entry):
+        node = entry.freq_node
+        target = node.next
+        if target is self._head or target.freq != node.freq + 1:
+            target = self._insert_after(node, node.freq + 1)
+        del node.entries[entry.key]
+        target.entries[entry.key] = entry
+        entry.freq_node = target
+        self._drop_if_empty(node)
+
+    def _link(self, entry):
+        first = self._head.next
+        if first is self._head or first.freq != 1:
+            first = self._insert_after(self._head, 1)
+        first.entries[entry.key] = entry
+        entry.freq_node = first
+        self.bytes += entry.size
+
+    def _unlink(self, entry):
+        node = entry.freq_node
+        del node.entries[entry.key]
+        entry.freq_node = None
+        self._drop_if_empty(node)
+        self.bytes -= entry.size
+
+    def _victim(self):
+        first = self._head.next
+        if first is self._head:
+            return None
+        return next(iter(first.entries.values()))
+
+
+class _WTinyLFUShard(_Shard):
+    """W-TinyLFU: 1% LRU admission window in front of a segmented LRU main space.
+
+    Entries leaving the window only enter the main space if the TinyLFU
+    filter estimates them to be more popular than the probation victim.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, expected_entries: int):
+        super().__init__(max_bytes, max_entries)
+        self.admission = TinyLFUAdmission(expected_entries)
+        self._window_max_bytes = max(1, self.max_bytes // 100)
+        self._window_max_entries = max(1, self.max_entries // 100)
+        self._main_max_bytes = max(1, self.max_bytes - self._window_max_bytes)
+        self._main_max_entries = max(1, self.max_entries - self._window_max_entries)
+        self._protected_max_bytes = int(self._main_max_bytes * 0.8)
+        self._protected_max_entries = int(self._main_max_entries * 0.8)
+
+        self._window: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._window_bytes = 0
+        self._protected_bytes = 0
+
+    def _insert(self, entry):
+        # New entries always enter the window; admission happens on overflow
+        self.index[entry.key] = entry
+        self._link(entry)
+        self._evict()
+
+    def _segment(self, entry) -> "OrderedDict[Hashable, CacheEntry]":
+        if entry.segment == _WINDOW:
+            return self._window
+        if entry.segment == _PROBATION:
+            return self._probation
+        return self._protected
+
+    def _link(self, entry):
+        entry.segment = _WINDOW
+        self._window[entry.key] = entry
+        self._window_bytes += entry.size
+        self.bytes += entry.size
+
+    def _unlink(self, entry):
+        del self._segment(entry)[entry.key]
+        if entry.segment == _WINDOW:
+            self._window_bytes -= entry.size
+        elif entry.segment == _PROTECTED:
+            self._protected_bytes -= entry.size
+        self.bytes -= entry.size
+
+    def _resize(self, entry, delta):
+        if entry.segment == _WINDOW:
+            self._window_bytes += delta
+        elif entry.segment == _PROTECTED:
+            self._protected_bytes += delta
+        self.bytes += delta
+
+    def _on_hit(self, entry):
+        if entry.segment == _PROBATION:
+            del self._probation[entry.key]
+            entry.segment = _PROTECTED
+            self._protected[entry.key] = entry
+            self._protected_bytes += entry.size
+            self._demote_protected()
+        else:
+            self._segment(entry).move_to_end(entry.key)
+
+    def _demote_protected(self):
+        while len(self._protected) > 1 and (
+            self._protected_bytes > self._protected_max_bytes
+            or len(self._protected) > self._protected_max_entries
+        ):
+            _, demoted = self._protected.popitem(last=False)
+            self._protected_bytes -= demoted.size
+            demoted.segment = _PROBATION
+            self._probation[demoted.key] = demoted
+
+    def _main_over_budget(self) -> bool:
+        main_entries = len(self._probation) + len(self._protected)
+        return (self.bytes - self._window_bytes > self._main_max_bytes
+                or main_entries > self._main_max_entries)
+
+    def _main_victim(self, candidate: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        # Probation LRU first, then protected LRU; the candidate sits at the
+        # probation MRU end, so this only skips it when it is alone there
+        for segment in (self._probation, self._protected):
+            for entry in segment.values():
+                if entry is not candidate:
+                    return entry
+        return None
+
+    def _evict(self):
+        # Overflow from the window competes for main space one entry at a time
+        while self._window and (
+            self._window_bytes > self._window_max_bytes
+            or len(self._window) > self._window_max_entries
+        ):
+            _, candidate = self._window.popitem(last=False)
+            self._window_bytes -= candidate.size
+            candidate.segment = _PROBATION
+            self._probation[candidate.key] = candidate
+            self._admit(candidate)
+
+        if self._main_over_budget():
+            self._admit(None)
+
+    def _admit(self, candidate: Optional[CacheEntry]):
+        while self._main_over_budget():
+            victim = self._main_victim(candidate)
+            if victim is None:
+                if candidate is not None:
+                    self._reject(candidate)
+                return
+            if candidate is not None and (
+                self.admission.frequency(candidate.key_hash)
+                <= self.admission.frequency(victim.key_hash)
+            ):
+                self._reject(candidate)
+                return
+            self._remove(victim)
+            self.evictions += 1
+
+    def _reject(self, candidate: CacheEntry):
+        self._remove(candidate)
+        self.evictions += 1
+        self.rejections += 1
+
+    def _victim(self):
+        # Not used: W-TinyLFU overrides _evict
+        return None
+
+
+class ShardedL1Cache:
+    """
+    Sharded, byte-budgeted L1 cache with pluggable eviction policy.
+
+    All operations are O(1) and hold only a per-shard ``threading.Lock`` for
+    the duration of a few dict operations, so the cache is safe to use from
+    the event loop and from executor threads without an ``asyncio.Lock``.
+    """
+
+    _MIN_ENTRIES_PER_SHARD = 32
+
+    def __init__(self,
+                 max_entries: int = 1000,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: Optional[int] = 300,
+                 eviction_policy: EvictionPolicy = EvictionPolicy.LRU,
+                 shards: int = 16,
+                 tinylfu_admission: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.eviction_policy = eviction_policy
+        self.tinylfu_admission = tinylfu_admission
+
+        # Keep shards large enough for the policies to be meaningful
+        shard_count = max(1, min(shards, self.max_entries // self._MIN_ENTRIES_PER_SHARD))
+        shard_count = 1 << (shard_count.bit_length() - 1)
+        self._shard_mask = shard_count - 1
+
+        per_shard_entries = -(-self.max_entries // shard_count)
+        per_shard_bytes = -(-self.max_bytes // shard_count)
+        self._shards: List[_Shard] = [
+            self._create_shard(per_shard_bytes, per_shard_entries) for _ in range(shard_count)
+        ]
+
+    def _create_shard(self, max_bytes: int, max_entries: int) -> _Shard:
+        policy = self.eviction_policy
+        if policy == EvictionPolicy.LFU:
+            return _LFUShard(max_bytes, max_entries)
+        if policy in (EvictionPolicy.FIFO, EvictionPolicy.TTL):
+            # With a per-cache TTL, insertion order is expiry order
+            return _FIFOShard(max_bytes, max_entries)
+        if self.tinylfu_admission:
+            return _WTinyLFUShard(max_bytes, max_entries, max_entries)
+        return _LRUShard(max_bytes, max_entries)
+
+    def _shard_for(self, key: Hashable):
+        key_hash = hash(key) & _MASK64
+        return self._shards[key_hash & self._shard_mask], key_hash
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        key_hash = hash(key) & _MASK64
+        shard = self._shards[key_hash & self._shard_mask]
+        with shard.lock:
+            entry = shard.lookup(key, key_hash, time.monotonic())
+        return default if entry is None else entry.value
+
+    def get_entry(self, key: Hashable, touch: bool = False) -> Optional[CacheEntry]:
+        """Return the live entry; ``touch`` counts it as an access (hit/miss)"""
+        shard, key_hash = self._shard_for(key)
+        with shard.lock:
+            if touch:
+                return shard.lookup(key, key_hash, time.monotonic())
+            return shard.peek(key, time.monotonic())
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[int] = None,
+            size_bytes: Optional[int] = None, compute_seconds: float = 0.0) -> bool:
+        """Insert or replace a value; returns False if it was not admitted"""
+        size = size_bytes if size_bytes is not None else estimate_size(value)
+        ttl = ttl_seconds or self.ttl_seconds
+        shard, key_hash = self._shard_for(key)
+        with shard.lock:
+            return shard.set(key, key_hash, value, size, ttl, time.monotonic(), compute_seconds)
+
+    def delete(self, key: Hashable) -> bool:
+        shard, _ = self._shard_for(key)
+        with shard.lock:
+            return shard.delete(key)
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.clear()
+
+    def keys(self) -> Iterator[Hashable]:
+        """Snapshot of live keys (shard by shard)"""
+        for shard in self._shards:
+            with shard.lock:
+                keys = list(shard.index.keys())
+            yield from keys
+
+    def size(self) -> int:
+        return sum(len(shard.index) for shard in self._shards)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get_entry(key) is not None
+
+    @property
+    def memory_usage_bytes(self) -> int:
+        return sum(shard.bytes for shard in self._shards)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = sum(shard.hits for shard in self._shards)
+        misses = sum(shard.misses for shard in self._shards)
+        return {
+            'policy': self.eviction_policy.value,
+            'tinylfu_admission': isinstance(self._shards[0], _WTinyLFUShard),
+            'shards': len(self._shards),
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'memory_usage_bytes': self.memory_usage_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / max(1, hits + misses),
+            'evictions': sum(shard.evictions for shard in self._shards),
+            'rejections': sum(shard.rejections for shard in self._shards),
+        }
+
+
+__all__ = [
+    'ShardedL1Cache', 'CacheEntry', 'CountMinSketch', 'Doorkeeper',
+    'TinyLFUAdmission', 'estimate_size'
+]
@@ -1,14 +1,14 @@
 import asyncio
+import functools
+import inspect
 import json
 import time
 import logging
 import hashlib
 import pickle
 import gzip
-from typing import Dict, List, Any, Optional, Union, Callable, TypeVar, Generic
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Any, Optional, Union, Callable, TypeVar
 from datetime import datetime, timezone, timedelta
-from enum import Enum
 import weakref
 
 # Google Cloud imports
@@ -30,168 +30,22 @@ except ImportError:
 from ...core.gcp_config import GCPSettings
 from ...middleware.monitoring import performance_monitor
 from ...core.feature_flags import FeatureFlags
+from ...core.serialization import StorageCodec, get_serialization_stats
+from .cache_types import (
+    CacheLevel, CacheStrategy, EvictionPolicy, CacheConfig, CacheItem, CacheStats
+)
+from .l1_memory_cache import ShardedL1Cache, estimate_size
+from .single_flight import SingleFlight, SingleFlightStats, RedisLease, xfetch_should_refresh
+from .write_back import WriteBackBuffer, DirtyEntry
+from .cache_tags import TagGenerations, TaggedValue, cache_tags, namespace_of, namespace_tag
+from .cache_dictionary import cache_dictionary_id
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
-class CacheLevel(Enum):
-    """Cache levels in order of access speed"""
-    L1_MEMORY = 1      # In-memory cache (fastest)
-    L2_REDIS = 2       # Distributed Redis cache
-    L3_MEMCACHED = 3   # GCP Memorystore Memcached
-    L4_PERSISTENT = 4  # Firestore/Storage (slowest)
-
-class CacheStrategy(Enum):
-    """Cache storage strategies"""
-    WRITE_THROUGH = "write_through"       # Write to cache and storage simultaneously
-    WRITE_BACK = "write_back"            # Write to cache, lazy write to storage
-    WRITE_AROUND = "write_around"        # Skip cache, write directly to storage
-    CACHE_ASIDE = "cache_aside"          # Manual cache management
-
-class EvictionPolicy(Enum):
-    """Cache eviction policies"""
-    LRU = "lru"                          # Least Recently Used
-    LFU = "lfu"                          # Least Frequently Used
-    TTL = "ttl"                          # Time To Live
-    FIFO = "fifo"                        # First In, First Out
-
-@dataclass
-class CacheConfig:
-    """Configuration for cache levels"""
-    enabled: bool = True
-    max_size: int = 1000
-    ttl_seconds: int = 3600
-    eviction_policy: EvictionPolicy = EvictionPolicy.LRU
-    compression: bool = False
-    serialization: str = 'json'  # 'json', 'pickle', 'msgpack'
-
-@dataclass
-class CacheItem:
-    """Cached item with metadata"""
-    key: str
-    value: Any
-    created_at: datetime
-    last_accessed: datetime
-    access_count: int = 0
-    size_bytes: int = 0
-    ttl_seconds: Optional[int] = None
-    tags: List[str] = None
-
-@dataclass
-class CacheStats:
-    """Cache statistics"""
-    level: CacheLevel
-    hits: int = 0
-    misses: int = 0
-    sets: int = 0
-    deletes: int = 0
-    evictions: int = 0
-    total_items: int = 0
-    memory_usage_bytes: int = 0
-    avg_response_time_ms: float = 0.0
-    hit_ratio: float = 0.0
-
-class LRUCache(Generic[T]):
-    """Thread-safe LRU cache implementation"""
-    
-    def __init__(self, max_size: int, ttl_seconds: int = 3600):
-        self.max_size = max_size
-        self.ttl_seconds = ttl_seconds
-        self._cache: Dict[str, CacheItem] = {}
-        self._access_order: List[str] = []
-        self._lock = asyncio.Lock()
-    
-    async def get(self, key: str) -> Optional[T]:
-        async with self._lock:
-            if key in self._cache:
-                item = self._cache[key]
-                
-                # Check TTL
-                if self._is_expired(item):
-                    await self._remove_item(key)
-                    return None
-                
-                # Update access info
-                item.last_accessed = datetime.now(timezone.utc)
-                item.access_count += 1
-                
-                # Move to end (most recently used)
-                self._access_order.remove(key)
-                self._access_order.append(key)
-                
-                return item.value
-            
-            return None
-    
-    async def set(self, key: str, value: T, ttl_seconds: Optional[int] = None) -> bool:
-        async with self._lock:
-            now = datetime.now(timezone.utc)
-            
-            # Calculate item size
-            size_bytes = len(json.dumps(value, default=str).encode('utf-8'))
-            
-            # Create cache item
-            item = CacheItem(
-                key=key,
-                value=value,
-                created_at=now,
-                last_accessed=now,
-                access_count=1,
-                size_bytes=size_bytes,
-                ttl_seconds=ttl_seconds or self.ttl_seconds
-            )
-            
-            # Remove existing item if present
-            if key in self._cache:
-                await self._remove_item(key)
-            
-            # Add new item
-            self._cache[key] = item
-            self._access_order.append(key)
-            
-            # Evict if necessary
-            await self._evict_if_needed()
-            
-            return True
-    
-    async def delete(self, key: str) -> bool:
-        async with self._lock:
-            if key in self._cache:
-                await self._remove_item(key)
-                return True
-            return False
-    
-    async def clear(self):
-        async with self._lock:
-            self._cache.clear()
-            self._access_order.clear()
-    
-    async def size(self) -> int:
-        return len(self._cache)
-    
-    async def _remove_item(self, key: str):
-        """Remove item from cache"""
-        if key in self._cache:
-            del self._cache[key]
-            if key in self._access_order:
-                self._access_order.remove(key)
-    
-    async def _evict_if_needed(self):
-        """Evict items if cache is over capacity"""
-        while len(self._cache) > self.max_size:
-            if self._access_order:
-                # Remove least recently used item
-                lru_key = self._access_order[0]
-                await self._remove_item(lru_key)
-    
-    def _is_expired(self, item: CacheItem) -> bool:
-        """Check if cache item has expired"""
-        if item.ttl_seconds is None:
-            return False
-        
-        age = (datetime.now(timezone.utc) - item.created_at).total_seconds()
-        return age > item.ttl_seconds
+# Firestore rejects batched writes with more than 500 operations
+FIRESTORE_BATCH_LIMIT = 500
 
 class MultiLevelCacheManager:
     """
@@ -209,7 +63,10 @@ class MultiLevelCacheManager:
                 ttl_seconds=300,  # 5 minutes
                 eviction_policy=EvictionPolicy.LRU,
                 compression=False,
-                serialization='json'
+                serialization='json',
+                max_bytes=64 * 1024 * 1024,  # 64 MB
+                shards=16,
+                tinylfu_admission=True
             ),
             CacheLevel.L2_REDIS: CacheConfig(
                 enabled=FeatureFlags.REDIS_CACHE_ENABLED if hasattr(FeatureFlags, 'REDIS_CACHE_ENABLED') else True,
@@ -217,7 +74,7 @@ class MultiLevelCacheManager:
                 ttl_seconds=1800,  # 30 minutes
                 eviction_policy=EvictionPolicy.LRU,
                 compression=True,
-                serialization='pickle'
+                serialization='msgpack'
             ),
             CacheLevel.L3_MEMCACHED: CacheConfig(
                 enabled=True,
@@ -225,7 +82,7 @@ class MultiLevelCacheManager:
                 ttl_seconds=3600,  # 1 hour
                 eviction_policy=EvictionPolicy.LRU,
                 compression=True,
-                serialization='pickle'
+                serialization='msgpack'
             ),
             CacheLevel.L4_PERSISTENT: CacheConfig(
                 enabled=True,
@@ -233,12 +90,27 @@ class MultiLevelCacheManager:
                 ttl_seconds=86400,  # 24 hours
                 eviction_policy=EvictionPolicy.TTL,
                 compression=True,
-                serialization='pickle'
+                serialization='msgpack'
             )
         }
         
+        # Header-framed codecs for the byte-oriented levels; entries written
+        # by earlier releases (bare gzip/pickle/json) still decode
+        self.codecs: Dict[CacheLevel, StorageCodec] = {
+            level: self._build_codec(level)
+            for level in (CacheLevel.L2_REDIS, CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT)
+        }
+        
         # Initialize cache layers
-        self.l1_cache = LRUCache(self.cache_configs[CacheLevel.L1_MEMORY].max_size)
+        l1_config = self.cache_configs[CacheLevel.L1_MEMORY]
+        self.l1_cache = ShardedL1Cache(
+            max_entries=l1_config.max_size,
+            max_bytes=l1_config.max_bytes,
+            ttl_seconds=l1_config.ttl_seconds,
+            eviction_policy=l1_config.eviction_policy,
+            shards=l1_config.shards,
+            tinylfu_admission=l1_config.tinylfu_admission
+        )
         self.redis_client: Optional[redis.Redis] = None
         self.memcached_client: Optional[memcache.Client] = None
         self.firestore_client: Optional[firestore.Client] = None
@@ -249,6 +121,23 @@ class MultiLevelCacheManager:
             level: CacheStats(level=level) for level in CacheLevel
         }
         
+        # Stampede protection (in-process single flight, optional Redis lease)
+        self.single_flight_stats = SingleFlightStats()
+        self.single_flight = SingleFlight(self.single_flight_stats)
+        self.distributed_single_flight = getattr(FeatureFlags, 'DISTRIBUTED_SINGLE_FLIGHT_ENABLED', False)
+        self.redis_lease: Optional[RedisLease] = None
+        
+        # Tag/namespace invalidation through generation counters (shared via Redis)
+        self.tag_generations = TagGenerations()
+        
+        # WRITE_BACK: L1 is written synchronously, L2-L4 by a batched background flusher
+        self.write_back = WriteBackBuffer(
+            self._flush_write_back_batch,
+            max_dirty=10000,
+            batch_size=FIRESTORE_BATCH_LIMIT,
+            flush_interval_seconds=1.0
+        )
+        
         # Monitoring
         self.monitoring_client = monitoring_v3.MetricServiceClient()
         
@@ -275,6 +164,8 @@ class MultiLevelCacheManager:
             if self.cache_configs[CacheLevel.L4_PERSISTENT].enabled:
                 await self._init_persistent()
             
+            self.write_back.start()
+            
             logger.info("Multi-Level Cache Manager fully initialized")
             
         except Exception as e:
@@ -301,6 +192,12 @@ class MultiLevelCacheManager:
             
             # Test connection
             await self.redis_client.ping()
+            
+            self.tag_generations.redis_client = self.redis_client
+            
+            if self.distributed_single_flight:
+                self.redis_lease = RedisLease(self.redis_client, stats=self.single_flight_stats)
+            
             logger.info("✅ Redis cache initialized")
             
         except Exception as e:
@@ -349,70 +246,176 @@ class MultiLevelCacheManager:
         try:
             # L1 Cache (Memory) - Fastest
             if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
-                value = await self._get_from_l1(key)
+                value = await self._unwrap(key, await self._get_from_l1(key), CacheLevel.L1_MEMORY)
                 if value is not None:
                     await self._record_hit(CacheLevel.L1_MEMORY, time.time() - start_time)
                     return value
                 else:
                     await self._record_miss(CacheLevel.L1_MEMORY)
             
-            # L2 Cache (Redis) - Fast distributed
-            if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
-                value = await self._get_from_l2(key)
-                if value is not None:
-                    # Promote to L1
-                    await self._promote_to_l1(key, value)
-                    await self._record_hit(CacheLevel.L2_REDIS, time.time() - start_time)
-                    return value
-                else:
-                    await self._record_miss(CacheLevel.L2_REDIS)
-            
-            # L3 Cache (Memcached) - Medium speed
-            if self.cache_configs[CacheLevel.L3_MEMCACHED].enabled and self.memcached_client:
-                value = await self._get_from_l3(key)
-                if value is not None:
-                    # Promote to L2 and L1
-                    await self._promote_to_l2(key, value)
-                    await self._promote_to_l1(key, value)
-                    await self._record_hit(CacheLevel.L3_MEMCACHED, time.time() - start_time)
-                    return value
-                else:
-                    await self._record_miss(CacheLevel.L3_MEMCACHED)
-            
-            # L4 Cache (Persistent) - Slowest but most reliable
-            if self.cache_configs[CacheLevel.L4_PERSISTENT].enabled:
-                value = await self._get_from_l4(key)
-                if value is not None:
-                    # Promote to all upper levels
-                    await self._promote_to_l3(key, value)
-                    await self._promote_to_l2(key, value)
-                    await self._promote_to_l1(key, value)
-                    await self._record_hit(CacheLevel.L4_PERSISTENT, time.time() - start_time)
-                    return value
-                else:
-                    await self._record_miss(CacheLevel.L4_PERSISTENT)
-            
-            return default
+            # Concurrent misses on the same key share one L2-L4 lookup
+            value = await self.single_flight.do(
+                ('lookup', key), lambda: self._get_from_lower_levels(key, start_time)
+            )
+            return default if value is None else value
             
         except Exception as e:
             logger.error(f"Cache get operation failed for key {key}: {e}")
             return default
     
+    async def _get_from_lower_levels(self, key: str, start_time: float) -> Any:
+        """L2 -> L3 -> L4 fall-through with promotion to the faster levels"""
+        # Read-your-writes for WRITE_BACK entries evicted from L1 before their flush
+        stored = self.write_back.pending_value(key)
+        value = await self._unwrap(key, stored, CacheLevel.L1_MEMORY)
+        if value is not None:
+            await self._promote_to_l1(key, stored)
+            return value
+        
+        # L2 Cache (Redis) - Fast distributed
+        if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
+            stored = await self._get_from_l2(key)
+            value = await self._unwrap(key, stored, CacheLevel.L2_REDIS)
+            if value is not None:
+                # Promote to L1
+                await self._promote_to_l1(key, stored)
+                await self._record_hit(CacheLevel.L2_REDIS, time.time() - start_time)
+                return value
+            else:
+                await self._record_miss(CacheLevel.L2_REDIS)
+        
+        # L3 Cache (Memcached) - Medium speed
+        if self.cache_configs[CacheLevel.L3_MEMCACHED].enabled and self.memcached_client:
+            stored = await self._get_from_l3(key)
+            value = await self._unwrap(key, stored, CacheLevel.L3_MEMCACHED)
+            if value is not None:
+                # Promote to L2 and L1
+                await self._promote_to_l2(key, stored)
+                await self._promote_to_l1(key, stored)
+                await self._record_hit(CacheLevel.L3_MEMCACHED, time.time() - start_time)
+                return value
+            else:
+                await self._record_miss(CacheLevel.L3_MEMCACHED)
+        
+        # L4 Cache (Persistent) - Slowest but most reliable
+        if self.cache_configs[CacheLevel.L4_PERSISTENT].enabled:
+            stored = await self._get_from_l4(key)
+            value = await self._unwrap(key, stored, CacheLevel.L4_PERSISTENT)
+            if value is not None:
+                # Promote to all upper levels
+                await self._promote_to_l3(key, stored)
+                await self._promote_to_l2(key, stored)
+                await self._promote_to_l1(key, stored)
+                await self._record_hit(CacheLevel.L4_PERSISTENT, time.time() - start_time)
+                return value
+            else:
+                await self._record_miss(CacheLevel.L4_PERSISTENT)
+        
+        return None
+    
+    async def get_or_compute(self, key: str, compute_fn: Callable[[], Any],
+                             ttl_seconds: Optional[int] = None,
+                             strategy: CacheStrategy = CacheStrategy.WRITE_THROUGH,
+                             beta: float = 1.0,
+                             tags: Optional[Iterable[str]] = None) -> Any:
+        """
+        Get value or compute it exactly once per key under concurrency.
+        
+        L1 hits may trigger an XFetch early refresh in the background; misses
+        are coalesced in-process and, when enabled, across instances through
+        a Redis lease so only one caller recomputes and writes the value.
+        """
+        start_time = time.time()
+        
+        if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
+            entry = self.l1_cache.get_entry(key, touch=True)
+            value = await self._unwrap(key, entry.value, CacheLevel.L1_MEMORY) if entry else None
+            if value is not None:
+                await self._record_hit(CacheLevel.L1_MEMORY, time.time() - start_time)
+                if xfetch_should_refresh(entry.created_at, entry.ttl_seconds,
+                                         entry.compute_seconds, beta=beta):
+                    self.single_flight.refresh_in_background(
+                        ('compute', key),
+                        lambda: self._compute_and_store(key, compute_fn, ttl_seconds, strategy, tags)
+                    )
+                return value
+            await self._record_miss(CacheLevel.L1_MEMORY)
+        
+        async def load():
+            value = await self._get_from_lower_levels(key, start_time)
+            if value is not None:
+                return value
+            return await self._compute_with_lease(key, compute_fn, ttl_seconds, strategy, tags)
+        
+        return await self.single_flight.do(('compute', key), load)
+    
+    async def _compute_with_lease(self, key: str, compute_fn: Callable[[], Any],
+                                  ttl_seconds: Optional[int], strategy: CacheStrategy,
+                                  tags: Optional[Iterable[str]] = None) -> Any:
+        """Compute under a Redis lease so other instances wait instead of recomputing"""
+        lease = self.redis_lease if self.redis_client else None
+        if lease is None:
+            return await self._compute_and_store(key, compute_fn, ttl_seconds, strategy, tags)
+        
+        try:
+            token = await lease.acquire(key)
+        except Exception as e:
+            logger.debug(f"Lease acquire failed for {key}: {e}")
+            return await self._compute_and_store(key, compute_fn, ttl_seconds, strategy, tags)
+        
+        if token:
+            try:
+                return await self._compute_and_store(key, compute_fn, ttl_seconds, strategy, tags)
+            finally:
+                await lease.release(key, token)
+        
+        stored = await lease.wait_for_value(key, lambda: self._get_from_l2(key))
+        value = await self._unwrap(key, stored, CacheLevel.L2_REDIS)
+        if value is not None:
+            await self._promote_to_l1(key, stored)
+            return value
+        return await self._compute_and_store(key, compute_fn, ttl_seconds, strategy, tags)
+    
+    async def _compute_and_store(self, key: str, compute_fn: Callable[[], Any],
+                                 ttl_seconds: Optional[int], strategy: CacheStrategy,
+                                 tags: Optional[Iterable[str]] = None) -> Any:
+        """Run the loader and store the result with its measured recompute cost"""
+        started = time.perf_counter()
+        value = compute_fn()
+        if inspect.isawaitable(value):
+            value = await value
+        compute_seconds = time.perf_counter() - started
+        
+        if value is not None:
+            await self.set(key, value, ttl_seconds, strategy, compute_seconds=compute_seconds,
+                           tags=tags)
+        return value
+    
     @performance_monitor
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None, 
-                 strategy: CacheStrategy = CacheStrategy.WRITE_THROUGH) -> bool:
+                 strategy: CacheStrategy = CacheStrategy.WRITE_THROUGH,
+                 compute_seconds: float = 0.0,
+                 tags: Optional[Iterable[str]] = None) -> bool:
         """
         Set value in cache with specified strategy
+        
+        ``tags`` (e.g. from ``cache_tags(session_id=...)``) and the key's
+        namespace are stamped with their current generation so the entry can
+        later be invalidated in O(1) through ``invalidate_tags``.
         """
         try:
             success = True
+            value = await self._tag_value(key, value, tags)
             
             if strategy == CacheStrategy.WRITE_THROUGH:
+                # An older pending write-back must not overwrite this value later
+                self.write_back.discard(key)
+                
                 # Write to all levels simultaneously
                 tasks = []
                 
                 if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
-                    tasks.append(self._set_in_l1(key, value, ttl_seconds))
+                    tasks.append(self._set_in_l1(key, value, ttl_seconds, compute_seconds))
                 
                 if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
                     tasks.append(self._set_in_l2(key, value, ttl_seconds))
@@ -426,10 +429,17 @@ class MultiLevelCacheManager:
                 results = await asyncio.gather(*tasks, return_exceptions=True)
                 success = all(r is True or not isinstance(r, Exception) for r in results)
                 
+            elif strategy == CacheStrategy.WRITE_BACK:
+                # Write L1 now; lower levels are flushed asynchronously in batches
+                if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
+                    success = await self._set_in_l1(key, value, ttl_seconds, compute_seconds)
+                if self._lower_levels_writable():
+                    await self.write_back.put(key, value, ttl_seconds)
+                
             elif strategy == CacheStrategy.CACHE_ASIDE:
                 # Only write to L1 (manual management)
                 if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
-                    success = await self._set_in_l1(key, value, ttl_seconds)
+                    success = await self._set_in_l1(key, value, ttl_seconds, compute_seconds)
             
             # Record statistics
             for level in CacheLevel:
@@ -445,6 +455,9 @@ class MultiLevelCacheManager:
     async def delete(self, key: str) -> bool:
         """Delete from all cache levels"""
         try:
+            # A pending write-back must not resurrect the key after deletion
+            self.write_back.discard(key)
+            
             tasks = []
             
             if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
@@ -474,26 +487,54 @@ class MultiLevelCacheManager:
             logger.error(f"Cache delete operation failed for key {key}: {e}")
             return False
     
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate every entry written with any of ``tags`` on all levels.
+        
+        O(1) per tag: only the tag generation is bumped; stale entries are
+        rejected on read and expire through their TTL. Returns the number of
+        tags invalidated on every instance; the others hold in this process
+        only until Redis accepts the new generation.
+        """
+        shared = 0
+        for tag in tags:
+            if await self.tag_generations.bump(tag):
+                shared += 1
+        if tags:
+            logger.info(f"Invalidated cache tags: {', '.join(tags)}")
+        if shared < len(tags):
+            logger.warning(f"{len(tags) - shared} tag invalidations not yet shared with other instances")
+        return shared
+    
+    async def invalidate_namespace(self, namespace: str) -> int:
+        """Invalidate all keys of the form ``<namespace>:...`` on all levels in O(1)"""
+        return await self.invalidate_tags(namespace_tag(namespace))
+    
     async def invalidate_by_pattern(self, pattern: str) -> int:
-        """Invalidate cache entries matching pattern"""
+        """
+        Invalidate cache entries matching pattern
+        
+        Scans L1 and Redis and skips L3/L4; prefer ``invalidate_tags`` or
+        ``invalidate_namespace`` which are O(1) on every level.
+        """
         invalidated_count = 0
         
         try:
+            self.write_back.discard_where(lambda key: self._match_pattern(key, pattern))
+            
             # L1 - scan in-memory keys
             if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
-                l1_keys = []
-                async with self.l1_cache._lock:
-                    for key in self.l1_cache._cache.keys():
-                        if self._match_pattern(key, pattern):
-                            l1_keys.append(key)
+                l1_keys = [key for key in self.l1_cache.keys() if self._match_pattern(key, pattern)]
                 
                 for key in l1_keys:
-                    await self.l1_cache.delete(key)
-                    invalidated_count += 1
+                    if self.l1_cache.delete(key):
+                        invalidated_count += 1
             
             # L2 - Redis pattern scan
             if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
                 async for key in self.redis_client.scan_iter(match=pattern):
+                    if self._is_tag_counter(key):
+                        continue
                     await self.redis_client.delete(key)
                     invalidated_count += 1
             
@@ -510,15 +551,20 @@ class MultiLevelCacheManager:
     # L1 Cache Operations (Memory)
     async def _get_from_l1(self, key: str) -> Any:
         """Get from L1 memory cache"""
-        return await self.l1_cache.get(key)
+        return self.l1_cache.get(key)
     
-    async def _set_in_l1(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> bool:
+    async def _set_in_l1(self, key: str, value: Any, ttl_seconds: Optional[int] = None,
+                         compute_seconds: float = 0.0) -> bool:
         """Set in L1 memory cache"""
-        return await self.l1_cache.set(key, value, ttl_seconds)
+        size_bytes = None
+        if isinstance(value, TaggedValue):
+            size_bytes = estimate_size(value.value) + 64 * len(value.generations)
+        return self.l1_cache.set(key, value, ttl_seconds, size_bytes=size_bytes,
+                                 compute_seconds=compute_seconds)
     
     async def _delete_from_l1(self, key: str) -> bool:
         """Delete from L1 memory cache"""
-        return await self.l1_cache.delete(key)
+        return self.l1_cache.delete(key)
     
     async def _promote_to_l1(self, key: str, value: Any):
         """Promote value to L1 cache"""
@@ -536,15 +582,7 @@ class MultiLevelCacheManager:
             
             data = await self.redis_client.get(key)
             if data:
-                # Deserialize based on configuration
-                config = self.cache_configs[CacheLevel.L2_REDIS]
-                if config.compression:
-                    data = gzip.decompress(data)
-                
-                if config.serialization == 'pickle':
-                    return pickle.loads(data)
-                elif config.serialization == 'json':
-                    return json.loads(data.decode('utf-8'))
+                return self._deserialize_from_storage(CacheLevel.L2_REDIS, data)
                 
             return None
             
@@ -559,18 +597,7 @@ class MultiLevelCacheManager:
                 return False
             
             config = self.cache_configs[CacheLevel.L2_REDIS]
-            
-            # Serialize based on configuration
-            if config.serialization == 'pickle':
-                data = pickle.dumps(value)
-            elif config.serialization == 'json':
-                data = json.dumps(value, default=str).encode('utf-8')
-            else:
-                data = str(value).encode('utf-8')
-            
-            # Compress if enabled
-            if config.compression:
-                data = gzip.compress(data)
+            data = self._serialize_for_storage(CacheLevel.L2_REDIS, value)
             
             # Set with TTL
             ttl = ttl_seconds or config.ttl_seconds
@@ -582,6 +609,18 @@ class MultiLevelCacheManager:
             logger.debug(f"L2 cache set failed: {e}")
             return False
     
+    async def _set_many_in_l2(self, entries: List[DirtyEntry]):
+        """Write a batch to Redis in one non-transactional pipeline round trip"""
+        config = self.cache_configs[CacheLevel.L2_REDIS]
+        pipe = self.redis_client.pipeline(transaction=False)
+        for entry in entries:
+            pipe.setex(
+                entry.key,
+                entry.ttl_seconds or config.ttl_seconds,
+                self._serialize_for_storage(CacheLevel.L2_REDIS, entry.value)
+            )
+        await pipe.execute()
+    
     async def _delete_from_l2(self, key: str) -> bool:
         """Delete from L2 Redis cache"""
         try:
@@ -602,21 +641,82 @@ class MultiLevelCacheManager:
         except Exception as e:
             logger.debug(f"Failed to promote to L2: {e}")
     
-    # L3 Cache Operations (Memcached) - Simplified implementation
+    # L3 Cache Operations (Memcached)
+    # The client is expected to expose the memcache protocol calls
+    # (get/set/delete/set_multi); anything else behaves as a miss.
     async def _get_from_l3(self, key: str) -> Any:
         """Get from L3 Memcached cache"""
-        # Placeholder for GCP Memorystore Memcached implementation
-        return None
+        try:
+            if not hasattr(self.memcached_client, 'get'):
+                return None
+            
+            data = await asyncio.get_event_loop().run_in_executor(
+                None, self.memcached_client.get, key
+            )
+            if data:
+                return self._deserialize_from_storage(CacheLevel.L3_MEMCACHED, data)
+            return None
+            
+        except Exception as e:
+            logger.debug(f"L3 cache get failed: {e}")
+            return None
     
     async def _set_in_l3(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> bool:
         """Set in L3 Memcached cache"""
-        # Placeholder for GCP Memorystore Memcached implementation
-        return False
+        try:
+            if not hasattr(self.memcached_client, 'set'):
+                return False
+            
+            config = self.cache_configs[CacheLevel.L3_MEMCACHED]
+            data = self._serialize_for_storage(CacheLevel.L3_MEMCACHED, value)
+            result = await asyncio.get_event_loop().run_in_executor(
+                None, functools.partial(self.memcached_client.set, key, data,
+                                        time=ttl_seconds or config.ttl_seconds)
+            )
+            return bool(result)
+            
+        except Exception as e:
+            logger.debug(f"L3 cache set failed: {e}")
+            return False
+    
+    async def _set_many_in_l3(self, entries: List[DirtyEntry]):
+        """Write a batch to Memcached with one set_multi call per TTL"""
+        config = self.cache_configs[CacheLevel.L3_MEMCACHED]
+        by_ttl: Dict[int, Dict[str, bytes]] = {}
+        for entry in entries:
+            ttl = entry.ttl_seconds or config.ttl_seconds
+            by_ttl.setdefault(ttl, {})[entry.key] = self._serialize_for_storage(
+                CacheLevel.L3_MEMCACHED, entry.value
+            )
+        
+        loop = asyncio.get_event_loop()
+        for ttl, mapping in by_ttl.items():
+            if hasattr(self.memcached_client, 'set_multi'):
+                failed = await loop.run_in_executor(
+                    None, functools.partial(self.memcached_client.set_multi, mapping, time=ttl)
+                )
+                if failed:
+                    raise RuntimeError(f"Memcached set_multi failed for {len(failed)} keys")
+            else:
+                for key, data in mapping.items():
+                    await loop.run_in_executor(
+                        None, functools.partial(self.memcached_client.set, key, data, time=ttl)
+                    )
     
     async def _delete_from_l3(self, key: str) -> bool:
         """Delete from L3 Memcached cache"""
-        # Placeholder for GCP Memorystore Memcached implementation
-        return False
+        try:
+            if not hasattr(self.memcached_client, 'delete'):
+                return False
+            
+            result = await asyncio.get_event_loop().run_in_executor(
+                None, self.memcached_client.delete, key
+            )
+            return bool(result)
+            
+        except Exception as e:
+            logger.debug(f"L3 cache delete failed: {e}")
+            return False
     
     async def _promote_to_l3(self, key: str, value: Any):
         """Promote value to L3 cache"""
@@ -633,9 +733,7 @@ class MultiLevelCacheManager:
                 return None
             
             # Use Firestore for structured data caching
-            doc_ref = self.firestore_client.collection('cache_l4').document(
-                hashlib.md5(key.encode()).hexdigest()
-            )
+            doc_ref = self._l4_document(key)
             
             doc = await asyncio.get_event_loop().run_in_executor(None, doc_ref.get)
             
@@ -656,11 +754,15 @@ class MultiLevelCacheManager:
                 # Deserialize value
                 serialized_value = data.get('value')
                 if serialized_value:
-                    config = self.cache_configs[CacheLevel.L4_PERSISTENT]
+                    if isinstance(serialized_value, bytes):
+                        return self._deserialize_from_storage(CacheLevel.L4_PERSISTENT,
+                                                              serialized_value)
                     
-                    if config.serialization == 'pickle':
+                    # Documents written before the codec layer store text
+                    serialization = data.get('serialization', 'pickle')
+                    if serialization == 'pickle':
                         return pickle.loads(serialized_value.encode('latin-1'))
-                    elif config.serialization == 'json':
+                    elif serialization == 'json':
                         return json.loads(serialized_value)
             
             return None
@@ -675,30 +777,10 @@ class MultiLevelCacheManager:
             if not self.firestore_client:
                 return False
             
-            config = self.cache_configs[CacheLevel.L4_PERSISTENT]
-            
-            # Serialize value
-            if config.serialization == 'pickle':
-                serialized_value = pickle.dumps(value).decode('latin-1')
-            elif config.serialization == 'json':
-                serialized_value = json.dumps(value, default=str)
-            else:
-                serialized_value = str(value)
-            
-            # Prepare document
-            doc_data = {
-                'key': key,
-                'value': serialized_value,
-                'created_at': datetime.now(timezone.utc),
-                'ttl_seconds': ttl_seconds or config.ttl_seconds,
-                'serialization': config.serialization
-            }
+            doc_ref = self._l4_document(key)
+            doc_data = self._l4_document_data(key, value, ttl_seconds)
             
             # Store in Firestore
-            doc_ref = self.firestore_client.collection('cache_l4').document(
-                hashlib.md5(key.encode()).hexdigest()
-            )
-            
             await asyncio.get_event_loop().run_in_executor(
                 None, doc_ref.set, doc_data
             )
@@ -715,9 +797,7 @@ class MultiLevelCacheManager:
             if not self.firestore_client:
                 return False
             
-            doc_ref = self.firestore_client.collection('cache_l4').document(
-                hashlib.md5(key.encode()).hexdigest()
-            )
+            doc_ref = self._l4_document(key)
             
             await asyncio.get_event_loop().run_in_executor(None, doc_ref.delete)
             return True
@@ -726,6 +806,108 @@ class MultiLevelCacheManager:
             logger.debug(f"L4 cache delete failed: {e}")
             return False
     
+    async def _set_many_in_l4(self, entries: List[DirtyEntry]):
+        """Write a batch to Firestore using batched writes of at most 500 documents"""
+        loop = asyncio.get_event_loop()
+        for start in range(0, len(entries), FIRESTORE_BATCH_LIMIT):
+            batch = self.firestore_client.batch()
+            for entry in entries[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.set(
+                    self._l4_document(entry.key),
+                    self._l4_document_data(entry.key, entry.value, entry.ttl_seconds)
+                )
+            await loop.run_in_executor(None, batch.commit)
+    
+    def _l4_document(self, key: str):
+        return self.firestore_client.collection('cache_l4').document(
+            hashlib.md5(key.encode()).hexdigest()
+        )
+    
+    def _l4_document_data(self, key: str, value: Any, ttl_seconds: Optional[int]) -> Dict[str, Any]:
+        config = self.cache_configs[CacheLevel.L4_PERSISTENT]
+        
+        return {
+            'key': key,
+            'value': self._serialize_for_storage(CacheLevel.L4_PERSISTENT, value),
+            'created_at': datetime.now(timezone.utc),
+            'ttl_seconds': ttl_seconds or config.ttl_seconds,
+            'serialization': 'codec'
+        }
+    
+    # Serialization shared by L2, L3 and L4
+    def _build_codec(self, level: CacheLevel) -> StorageCodec:
+        config = self.cache_configs[level]
+        return StorageCodec(
+            tier=level.name.lower(),
+            codec=config.serialization,
+            compression='zstd' if config.compression else None,
+            dictionary_id=cache_dictionary_id() if config.compression else None,
+            legacy_decoder=functools.partial(self._legacy_deserialize, level)
+        )
+    
+    def _serialize_for_storage(self, level: CacheLevel, value: Any) -> bytes:
+        return self.codecs[level].encode(value)
+    
+    def _deserialize_from_storage(self, level: CacheLevel, data: bytes) -> Any:
+        return self.codecs[level].decode(data)
+    
+    def _legacy_deserialize(self, level: CacheLevel, data: bytes) -> Any:
+        """Entries written before the codec header existed (gzip + pickle/json)"""
+        if data[:2] == b'\x1f\x8b':
+            data = gzip.decompress(data)
+        if data[:1] == b'\x80':
+            return pickle.loads(data)
+        return json.loads(data.decode('utf-8'))
+    
+    # Tag generations
+    async def _tag_value(self, key: str, value: Any,
+                         tags: Optional[Iterable[str]] = None) -> Any:
+        """Wrap value with the current generations of its namespace and tags"""
+        names = list(tags or ())
+        namespace = namespace_of(key)
+        if namespace:
+            names.insert(0, namespace_tag(namespace))
+        if not names:
+            return value
+        return TaggedValue(value, await self.tag_generations.stamp(names))
+    
+    async def _unwrap(self, key: str, stored: Any, level: CacheLevel) -> Any:
+        """Return the cached value, or None if one of its tags was invalidated"""
+        if not isinstance(stored, TaggedValue):
+            return stored
+        if await self.tag_generations.is_current(stored.generations):
+            return stored.value
+        if level == CacheLevel.L1_MEMORY:
+            # Free the memory now; lower levels let the stale entry expire
+            self.l1_cache.delete(key)
+        return None
+    
+    # Write-back flushing
+    def _lower_levels_writable(self) -> bool:
+        return bool(
+            (self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client) or
+            (self.cache_configs[CacheLevel.L3_MEMCACHED].enabled and self.memcached_client) or
+            (self.cache_configs[CacheLevel.L4_PERSISTENT].enabled and self.firestore_client)
+        )
+    
+    async def _flush_write_back_batch(self, entries: List[DirtyEntry]):
+        """Persist a write-back batch to L2-L4; raising makes the buffer retry it"""
+        tasks = []
+        
+        if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
+            tasks.append(self._set_many_in_l2(entries))
+        
+        if self.cache_configs[CacheLevel.L3_MEMCACHED].enabled and self.memcached_client:
+            tasks.append(self._set_many_in_l3(entries))
+        
+        if self.cache_configs[CacheLevel.L4_PERSISTENT].enabled and self.firestore_client:
+            tasks.append(self._set_many_in_l4(entries))
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    
     # Statistics and monitoring
     async def _record_hit(self, level: CacheLevel, response_time: float):
         """Record cache hit statistics"""
@@ -839,10 +1021,27 @@ class MultiLevelCacheManager:
                     'total_items': await self._get_level_item_count(level)
                 }
                 
+                if level == CacheLevel.L1_MEMORY:
+                    l1_stats = self.l1_cache.get_stats()
+                    stats.evictions = l1_stats['evictions']
+                    stats.memory_usage_bytes = l1_stats['memory_usage_bytes']
+                    level_stats.update({
+                        'evictions': l1_stats['evictions'],
+                        'admission_rejections': l1_stats['rejections'],
+                        'memory_usage_bytes': l1_stats['memory_usage_bytes'],
+                        'max_bytes': l1_stats['max_bytes'],
+                        'eviction_policy': l1_stats['policy']
+                    })
+                
                 stats_summary['levels'][level.name] = level_stats
                 total_hits += stats.hits
                 total_misses += stats.misses
         
+        stats_summary['single_flight'] = self.single_flight_stats.to_dict()
+        stats_summary['write_back'] = self.write_back.stats.to_dict()
+        stats_summary['tags'] = self.tag_generations.get_stats()
+        stats_summary['serialization'] = get_serialization_stats()
+        
         # Overall statistics
         total_ops = total_hits + total_misses
         if total_ops > 0:
@@ -857,7 +1056,7 @@ class MultiLevelCacheManager:
         """Get current item count for a cache level"""
         try:
             if level == CacheLevel.L1_MEMORY:
-                return await self.l1_cache.size()
+                return self.l1_cache.size()
             elif level == CacheLevel.L2_REDIS and self.redis_client:
                 return await self.redis_client.dbsize()
             else:
@@ -869,30 +1068,62 @@ class MultiLevelCacheManager:
         """Clear all cache levels"""
         tasks = []
         
+        # Pending writes would otherwise be served and flushed back afterwards
+        self.write_back.clear()
+        
         if self.cache_configs[CacheLevel.L1_MEMORY].enabled:
-            tasks.append(self.l1_cache.clear())
+            self.l1_cache.clear()
         
         if self.cache_configs[CacheLevel.L2_REDIS].enabled and self.redis_client:
-            tasks.append(self.redis_client.flushdb())
+            tasks.append(self._clear_redis())
         
         await asyncio.gather(*tasks, return_exceptions=True)
         
         logger.info("All cache levels cleared")
     
+    def _is_tag_counter(self, key) -> bool:
+        if isinstance(key, bytes):
+            key = key.decode('utf-8', 'replace')
+        return key.startswith(self.tag_generations.key_prefix)
+    
+    async def _clear_redis(self, batch_size: int = 500):
+        """Delete every Redis key except the tag generation counters
+        
+        FLUSHDB would reset the counters to 0 and revalidate stale entries
+        still stamped with generation 0 on L3/L4.
+        """
+        batch = []
+        async for key in self.redis_client.scan_iter(count=batch_size):
+            if self._is_tag_counter(key):
+                continue
+            batch.append(key)
+            if len(batch) >= batch_size:
+                await self.redis_client.delete(*batch)
+                batch = []
+        if batch:
+            await self.redis_client.delete(*batch)
+    
     async def shutdown(self):
         """Gracefully shutdown cache manager"""
         logger.info("Shutting down Multi-Level Cache Manager...")
         
+        # Let in-flight early refreshes finish before closing connections
+        await self.single_flight.drain()
+        
+        # Flush pending write-back entries while the lower levels are still reachable
+        await self.write_back.stop(flush=True)
+        
         # Close Redis connection
         if self.redis_client:
             await self.redis_client.close()
         
         # Clear memory cache
-        await self.l1_cache.clear()
+        self.l1_cache.clear()
         
         logger.info("Multi-Level Cache Manager shutdown completed")
 
 __all__ = [
     'MultiLevelCacheManager', 'CacheLevel', 'CacheStrategy', 
-    'CacheConfig', 'CacheStats', 'EvictionPolicy'
+    'CacheConfig', 'CacheItem', 'CacheStats', 'EvictionPolicy', 'ShardedL1Cache',
+    'WriteBackBuffer', 'TagGenerations', 'cache_tags'
 ]
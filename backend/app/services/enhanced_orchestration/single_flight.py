@@ -0,0 +1,10 @@
+"""
+Cache Stampede Protection for the Multi-Level Cache Manager
+
+Re-exports core.single_flight, where the implementation lives so that core
+modules (memoization) can use it without depending on services.
+"""
+
+from ...core.single_flight import SingleFlight, SingleFlightStats, RedisLease, xfetch_should_refresh
+
+__all__ = ['SingleFlight', 'SingleFlightStats', 'RedisLease', 'xfetch_should_refresh']
@@ -0,0 +1,254 @@
+"""
+Write-Back Buffer for the Multi-Level Cache Manager
+
+Bounded dirty set with a background flusher:
+- Repeated writes to a key are coalesced (last write wins)
+- Dirty entries are flushed in batches through a single sink call, which the
+  cache manager maps to Redis pipelines, Memcached set_multi and Firestore
+  batched writes
+- Writers wait (backpressure) when the dirty set is full
+- Failed batches are re-queued unless a newer write or a discard superseded
+  them, so a crash in the sink never loses the latest value of a key and
+  never restores a deleted one
+- stop() drains everything that is still dirty (flush-on-shutdown)
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DirtyEntry:
+    """Pending write for one key"""
+    key: str
+    value: Any
+    ttl_seconds: Optional[int]
+    attempts: int = 0
+
+
+@dataclass
+class WriteBackStats:
+    """Write-back counters"""
+    writes: int = 0
+    coalesced_writes: int = 0
+    flushed_entries: int = 0
+    flush_batches: int = 0
+    flush_failures: int = 0
+    requeued_entries: int = 0
+    dropped_entries: int = 0
+    backpressure_waits: int = 0
+    pending_entries: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class WriteBackBuffer:
+    """Coalescing dirty set flushed asynchronously in batches"""
+
+    def __init__(self,
+                 flush_fn: Callable[[List[DirtyEntry]], Awaitable[None]],
+                 max_dirty: int = 10000,
+                 batch_size: int = 500,
+                 flush_interval_seconds: float = 1.0,
+                 max_attempts: int = 5):
+        self.flush_fn = flush_fn
+        self.max_dirty = max(1, max_dirty)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.stats = WriteBackStats()
+
+        self._dirty: "OrderedDict[str, DirtyEntry]" = OrderedDict()
+        self._in_flight: Dict[str, DirtyEntry] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._space: Optional[asyncio.Condition] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _ensure_primitives(self):
+        # Created lazily so the buffer can be constructed outside a running loop
+        if self._space is None:
+            self._flush_lock = asyncio.Lock()
+            self._space = asyncio.Condition()
+            self._wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def start(self):
+        """Start the background flusher (idempotent)"""
+        self._ensure_primitives()
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.ensure_future(self._run())
+
+    async def put(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        """Mark a key dirty; waits for space when the dirty set is full"""
+        self._ensure_primitives()
+        if not self.running and not self._stopping:
+            self.start()
+
+        self.stats.writes += 1
+        existing = self._dirty.get(key)
+        if existing is not None:
+            # Coalesce: keep queue position so hot keys are not starved
+            existing.value = value
+            existing.ttl_seconds = ttl_seconds
+            existing.attempts = 0
+            self.stats.coalesced_writes += 1
+            return
+
+        if len(self._dirty) >= self.max_dirty:
+            self.stats.backpressure_waits += 1
+            self._wakeup.set()
+            async with self._space:
+                await self._space.wait_for(lambda: len(self._dirty) < self.max_dirty)
+            # A concurrent writer may have dirtied the key meanwhile
+            existing = self._dirty.get(key)
+            if existing is not None:
+                existing.value = value
+                existing.ttl_seconds = ttl_seconds
+                self.stats.coalesced_writes += 1
+                return
+
+        self._dirty[key] = DirtyEntry(key, value, ttl_seconds)
+        self.stats.pending_entries = len(self._dirty)
+        if len(self._dirty) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending_value(self, key: str, default: Any = None) -> Any:
+        """Latest not-yet-persisted value for read-your-writes on L1 misses"""
+        entry = self._dirty.get(key) or self._in_flight.get(key)
+        return default if entry is None else entry.value
+
+    def discard(self, key: str) -> bool:
+        """Drop a pending write (e.g. on delete/invalidation)"""
+        entry = self._dirty.pop(key, None)
+        # An in-flight write of the key is not re-queued if its flush fails
+        self._in_flight.pop(key, None)
+        self.stats.pending_entries = len(self._dirty)
+        if entry is not None:
+            self._notify_space()
+        return entry is not None
+
+    def discard_where(self, predicate: Callable[[str], bool]) -> int:
+        keys = [key for key in self._dirty if predicate(key)]
+        for key in keys:
+            del self._dirty[key]
+        for key in [key for key in self._in_flight if predicate(key)]:
+            del self._in_flight[key]
+        self.stats.pending_entries = len(self._dirty)
+        if keys:
+            self._notify_space()
+        return len(keys)
+
+    def clear(self) -> int:
+        """Drop every pending and in-flight write (e.g. when all caches are cleared)"""
+        return self.discard_where(lambda key: True)
+
+    def _notify_space(self):
+        if self._space is None:
+            return
+
+        async def notify():
+            async with self._space:
+                self._space.notify_all()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        asyncio.ensure_future(notify())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-back flush loop error: {e}")
+
+    async def flush(self) -> int:
+        """Flush all currently dirty entries in batches; returns entries flushed"""
+        self._ensure_primitives()
+        flushed = 0
+        async with self._flush_lock:
+            # Bound the pass so a failing sink cannot spin forever
+            passes = max(1, -(-len(self._dirty) // self.batch_size))
+            for _ in range(passes):
+                if not self._dirty:
+                    break
+                flushed += await self._flush_batch()
+        return flushed
+
+    async def _flush_batch(self) -> int:
+        batch: List[DirtyEntry] = []
+        while self._dirty and len(batch) < self.batch_size:
+            _, entry = self._dirty.popitem(last=False)
+            self._in_flight[entry.key] = entry
+            batch.append(entry)
+
+        try:
+            await self.flush_fn(batch)
+        except Exception as e:
+            self.stats.flush_failures += 1
+            logger.warning(f"Write-back flush of {len(batch)} entries failed: {e}")
+            self._requeue(batch)
+            return 0
+        else:
+            self.stats.flush_batches += 1
+            self.stats.flushed_entries += len(batch)
+            return len(batch)
+        finally:
+            for entry in batch:
+                if self._in_flight.get(entry.key) is entry:
+                    del self._in_flight[entry.key]
+            self.stats.pending_entries = len(self._dirty)
+            async with self._space:
+                self._space.notify_all()
+
+    def _requeue(self, batch: List[DirtyEntry]):
+        # Re-insert at the front in original order; newer writes and
+        # discards (which leave the key dirty or no longer in flight) win
+        for entry in reversed(batch):
+            if entry.key in self._dirty or self._in_flight.get(entry.key) is not entry:
+                continue
+            entry.attempts += 1
+            if entry.attempts >= self.max_attempts:
+                self.stats.dropped_entries += 1
+                logger.error(f"Dropping write-back for {entry.key} after {entry.attempts} attempts")
+                continue
+            self._dirty[entry.key] = entry
+            self._dirty.move_to_end(entry.key, last=False)
+            self.stats.requeued_entries += 1
+
+    async def stop(self, flush: bool = True):
+        """Stop the flusher and (by default) persist everything still dirty"""
+        self._stopping = True
+        if self._task is not None:
+            if self._wakeup is not None:
+                self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if flush and self._dirty:
+            await self.flush()
+
+
+__all__ = ['WriteBackBuffer', 'WriteBackStats', 'DirtyEntry']
@@ -3,11 +3,12 @@
 import asyncio
 import logging
 import math
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Mapping, Optional, Union
 from datetime import datetime, timezone
 from dataclasses import dataclass
 import numpy as np
 
+from ..core.formula_compiler import compile_formula
 from ..models.analysis_models import FactorCalculation
 from ..middleware.monitoring import performance_monitor
 
@@ -451,20 +452,22 @@ class FormulaEngine:
         """Execute the formula calculation with step tracking"""
         
         try:
-            # Replace variables in formula with actual values
-            formula_with_values = formula
+            compiled = compile_formula(formula)
             
-            for var_name, value in input_values.items():
-                formula_with_values = formula_with_values.replace(var_name, str(value))
+            for var_name in compiled.variables:
                 calculation_steps.append({
                     'step': f'substitute_{var_name}',
                     'variable': var_name,
-                    'value': value,
-                    'formula': formula_with_values
+                    'value': input_values.get(var_name)
                 })
             
-            # Safe evaluation of mathematical expressions
-            result = self._safe_eval_formula(formula_with_values, calculation_steps)
+            result = compiled(input_values)
+            
+            calculation_steps.append({
+                'step': 'final_evaluation',
+                'formula': formula,
+                'result': result
+            })
             
             # Normalize result to 0-1 range
             normalized_result = max(0.0, min(1.0, result))
@@ -485,96 +488,23 @@ class FormulaEngine:
             })
             return 0.0
     
-    def _safe_eval_formula(self, 
-                          formula: str, 
-                          calculation_steps: List[Dict[str, Any]]) -> float:
-        """Safely evaluate mathematical formula"""
+    def evaluate_formula(self, formula: str, input_values: Mapping[str, Any]) -> Union[float, np.ndarray]:
+        """Evaluate a formula on scalar or array inputs, normalized to 0-1
         
-        try:
-            # Remove spaces
-            formula = formula.replace(' ', '')
-            
-            # Handle parentheses
-            while '(' in formula and ')' in formula:
-                start = formula.rfind('(')
-                end = formula.find(')', start)
-                
-                if start != -1 and end != -1:
-                    sub_formula = formula[start+1:end]
-                    sub_result = self._evaluate_simple_expression(sub_formula)
-                    
-                    calculation_steps.append({
-                        'step': 'evaluate_subexpression',
-                        'sub_formula': sub_formula,
-                        'result': sub_result
-                    })
-                    
-                    formula = formula[:start] + str(sub_result) + formula[end+1:]
-                else:
-                    break
-            
-            # Evaluate final expression
-            final_result = self._evaluate_simple_expression(formula)
-            
-            calculation_steps.append({
-                'step': 'final_evaluation',
-                'formula': formula,
-                'result': final_result
-            })
-            
-            return final_result
-            
-        except Exception as e:
-            logger.error(f"Safe formula evaluation failed: {e}")
-            return 0.0
+        Array inputs (e.g. one entry per Monte Carlo sample) are evaluated
+        in one vectorized call; scalars broadcast against them. Raises
+        FormulaError for unsupported formulas or missing inputs.
+        """
+        result = compile_formula(formula)(input_values)
+        if type(result) is float:
+            return max(0.0, min(1.0, result))
+        return np.clip(result, 0.0, 1.0, out=result)
     
-    def _evaluate_simple_expression(self, expression: str) -> float:
-        """Evaluate simple mathematical expressions"""
-        
-        try:
-            # Handle basic operations
-            if '*' in expression:
-                parts = expression.split('*')
-                result = 1.0
-                for part in parts:
-                    result *= float(part)
-                return result
-            
-            elif '/' in expression:
-                parts = expression.split('/')
-                if len(parts) == 2:
-                    numerator = float(parts[0])
-                    denominator = float(parts[1])
-                    return numerator / denominator if denominator != 0 else 0.0
-                else:
-                    # Multiple divisions
-                    result = float(parts[0])
-                    for part in parts[1:]:
-                        denominator = float(part)
-                        result = result / denominator if denominator != 0 else 0.0
-                    return result
-            
-            elif '+' in expression:
-                parts = expression.split('+')
-                result = 0.0
-                for part in parts:
-                    result += float(part)
-                return result
-            
-            elif '-' in expression and not expression.startswith('-'):
-                parts = expression.split('-')
-                result = float(parts[0])
-                for part in parts[1:]:
-                    result -= float(part)
-                return result
-            
-            else:
-                # Single number
-                return float(expression)
-                
-        except Exception as e:
-            logger.error(f"Simple expression evaluation failed: {e}")
-            return 0.0
+    def evaluate_factor(self, factor_name: str, layer_scores: Mapping[str, Any]) -> Union[float, np.ndarray]:
+        """A strategic factor from scalar or per-sample layer scores"""
+        formula_def = self.formulas[factor_name]
+        input_values = self._map_layer_scores_to_inputs(formula_def, layer_scores)
+        return self.evaluate_formula(formula_def.formula, input_values)
     
     def _calculate_confidence(self, 
                             input_values: Dict[str, float], 
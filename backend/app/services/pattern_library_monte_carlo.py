@@ -10,12 +10,15 @@ from datetime import datetime, timezone
 from enum import Enum
 
 import numpy as np
-from scipy import stats
 from pydantic import BaseModel, Field
 
 from ..core.gcp_config import GCPSettings
 from ..middleware.monitoring import performance_monitor
-from ..core.error_recovery import with_exponential_backoff
+from ..core.error_recovery import RecoveryResult, with_exponential_backoff
+from ..core.samplers import validate_method
+from ..core.simulation_pool import (
+    STAT_FIELDS, STATUS_DONE, SimulationPool, SimulationTask, get_simulation_pool, run_serial
+)
 
 logger = logging.getLogger(__name__)
 
@@ -87,17 +90,24 @@ class PatternLibraryMonteCarloEngine:
     Based on sophisticated pattern library from previous repository
     """
     
-    def __init__(self):
+    def __init__(self, random_seed: Optional[int] = 42, max_workers: Optional[int] = None,
+                 sampling: str = 'random'):
         self.settings = GCPSettings()
         self.simulation_iterations = 10000
         self.confidence_levels = [0.95, 0.99]
+        # Point set behind the draws ('sobol', 'lhs' or 'antithetic' need
+        # fewer iterations for the same precision; see core.samplers)
+        self.sampling = validate_method(sampling)
         
         # Initialize 41 strategic patterns
         self.pattern_library = self._initialize_pattern_library()
         
-        # Initialize per-instance random number generators
-        self.rng = np.random.default_rng(42)
-        self.py_rng = random.Random(42)
+        # Each analysis spawns one independent stream per pattern, so results
+        # are the same whether patterns run serially or in worker processes
+        self.seed_sequence = np.random.SeedSequence(random_seed)
+        self.py_rng = random.Random(random_seed)
+        # Engines share one pool unless given their own worker count
+        self.simulation_pool = SimulationPool(max_workers=max_workers) if max_workers else get_simulation_pool()
 
     def _initialize_pattern_library(self) -> Dict[str, PatternDefinition]:
         """Initialize all 41 strategic pattern definitions"""
@@ -247,10 +257,16 @@ class PatternLibraryMonteCarloEngine:
             # Extract pattern inputs from documents and context
             pattern_inputs = await self._extract_pattern_inputs(topic_documents, analysis_context)
             
+            # Simulate all patterns off the event loop (worker processes when
+            # more than one CPU is available)
+            simulation_results = await self._run_pattern_simulations(
+                list(self.pattern_library.values()), pattern_inputs
+            )
+            
             # Analyze all patterns in parallel
             pattern_tasks = []
             for pattern_id, pattern_def in self.pattern_library.items():
-                task = self._analyze_single_pattern(pattern_def, pattern_inputs)
+                task = self._analyze_single_pattern(pattern_def, pattern_inputs, simulation_results[pattern_id])
                 pattern_tasks.append(task)
             
             pattern_analyses = await asyncio.gather(*pattern_tasks, return_exceptions=True)
@@ -259,6 +275,9 @@ class PatternLibraryMonteCarloEngine:
             pattern_results = {}
             for i, result in enumerate(pattern_analyses):
                 pattern_id = list(self.pattern_library.keys())[i]
+                # The recovery decorator wraps return values
+                if isinstance(result, RecoveryResult):
+                    result = result.result if result.success else Exception(result.error)
                 if isinstance(result, Exception):
                     logger.error(f"Pattern {pattern_id} analysis failed: {result}")
                     # Create default result
@@ -324,9 +343,10 @@ class PatternLibraryMonteCarloEngine:
         
         return inputs
 
-    @with_exponential_backoff
-    async def _analyze_single_pattern(self, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> PatternAnalysisResult:
-        """Analyze a single pattern with Monte Carlo simulation"""
+    @with_exponential_backoff(max_retries=3)
+    async def _analyze_single_pattern(self, pattern_def: PatternDefinition, inputs: Dict[str, Any],
+                                      monte_carlo_result: Optional[MonteCarloResult] = None) -> PatternAnalysisResult:
+        """Analyze a single pattern with Monte Carlo simulation (simulated here unless given)"""
         
         try:
             # Check if pattern is triggered
@@ -337,7 +357,8 @@ class PatternLibraryMonteCarloEngine:
             impact_score = self._calculate_impact_score(pattern_def, inputs, triggered)
             
             # Run Monte Carlo simulation
-            monte_carlo_result = await self._run_monte_carlo_simulation(pattern_def, inputs)
+            if monte_carlo_result is None:
+                monte_carlo_result = await self._run_monte_carlo_simulation(pattern_def, inputs)
             
             # Generate supporting evidence
             supporting_evidence = self._generate_supporting_evidence(pattern_def, inputs, triggered)
@@ -368,90 +389,46 @@ class PatternLibraryMonteCarloEngine:
             logger.error(f"Pattern {pattern_def.pattern_id} analysis error: {e}")
             raise
 
-    async def _run_monte_carlo_simulation(self, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> MonteCarloResult:
-        """Run Monte Carlo simulation for pattern impact assessment"""
+    def _simulation_task(self, pattern_def: PatternDefinition, inputs: Dict[str, Any],
+                         seed: np.random.SeedSequence) -> SimulationTask:
+        """Picklable simulation of one pattern"""
+        return SimulationTask(
+            task_id=pattern_def.pattern_id,
+            params=dict(pattern_def.simulation_params),
+            adjustments=self._business_logic_adjustments(pattern_def, inputs),
+            iterations=self.simulation_iterations,
+            seed=seed,
+            sampling=self.sampling
+        )
+
+    async def _run_pattern_simulations(self, patterns: List[PatternDefinition],
+                                       inputs: Dict[str, Any]) -> Dict[str, MonteCarloResult]:
+        """Monte Carlo results for ``patterns``, one seed stream per pattern
         
-        simulations = []
-        sim_params = pattern_def.simulation_params
-        distribution = sim_params.get('distribution', 'normal')
+        Streams are spawned in pattern order, so a fixed random_seed gives
+        the same results for any number of workers.
+        """
+        seeds = self.seed_sequence.spawn(len(patterns))
+        tasks = [self._simulation_task(pattern_def, inputs, seed) for pattern_def, seed in zip(patterns, seeds)]
+        table = await self.simulation_pool.run(tasks)
+        return {
+            pattern_def.pattern_id: self._monte_carlo_result_from_row(pattern_def, row)
+            for pattern_def, row in zip(patterns, table)
+        }
+
+    async def _run_monte_carlo_simulation(self, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> MonteCarloResult:
+        """Run Monte Carlo simulation for pattern impact assessment
         
-        try:
-            # Generate samples based on distribution type
-            for _ in range(self.simulation_iterations):
-                if distribution == 'triangular':
-                    sample = self.rng.triangular(
-                        sim_params.get('min', 0.2),
-                        sim_params.get('mode', 0.5),
-                        sim_params.get('max', 0.8)
-                    )
-                elif distribution == 'normal':
-                    sample = self.rng.normal(
-                        sim_params.get('mean', 0.5),
-                        sim_params.get('std', 0.15)
-                    )
-                elif distribution == 'beta':
-                    sample = self.rng.beta(
-                        sim_params.get('alpha', 2),
-                        sim_params.get('beta', 2)
-                    ) * sim_params.get('scale', 1.0)
-                elif distribution == 'log_normal':
-                    sample = self.rng.lognormal(
-                        sim_params.get('mu', 0.0),
-                        sim_params.get('sigma', 0.3)
-                    )
-                else:  # uniform
-                    sample = self.rng.uniform(
-                        sim_params.get('min', 0.2),
-                        sim_params.get('max', 0.8)
-                    )
-                
-                # Apply business logic adjustments
-                adjusted_sample = self._apply_business_logic_adjustments(sample, pattern_def, inputs)
-                simulations.append(max(0.0, min(1.0, adjusted_sample)))
-            
-            # Calculate statistics
-            simulations_array = np.array(simulations)
-            mean_score = np.mean(simulations_array)
-            median_score = np.median(simulations_array)
-            std_deviation = np.std(simulations_array)
-            
-            # Calculate confidence intervals
-            ci_95 = (np.percentile(simulations_array, 2.5), np.percentile(simulations_array, 97.5))
-            ci_99 = (np.percentile(simulations_array, 0.5), np.percentile(simulations_array, 99.5))
-            
-            # Calculate percentiles
-            percentiles = {
-                '10th': np.percentile(simulations_array, 10),
-                '25th': np.percentile(simulations_array, 25),
-                '50th': np.percentile(simulations_array, 50),
-                '75th': np.percentile(simulations_array, 75),
-                '90th': np.percentile(simulations_array, 90)
-            }
-            
-            # Calculate risk metrics
-            risk_metrics = {
-                'downside_risk': np.mean(simulations_array[simulations_array < mean_score]),
-                'upside_potential': np.mean(simulations_array[simulations_array > mean_score]),
-                'volatility': std_deviation,
-                'skewness': stats.skew(simulations_array),
-                'kurtosis': stats.kurtosis(simulations_array)
-            }
-            
-            return MonteCarloResult(
-                pattern_id=pattern_def.pattern_id,
-                simulations_run=self.simulation_iterations,
-                mean_score=mean_score,
-                median_score=median_score,
-                std_deviation=std_deviation,
-                confidence_interval_95=ci_95,
-                confidence_interval_99=ci_99,
-                percentiles=percentiles,
-                risk_metrics=risk_metrics
-            )
-            
-        except Exception as e:
-            logger.error(f"Monte Carlo simulation failed for pattern {pattern_def.pattern_id}: {e}")
-            # Return default result
+        All iterations are drawn in one call (see core.simulation_pool) from
+        a fresh stream of this engine's seed sequence.
+        """
+        task = self._simulation_task(pattern_def, inputs, self.seed_sequence.spawn(1)[0])
+        return self._monte_carlo_result_from_row(pattern_def, run_serial([task])[0])
+
+    def _monte_carlo_result_from_row(self, pattern_def: PatternDefinition, row: np.ndarray) -> MonteCarloResult:
+        """MonteCarloResult from a simulation statistics row (default when it failed)"""
+        if row[-1] != STATUS_DONE:
+            logger.error(f"Monte Carlo simulation failed for pattern {pattern_def.pattern_id}")
             return MonteCarloResult(
                 pattern_id=pattern_def.pattern_id,
                 simulations_run=0,
@@ -463,6 +440,31 @@ class PatternLibraryMonteCarloEngine:
                 percentiles={'50th': pattern_def.expected_impact},
                 risk_metrics={'volatility': 0.1}
             )
+        
+        values = dict(zip(STAT_FIELDS, row[:-1].tolist()))
+        return MonteCarloResult(
+            pattern_id=pattern_def.pattern_id,
+            simulations_run=self.simulation_iterations,
+            mean_score=values['mean'],
+            median_score=values['median'],
+            std_deviation=values['std'],
+            confidence_interval_95=(values['ci95_low'], values['ci95_high']),
+            confidence_interval_99=(values['ci99_low'], values['ci99_high']),
+            percentiles={
+                '10th': values['p10'],
+                '25th': values['p25'],
+                '50th': values['p50'],
+                '75th': values['p75'],
+                '90th': values['p90']
+            },
+            risk_metrics={
+                'downside_risk': values['downside_risk'],
+                'upside_potential': values['upside_potential'],
+                'volatility': values['std'],
+                'skewness': values['skewness'],
+                'kurtosis': values['kurtosis']
+            }
+        )
 
     def _check_pattern_triggers(self, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> bool:
         """Check if pattern trigger conditions are met"""
@@ -483,7 +485,11 @@ class PatternLibraryMonteCarloEngine:
                     if input_value < threshold:
                         triggers_met += 1
                 elif condition_value.lower() in ['high', 'strong', 'significant']:
-                    if input_value > 0.6:
+                    # Inputs may be levels ('high') or scores
+                    if isinstance(input_value, str):
+                        if input_value.lower() in ['high', 'strong', 'significant']:
+                            triggers_met += 1
+                    elif input_value > 0.6:
                         triggers_met += 1
                 elif condition_value.lower() == str(input_value).lower():
                     triggers_met += 1
@@ -494,31 +500,25 @@ class PatternLibraryMonteCarloEngine:
         # Pattern is triggered if at least 50% of conditions are met
         return (triggers_met / max(total_triggers, 1)) >= 0.5
 
-    def _apply_business_logic_adjustments(self, sample: float, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> float:
-        """Apply business logic adjustments to Monte Carlo sample"""
-        
-        adjusted_sample = sample
+    def _business_logic_adjustments(self, pattern_def: PatternDefinition, inputs: Dict[str, Any]) -> Tuple[float, ...]:
+        """Additive business logic adjustments for a pattern's samples, in order"""
         
         # Adjust based on input quality
         input_quality = self._assess_input_quality(inputs)
-        quality_adjustment = (input_quality - 0.5) * 0.2
-        adjusted_sample += quality_adjustment
+        adjustments = [(input_quality - 0.5) * 0.2]
         
         # Adjust based on pattern category
         if pattern_def.category == PatternCategory.MARKET_DYNAMICS:
             # Market patterns sensitive to market conditions
-            market_adjustment = inputs.get('market_growth', 0.1) * 0.3
-            adjusted_sample += market_adjustment
+            adjustments.append(inputs.get('market_growth', 0.1) * 0.3)
         elif pattern_def.category == PatternCategory.COMPETITIVE_BEHAVIOR:
             # Competitive patterns sensitive to competitive pressure
-            competitive_adjustment = (1.0 - inputs.get('competitive_pressure', 0.5)) * 0.2
-            adjusted_sample += competitive_adjustment
+            adjustments.append((1.0 - inputs.get('competitive_pressure', 0.5)) * 0.2)
         elif pattern_def.category == PatternCategory.INNOVATION_PATTERNS:
             # Innovation patterns sensitive to R&D and technology
-            innovation_adjustment = inputs.get('tech_adoption', 0.2) * 0.4
-            adjusted_sample += innovation_adjustment
+            adjustments.append(inputs.get('tech_adoption', 0.2) * 0.4)
         
-        return adjusted_sample
+        return tuple(adjustments)
 
     def _assess_input_quality(self, inputs: Dict[str, Any]) -> float:
         """Assess quality of input data"""
@@ -4,12 +4,15 @@ Generates Monte Carlo scenarios with segment-specific counts and KPI distributio
 """
 
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 import asyncio
 from datetime import datetime
 import logging
 
+from ..core.samplers import from_uniforms, sample_uniforms, validate_method
+from ..core.sequential_monte_carlo import ConvergenceCriteria, SequentialMonteCarlo, concatenate_batches
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -24,6 +27,8 @@ class MonteCarloScenario:
     probability_success: float
     confidence_interval: Tuple[float, float]
     iterations_run: int
+    # Sequential runs: achieved standard errors of the KPI estimates
+    convergence: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -36,8 +41,15 @@ class MonteCarloScenario:
 class SegmentMonteCarloEngine:
     """Monte Carlo engine that generates segment-specific scenarios"""
     
-    def __init__(self):
+    def __init__(self, convergence: Optional[ConvergenceCriteria] = None,
+                 sampling: str = 'random', random_seed: Optional[int] = None):
         self.iterations = 1000
+        # When set, each scenario runs until its KPI estimates converge
+        self.convergence = convergence
+        # 'random' draws from the global numpy state; other point sets
+        # (see core.samplers) use this engine's generator
+        self.sampling = validate_method(sampling)
+        self.rng = np.random.default_rng(random_seed)
         self.required_scenarios = {
             'market': 4,
             'consumer': 4,
@@ -94,20 +106,26 @@ class SegmentMonteCarloEngine:
             kpi_anchors = self._generate_default_kpi_anchors(segment, pattern)
         
         kpi_results = {}
+        convergence = None
+        iterations_run = self.iterations
+        
+        if self.convergence is not None:
+            # All KPIs in the same batches; stop when every one has converged
+            runner = SequentialMonteCarlo(self.convergence)
+            batches, report = await runner.run_async(
+                lambda size: {kpi_name: self._kpi_samples(kpi_config, size)
+                              for kpi_name, kpi_config in kpi_anchors.items()}
+            )
+            kpi_samples = concatenate_batches(batches)
+            convergence = report.to_dict()
+            iterations_run = report.iterations
+        else:
+            kpi_samples = {kpi_name: self._kpi_samples(kpi_config, self.iterations)
+                           for kpi_name, kpi_config in kpi_anchors.items()}
         
         for kpi_name, kpi_config in kpi_anchors.items():
-            distribution = kpi_config.get('distribution', 'normal')
             params = kpi_config.get('params', [0, 1])
-            bounds = kpi_config.get('bounds', [None, None])
-            
-            # Run simulation
-            samples = self._generate_samples(distribution, params, self.iterations)
-            
-            # Apply bounds
-            if bounds[0] is not None:
-                samples = np.maximum(samples, bounds[0])
-            if bounds[1] is not None:
-                samples = np.minimum(samples, bounds[1])
+            samples = kpi_samples[kpi_name]
             
             # Calculate statistics
             kpi_results[kpi_name] = {
@@ -153,13 +171,34 @@ class SegmentMonteCarloEngine:
             kpi_results=kpi_results,
             probability_success=success_prob,
             confidence_interval=overall_ci,
-            iterations_run=self.iterations
+            iterations_run=iterations_run,
+            convergence=convergence
         )
     
+    def _kpi_samples(self, kpi_config: Dict[str, Any], size: int) -> np.ndarray:
+        """Bounded samples of one KPI anchor"""
+        distribution = kpi_config.get('distribution', 'normal')
+        params = kpi_config.get('params', [0, 1])
+        bounds = kpi_config.get('bounds', [None, None])
+        
+        samples = self._generate_samples(distribution, params, size)
+        
+        # Apply bounds
+        if bounds[0] is not None:
+            samples = np.maximum(samples, bounds[0])
+        if bounds[1] is not None:
+            samples = np.minimum(samples, bounds[1])
+        return samples
+    
     def _generate_samples(self, distribution: str, params: List[float], size: int) -> np.ndarray:
         """Generate random samples based on distribution type"""
         
         try:
+            if self.sampling != 'random':
+                distribution_type, spec, offset = self._distribution_spec(distribution, params)
+                uniforms = sample_uniforms(self.sampling, self.rng, size, 1)[:, 0]
+                return from_uniforms(distribution_type, spec, uniforms) + offset
+            
             if distribution == 'normal':
                 mean = params[0] if len(params) > 0 else 20
                 std = params[1] if len(params) > 1 else 8
@@ -195,6 +234,25 @@ class SegmentMonteCarloEngine:
             logger.warning(f"Error generating {distribution} samples: {e}. Using normal distribution.")
             return np.random.normal(20, 8, size)
     
+    @staticmethod
+    def _distribution_spec(distribution: str, params: List[float]) -> Tuple[str, Dict[str, float], float]:
+        """(type, spec, offset) in core.samplers keys, with _generate_samples' defaults"""
+        def param(index: int, default: float) -> float:
+            return params[index] if len(params) > index else default
+        
+        if distribution == 'normal':
+            return 'normal', {'mean': param(0, 20), 'std': param(1, 8)}, 0.0
+        if distribution == 'triangular':
+            return 'triangular', {'low': param(0, 10), 'mode': param(1, 20), 'high': param(2, 35)}, 0.0
+        if distribution == 'uniform':
+            return 'uniform', {'low': param(0, 10), 'high': param(1, 30)}, 0.0
+        if distribution == 'beta':
+            # Scaled to the percentage range
+            return 'beta', {'alpha': param(0, 2), 'beta': param(1, 5), 'scale': 50}, 10.0
+        if distribution == 'lognormal':
+            return 'lognormal', {'mu': param(0, 2.5), 'sigma': param(1, 0.5)}, 0.0
+        return 'normal', {'mean': 20, 'std': 8}, 0.0
+    
     def _generate_default_kpi_anchors(self, segment: str, pattern: Dict) -> Dict[str, Any]:
         """Generate default KPI anchors when pattern doesn't have them"""
         
@@ -5,9 +5,11 @@ Aggregates 210 layer scores into 28 strategic factors
 import logging
 from typing import List, Dict, Any
 from datetime import datetime, timezone
+import numpy as np
 from pydantic import BaseModel
 
 from ..core.aliases_config import aliases_config
+from ..core.hierarchy_rollup import HierarchyRollup
 from ..services.v2_expert_persona_scorer import LayerScore
 
 logger = logging.getLogger(__name__)
@@ -31,6 +33,9 @@ class V2FactorCalculationEngine:
     
     def __init__(self):
         self.aliases = aliases_config
+
+        # Layer -> factor weights as a matrix
+        self.hierarchy = HierarchyRollup.from_aliases(self.aliases)
         
         # Define default calculation methods
         self.calculation_methods = {
@@ -57,11 +62,17 @@ class V2FactorCalculationEngine:
         # Group layer scores by factor
         layer_scores_by_factor = self._group_scores_by_factor(layer_scores)
         
+        # Factor values and confidences for all factors in one pass each
+        hierarchy = self.hierarchy
+        factor_values = hierarchy.factor_scores(
+            hierarchy.layer_vector({ls.layer_id: ls.score for ls in layer_scores}))
+        factor_confidences = hierarchy.factor_scores(
+            hierarchy.layer_vector({ls.layer_id: ls.confidence for ls in layer_scores}))
+        
         # Calculate all factors
         factor_calculations = []
-        all_factor_ids = self.aliases.get_all_factor_ids()
         
-        for factor_id in all_factor_ids:
+        for factor_id in hierarchy.factor_ids:
             factor_layers = layer_scores_by_factor.get(factor_id, [])
             
             if not factor_layers:
@@ -71,8 +82,10 @@ class V2FactorCalculationEngine:
                 continue
             
             try:
+                f = hierarchy.factor_index[factor_id]
                 calculation = await self._calculate_single_factor(
-                    session_id, factor_id, factor_layers
+                    session_id, factor_id, factor_layers,
+                    float(factor_values[f]), float(factor_confidences[f])
                 )
                 factor_calculations.append(calculation)
             except Exception as e:
@@ -83,31 +96,22 @@ class V2FactorCalculationEngine:
         return factor_calculations
     
     async def _calculate_single_factor(self, session_id: str, factor_id: str,
-                                     layer_scores: List[LayerScore]) -> FactorCalculation:
-        """Calculate single factor from its layer scores"""
+                                     layer_scores: List[LayerScore], calculated_value: float,
+                                     avg_confidence: float) -> FactorCalculation:
+        """Build a factor calculation from its layer scores
+        
+        calculated_value and avg_confidence are the equal-weighted means of
+        the layer scores and confidences, from the hierarchy roll-up.
+        """
         
         factor_name = self.aliases.get_factor_name(factor_id)
         
         # Get layer contributions
-        layer_contributions = {}
-        total_weight = 0.0
-        weighted_sum = 0.0
-        confidence_scores = []
-        
-        # Equal weighting for now (can be enhanced with specific weights later)
-        weight_per_layer = 1.0 / len(layer_scores) if layer_scores else 1.0
-        
-        for layer_score in layer_scores:
-            layer_contributions[layer_score.layer_id] = float(layer_score.score)
-            weighted_sum += layer_score.score * weight_per_layer
-            total_weight += weight_per_layer
-            confidence_scores.append(layer_score.confidence)
-        
-        # Calculate final factor value
-        calculated_value = weighted_sum / total_weight if total_weight > 0 else 0.5
-        
-        # Calculate factor confidence (average of layer confidences)
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.5
+        layer_contributions = {
+            layer_score.layer_id: float(layer_score.score)
+            for layer_score in layer_scores
+        }
+        confidence_scores = [layer_score.confidence for layer_score in layer_scores]
         
         # Validation metrics
         validation_metrics = {
@@ -134,16 +138,32 @@ class V2FactorCalculationEngine:
             created_at=datetime.now(timezone.utc)
         )
     
+    def calculate_factor_batch(self, layer_values: np.ndarray) -> np.ndarray:
+        """
+        Factor values for many sessions or simulation draws at once
+        
+        Args:
+            layer_values: (runs x 210) layer scores in hierarchy.layer_ids
+                order, NaN where a layer is missing
+            
+        Returns:
+            (runs x 28) factor values in hierarchy.factor_ids order
+        """
+        return self.hierarchy.factor_scores(layer_values)
+    
     def _group_scores_by_factor(self, layer_scores: List[LayerScore]) -> Dict[str, List[LayerScore]]:
-        """Group layer scores by their parent factor"""
-        grouped = {}
+        """Group layer scores by their parent factor (one score per layer, the last wins)"""
+        by_layer = {}
         
         for layer_score in layer_scores:
-            factor_id = self.aliases.get_factor_for_layer(layer_score.layer_id)
-            if not factor_id:
+            if layer_score.layer_id not in self.hierarchy.layer_index:
                 logger.warning(f"No factor found for layer {layer_score.layer_id}")
                 continue
-            
+            by_layer[layer_score.layer_id] = layer_score
+        
+        grouped = {}
+        for layer_id, layer_score in by_layer.items():
+            factor_id = self.aliases.get_factor_for_layer(layer_id)
             if factor_id not in grouped:
                 grouped[factor_id] = []
             grouped[factor_id].append(layer_score)
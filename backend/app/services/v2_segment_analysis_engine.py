@@ -5,9 +5,13 @@ Analyzes 5 intelligence segments from 28 factor calculations
 import logging
 from typing import List, Dict, Any
 from datetime import datetime, timezone
+import numpy as np
 from pydantic import BaseModel
 
 from ..core.aliases_config import aliases_config
+from ..core.hierarchy_rollup import (
+    SEGMENT_METRIC_WEIGHTS, HierarchyRollup, overall_segment_score
+)
 from ..services.v2_factor_calculation_engine import FactorCalculation
 
 logger = logging.getLogger(__name__)
@@ -36,40 +40,19 @@ class V2SegmentAnalysisEngine:
     def __init__(self):
         self.aliases = aliases_config
         
-        # Segment-specific scoring formulas
+        # Segment-specific scoring formulas (linear in the factor scores)
         self.segment_formulas = {
-            'S1': {  # Product Intelligence
-                'attractiveness': lambda factors: factors.get('F7', 0.5) * 0.4 + factors.get('F8', 0.5) * 0.3 + factors.get('F10', 0.5) * 0.3,
-                'competitiveness': lambda factors: factors.get('F2', 0.5) * 0.5 + factors.get('F9', 0.5) * 0.5,
-                'market_size': lambda factors: factors.get('F1', 0.5) * 0.6 + factors.get('F4', 0.5) * 0.4,
-                'growth': lambda factors: factors.get('F8', 0.5) * 0.5 + factors.get('F5', 0.5) * 0.5
-            },
-            'S2': {  # Consumer Intelligence
-                'attractiveness': lambda factors: factors.get('F11', 0.5) * 0.4 + factors.get('F13', 0.5) * 0.3 + factors.get('F15', 0.5) * 0.3,
-                'competitiveness': lambda factors: factors.get('F12', 0.5) * 0.6 + factors.get('F14', 0.5) * 0.4,
-                'market_size': lambda factors: factors.get('F11', 0.5) * 0.7 + factors.get('F13', 0.5) * 0.3,
-                'growth': lambda factors: factors.get('F13', 0.5) * 0.5 + factors.get('F14', 0.5) * 0.5
-            },
-            'S3': {  # Market Intelligence
-                'attractiveness': lambda factors: factors.get('F18', 0.5) * 0.5 + factors.get('F16', 0.5) * 0.5,
-                'competitiveness': lambda factors: factors.get('F17', 0.5) * 0.7 + factors.get('F19', 0.5) * 0.3,
-                'market_size': lambda factors: factors.get('F18', 0.5) * 0.8 + factors.get('F20', 0.5) * 0.2,
-                'growth': lambda factors: factors.get('F18', 0.5) * 0.4 + factors.get('F16', 0.5) * 0.6
-            },
-            'S4': {  # Brand Intelligence
-                'attractiveness': lambda factors: factors.get('F22', 0.5) * 0.4 + factors.get('F23', 0.5) * 0.3 + factors.get('F25', 0.5) * 0.3,
-                'competitiveness': lambda factors: factors.get('F21', 0.5) * 0.6 + factors.get('F24', 0.5) * 0.4,
-                'market_size': lambda factors: factors.get('F23', 0.5) * 0.6 + factors.get('F22', 0.5) * 0.4,
-                'growth': lambda factors: factors.get('F25', 0.5) * 0.5 + factors.get('F24', 0.5) * 0.5
-            },
-            'S5': {  # Experience Intelligence
-                'attractiveness': lambda factors: factors.get('F26', 0.5) * 0.4 + factors.get('F27', 0.5) * 0.4 + factors.get('F28', 0.5) * 0.2,
-                'competitiveness': lambda factors: factors.get('F27', 0.5) * 0.6 + factors.get('F26', 0.5) * 0.4,
-                'market_size': lambda factors: factors.get('F26', 0.5) * 0.5 + factors.get('F28', 0.5) * 0.5,
-                'growth': lambda factors: factors.get('F26', 0.5) * 0.7 + factors.get('F27', 0.5) * 0.3
-            }
+            segment_id: {metric: self._linear_formula(weights) for metric, weights in formulas.items()}
+            for segment_id, formulas in SEGMENT_METRIC_WEIGHTS.items()
         }
-    
+
+        # The same formulas as a factor -> segment matrix
+        self.hierarchy = HierarchyRollup.from_aliases(self.aliases)
+
+    @staticmethod
+    def _linear_formula(weights: Dict[str, float]):
+        return lambda factors: sum(factors.get(factor_id, 0.5) * weight for factor_id, weight in weights.items())
+
     async def analyze_all_segments(self, session_id: str,
                                   factor_calculations: List[FactorCalculation]) -> List[SegmentAnalysis]:
         """
@@ -133,13 +116,11 @@ class V2SegmentAnalysisEngine:
         market_size = formulas['market_size'](factor_values)
         growth = formulas['growth'](factor_values)
         
-        # Calculate overall segment score
-        overall_score = (
-            attractiveness * 0.35 +
-            (1.0 - competitiveness) * 0.25 +  # Lower intensity is better
-            market_size * 0.20 +
-            growth * 0.20
-        )
+        # Calculate overall segment score (lower intensity is better)
+        overall_score = overall_segment_score({
+            'attractiveness': attractiveness, 'competitiveness': competitiveness,
+            'market_size': market_size, 'growth': growth
+        })
         
         # Generate insights based on scores
         insights = self._generate_segment_insights(
@@ -187,6 +168,19 @@ class V2SegmentAnalysisEngine:
             created_at=datetime.now(timezone.utc)
         )
     
+    def analyze_segment_batch(self, factor_values: np.ndarray) -> np.ndarray:
+        """
+        Segment metrics for many factor vectors at once
+
+        Args:
+            factor_values: (runs x 28) factor scores in hierarchy.factor_ids order
+
+        Returns:
+            (runs x 5 x 5) array: segments in hierarchy.segment_ids order,
+            outputs in SEGMENT_OUTPUTS order (the four metrics, then overall)
+        """
+        return self.hierarchy.segment_scores(factor_values)
+
     def _group_factors_by_segment(self, factor_calculations: List[FactorCalculation]) -> Dict[str, List[FactorCalculation]]:
         """Group factor calculations by their parent segment"""
         grouped = {}
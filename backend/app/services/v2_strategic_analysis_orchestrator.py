@@ -10,6 +10,9 @@ from datetime import datetime, timezone
 
 from ..core.aliases_config import aliases_config
 from ..core.database_config import db_manager
+from ..core.serialization import encode_json_text
+from ..middleware.monitoring import performance_monitor
+from ..middleware.tracing import get_flame_graph, trace_span
 from ..services.v2_expert_persona_scorer import V2ExpertPersonaScorer, LayerScore
 from ..services.v2_factor_calculation_engine import V2FactorCalculationEngine, FactorCalculation
 from ..services.v2_segment_analysis_engine import V2SegmentAnalysisEngine, SegmentAnalysis
@@ -25,6 +28,7 @@ class V2StrategicAnalysisOrchestrator:
         self.factor_engine = V2FactorCalculationEngine()
         self.segment_engine = V2SegmentAnalysisEngine()
     
+    @performance_monitor
     async def execute_complete_analysis(self, session_id: str, 
                                       topic_knowledge: Dict) -> Dict[str, Any]:
         """
@@ -52,39 +56,44 @@ class V2StrategicAnalysisOrchestrator:
             # Phase 1: Layer Scoring (210 layers)
             logger.info("📊 Phase 1: Scoring 210 strategic layers...")
             layer_start = datetime.now(timezone.utc)
-            layer_scores = await self._execute_layer_scoring_phase(session_id, topic_knowledge)
+            with trace_span("layer_scoring"):
+                layer_scores = await self._execute_layer_scoring_phase(session_id, topic_knowledge)
             layer_time = (datetime.now(timezone.utc) - layer_start).total_seconds()
             logger.info(f"   ✅ {len(layer_scores)} layers scored in {layer_time:.1f}s")
             
             # Phase 2: Factor Calculations (28 factors)  
             logger.info("🧮 Phase 2: Calculating 28 strategic factors...")
             factor_start = datetime.now(timezone.utc)
-            factor_calculations = await self.factor_engine.calculate_all_factors(
-                session_id, layer_scores
-            )
+            with trace_span("factor_calculation"):
+                factor_calculations = await self.factor_engine.calculate_all_factors(
+                    session_id, layer_scores
+                )
             factor_time = (datetime.now(timezone.utc) - factor_start).total_seconds()
             logger.info(f"   ✅ {len(factor_calculations)} factors calculated in {factor_time:.1f}s")
             
             # Phase 3: Segment Analysis (5 segments)
             logger.info("🎯 Phase 3: Analyzing 5 intelligence segments...")
             segment_start = datetime.now(timezone.utc)
-            segment_analyses = await self.segment_engine.analyze_all_segments(
-                session_id, factor_calculations
-            )
+            with trace_span("segment_analysis"):
+                segment_analyses = await self.segment_engine.analyze_all_segments(
+                    session_id, factor_calculations
+                )
             segment_time = (datetime.now(timezone.utc) - segment_start).total_seconds()
             logger.info(f"   ✅ {len(segment_analyses)} segments analyzed in {segment_time:.1f}s")
             
             # Phase 4: Calculate Overall Business Case Score
             logger.info("💼 Phase 4: Calculating overall business case score...")
-            overall_score = self._calculate_overall_business_case_score(
-                layer_scores, factor_calculations, segment_analyses
-            )
+            with trace_span("business_case_score"):
+                overall_score = self._calculate_overall_business_case_score(
+                    layer_scores, factor_calculations, segment_analyses
+                )
             
             # Phase 5: Generate Scenarios
             logger.info("🎲 Phase 5: Generating strategic scenarios...")
-            scenarios = self._generate_strategic_scenarios(
-                overall_score, layer_scores, factor_calculations, segment_analyses
-            )
+            with trace_span("scenario_generation"):
+                scenarios = self._generate_strategic_scenarios(
+                    overall_score, layer_scores, factor_calculations, segment_analyses
+                )
             
             # Calculate total processing time
             total_time = (datetime.now(timezone.utc) - analysis_start).total_seconds()
@@ -134,8 +143,9 @@ class V2StrategicAnalysisOrchestrator:
             }
             
             # Store comprehensive results in database
-            await self._store_complete_analysis(session_id, final_results, 
-                                              layer_scores, factor_calculations, segment_analyses)
+            with trace_span("store_complete_analysis"):
+                await self._store_complete_analysis(session_id, final_results, 
+                                                  layer_scores, factor_calculations, segment_analyses)
             
             logger.info(f"✅ v2.0 Strategic analysis completed in {total_time:.2f}s")
             logger.info(f"   Overall Score: {overall_score:.3f}")
@@ -147,6 +157,10 @@ class V2StrategicAnalysisOrchestrator:
             logger.error(f"❌ v2.0 Strategic analysis failed for {session_id}: {e}")
             raise
     
+    def get_time_breakdown(self) -> Dict[str, Any]:
+        """Aggregated wall/self time per phase of execute_complete_analysis (sampled runs)"""
+        return get_flame_graph(type(self).execute_complete_analysis.__qualname__)
+    
     async def _execute_layer_scoring_phase(self, session_id: str, 
                                          topic_knowledge: Dict) -> List[LayerScore]:
         """Execute comprehensive layer scoring for all 210 layers"""
@@ -167,13 +181,15 @@ class V2StrategicAnalysisOrchestrator:
             logger.info(f"   Batch {batch_num}/{total_batches}: Scoring {len(batch_layers)} layers")
             
             try:
-                batch_scores = await self.layer_scorer.score_layer_batch(
-                    session_id, topic_knowledge, batch_layers
-                )
+                with trace_span("score_layer_batch"):
+                    batch_scores = await self.layer_scorer.score_layer_batch(
+                        session_id, topic_knowledge, batch_layers
+                    )
                 all_layer_scores.extend(batch_scores)
                 
                 # Store batch results immediately for reliability
-                await self._store_layer_scores_batch(batch_scores)
+                with trace_span("store_layer_scores_batch"):
+                    await self._store_layer_scores_batch(batch_scores)
                 
                 logger.info(f"   ✓ Batch {batch_num} completed: {len(batch_scores)} layers scored")
                 
@@ -185,19 +201,7 @@ class V2StrategicAnalysisOrchestrator:
     
     def _get_segment_for_factor(self, factor_id: str) -> str:
         """Get segment ID for a factor"""
-        factor_num = int(factor_id[1:])  # Remove 'F' prefix
-        if 1 <= factor_num <= 10:
-            return 'S1'  # Product Intelligence
-        elif 11 <= factor_num <= 15:
-            return 'S2'  # Consumer Intelligence
-        elif 16 <= factor_num <= 20:
-            return 'S3'  # Market Intelligence
-        elif 21 <= factor_num <= 25:
-            return 'S4'  # Brand Intelligence
-        elif 26 <= factor_num <= 28:
-            return 'S5'  # Experience Intelligence
-        else:
-            return 'S1'  # Default fallback
+        return self.aliases.get_segment_for_factor(factor_id) or 'S1'  # Default fallback
     
     async def _upsert_segment(self, connection, segment_id: str) -> str:
         """
@@ -477,7 +481,7 @@ class V2StrategicAnalysisOrchestrator:
                 results['summary']['scenarios_generated'], results['processing_time_seconds'],
                 results['summary']['content_items_processed'], 
                 json.dumps(results['summary']) if isinstance(results['summary'], dict) else results['summary'],
-                json.dumps(results) if isinstance(results, dict) else results,
+                encode_json_text(results, tier='analysis_results') if isinstance(results, dict) else results,
                 json.dumps(results.get('configuration', {})) if isinstance(results.get('configuration'), dict) else results.get('configuration', {}),
                 datetime.now(timezone.utc)
             )
@@ -0,0 +1,103 @@
+"""
+Performance tests for the compiled alias hierarchy.
+
+Times the alias lookups V2StrategicAnalysisOrchestrator and its scorer call
+per analysis (all layer ids, factor and segment of each layer, segment of
+each factor, factor names) against the previous scanning and parsing
+implementations, and startup from the hashed JSON cache against parsing the
+YAML.
+"""
+
+import time
+
+import pytest
+
+from app.core.aliases_config import ValidatusAliasesConfig
+
+ROUNDS = 200
+
+
+class _PreviousLookups:
+    """The lookups as implemented before the hierarchy was compiled"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def get_all_layer_ids(self):
+        return list(self.config['reverse']['layers'].keys())
+
+    def get_factor_name(self, factor_id):
+        return self.config['reverse']['factors'].get(factor_id)
+
+    def get_factor_for_layer(self, layer_id):
+        parts = layer_id.split('_')
+        if len(parts) >= 2 and parts[0].startswith('L'):
+            return f"F{parts[0][1:]}"
+        return None
+
+    def get_segment_for_factor(self, factor_id):
+        for segment_id, factor_list in self.config['factor_groups'].items():
+            if factor_id in factor_list:
+                return segment_id
+        return None
+
+    def get_segment_for_layer(self, layer_id):
+        factor_id = self.get_factor_for_layer(layer_id)
+        return self.get_segment_for_factor(factor_id) if factor_id else None
+
+
+def _analysis_lookups(aliases):
+    """One analysis worth of lookups: layer scoring, factor storage"""
+    for layer_id in aliases.get_all_layer_ids():
+        aliases.get_factor_for_layer(layer_id)
+        aliases.get_segment_for_layer(layer_id)
+    for layer_id in aliases.get_all_layer_ids():
+        factor_id = aliases.get_factor_for_layer(layer_id)
+        aliases.get_factor_name(factor_id)
+        aliases.get_segment_for_factor(factor_id)
+
+
+def _best_of(function, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.performance
+class TestAliasLookupPerformance:
+    """Compiled lookups against scans over factor_groups."""
+
+    def test_orchestrator_lookups(self):
+        aliases = ValidatusAliasesConfig(cache_dir='')
+        previous = _PreviousLookups(aliases.config)
+
+        def run(target):
+            return lambda: [_analysis_lookups(target) for _ in range(ROUNDS)]
+
+        previous_seconds = _best_of(run(previous))
+        compiled_seconds = _best_of(run(aliases))
+
+        speedup = previous_seconds / compiled_seconds
+        print(f"\n{ROUNDS} analyses of lookups: previous {previous_seconds * 1000:.0f} ms, "
+              f"compiled {compiled_seconds * 1000:.0f} ms ({speedup:.1f}x)")
+        assert speedup >= 2
+
+        layer_ids_seconds = _best_of(lambda: [aliases.get_all_layer_ids() for _ in range(10_000)])
+        previous_layer_ids_seconds = _best_of(lambda: [previous.get_all_layer_ids() for _ in range(10_000)])
+        print(f"get_all_layer_ids: {previous_layer_ids_seconds / 10_000 * 1e6:.2f} us -> "
+              f"{layer_ids_seconds / 10_000 * 1e6:.2f} us")
+        assert layer_ids_seconds < previous_layer_ids_seconds
+
+    def test_cached_startup_skips_yaml(self, tmp_path):
+        cache_dir = str(tmp_path)
+        ValidatusAliasesConfig(cache_dir=cache_dir)
+
+        parse_seconds = _best_of(lambda: ValidatusAliasesConfig(cache_dir=''), repeats=3)
+        cached_seconds = _best_of(lambda: ValidatusAliasesConfig(cache_dir=cache_dir), repeats=3)
+
+        print(f"\nStartup: YAML {parse_seconds * 1000:.1f} ms, cached {cached_seconds * 1000:.2f} ms "
+              f"({parse_seconds / cached_seconds:.0f}x)")
+        assert cached_seconds * 5 < parse_seconds
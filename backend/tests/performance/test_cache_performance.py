@@ -0,0 +1,274 @@
+"""
+Performance tests for the L1 memory cache.
+
+Microbenchmark comparing the sharded W-TinyLFU L1 cache against the previous
+list-based LRU implementation on a Zipfian trace with one-off scan bursts
+(the access shape of hot layer/factor entries mixed with scraped content).
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_orchestration.l1_memory_cache import ShardedL1Cache
+
+
+class _LegacyListLRUCache:
+    """Previous L1 implementation: list recency, json sizing, one asyncio.Lock"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._access_order: List[str] = []
+        self._lock = asyncio.Lock()
+
+    async def get(self, key):
+        async with self._lock:
+            if key in self._cache:
+                self._cache[key]['last_accessed'] = datetime.now(timezone.utc)
+                self._access_order.remove(key)
+                self._access_order.append(key)
+                return self._cache[key]['value']
+            return None
+
+    async def set(self, key, value):
+        async with self._lock:
+            size_bytes = len(json.dumps(value, default=str).encode('utf-8'))
+            if key in self._cache:
+                del self._cache[key]
+                self._access_order.remove(key)
+            self._cache[key] = {'value': value, 'size_bytes': size_bytes,
+                                'last_accessed': datetime.now(timezone.utc)}
+            self._access_order.append(key)
+            while len(self._cache) > self.max_size:
+                lru_key = self._access_order.pop(0)
+                del self._cache[lru_key]
+
+
+def _zipf_trace(length: int, key_space: int, scan_every: int, scan_length: int,
+                seed: int = 42) -> List[str]:
+    """Zipf(1.1) popularity over key_space keys, interrupted by one-off scans"""
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(1.1, size=length * 2)
+    ranks = ranks[ranks <= key_space][:length]
+    trace: List[str] = []
+    scan_id = 0
+    for i, rank in enumerate(ranks):
+        trace.append(f"layer:{rank}")
+        if scan_every and i % scan_every == scan_every - 1:
+            trace.extend(f"scraped:{scan_id}:{j}" for j in range(scan_length))
+            scan_id += 1
+    return trace
+
+
+# Shaped like a cached layer score (score, confidence, evidence snippets)
+_VALUE = {
+    "layer_id": "market_size_growth_rate",
+    "score": 0.73,
+    "confidence": 0.81,
+    "reasoning": "Demand indicators remain strong across regions. " * 6,
+    "evidence": [
+        {"url": f"https://example.com/source/{i}", "snippet": "market evidence " * 20,
+         "relevance": 0.9 - i * 0.05}
+        for i in range(8)
+    ],
+    "metadata": {"persona": "market_analyst", "model": "gemini", "tokens": 1842},
+}
+
+
+def _run_sharded(cache: ShardedL1Cache, trace: List[str]):
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, _VALUE)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+async def _run_legacy(cache: _LegacyListLRUCache, trace: List[str]):
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if await cache.get(key) is not None:
+            hits += 1
+        else:
+            await cache.set(key, _VALUE)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+@pytest.fixture(scope="module")
+def trace():
+    return _zipf_trace(length=60_000, key_space=20_000, scan_every=2_000, scan_length=1_500)
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestL1CachePerformance:
+    """Hit ratio and throughput of the L1 cache on a Zipfian trace."""
+
+    CAPACITY = 1_000
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("capacity", [1_000, 10_000])
+    async def test_hit_ratio_and_throughput_vs_legacy(self, trace, capacity):
+        legacy_ratio, legacy_ops = await _run_legacy(_LegacyListLRUCache(capacity), trace)
+        sharded_ratio, sharded_ops = _run_sharded(ShardedL1Cache(max_entries=capacity), trace)
+
+        print(f"\nL1 cache on Zipf(1.1) trace ({len(trace)} ops, capacity {capacity}):")
+        print(f"  legacy list LRU  : hit ratio {legacy_ratio:.3f}, {legacy_ops:,.0f} ops/s")
+        print(f"  sharded W-TinyLFU: hit ratio {sharded_ratio:.3f}, {sharded_ops:,.0f} ops/s")
+
+        assert sharded_ratio > legacy_ratio
+        if capacity >= 10_000:
+            # The list-based recency update is O(n); it dominates at larger sizes
+            assert sharded_ops > legacy_ops * 1.5
+        else:
+            assert sharded_ops > legacy_ops * 0.7
+
+    @pytest.mark.asyncio
+    async def test_policies_throughput(self, trace):
+        from app.services.enhanced_orchestration.cache_types import EvictionPolicy
+
+        # Relative to the legacy cache measured in the same run, so machine
+        # load shifts both sides
+        _, legacy_ops = await _run_legacy(_LegacyListLRUCache(self.CAPACITY), trace)
+        print(f"\n  legacy: {legacy_ops:,.0f} ops/s")
+        for policy in (EvictionPolicy.LRU, EvictionPolicy.LFU, EvictionPolicy.FIFO):
+            ratio, ops = _run_sharded(
+                ShardedL1Cache(max_entries=self.CAPACITY, eviction_policy=policy), trace
+            )
+            print(f"  {policy.value:>6}: hit ratio {ratio:.3f}, {ops:,.0f} ops/s")
+            assert ops > legacy_ops * 0.7
+
+    def test_operation_cost_independent_of_size(self):
+        """O(1) operations: per-op time should not scale with capacity"""
+        timings = {}
+        for capacity in (1_000, 100_000):
+            cache = ShardedL1Cache(max_entries=capacity, max_bytes=1 << 34)
+            for i in range(capacity):
+                cache.set(i, i, size_bytes=24)
+            start = time.perf_counter()
+            for i in range(20_000):
+                cache.get(i % capacity)
+                cache.set(capacity + i, i, size_bytes=24)
+            timings[capacity] = time.perf_counter() - start
+
+        assert timings[100_000] < timings[1_000] * 3
+
+
+class _KeyspaceRedis:
+    """In-memory Redis stand-in holding a large keyspace of one shared payload"""
+
+    def __init__(self, keys: List[str], payload: bytes):
+        self.data = dict.fromkeys(keys, payload)
+        self.counters: Dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, data):
+        self.data[key] = data
+        return True
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    async def scan_iter(self, match=None):
+        import fnmatch
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def expire(self, key, ttl):
+        return key in self.counters
+
+    async def mget(self, keys):
+        return [self.counters.get(key) for key in keys]
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestTagInvalidationPerformance:
+    """Invalidation latency of tag generations vs. keyspace scans."""
+
+    @pytest.fixture
+    def make_manager(self, mock_gcp_settings):
+        from unittest.mock import Mock, patch
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        def make(keyspace: int):
+            with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                    patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+                manager = mlcm.MultiLevelCacheManager(project_id="test-project")
+            for level in (CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT):
+                manager.cache_configs[level].enabled = False
+            manager.cache_configs[CacheLevel.L2_REDIS].enabled = True
+
+            payload = manager._serialize_for_storage(
+                CacheLevel.L2_REDIS,
+                mlcm.TaggedValue({"score": 0.5}, (("ns:layer", 0), ("session:s1", 0)))
+            )
+            redis = _KeyspaceRedis([f"layer:{i}" for i in range(keyspace)], payload)
+            manager.redis_client = redis
+            manager.tag_generations.redis_client = redis
+            manager.tag_generations.refresh_seconds = 0.0
+            return manager
+
+        return make
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_latency_flat_up_to_1m_keys(self, make_manager):
+        latencies = {}
+        for keyspace in (10_000, 100_000, 1_000_000):
+            manager = make_manager(keyspace)
+            assert await manager.get(f"layer:{keyspace - 1}") == {"score": 0.5}
+
+            rounds = 500
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await manager.invalidate_tags("session:s1")
+            latencies[keyspace] = (time.perf_counter() - start) / rounds
+
+            # Every level now rejects the stale entries
+            manager.l1_cache.clear()
+            assert await manager.get(f"layer:{keyspace - 1}") is None
+
+        print("\nTag invalidation latency by keyspace size:")
+        for keyspace, latency in latencies.items():
+            print(f"  {keyspace:>9,} keys: {latency * 1e6:8.1f} us")
+
+        assert latencies[1_000_000] < latencies[10_000] * 3
+        assert latencies[1_000_000] < 0.001
+
+    @pytest.mark.asyncio
+    async def test_pattern_scan_grows_with_keyspace(self, make_manager):
+        timings = {}
+        for keyspace in (10_000, 100_000):
+            manager = make_manager(keyspace)
+            start = time.perf_counter()
+            await manager.invalidate_by_pattern("session_s1:*")
+            timings[keyspace] = time.perf_counter() - start
+
+        tag_manager = make_manager(100_000)
+        start = time.perf_counter()
+        await tag_manager.invalidate_tags("session:s1")
+        tag_latency = time.perf_counter() - start
+
+        print(f"\nPattern scan: 10k keys {timings[10_000] * 1e3:.1f} ms, "
+              f"100k keys {timings[100_000] * 1e3:.1f} ms; tag bump {tag_latency * 1e6:.1f} us")
+        assert timings[100_000] > timings[10_000] * 3
+        assert tag_latency * 100 < timings[100_000]
@@ -0,0 +1,90 @@
+"""
+Performance tests for the matrix hierarchy roll-up.
+
+Compares rolling 10k simulation draws of 210 layer scores up to factors and
+segments with the engines' previous dict-and-loop method against one
+mat-mat per level, and times single-layer RollupState updates against full
+recomputes.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.core.aliases_config import aliases_config
+from app.core.hierarchy_rollup import DEFAULT_SCORE, SEGMENT_METRIC_WEIGHTS, HierarchyRollup
+
+DRAWS = 10_000
+
+
+def _loop_rollup(scores):
+    """The dict-and-loop roll-up the V2 engines used, per draw"""
+    grouped = {}
+    for layer_id, score in scores.items():
+        grouped.setdefault(aliases_config.get_factor_for_layer(layer_id), []).append(score)
+    factors = {}
+    for factor_id in aliases_config.get_all_factor_ids():
+        layer_scores = grouped.get(factor_id)
+        factors[factor_id] = sum(layer_scores) / len(layer_scores) if layer_scores else DEFAULT_SCORE
+    segments = {}
+    for segment_id, formulas in SEGMENT_METRIC_WEIGHTS.items():
+        metrics = {metric: sum(factors.get(factor_id, 0.5) * weight for factor_id, weight in weights.items())
+                   for metric, weights in formulas.items()}
+        metrics['overall'] = (metrics['attractiveness'] * 0.35 + (1.0 - metrics['competitiveness']) * 0.25 +
+                              metrics['market_size'] * 0.20 + metrics['growth'] * 0.20)
+        segments[segment_id] = metrics
+    return factors, segments
+
+
+@pytest.mark.performance
+class TestHierarchyRollupPerformance:
+    """Sparse roll-up against the per-draw loop."""
+
+    def test_batch_rollup_speedup(self):
+        rollup = HierarchyRollup.from_aliases(aliases_config)
+        draws = np.random.default_rng(1).random((DRAWS, len(rollup.layer_ids)))
+
+        start = time.perf_counter()
+        loop_results = [_loop_rollup(dict(zip(rollup.layer_ids, row))) for row in draws.tolist()]
+        loop_seconds = time.perf_counter() - start
+
+        matrix_seconds = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            factors, segments = rollup.rollup(draws)
+            matrix_seconds = min(matrix_seconds, time.perf_counter() - start)
+
+        speedup = loop_seconds / matrix_seconds
+        print(f"\n{DRAWS:,} draws: loop {loop_seconds * 1000:.0f} ms, "
+              f"matrix {matrix_seconds * 1000:.1f} ms ({speedup:.0f}x)")
+        assert speedup >= 50
+        last_factors, last_segments = loop_results[-1]
+        np.testing.assert_allclose(factors[-1], [last_factors[f] for f in rollup.factor_ids], atol=1e-12)
+        assert segments[-1, rollup.segment_index['S3'], -1] == pytest.approx(last_segments['S3']['overall'],
+                                                                               abs=1e-12)
+
+    def test_incremental_update_cheaper_than_recompute(self):
+        rollup = HierarchyRollup.from_aliases(aliases_config)
+        rng = np.random.default_rng(2)
+        state = rollup.state(rng.random(len(rollup.layer_ids)))
+        updates = [(rollup.layer_ids[i], float(score))
+                   for i, score in zip(rng.integers(len(rollup.layer_ids), size=5000), rng.random(5000))]
+
+        start = time.perf_counter()
+        for layer_id, score in updates:
+            state.update_layer(layer_id, score)
+        update_us = (time.perf_counter() - start) / len(updates) * 1e6
+
+        layers = state.layers.copy()
+        start = time.perf_counter()
+        for layer_id, score in updates:
+            layers[rollup.layer_index[layer_id]] = score
+            rollup.rollup(layers)
+        recompute_us = (time.perf_counter() - start) / len(updates) * 1e6
+
+        print(f"\nSingle-layer update: incremental {update_us:.1f} us, full recompute {recompute_us:.1f} us")
+        assert update_us < recompute_us
+        factors, segments = rollup.rollup(state.layers)
+        np.testing.assert_allclose(state.factors, factors, atol=1e-12)
+        np.testing.assert_allclose(state.segments, segments, atol=1e-12)
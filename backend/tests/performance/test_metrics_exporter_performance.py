@@ -0,0 +1,67 @@
+"""
+Performance tests for the batched metrics exporter.
+
+Measures the request-path cost of recording a point and the cost of a flush,
+using the in-memory sink so the benchmark runs offline.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.middleware.metrics_exporter import InMemorySink, MetricSink, MetricsExporter
+
+
+class SlowSink(MetricSink):
+    """Sink with a fixed per-request latency, like a remote API"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+
+    async def write(self, batch):
+        self.requests += 1
+        await asyncio.sleep(self.latency_seconds)
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestMetricsExporterPerformance:
+    """Recording cost and flush throughput."""
+
+    def test_recording_cost_per_point(self):
+        exporter = MetricsExporter(sink=InMemorySink())
+        labels = [{"function_name": f"svc.fn_{i % 50}", "status": "success"} for i in range(1000)]
+        rounds = 100_000
+
+        start = time.perf_counter()
+        for i in range(rounds):
+            exporter.observe("custom.googleapis.com/validatus/function/latency",
+                             (i % 1000) / 1000, labels=labels[i % 1000])
+        per_point_us = (time.perf_counter() - start) / rounds * 1e6
+
+        print(f"\nRecording a distribution point: {per_point_us:.2f} us")
+        assert per_point_us < 20
+        assert exporter.get_stats()['series'] == 50
+
+    @pytest.mark.asyncio
+    async def test_request_path_independent_of_sink_latency(self):
+        sink = SlowSink(latency_seconds=0.05)
+        exporter = MetricsExporter(sink=sink, flush_interval_seconds=3600)
+
+        start = time.perf_counter()
+        for i in range(1000):
+            exporter.increment("custom.googleapis.com/test/calls", labels={"fn": f"f{i % 500}"})
+        record_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        written = await exporter.flush()
+        flush_seconds = time.perf_counter() - start
+        await exporter.stop(flush=False)
+
+        print(f"\n1,000 points recorded in {record_seconds * 1000:.2f} ms; "
+              f"flush of {written} series took {sink.requests} requests / {flush_seconds * 1000:.0f} ms "
+              f"(per-call export would take ~{1000 * sink.latency_seconds:.0f} s)")
+        assert record_seconds < 0.05
+        assert sink.requests == 3
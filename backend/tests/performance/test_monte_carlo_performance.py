@@ -0,0 +1,156 @@
+"""
+Performance tests for the vectorized Monte Carlo engines.
+
+Compares MonteCarloSimulator sampling and scoring at 100k iterations against
+the previous per-iteration loop (one scalar draw per variable and
+iteration), checks that chunked (streaming) simulations run in constant
+memory, and times a 1M-run correlated AdvancedStrategyAnalysisEngine
+analysis.
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+
+ITERATIONS = 100_000
+UNCERTAINTIES = {
+    'market_conditions': {'distribution': 'normal', 'mean': 0.0, 'std': 0.1},
+    'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.2},
+    'financial_performance': {'distribution': 'beta', 'alpha': 2, 'beta': 2, 'scale': 0.2},
+    'execution_risk': {'distribution': 'uniform', 'low': -0.1, 'high': 0.1},
+}
+PATTERN = {'expected_score': 0.5, 'pattern_multiplier': 1.05, 'industry_factor': 0.97}
+
+
+def _loop_samples(simulator, pattern_data, uncertainties):
+    """The per-iteration implementation the simulator replaced"""
+    samples = []
+    base_score = pattern_data.get('expected_score', 0.5)
+    for _ in range(simulator.params.iterations):
+        adjustments = {}
+        for variable, params in uncertainties.items():
+            distribution = params['distribution']
+            if distribution == 'normal':
+                sample = np.random.normal(params['mean'], params['std'])
+            elif distribution == 'triangular':
+                sample = np.random.triangular(params['low'], params['mode'], params['high'])
+            elif distribution == 'beta':
+                sample = np.random.beta(params['alpha'], params['beta']) * params['scale']
+            else:
+                sample = np.random.uniform(params['low'], params['high'])
+            adjustments[variable] = sample
+        score = base_score
+        score += adjustments.get('market_conditions', 0.0) * 0.3
+        score += adjustments.get('competitive_dynamics', 0.0) * 0.25
+        score += adjustments.get('financial_performance', 0.0) * 0.25
+        score += adjustments.get('execution_risk', 0.0) * 0.2
+        score *= pattern_data.get('pattern_multiplier', 1.0)
+        score *= pattern_data.get('industry_factor', 1.0)
+        score *= pattern_data.get('time_decay_factor', 1.0)
+        samples.append(max(0.0, min(1.0, score)))
+    return samples
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestMonteCarloPerformance:
+    """Vectorized sampling against the per-iteration loop."""
+
+    def test_vectorized_sampling_speedup(self):
+        simulator = MonteCarloSimulator(SimulationParameters(iterations=ITERATIONS, random_seed=42))
+
+        start = time.perf_counter()
+        loop_samples = _loop_samples(simulator, PATTERN, UNCERTAINTIES)
+        loop_seconds = time.perf_counter() - start
+
+        loop = asyncio.new_event_loop()
+        try:
+            vectorized_seconds = float('inf')
+            for _ in range(5):
+                start = time.perf_counter()
+                samples = loop.run_until_complete(
+                    simulator._generate_simulation_samples(PATTERN, UNCERTAINTIES))
+                vectorized_seconds = min(vectorized_seconds, time.perf_counter() - start)
+        finally:
+            loop.close()
+
+        speedup = loop_seconds / vectorized_seconds
+        print(f"\n{ITERATIONS:,} iterations: loop {loop_seconds * 1000:.0f} ms, "
+              f"vectorized {vectorized_seconds * 1000:.1f} ms ({speedup:.0f}x)")
+        assert speedup >= 50
+        # Same model, different streams: the distributions agree
+        assert np.mean(samples) == pytest.approx(np.mean(loop_samples), abs=2e-3)
+        assert np.std(samples) == pytest.approx(np.std(loop_samples), rel=2e-2)
+
+    def test_full_simulation_reproducible_at_scale(self):
+        results = []
+        start = time.perf_counter()
+        for _ in range(2):
+            simulator = MonteCarloSimulator(SimulationParameters(iterations=ITERATIONS, random_seed=42))
+            results.append(asyncio.run(simulator.run_pattern_simulation(PATTERN, UNCERTAINTIES)))
+        per_run_ms = (time.perf_counter() - start) / 2 * 1000
+
+        print(f"\nFull simulation with statistics at {ITERATIONS:,} iterations: {per_run_ms:.0f} ms")
+        first, second = results
+        assert first.percentiles == second.percentiles
+        assert first.risk_metrics == second.risk_metrics
+        assert per_run_ms < 500
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestStreamingSimulationMemory:
+    """Chunked simulations summarize into fixed-size sketches."""
+
+    def _peak_mb(self, iterations, chunk_size):
+        simulator = MonteCarloSimulator(SimulationParameters(iterations=iterations, random_seed=1,
+                                                             chunk_size=chunk_size))
+        tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            result = asyncio.run(simulator.run_pattern_simulation(PATTERN, UNCERTAINTIES))
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+        return peak, seconds, result
+
+    def test_peak_memory_independent_of_iterations(self):
+        small_peak, _, _ = self._peak_mb(1_000_000, 100_000)
+        large_peak, seconds, result = self._peak_mb(10_000_000, 100_000)
+
+        print(f"\nStreaming peak memory: {small_peak:.1f} MB at 1M, {large_peak:.1f} MB at 10M "
+              f"({seconds:.2f}s for 10M)")
+        assert large_peak < small_peak * 1.2 + 1
+        # Materializing 10M float64 scores alone would take 80 MB
+        assert large_peak < 20
+        assert 0.0 <= result.percentiles['1st'] <= result.percentiles['99th'] <= 1.0
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestStrategySimulationPerformance:
+    """Correlated block simulation at 1M runs."""
+
+    def test_million_run_analysis_latency(self):
+        pytest.importorskip("pandas")
+        from app.services.advanced_strategy_analysis import AdvancedStrategyAnalysisEngine
+
+        engine = AdvancedStrategyAnalysisEngine(random_seed=7)
+        topic = {'strategic_layers': {'market_attractiveness': {}, 'competitive_position': {},
+                                      'financial_performance': {}}}
+
+        start = time.perf_counter()
+        results = engine.analyze_strategy('perf', topic, {'budget': 500000}, num_runs=1_000_000)
+        seconds = time.perf_counter() - start
+
+        print(f"\n1,000,000-run correlated analysis: {seconds * 1000:.0f} ms")
+        assert results['simulation_metadata']['runs'] == 1_000_000
+        assert seconds < 3.0
@@ -0,0 +1,115 @@
+"""
+Performance tests for MinHash/LSH near-duplicate detection.
+
+Compares the near-exact deduplication stage's previous full SequenceMatcher
+scan with NearDuplicateIndex on a corpus small enough for the scan
+(decisions must agree), then measures throughput, precision and recall on
+12k pages with planted near-duplicates, where the scan would take hours.
+"""
+
+import random
+import time
+from difflib import SequenceMatcher
+
+import pytest
+
+from app.core.near_duplicates import NearDuplicateIndex
+
+THRESHOLD = 0.95
+EDITS = [
+    lambda text: text.upper(),
+    lambda text: text + ' Read more on our site.',
+    lambda text: text[:-15],
+    lambda text: 'Updated: ' + text,
+    lambda text: text.replace(' ', '  ', 4),
+    lambda text: text[:len(text) // 2] + 'xy' + text[len(text) // 2 + 2:],
+    # Rewrites that fall below the threshold (not near-exact)
+    lambda text: ' '.join(reversed(text.split())),
+]
+
+
+def _corpus(size, seed, duplicate_rate=0.2):
+    """Scraped-page stand-ins sharing boilerplate, with planted edits of earlier pages"""
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 10)))
+             for _ in range(20000)]
+    boilerplate = ' '.join(rng.choice(words) for _ in range(25))
+    texts, sources = [], []
+    for _ in range(size):
+        if texts and rng.random() < duplicate_rate:
+            source = rng.randrange(len(texts))
+            texts.append(rng.choice(EDITS)(texts[source]))
+            sources.append(source)
+        else:
+            body = ' '.join(rng.choice(words) for _ in range(rng.randint(60, 140)))
+            texts.append(f"{body.capitalize()}. {boilerplate}.")
+            sources.append(None)
+    return texts, sources
+
+
+def _full_scan(texts):
+    accepted, decisions = [], []
+    for text in texts:
+        match = None
+        for position, existing in enumerate(accepted):
+            if SequenceMatcher(None, text.lower(), existing.lower()).ratio() > THRESHOLD:
+                match = position
+                break
+        decisions.append(match)
+        if match is None:
+            accepted.append(text)
+    return decisions
+
+
+@pytest.mark.performance
+class TestNearDuplicatePerformance:
+    """LSH candidate search against the pairwise scan."""
+
+    def test_agrees_with_full_scan(self):
+        texts, _ = _corpus(250, seed=1)
+
+        start = time.perf_counter()
+        expected = _full_scan(texts)
+        scan_seconds = time.perf_counter() - start
+
+        index = NearDuplicateIndex(threshold=THRESHOLD)
+        start = time.perf_counter()
+        decisions = [index.check(text)[0] for text in texts]
+        lsh_seconds = time.perf_counter() - start
+
+        found = {i for i, decision in enumerate(decisions) if decision is not None}
+        reference = {i for i, decision in enumerate(expected) if decision is not None}
+        precision = len(found & reference) / max(len(found), 1)
+        recall = len(found & reference) / max(len(reference), 1)
+        print(f"\n{len(texts)} pages: full scan {scan_seconds:.1f}s, LSH {lsh_seconds * 1000:.0f} ms "
+              f"({scan_seconds / lsh_seconds:.0f}x); precision {precision:.3f}, recall {recall:.3f} "
+              f"({len(reference)} duplicates)")
+        assert decisions == expected
+        assert scan_seconds / lsh_seconds >= 20
+
+    def test_throughput_and_recall_at_scale(self):
+        texts, sources = _corpus(12_000, seed=2)
+
+        index = NearDuplicateIndex(threshold=THRESHOLD)
+        start = time.perf_counter()
+        decisions = [index.check(text) for text in texts]
+        seconds = time.perf_counter() - start
+
+        # Ground truth: planted edits above the threshold of a page that was
+        # accepted; edits of rejected pages are compared with accepted pages
+        # only, by the full scan as well
+        accepted = {i for i, (position, _) in enumerate(decisions) if position is None}
+        planted = {i for i, source in enumerate(sources) if source in accepted and
+                   SequenceMatcher(None, texts[i].lower(), texts[source].lower()).ratio() > THRESHOLD}
+
+        found = {i for i, (position, _) in enumerate(decisions) if position is not None}
+        # Every reported pair was verified, so precision is exact by construction
+        assert all(similarity > THRESHOLD for position, similarity in decisions if position is not None)
+        recall = len(found & planted) / len(planted)
+        print(f"\n{len(texts):,} pages: {seconds:.2f}s ({len(texts) / seconds:,.0f} pages/s), "
+              f"{index.verified_pairs:,} pairs verified; recall {recall:.4f} of {len(planted):,} planted, "
+              f"{len(found - planted)} other duplicates found")
+        assert recall >= 0.99
+        # The scan would verify ~(12k^2 / 2) pairs
+        assert index.verified_pairs < 2 * len(texts)
+        assert seconds < 30
@@ -0,0 +1,80 @@
+"""
+Performance tests for inverted-index partial-overlap detection.
+
+Compares the partial deduplication stage's previous pairwise comparison
+with find_partial_duplicates on 5,000 key-sentence word sets (decisions
+must be identical), with and without the SimHash pre-filter.
+"""
+
+import random
+import time
+
+import pytest
+
+from app.core.sentence_overlap import find_partial_duplicates, word_overlap
+
+THRESHOLD = 0.80
+DOCUMENTS = 5000
+
+
+def _word_sets(size, seed, duplicate_rate=0.2):
+    """Ten key sentences per page from a Zipf-like vocabulary, with planted rewrites"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(30000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    sets = []
+    for _ in range(size):
+        if sets and rng.random() < duplicate_rate:
+            words = set(rng.choice(sets))
+            for _ in range(rng.randint(0, 20)):
+                words.discard(rng.choice(sorted(words)))
+                words.add(rng.choice(vocabulary))
+        else:
+            words = set(rng.choices(vocabulary, weights, k=rng.randint(80, 200)))
+        sets.append(frozenset(words))
+    return sets
+
+
+def _pairwise(word_sets):
+    accepted, decisions = [], []
+    for document, words in enumerate(word_sets):
+        decision = (None, 0.0)
+        for existing in accepted:
+            overlap = word_overlap(word_sets[existing], words)
+            if overlap > THRESHOLD:
+                decision = (existing, overlap)
+                break
+        decisions.append(decision)
+        if decision[0] is None:
+            accepted.append(document)
+    return decisions
+
+
+@pytest.mark.performance
+class TestPartialOverlapPerformance:
+    """Inverted word index against the pairwise comparison."""
+
+    @pytest.mark.slow
+    def test_agrees_with_pairwise_on_5k_documents(self):
+        word_sets = _word_sets(DOCUMENTS, seed=1)
+
+        start = time.perf_counter()
+        expected = _pairwise(word_sets)
+        pairwise_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decisions = find_partial_duplicates(word_sets, THRESHOLD)
+        index_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prefiltered = find_partial_duplicates(word_sets, THRESHOLD, simhash_distance=24)
+        simhash_seconds = time.perf_counter() - start
+
+        duplicates = sum(source is not None for source, _ in expected)
+        kept = sum(source is not None for source, _ in prefiltered)
+        print(f"\n{DOCUMENTS:,} documents: pairwise {pairwise_seconds:.1f}s, index {index_seconds * 1000:.0f} ms "
+              f"({pairwise_seconds / index_seconds:.0f}x), with SimHash {simhash_seconds * 1000:.0f} ms; "
+              f"{duplicates} duplicates, {kept} after SimHash")
+        assert decisions == expected
+        assert duplicates > 500
+        assert pairwise_seconds / index_seconds >= 10
@@ -0,0 +1,75 @@
+"""
+Performance tests for batch F1-F28 calculation.
+
+Scores many sessions with PDFFormulaEngine.calculate_all_factors, one
+session at a time, and with a single calculate_factor_batch call, and
+times a 100k-sample Monte Carlo over the factor inputs.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.pdf_formula_engine import (
+    FactorBatch, FactorInput, PDFFormulaEngine
+)
+
+SESSIONS = 200
+SAMPLES = 100_000
+RAW_DATA = {
+    'F1_market_size': {'total_addressable_market': 5e10, 'market_penetration': 0.2, 'market_growth_rate': 4.0},
+    'F2_market_growth': {'market_growth_rate': 0.15, 'growth_sustainability': 0.7},
+    'F4_competitive_intensity': {'market_concentration': 0.4, 'competitor_count': 25},
+    'F15_revenue_growth': {'revenue_growth_rate': 0.2},
+    'F22_brand_strength': {'brand_recognition': 0.6, 'market_share': 0.08},
+    'F9_innovation_capability': {'innovation_capability': 0.7},
+    'F25_operational_excellence': {'operational_excellence': 0.6},
+}
+
+
+def _sessions():
+    rng = np.random.default_rng(0)
+    return [
+        [FactorInput(factor_id, {key: value * rng.uniform(0.8, 1.2) for key, value in raw.items()}, {})
+         for factor_id, raw in RAW_DATA.items()]
+        for _ in range(SESSIONS)
+    ]
+
+
+@pytest.mark.performance
+class TestFactorBatchPerformance:
+    def test_batch_against_per_session(self):
+        engine = PDFFormulaEngine()
+        sessions = _sessions()
+
+        async def score_all():
+            return [(await engine.calculate_all_factors(inputs)).result.overall_score for inputs in sessions]
+
+        start = time.perf_counter()
+        per_session = asyncio.run(score_all())
+        per_session_seconds = time.perf_counter() - start
+
+        batch_seconds = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            batch = engine.calculate_factor_batch(FactorBatch.from_inputs(sessions))
+            batch_seconds = min(batch_seconds, time.perf_counter() - start)
+
+        rng = np.random.default_rng(1)
+        samples = {
+            factor_id: {key: value * rng.lognormal(0.0, 0.2, SAMPLES) for key, value in raw.items()}
+            for factor_id, raw in RAW_DATA.items()
+        }
+        start = time.perf_counter()
+        monte_carlo = engine.calculate_factor_batch(FactorBatch.from_arrays(samples))
+        monte_carlo_seconds = time.perf_counter() - start
+
+        print(f"\n{SESSIONS} sessions: per session {per_session_seconds * 1000:.0f} ms, "
+              f"batch {batch_seconds * 1000:.1f} ms ({per_session_seconds / batch_seconds:.0f}x); "
+              f"{SAMPLES:,}-sample Monte Carlo {monte_carlo_seconds * 1000:.0f} ms")
+        np.testing.assert_allclose(batch.overall_scores, per_session, rtol=1e-12)
+        assert per_session_seconds / batch_seconds >= 10
+        assert monte_carlo.overall_scores.shape == (SAMPLES,)
+        assert monte_carlo_seconds < 1.0
@@ -0,0 +1,73 @@
+"""
+Performance tests for the variance-reduction samplers.
+
+Measures, for each sampling method, the root-mean-square error of the
+MonteCarloSimulator score mean and median over independent replicates at
+increasing iteration counts, and compares the iterations each method needs
+to reach the error plain random sampling achieves at REFERENCE_RUNS.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+
+REPLICATES = 30
+SIZES = [256, 512, 1024, 2048, 4096, 8192, 16384, 32768]
+REFERENCE_RUNS = 32768
+UNCERTAINTIES = {
+    'market_conditions': {'distribution': 'normal', 'mean': 0.0, 'std': 0.1},
+    'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.2},
+    'financial_performance': {'distribution': 'beta', 'alpha': 2, 'beta': 2, 'scale': 0.2},
+    'execution_risk': {'distribution': 'uniform', 'low': -0.1, 'high': 0.1},
+}
+# Clipped at 1, so the score is not linear in the draws
+PATTERN = {'expected_score': 0.85, 'pattern_multiplier': 1.05}
+
+
+def _estimates(sampling, iterations, seed):
+    simulator = MonteCarloSimulator(SimulationParameters(iterations=iterations, random_seed=seed,
+                                                         sampling=sampling))
+    scores = simulator._simulate_scores(PATTERN, UNCERTAINTIES, iterations)
+    return scores.mean(), np.median(scores)
+
+
+def _truth():
+    estimates = np.array([_estimates('sobol', 2 ** 20, seed) for seed in range(4)])
+    return estimates.mean(axis=0)
+
+
+def _rmse_table(sampling, truth):
+    table = {}
+    for size in SIZES:
+        estimates = np.array([_estimates(sampling, size, 1000 + seed) for seed in range(REPLICATES)])
+        table[size] = np.sqrt(((estimates - truth) ** 2).mean(axis=0))
+    return table
+
+
+def _iterations_to(table, tolerance, statistic):
+    reached = [size for size in SIZES if table[size][statistic] <= tolerance]
+    return reached[0] if reached else None
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestSamplingEfficiency:
+    def test_iterations_to_tolerance(self):
+        truth = _truth()
+        tables = {method: _rmse_table(method, truth) for method in ('random', 'antithetic', 'lhs', 'sobol')}
+        target = tables['random'][REFERENCE_RUNS]
+
+        needed = {}
+        print(f"\nIterations to reach random sampling's RMSE at {REFERENCE_RUNS:,} "
+              f"(mean {target[0]:.1e}, median {target[1]:.1e})")
+        for method, table in tables.items():
+            needed[method] = [_iterations_to(table, target[s], s) for s in (0, 1)]
+            print(f"  {method:>10}: mean {needed[method][0]}, median {needed[method][1]}")
+
+        mean_runs, median_runs = needed['sobol']
+        assert mean_runs is not None and REFERENCE_RUNS / mean_runs >= 20
+        assert median_runs is not None and REFERENCE_RUNS / median_runs >= 4
+        assert needed['lhs'][0] is not None and REFERENCE_RUNS / needed['lhs'][0] >= 5
@@ -0,0 +1,93 @@
+"""
+Performance tests for batched scenario analysis.
+
+Runs 60 scenarios through MonteCarloSimulator.run_scenario_analysis
+(common random numbers over a chunked scenario tensor) and through one
+independent simulation per scenario. Compares end-to-end time, the time
+to produce the scores alone, and the replicate variance of scenario deltas.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+
+SCENARIOS = 60
+ITERATIONS = 20_000
+UNCERTAINTIES = {
+    'market_conditions': {'distribution': 'normal', 'mean': 0.0, 'std': 0.1},
+    'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.2},
+    'financial_performance': {'distribution': 'beta', 'alpha': 2, 'beta': 2, 'scale': 0.2},
+    'execution_risk': {'distribution': 'uniform', 'low': -0.1, 'high': 0.1},
+}
+BASE = {'expected_score': 0.5, 'uncertainties': UNCERTAINTIES}
+
+
+def _variations():
+    variations = []
+    for i in range(SCENARIOS):
+        shifted = {**UNCERTAINTIES,
+                   'market_conditions': {'distribution': 'normal', 'mean': 0.002 * i, 'std': 0.1 + 0.001 * i}}
+        variations.append({'name': f"S{i:02d}", 'expected_score': 0.45 + 0.002 * i,
+                           'uncertainties': shifted})
+    return variations
+
+
+def _run(batched, seed, iterations=ITERATIONS):
+    simulator = MonteCarloSimulator(SimulationParameters(iterations=iterations, random_seed=seed))
+    variations = _variations()
+    if batched:
+        return asyncio.run(simulator.run_scenario_analysis(BASE, variations))
+    scenarios = [{**BASE, **variation} for variation in variations]
+    return asyncio.run(simulator._run_scenarios_independently([v['name'] for v in variations], scenarios))
+
+
+def _timed(batched, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _run(batched, seed=1)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestScenarioAnalysisPerformance:
+    def test_batched_scenarios_faster_and_lower_variance(self, monkeypatch):
+        end_to_end = {batched: _timed(batched) for batched in (True, False)}
+
+        # Scores only: statistics replaced by a no-op in both paths
+        monkeypatch.setattr(MonteCarloSimulator, '_calculate_simulation_statistics', lambda self, scores: None)
+        monkeypatch.setattr(MonteCarloSimulator, 'run_pattern_simulation',
+                            lambda self, scenario, uncertainties: asyncio.sleep(
+                                0, self._simulate_scores(scenario, uncertainties, self.params.iterations)))
+        scores_only = {batched: _timed(batched) for batched in (True, False)}
+        monkeypatch.undo()
+
+        # Variance of the S30 - S00 mean difference over replicates
+        deltas = {
+            batched: np.var([
+                (lambda results: results['S30'].mean - results['S00'].mean)(_run(batched, seed, 2_000))
+                for seed in range(20)
+            ])
+            for batched in (True, False)
+        }
+
+        print(f"\n{SCENARIOS} scenarios x {ITERATIONS:,} iterations")
+        print(f"  end to end:  batched {end_to_end[True] * 1000:.0f} ms, "
+              f"independent {end_to_end[False] * 1000:.0f} ms")
+        print(f"  scores only: batched {scores_only[True] * 1000:.0f} ms, "
+              f"independent {scores_only[False] * 1000:.0f} ms "
+              f"({scores_only[False] / scores_only[True]:.1f}x)")
+        print(f"  delta variance: common {deltas[True]:.2e}, independent {deltas[False]:.2e} "
+              f"({deltas[False] / deltas[True]:.0f}x)")
+
+        assert scores_only[False] / scores_only[True] >= 1.5
+        assert end_to_end[True] <= end_to_end[False] * 1.25
+        assert deltas[False] / deltas[True] >= 20
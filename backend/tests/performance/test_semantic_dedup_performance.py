@@ -0,0 +1,89 @@
+"""
+Performance tests for blocked semantic duplicate search.
+
+Compares the semantic deduplication stage's previous full cosine matrix and
+Python double loop with resolve_semantic_duplicates on 2,000 embeddings
+(duplicates must agree), then checks that peak memory on 20,000 embeddings
+stays far below the n x n matrix the previous stage would allocate.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.core.semantic_duplicates import resolve_semantic_duplicates
+
+DIMENSION = 768
+THRESHOLD = 0.85
+
+
+def _embeddings(count, seed, duplicate_rate=0.2):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(count, DIMENSION)).astype(np.float64)
+    copies = np.flatnonzero(rng.random(count) < duplicate_rate)
+    copies = copies[copies > 0]
+    sources = (rng.random(len(copies)) * copies).astype(int)
+    embeddings[copies] = embeddings[sources] + rng.normal(0.0, 0.3, size=(len(copies), DIMENSION))
+    return embeddings, rng.integers(100, 20000, size=count).tolist()
+
+
+def _double_loop(embeddings, lengths):
+    normalized = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+    matrix = np.dot(normalized, normalized.T)
+    duplicates = {}
+    for i in range(len(embeddings)):
+        if i in duplicates:
+            continue
+        for j in range(i + 1, len(embeddings)):
+            if j in duplicates:
+                continue
+            if matrix[i][j] > THRESHOLD:
+                if lengths[i] >= lengths[j]:
+                    duplicates[j] = i
+                else:
+                    duplicates[i] = j
+                    break
+    return duplicates
+
+
+@pytest.mark.performance
+class TestSemanticDedupPerformance:
+    """Blocked threshold search against the full matrix and double loop."""
+
+    def test_agrees_with_double_loop(self):
+        embeddings, lengths = _embeddings(2000, seed=1)
+
+        start = time.perf_counter()
+        expected = _double_loop(embeddings, lengths)
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        duplicates = resolve_semantic_duplicates(embeddings, lengths, THRESHOLD, block_size=256)
+        blocked_seconds = time.perf_counter() - start
+
+        print(f"\n2,000 embeddings: double loop {loop_seconds:.2f}s, blocked {blocked_seconds * 1000:.0f} ms "
+              f"({loop_seconds / blocked_seconds:.0f}x), {len(expected)} duplicates")
+        assert {index: source for index, (source, _) in duplicates.items()} == expected
+        assert len(expected) > 100
+        assert loop_seconds / blocked_seconds >= 5
+
+    def test_memory_is_linear(self):
+        count = 20_000
+        embeddings, lengths = _embeddings(count, seed=2)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        duplicates = resolve_semantic_duplicates(embeddings, lengths, THRESHOLD, block_size=512)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        full_matrix = count * count * 8
+        print(f"\n{count:,} embeddings: {seconds:.2f}s, peak {peak / 2 ** 20:.0f} MB "
+              f"(full matrix {full_matrix / 2 ** 20:,.0f} MB), {len(duplicates):,} duplicates")
+        assert len(duplicates) > 0.1 * count
+        # Normalized copy plus one 512 x n block of similarities and its mask
+        assert peak < 3 * embeddings.nbytes
+        assert peak < full_matrix / 10
@@ -0,0 +1,120 @@
+"""
+Performance tests for the storage codecs.
+
+Compares the legacy cache formats (pickle + gzip, json) with the msgpack
+codec (gzip, and zstd with the cache manager's trained dictionary when
+zstandard is installed) on results shaped like a complete 210-layer v2.0
+analysis, and zstd with and without that dictionary on cache-sized parts.
+"""
+
+import gzip
+import json
+import pickle
+import time
+from typing import Any, Callable, Tuple
+
+import numpy as np
+import pytest
+
+from app.core.serialization import StorageCodec, decode_framed, zstd_available
+from app.services.enhanced_orchestration.cache_dictionary import (
+    cache_dictionary_id, sample_analysis_result
+)
+
+
+def _measure(encode: Callable[[Any], bytes], decode: Callable[[bytes], Any],
+             value: Any, rounds: int = 30) -> Tuple[int, float, float]:
+    data = encode(value)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(value)
+    encode_ms = (time.perf_counter() - start) * 1000 / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode(data)
+    decode_ms = (time.perf_counter() - start) * 1000 / rounds
+    return len(data), encode_ms, decode_ms
+
+
+@pytest.fixture(scope="module")
+def results():
+    return sample_analysis_result("session_benchmark", seed=42)
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestSerializationPerformance:
+    """Bytes on the wire and encode/decode time on 210-layer results."""
+
+    def test_codecs_on_210_layer_results(self, results):
+        gzip_codec = StorageCodec('bench_msgpack_gzip', compression='gzip', level=6)
+        raw_codec = StorageCodec('bench_msgpack_raw', compression=None)
+        candidates = {
+            'legacy pickle+gzip': (lambda v: gzip.compress(pickle.dumps(v)),
+                                   lambda d: pickle.loads(gzip.decompress(d))),
+            'legacy json': (lambda v: json.dumps(v, default=str).encode('utf-8'),
+                            lambda d: json.loads(d.decode('utf-8'))),
+            'msgpack': (raw_codec.encode, raw_codec.decode),
+            'msgpack+gzip': (gzip_codec.encode, gzip_codec.decode),
+        }
+        if zstd_available():
+            zstd_codec = StorageCodec('bench_msgpack_zstd', compression='zstd',
+                                      dictionary_id=cache_dictionary_id())
+            candidates['msgpack+zstd(dict)'] = (zstd_codec.encode, zstd_codec.decode)
+
+        measured = {name: _measure(enc, dec, results) for name, (enc, dec) in candidates.items()}
+
+        print("\nCodec comparison on a 210-layer analysis result:")
+        for name, (size, encode_ms, decode_ms) in measured.items():
+            print(f"  {name:<20}: {size:>7,} bytes, encode {encode_ms:6.2f} ms, "
+                  f"decode {decode_ms:6.2f} ms")
+
+        legacy_size, legacy_encode, _ = measured['legacy pickle+gzip']
+        json_size, json_encode, json_decode = measured['legacy json']
+        size, encode_ms, _ = measured['msgpack+gzip']
+        msgpack_size, msgpack_encode, msgpack_decode = measured['msgpack']
+
+        # pickle memoizes repeated strings; gzip mostly evens that out
+        assert size <= legacy_size * 1.15
+        assert msgpack_size < json_size
+        assert msgpack_encode < json_encode
+        assert msgpack_decode < json_decode
+        if zstd_available():
+            zstd_size, zstd_encode, _ = measured['msgpack+zstd(dict)']
+            assert zstd_size < legacy_size
+            assert zstd_encode < legacy_encode
+
+    @pytest.mark.skipif(not zstd_available(), reason="zstandard not installed")
+    def test_cache_dictionary_shrinks_entries(self, results):
+        plain = StorageCodec('bench_zstd_plain', min_compress_bytes=0)
+        with_dict = StorageCodec('bench_zstd_dict', min_compress_bytes=0,
+                                 dictionary_id=cache_dictionary_id())
+        payloads = {
+            'complete result': results,
+            '10 layer scores': results['layer_scores'][:10],
+            '1 factor': results['factor_calculations'][0],
+            '1 segment': results['segment_analyses'][0],
+        }
+
+        print("\nzstd with and without the cache dictionary:")
+        sizes = {}
+        for name, value in payloads.items():
+            sizes[name] = len(plain.encode(value)), len(with_dict.encode(value))
+            assert with_dict.decode(with_dict.encode(value)) == value
+            print(f"  {name:<16}: {sizes[name][0]:>6,} -> {sizes[name][1]:>6,} bytes")
+
+        assert sizes['complete result'][1] < sizes['complete result'][0] * 0.85
+        for name in ('10 layer scores', '1 factor', '1 segment'):
+            assert sizes[name][1] < sizes[name][0] * 0.7
+
+    def test_numpy_payloads_stay_binary(self):
+        codec = StorageCodec('bench_numpy', compression=None)
+        samples = {'simulations': np.random.default_rng(0).normal(size=100_000)}
+        data = codec.encode(samples)
+        as_json = json.dumps({'simulations': samples['simulations'].tolist()}).encode('utf-8')
+
+        print(f"\n100k float64 samples: codec {len(data):,} bytes vs json {len(as_json):,} bytes")
+        assert len(data) < 100_000 * 8 + 128
+        assert len(data) * 2 < len(as_json)
+        np.testing.assert_array_equal(decode_framed(data)['simulations'],
+                                      samples['simulations'])
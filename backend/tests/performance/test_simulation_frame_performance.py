@@ -0,0 +1,89 @@
+"""
+Performance tests for columnar simulation results.
+
+Measures the peak RSS of holding 200k strategy simulation runs as a list
+of per-run dicts (the previous result format) against a SimulationFrame,
+and of a 2M-run frame that spills past its memory budget. Each variant
+runs in a fresh interpreter so peaks do not mix.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROWS = 200_000
+DRIVERS = ['F1', 'F2', 'F3', 'F5']
+KPIS = ['roi', 'payback_period', 'adoption_rate', 'margin', 'conversion', 'revenue', 'profit', 'npv']
+
+_PRELUDE = f"""
+import json
+import numpy as np
+from app.core.simulation_frame import SimulationFrame
+
+def peak_mb():
+    # VmHWM resets on exec; ru_maxrss would carry over the parent's peak
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+rows, drivers, kpis = {ROWS}, {DRIVERS!r}, {KPIS!r}
+rng = np.random.default_rng(0)
+baseline = peak_mb()
+"""
+
+_RECORDS = """
+records = []
+for run_id in range(rows):
+    values = rng.random(len(drivers) + len(kpis)).tolist()
+    records.append({'run_id': run_id,
+                    'drivers': dict(zip(drivers, values[:len(drivers)])),
+                    'kpis': dict(zip(kpis, values[len(drivers):]))})
+roi = np.percentile([r['kpis']['roi'] for r in records], [25, 50, 75])
+"""
+
+_FRAME = """
+frame = SimulationFrame(length=rows)
+for name in drivers + kpis:
+    frame.add_column(name, rng.random(rows))
+roi = frame.quantiles('roi', [0.25, 0.5, 0.75])
+"""
+
+_SPILLED_FRAME = """
+rows = rows * 10
+frame = SimulationFrame(length=rows, memory_budget_bytes=32 * 1024 * 1024)
+for name in drivers + kpis:
+    frame.add_column(name, rng.random(rows))
+spilled = len(frame.spilled_columns)
+"""
+
+
+def _peak_rss_mb(body: str) -> float:
+    code = _PRELUDE + body + "\nprint(json.dumps(peak_mb() - baseline))\n"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True, cwd='.', env={'PYTHONPATH': '.'})
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.performance
+@pytest.mark.phase_e
+class TestSimulationFrameMemory:
+    """Peak RSS of simulation results."""
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="Needs Linux /proc peak RSS")
+    def test_peak_rss_reduction(self):
+        records_mb = _peak_rss_mb(_RECORDS)
+        frame_mb = _peak_rss_mb(_FRAME)
+        spilled_mb = _peak_rss_mb(_SPILLED_FRAME)
+        column_mb = ROWS * (len(DRIVERS) + len(KPIS)) * 8 / 1024 / 1024
+
+        print(f"\n{ROWS:,} runs x {len(DRIVERS) + len(KPIS)} values: "
+              f"list of dicts +{records_mb:.0f} MB, SimulationFrame +{frame_mb:.0f} MB "
+              f"({column_mb:.0f} MB of columns, {records_mb / max(frame_mb, 1):.0f}x less); "
+              f"{ROWS * 10:,}-run frame with a 32 MB budget +{spilled_mb:.0f} MB "
+              f"({column_mb * 10:.0f} MB of columns)")
+        assert frame_mb * 5 < records_mb
+        assert spilled_mb < column_mb * 10 / 2
@@ -0,0 +1,98 @@
+"""
+Performance tests for the simulation process pool.
+
+Times a batch of simulations serially and with 1..N workers (N = CPU
+count; more than one worker means processes), checking every worker count
+returns the serial table exactly, and times the default pattern analysis
+(41 x 10k samples, above DEFAULT_MIN_PARALLEL_SAMPLES) on a warm pool.
+Speedup is only asserted on machines with more than one CPU.
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.core.simulation_pool import (
+    DEFAULT_MIN_PARALLEL_SAMPLES, SimulationPool, SimulationTask, run_serial
+)
+
+TASKS = 32
+ITERATIONS = 400_000
+PARAMS = [
+    {'distribution': 'triangular', 'min': 0.5, 'mode': 0.75, 'max': 0.95},
+    {'distribution': 'normal', 'mean': 0.6, 'std': 0.15},
+    {'distribution': 'beta', 'alpha': 2, 'beta': 3, 'scale': 0.5},
+    {'distribution': 'uniform', 'min': 0.3, 'max': 0.7},
+]
+
+
+def _tasks(count=TASKS, iterations=ITERATIONS):
+    seeds = np.random.SeedSequence(2024).spawn(count)
+    return [
+        SimulationTask(task_id=f"P{i:03d}", params=PARAMS[i % len(PARAMS)],
+                       adjustments=(0.02,), iterations=iterations, seed=seeds[i])
+        for i in range(count)
+    ]
+
+
+@pytest.mark.performance
+class TestSimulationPoolScaling:
+    def test_scaling_across_cores(self):
+        tasks = _tasks()
+        start = time.perf_counter()
+        serial = run_serial(tasks)
+        serial_time = time.perf_counter() - start
+        print(f"\nserial: {serial_time:.2f}s for {TASKS} x {ITERATIONS:,} samples")
+
+        timings = {}
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            # One worker runs in a thread of this process
+            pool = SimulationPool(max_workers=workers, min_parallel_samples=0)
+            try:
+                # Warm the workers (process start-up and imports)
+                asyncio.run(pool.run(tasks[:workers]))
+                start = time.perf_counter()
+                table = asyncio.run(pool.run(tasks))
+                timings[workers] = time.perf_counter() - start
+            finally:
+                pool.shutdown()
+            np.testing.assert_array_equal(table, serial)
+            print(f"{workers} worker(s): {timings[workers]:.2f}s "
+                  f"({serial_time / timings[workers]:.2f}x serial)")
+
+        cores = os.cpu_count() or 1
+        if cores >= 2:
+            assert serial_time / timings[cores] > min(cores, 4) * 0.5
+
+    def test_default_pattern_analysis_on_warm_pool(self):
+        tasks = _tasks(count=41, iterations=10_000)
+        assert sum(task.iterations for task in tasks) >= DEFAULT_MIN_PARALLEL_SAMPLES
+
+        serial_time = min(_timed(lambda: run_serial(tasks)) for _ in range(3))
+        cores = os.cpu_count() or 1
+        pool = SimulationPool(max_workers=max(cores, 2))
+        try:
+            start = time.perf_counter()
+            asyncio.run(pool.run(tasks))
+            cold_time = time.perf_counter() - start
+            assert pool.get_stats()['started']
+            warm_time = min(_timed(lambda: asyncio.run(pool.run(tasks))) for _ in range(3))
+        finally:
+            pool.shutdown()
+
+        print(f"\n41 x 10,000 samples: serial {serial_time * 1000:.0f} ms, "
+              f"{pool.max_workers} workers cold {cold_time:.2f}s, warm {warm_time * 1000:.0f} ms")
+        if cores >= 2:
+            assert warm_time < serial_time
+        else:
+            # Two processes sharing one core: only the IPC overhead shows
+            assert warm_time < serial_time + 0.1
+
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
@@ -0,0 +1,135 @@
+"""
+Unit tests for the vectorized AdvancedStrategyAnalysisEngine simulation.
+
+Tests seeded reproducibility, the correlation structure of simulated
+drivers, parity of the array KPI/constraint expressions with the
+per-run formulas, the shape of the analysis output, and sequential runs
+that stop once the KPI estimates converge.
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+pytest.importorskip("pandas")
+
+from app.core.sequential_monte_carlo import ConvergenceCriteria  # noqa: E402
+from app.core.simulation_frame import SimulationFrame  # noqa: E402
+from app.services.advanced_strategy_analysis import AdvancedStrategyAnalysisEngine  # noqa: E402
+
+TOPIC = {'strategic_layers': {
+    'market_attractiveness': {}, 'competitive_position': {},
+    'financial_performance': {}, 'risk_assessment': {},
+}}
+INPUTS = {'unit_price': 120, 'unit_cost': 70, 'expected_volume': 1500,
+          'initial_investment': 80000, 'budget': 500000}
+
+
+def _scalar_kpis(drivers, inputs, constraints):
+    """Per-run KPI and constraint formulas the array expressions must reproduce"""
+    unit_price = inputs.get('unit_price', 100)
+    unit_cost = inputs.get('unit_cost', 60)
+    volume = inputs.get('expected_volume', 1000)
+    market_growth = drivers.get('F1', 0.1)
+    competitive_intensity = drivers.get('F2', 0.5)
+    tech_adoption = drivers.get('F3', 0.1)
+    regulatory_impact = drivers.get('F4', 0.0)
+    economic_conditions = drivers.get('F5', 0.05)
+
+    adoption_rate = 0.1 + market_growth + tech_adoption - competitive_intensity * 0.2
+    margin = (unit_price - unit_cost) / unit_price * (1 + economic_conditions - regulatory_impact)
+    conversion = 0.15 + tech_adoption * 0.1 - competitive_intensity * 0.05
+    revenue = unit_price * volume * adoption_rate
+    profit = revenue - unit_cost * volume * adoption_rate
+    investment = inputs.get('initial_investment', 100000)
+    roi = profit / investment if investment > 0 else 0
+    payback = investment / profit if profit > 0 else 999
+    return {
+        'roi': max(constraints['min_roi'], max(0, roi)),
+        'payback_period': min(constraints['max_payback_period'], min(payback, 10)),
+        'adoption_rate': max(constraints['min_adoption_rate'], max(0, min(adoption_rate, 1))),
+        'margin': max(0, min(margin, 1)),
+        'conversion': max(0, min(conversion, 1)),
+        'revenue': max(0, revenue),
+        'profit': profit,
+        'npv': profit * 0.9,
+    }
+
+
+@pytest.fixture
+def engine():
+    return AdvancedStrategyAnalysisEngine(random_seed=11)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestVectorizedStrategySimulation:
+    """Correlated block simulation."""
+
+    def test_frame_shape_and_reproducibility(self, engine):
+        pack = engine._build_simulation_pack(TOPIC, INPUTS)
+        frame = engine._run_monte_carlo_simulation(pack, num_runs=5000)
+        assert isinstance(frame, SimulationFrame)
+        assert len(frame) == 5000
+        assert frame.attrs['driver_ids'] == [driver.factor_id for driver in pack.drivers]
+        assert frame.columns == frame.attrs['driver_ids'] + list(_scalar_kpis({}, {}, pack.constraints))
+        assert all(frame[name].shape == (5000,) and frame[name].flags.c_contiguous for name in frame)
+
+        again = AdvancedStrategyAnalysisEngine(random_seed=11)._run_monte_carlo_simulation(pack, num_runs=5000)
+        assert all(np.array_equal(frame[name], again[name]) for name in frame)
+
+    def test_drivers_follow_correlation_structure(self, engine):
+        pack = engine._build_simulation_pack(TOPIC, INPUTS)
+        frame = engine._run_monte_carlo_simulation(pack, num_runs=200_000)
+
+        # F1 and F5 are both normal: Pearson correlation is the target
+        assert np.corrcoef(frame['F1'], frame['F5'])[0, 1] == pytest.approx(0.4, abs=0.01)
+        # Copula-mapped non-normal pairs keep the Gaussian rank correlation
+        spearman = stats.spearmanr(frame['F2'], frame['F5']).statistic
+        assert spearman == pytest.approx(6 / np.pi * np.arcsin(0.3 / 2), abs=0.01)
+        spearman = stats.spearmanr(frame['F1'], frame['F3']).statistic
+        assert spearman == pytest.approx(6 / np.pi * np.arcsin(0.6 / 2), abs=0.01)
+        # Marginals are unchanged by the correlation
+        assert frame['F1'].mean() == pytest.approx(0.15, abs=1e-3)
+        assert frame['F1'].std() == pytest.approx(0.05, rel=1e-2)
+        assert frame['F2'].mean() == pytest.approx(2 / 5, abs=2e-3)
+
+    def test_array_kpis_match_per_run_formulas(self, engine):
+        pack = engine._build_simulation_pack(TOPIC, INPUTS)
+        frame = engine._run_monte_carlo_simulation(pack, num_runs=2000)
+        driver_ids = frame.attrs['driver_ids']
+        for record in frame.to_records(max_rows=40):
+            drivers = {driver_id: record.pop(driver_id) for driver_id in driver_ids}
+            assert record == pytest.approx(_scalar_kpis(drivers, INPUTS, pack.constraints), rel=1e-12)
+
+    def test_missing_drivers_use_defaults(self, engine):
+        pack = engine._build_simulation_pack({'strategic_layers': {}}, {})
+        frame = engine._run_monte_carlo_simulation(pack, num_runs=100)
+        assert frame.attrs['driver_ids'] == [] and len(frame) == 100
+        for name, expected in _scalar_kpis({}, {}, pack.constraints).items():
+            assert np.all(frame[name] == pytest.approx(expected))
+
+    def test_analysis_output(self, engine):
+        results = engine.analyze_strategy('session-1', TOPIC, INPUTS, num_runs=20_000)
+        assert results['simulation_metadata']['analysis_type'] == 'advanced_monte_carlo'
+        assert results['simulation_metadata']['runs'] == 20_000
+        assert [scenario['name'] for scenario in results['scenarios']] == \
+            ['Base Case', 'Aggressive Growth', 'Crisis']
+        assert results['scenarios'][1]['probability'] == pytest.approx(0.25, abs=0.05)
+        assert 0 <= results['business_case_score']['score'] <= 1
+        assert set(results['driver_sensitivities']) == {'F1', 'F2', 'F3', 'F4', 'F5'}
+        # F4 is filtered out (confidence 0.6) and gets the default sensitivity
+        assert results['driver_sensitivities']['F4'] == 0.1
+        assert results['driver_sensitivities']['F3'] > results['driver_sensitivities']['F5']
+
+    def test_sequential_run_reports_precision(self, engine):
+        criteria = ConvergenceCriteria(relative_tolerance=0.01, batch_size=2000, max_iterations=100_000)
+        results = engine.analyze_strategy('session-2', TOPIC, INPUTS, convergence=criteria)
+        metadata = results['simulation_metadata']
+        report = metadata['convergence']
+
+        assert report['converged']
+        assert metadata['runs'] == report['iterations'] < 100_000
+        assert report['iterations'] % 2000 == 0
+        for name in ('roi.mean', 'adoption_rate.q0.5', 'revenue.q0.95'):
+            assert report['metrics'][name]['standard_error'] <= report['metrics'][name]['target']
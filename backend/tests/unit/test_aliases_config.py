@@ -0,0 +1,155 @@
+"""
+Unit tests for the compiled alias hierarchy.
+
+Tests AliasHierarchy against the YAML configuration it is compiled from
+(parents, CSR children, id lookups), the O(1) ValidatusAliasesConfig
+lookups against the previous scanning and parsing implementations, and the
+on-disk cache keyed by the YAML hash.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+import yaml
+
+from app.core import aliases_config as aliases_module
+from app.core.aliases_config import AliasHierarchy, ValidatusAliasesConfig
+
+
+@pytest.fixture
+def yaml_copy(tmp_path):
+    path = tmp_path / "validatus_aliases.yaml"
+    shutil.copy(aliases_module.DEFAULT_CONFIG_PATH, path)
+    return path
+
+
+@pytest.fixture(scope='module')
+def aliases():
+    return ValidatusAliasesConfig(cache_dir='')
+
+
+@pytest.mark.unit
+class TestAliasHierarchy:
+    def test_matches_configuration(self, aliases):
+        config = aliases.config
+        hierarchy = aliases.hierarchy
+
+        assert hierarchy.segment_ids == tuple(config['reverse']['segments'])
+        assert len(hierarchy.layer_ids) == 210
+        for s, segment_id in enumerate(hierarchy.segment_ids):
+            factors = [hierarchy.factor_ids[f] for f in hierarchy.factors_of_segment(s)]
+            assert factors == config['factor_groups'][segment_id]
+        for f, factor_id in enumerate(hierarchy.factor_ids):
+            layers = [hierarchy.layer_ids[i] for i in hierarchy.layers_of_factor(f)]
+            assert layers == config['layer_groups'][factor_id]
+            assert hierarchy.segment_ids[hierarchy.factor_segment[f]] == next(
+                segment for segment, factors in config['factor_groups'].items() if factor_id in factors)
+        assert np.all(hierarchy.layer_factor >= 0)
+
+    def test_arrays_and_maps_are_read_only(self, aliases):
+        hierarchy = aliases.hierarchy
+        with pytest.raises(ValueError):
+            hierarchy.layer_factor[0] = 3
+        with pytest.raises(TypeError):
+            hierarchy.factor_of_layer['L1_1'] = 'F2'
+        with pytest.raises(AttributeError):
+            hierarchy.layer_ids = ()
+
+    def test_dict_round_trip(self, aliases):
+        restored = AliasHierarchy.from_dict(aliases.hierarchy.to_dict())
+        assert restored.layer_ids == aliases.hierarchy.layer_ids
+        np.testing.assert_array_equal(restored.factor_layer_indices, aliases.hierarchy.factor_layer_indices)
+        assert restored.segment_of_layer == aliases.hierarchy.segment_of_layer
+
+
+@pytest.mark.unit
+class TestLookups:
+    def test_match_previous_implementations(self, aliases):
+        config = aliases.config
+        for factor_id in config['reverse']['factors']:
+            scanned = next((segment for segment, factors in config['factor_groups'].items()
+                            if factor_id in factors), None)
+            assert aliases.get_segment_for_factor(factor_id) == scanned
+        for layer_id in config['reverse']['layers']:
+            parsed = f"F{layer_id.split('_')[0][1:]}"
+            assert aliases.get_factor_for_layer(layer_id) == parsed
+            assert aliases.get_segment_for_layer(layer_id) == aliases.get_segment_for_factor(parsed)
+        assert list(aliases.get_all_layer_ids()) == list(config['reverse']['layers'])
+
+    def test_unknown_ids(self, aliases):
+        assert aliases.get_segment_for_factor('F99') is None
+        # Layer ids outside the configuration still resolve by their format
+        assert aliases.get_factor_for_layer('L3_42') == 'F3'
+        assert aliases.get_segment_for_layer('L3_42') == 'S1'
+        assert aliases.get_factor_for_layer('unknown') is None
+
+    def test_validation(self, aliases):
+        assert aliases.validate_configuration()['valid']
+
+
+@pytest.mark.unit
+class TestHierarchyCache:
+    def test_second_load_skips_yaml(self, yaml_copy, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        first = ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+        assert len(list(cache_dir.glob("*.json"))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("YAML parsed despite a valid cache")
+        monkeypatch.setattr(aliases_module.yaml, 'safe_load', fail)
+        second = ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+
+        assert second.config == first.config
+        assert second.hierarchy.layer_ids == first.hierarchy.layer_ids
+        assert second.get_segment_for_layer('L20_4') == 'S3'
+
+    def test_changed_yaml_invalidates_cache(self, yaml_copy, tmp_path):
+        cache_dir = tmp_path / "cache"
+        ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+
+        config = yaml.safe_load(yaml_copy.read_text())
+        config['factor_groups']['S1'].remove('F10')
+        config['factor_groups']['S2'].append('F10')
+        yaml_copy.write_text(yaml.safe_dump(config))
+        changed = ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+
+        assert changed.get_segment_for_factor('F10') == 'S2'
+        # The stale entry is replaced
+        assert len(list(cache_dir.glob("*.json"))) == 1
+
+    def test_corrupt_cache_falls_back_to_yaml(self, yaml_copy, tmp_path):
+        cache_dir = tmp_path / "cache"
+        ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+        cache_file, = cache_dir.glob("*.json")
+        cache_file.write_text("{not json")
+
+        reloaded = ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+        assert len(reloaded.get_all_layer_ids()) == 210
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX ownership checks")
+    def test_cache_directory_is_private(self, yaml_copy, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+        assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+        # A cache others could have planted is ignored, and the YAML is parsed
+        cache_dir.chmod(0o777)
+        parsed = []
+        safe_load = aliases_module.yaml.safe_load
+        monkeypatch.setattr(aliases_module.yaml, 'safe_load', lambda raw: parsed.append(1) or safe_load(raw))
+        reloaded = ValidatusAliasesConfig(yaml_copy, cache_dir=str(cache_dir))
+
+        assert parsed
+        assert len(reloaded.get_all_layer_ids()) == 210
+
+    def test_default_cache_directory_is_per_user(self, monkeypatch, tmp_path):
+        monkeypatch.delenv(aliases_module.CACHE_DIR_ENV, raising=False)
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+        assert ValidatusAliasesConfig().cache_dir == tmp_path / "validatus"
+
+    def test_missing_yaml_uses_fallback(self, tmp_path):
+        missing = ValidatusAliasesConfig(tmp_path / "absent.yaml", cache_dir=str(tmp_path))
+        assert missing.get_all_segment_ids() == ()
+        assert missing.get_segment_for_factor('F1') is None
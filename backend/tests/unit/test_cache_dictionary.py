@@ -0,0 +1,44 @@
+"""
+Unit tests for the shared cache zstd dictionary.
+
+Tests that training is deterministic (every instance registers the same
+dictionary id) and that the cache manager's compressed tiers use it.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.serialization import StorageCodec, describe, zstd_available
+from app.services.enhanced_orchestration.cache_dictionary import (
+    cache_dictionary_id,
+    dictionary_samples,
+    sample_analysis_result
+)
+
+pytestmark = pytest.mark.skipif(not zstd_available(), reason="zstandard not installed")
+
+
+@pytest.mark.unit
+class TestCacheDictionary:
+    def test_samples_are_deterministic(self):
+        assert dictionary_samples(3) == dictionary_samples(3)
+        assert len(sample_analysis_result("s1")['layer_scores']) == 210
+
+    def test_training_is_deterministic(self):
+        # A fresh training run (another instance) yields the same dictionary id
+        assert cache_dictionary_id.__wrapped__() == cache_dictionary_id() is not None
+
+    def test_manager_tiers_use_dictionary(self, mock_gcp_settings):
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+            manager = mlcm.MultiLevelCacheManager(project_id="test-project")
+
+        value = sample_analysis_result("s1", seed=7)['layer_scores'][:10]
+        for level in (CacheLevel.L2_REDIS, CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT):
+            data = manager._serialize_for_storage(level, value)
+            assert describe(data)['dictionary_id'] == cache_dictionary_id()
+            # Any other instance decodes it with its own codecs
+            assert StorageCodec('test_other_instance').decode(data) == value
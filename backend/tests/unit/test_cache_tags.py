@@ -0,0 +1,261 @@
+"""
+Unit tests for tag and namespace cache invalidation.
+
+Tests generation stamping, O(1) invalidation across all cache levels,
+sharing of generations between instances through Redis, and that a
+generation never goes backwards after failed bumps, clears or evictions.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.enhanced_orchestration.cache_tags import (
+    TagGenerations,
+    TaggedValue,
+    cache_tags,
+    namespace_of
+)
+from tests.unit.test_write_back import FakeRedis, FakeMemcached, FakeFirestore
+
+
+class CountingRedis(FakeRedis):
+    """FakeRedis with counters and setex for tag generation tests
+
+    Counters share the keyspace with cached values, as in Redis.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.expiries = {}
+        self.fail_incr = False
+
+    async def setex(self, key, ttl, data):
+        self.data[key] = data
+        return True
+
+    async def incrby(self, key, amount):
+        if self.fail_incr:
+            raise ConnectionError("redis unavailable")
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def incr(self, key):
+        return await self.incrby(key, 1)
+
+    async def expire(self, key, ttl):
+        self.expiries[key] = ttl
+        return key in self.data
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestTagGenerations:
+    """Test suite for generation counters."""
+
+    def test_cache_tags_and_namespaces(self):
+        assert cache_tags(session_id="s1", topic="ev", analysis_id="a9") == [
+            "session:s1", "topic:ev", "analysis:a9"
+        ]
+        assert cache_tags() == []
+        assert namespace_of("analysis_optimization:s1") == "analysis_optimization"
+        assert namespace_of("plainkey") is None
+
+    @pytest.mark.asyncio
+    async def test_bump_makes_stamp_stale(self):
+        generations = TagGenerations()
+        stamp = await generations.stamp(["session:s1", "topic:ev"])
+        assert await generations.is_current(stamp)
+
+        await generations.bump("topic:ev")
+        assert not await generations.is_current(stamp)
+        assert await generations.is_current(await generations.stamp(["session:s1", "topic:ev"]))
+
+    @pytest.mark.asyncio
+    async def test_generations_shared_through_redis(self):
+        redis = CountingRedis()
+        instance_a = TagGenerations(redis, refresh_seconds=0.0)
+        instance_b = TagGenerations(redis, refresh_seconds=0.0)
+
+        stamp = await instance_b.stamp(["session:s1"])
+        await instance_a.bump("session:s1")
+        assert not await instance_b.is_current(stamp)
+
+    @pytest.mark.asyncio
+    async def test_failed_shared_bump_is_kept_and_retried(self):
+        redis = CountingRedis()
+        instance_a = TagGenerations(redis, refresh_seconds=0.0)
+        instance_b = TagGenerations(redis, refresh_seconds=0.0)
+        await instance_a.bump("session:s1")
+        stamp_a = await instance_a.stamp(["session:s1"])
+        stamp_b = await instance_b.stamp(["session:s1"])
+
+        redis.fail_incr = True
+        assert await instance_a.bump("session:s1") is False
+        # A refresh must not adopt the older Redis value
+        assert not await instance_a.is_current(stamp_a)
+        assert instance_a.get_stats()['unshared_tags'] == 1
+
+        redis.fail_incr = False
+        assert not await instance_a.is_current(stamp_a)
+        assert instance_a.get_stats()['unshared_tags'] == 0
+        assert not await instance_b.is_current(stamp_b)
+        assert await instance_b.stamp(["session:s1"]) == await instance_a.stamp(["session:s1"])
+
+    @pytest.mark.asyncio
+    async def test_lost_counter_is_republished(self):
+        redis = CountingRedis()
+        instance = TagGenerations(redis, refresh_seconds=0.0)
+        stamp = await instance.stamp(["topic:ev"])
+        await instance.bump("topic:ev")
+        await instance.bump("topic:ev")
+        assert redis.expiries["tag_gen:topic:ev"] == instance.counter_ttl_seconds
+
+        redis.data.clear()
+        assert not await instance.is_current(stamp)
+        assert redis.data["tag_gen:topic:ev"] == 2
+        assert not await TagGenerations(redis).is_current(stamp)
+
+    @pytest.mark.asyncio
+    async def test_tracked_tags_are_bounded(self):
+        redis = CountingRedis()
+        shared = TagGenerations(redis, refresh_seconds=0.0, max_tags=3)
+        await shared.bump("topic:old")
+        stamp = await shared.stamp(["topic:old"])
+        await shared.bump("topic:old")
+        await shared.stamp([f"session:s{i}" for i in range(10)])
+        assert shared.get_stats()['tracked_tags'] == 3
+        # Evicted tags are re-read from Redis
+        assert not await shared.is_current(stamp)
+
+        local = TagGenerations(max_tags=3)
+        stamp = await local.stamp(["topic:old"])
+        await local.bump("topic:old")
+        for i in range(10):
+            await local.bump(f"session:s{i}")
+        assert local.get_stats()['tracked_tags'] == 3
+        assert not await local.is_current(stamp)
+
+    def test_tagged_value_pickles(self):
+        import pickle
+        tagged = TaggedValue({"score": 0.4}, (("session:s1", 3),))
+        restored = pickle.loads(pickle.dumps(tagged))
+        assert restored.value == {"score": 0.4}
+        assert restored.generations == (("session:s1", 3),)
+        assert restored.tags == ["session:s1"]
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCacheManagerTagInvalidation:
+    """Tag invalidation through MultiLevelCacheManager on every level."""
+
+    @pytest.fixture
+    def cache_manager(self, mock_gcp_settings):
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+            manager = mlcm.MultiLevelCacheManager(project_id="test-project")
+        for level in (CacheLevel.L2_REDIS, CacheLevel.L3_MEMCACHED):
+            manager.cache_configs[level].enabled = True
+        manager.redis_client = CountingRedis()
+        manager.memcached_client = FakeMemcached()
+        manager.cache_configs[CacheLevel.L4_PERSISTENT].enabled = False
+        manager.tag_generations.redis_client = manager.redis_client
+        manager.tag_generations.refresh_seconds = 0.0
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_invalidate_session_tag(self, cache_manager):
+        await cache_manager.set("analysis_optimization:s1", {"score": 1},
+                                tags=cache_tags(session_id="s1"))
+        await cache_manager.set("layer_scores:s1", {"score": 2},
+                                tags=cache_tags(session_id="s1", analysis_id="a1"))
+        await cache_manager.set("layer_scores:s2", {"score": 3},
+                                tags=cache_tags(session_id="s2"))
+
+        assert await cache_manager.invalidate_tags("session:s1") == 1
+
+        assert await cache_manager.get("analysis_optimization:s1") is None
+        assert await cache_manager.get("layer_scores:s1") is None
+        assert await cache_manager.get("layer_scores:s2") == {"score": 3}
+
+        stats = await cache_manager.get_cache_stats()
+        assert stats['tags']['invalidations'] == 1
+        assert stats['tags']['stale_reads'] >= 2
+
+    @pytest.mark.asyncio
+    async def test_stale_entries_rejected_on_lower_levels(self, cache_manager):
+        await cache_manager.set("layer_scores:s1", "v", tags=["topic:ev"])
+        await cache_manager.invalidate_tags("topic:ev")
+
+        # L1 is empty after the stale read; L2 and L3 still hold the old bytes
+        assert await cache_manager.get("layer_scores:s1") is None
+        cache_manager.l1_cache.clear()
+        assert "layer_scores:s1" in cache_manager.redis_client.data
+        assert "layer_scores:s1" in cache_manager.memcached_client.data
+        assert await cache_manager.get("layer_scores:s1", "miss") == "miss"
+
+        # Rewriting under the new generation makes the key readable again
+        await cache_manager.set("layer_scores:s1", "fresh", tags=["topic:ev"])
+        cache_manager.l1_cache.clear()
+        assert await cache_manager.get("layer_scores:s1") == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_namespace(self, cache_manager):
+        await cache_manager.set("knowledge_loading:ev", "kb")
+        await cache_manager.set("analysis_optimization:s1", "analysis")
+
+        await cache_manager.invalidate_namespace("knowledge_loading")
+
+        assert await cache_manager.get("knowledge_loading:ev") is None
+        assert await cache_manager.get("analysis_optimization:s1") == "analysis"
+
+    @pytest.mark.asyncio
+    async def test_other_instance_sees_invalidation(self, cache_manager):
+        await cache_manager.set("layer_scores:s1", "v", tags=cache_tags(session_id="s1"))
+
+        other = TagGenerations(cache_manager.redis_client, refresh_seconds=0.0)
+        await other.bump("session:s1")
+
+        assert await cache_manager.get("layer_scores:s1") is None
+
+    @pytest.mark.asyncio
+    async def test_clear_keeps_generations(self, cache_manager):
+        await cache_manager.set("layer_scores:s1", "v", tags=cache_tags(session_id="s1"))
+        await cache_manager.invalidate_tags("session:s1")
+
+        await cache_manager.clear_all_caches()
+
+        # L3 still holds the entry stamped before the invalidation
+        assert "layer_scores:s1" in cache_manager.memcached_client.data
+        assert "layer_scores:s1" not in cache_manager.redis_client.data
+        assert cache_manager.redis_client.data["tag_gen:session:s1"] == 1
+        other = TagGenerations(cache_manager.redis_client)
+        assert not await other.is_current((("session:s1", 0),))
+        assert await cache_manager.get("layer_scores:s1") is None
+
+    @pytest.mark.asyncio
+    async def test_unshared_invalidation_reported(self, cache_manager):
+        cache_manager.redis_client.fail_incr = True
+        assert await cache_manager.invalidate_tags("session:s1", "topic:ev") == 0
+
+    @pytest.mark.asyncio
+    async def test_firestore_entries_stamped(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel, CacheStrategy
+
+        cache_manager.cache_configs[CacheLevel.L4_PERSISTENT].enabled = True
+        cache_manager.firestore_client = FakeFirestore()
+        await cache_manager.set("layer_scores:s1", "v", tags=cache_tags(session_id="s1"),
+                                strategy=CacheStrategy.WRITE_BACK)
+        await cache_manager.write_back.flush()
+
+        (doc,) = cache_manager.firestore_client.docs.values()
+        stored = cache_manager._deserialize_from_storage(CacheLevel.L4_PERSISTENT, doc['value'])
+        assert isinstance(stored, TaggedValue)
+        assert ("session:s1", 0) in stored.generations
+        await cache_manager.shutdown()
@@ -0,0 +1,122 @@
+"""
+Unit tests for correlated sampling.
+
+Tests the correlation matrix builder, nearest-correlation repair and
+Cholesky fallback, the correlation of generated normals, and the Gaussian
+copula mapping onto each supported marginal.
+"""
+
+import logging
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.core.correlated_sampling import (
+    TABULATE_ABOVE, cholesky_factor, correlated_normals, correlation_matrix,
+    nearest_correlation, to_marginal
+)
+
+# Pairwise estimates that cannot all hold at once (not PSD)
+INCONSISTENT = np.array([[1.0, 0.9, -0.9],
+                         [0.9, 1.0, 0.9],
+                         [-0.9, 0.9, 1.0]])
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCorrelationStructure:
+    """Matrix construction and repair."""
+
+    def test_matrix_from_pairs(self):
+        matrix = correlation_matrix(['F1', 'F3', 'F5'], {
+            'F1': {'F3': 0.6, 'F5': 0.4, 'F9': 0.9},
+            'F3': {'F1': 0.4},
+            'F7': {'F1': 0.5},
+        })
+        expected = np.array([[1.0, 0.5, 0.4],
+                             [0.5, 1.0, 0.0],
+                             [0.4, 0.0, 1.0]])
+        assert np.allclose(matrix, expected)
+
+        with pytest.raises(ValueError):
+            correlation_matrix(['a', 'b'], {'a': {'b': 1.5}})
+
+    def test_nearest_correlation_is_valid_and_close(self):
+        repaired = nearest_correlation(INCONSISTENT)
+        assert np.allclose(repaired, repaired.T)
+        assert np.allclose(np.diag(repaired), 1.0)
+        assert np.linalg.eigvalsh(repaired).min() > 0
+        # Small perturbation of the input, same sign pattern
+        assert np.abs(repaired - INCONSISTENT).max() < 0.5
+        assert np.array_equal(np.sign(repaired), np.sign(INCONSISTENT))
+        # Valid matrices are (numerically) unchanged
+        valid = np.array([[1.0, 0.3], [0.3, 1.0]])
+        assert np.allclose(nearest_correlation(valid), valid)
+
+    def test_cholesky_falls_back_to_nearest_correlation(self, caplog):
+        valid = np.array([[1.0, 0.5], [0.5, 1.0]])
+        assert np.allclose(cholesky_factor(valid), np.linalg.cholesky(valid))
+
+        with caplog.at_level(logging.WARNING):
+            factor = cholesky_factor(INCONSISTENT)
+        assert "not positive definite" in caplog.text
+        assert np.allclose(factor @ factor.T, nearest_correlation(INCONSISTENT))
+
+    def test_generated_normals_have_target_correlation(self):
+        target = np.array([[1.0, 0.6, -0.3],
+                           [0.6, 1.0, 0.2],
+                           [-0.3, 0.2, 1.0]])
+        normals = correlated_normals(np.random.default_rng(0), cholesky_factor(target), 400_000)
+        assert normals.shape == (400_000, 3)
+        assert np.allclose(np.corrcoef(normals.T), target, atol=0.01)
+        assert np.allclose(normals.mean(axis=0), 0.0, atol=0.01)
+        assert np.allclose(normals.std(axis=0), 1.0, atol=0.01)
+
+    def test_same_seed_same_draws(self):
+        factor = cholesky_factor(np.array([[1.0, 0.4], [0.4, 1.0]]))
+        first = correlated_normals(np.random.default_rng(5), factor, 1000)
+        second = correlated_normals(np.random.default_rng(5), factor, 1000)
+        assert np.array_equal(first, second)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestGaussianCopula:
+    """Marginal mapping."""
+
+    @pytest.mark.parametrize('distribution_type,params,reference', [
+        ('normal', {'mean': 0.15, 'std': 0.05}, stats.norm(0.15, 0.05)),
+        ('lognormal', {'mu': 0.1, 'sigma': 0.3}, stats.lognorm(0.3, scale=np.exp(0.1))),
+        ('beta', {'alpha': 2, 'beta': 3}, stats.beta(2, 3)),
+        ('triangular', {'low': -0.1, 'mode': 0.02, 'high': 0.1},
+         stats.triang(0.6, loc=-0.1, scale=0.2)),
+        ('uniform', {'low': -1.0, 'high': 3.0}, stats.uniform(-1.0, 4.0)),
+        ('unknown', {}, stats.uniform(0.0, 1.0)),
+    ])
+    def test_marginals_match_target_distribution(self, distribution_type, params, reference):
+        normals = np.random.default_rng(1).standard_normal(20_000)
+        values = to_marginal(distribution_type, params, normals)
+        assert stats.kstest(values, reference.cdf).pvalue > 0.01
+        # Normal quantiles map exactly onto the target's quantiles
+        levels = np.array([0.01, 0.1, 0.5, 0.9, 0.99])
+        assert np.allclose(to_marginal(distribution_type, params, stats.norm.ppf(levels)),
+                           reference.ppf(levels), rtol=1e-9, atol=1e-12)
+
+    def test_rank_correlation_is_preserved(self):
+        rho = 0.6
+        factor = cholesky_factor(np.array([[1.0, rho], [rho, 1.0]]))
+        normals = correlated_normals(np.random.default_rng(2), factor, 200_000)
+        beta = to_marginal('beta', {'alpha': 2, 'beta': 3}, normals[:, 0])
+        triangular = to_marginal('triangular', {'low': -0.1, 'mode': 0.0, 'high': 0.1}, normals[:, 1])
+
+        spearman = stats.spearmanr(beta, triangular).statistic
+        assert spearman == pytest.approx(stats.spearmanr(normals[:, 0], normals[:, 1]).statistic, abs=1e-9)
+        assert spearman == pytest.approx(6 / np.pi * np.arcsin(rho / 2), abs=0.01)
+
+    def test_tabulated_beta_matches_exact_inverse(self):
+        normals = np.random.default_rng(3).standard_normal(TABULATE_ABOVE + 1)
+        for alpha, beta in ((2, 3), (0.5, 0.5), (10, 1)):
+            tabulated = to_marginal('beta', {'alpha': alpha, 'beta': beta}, normals)
+            exact = to_marginal('beta', {'alpha': alpha, 'beta': beta}, normals[:TABULATE_ABOVE])
+            assert np.abs(tabulated[:TABULATE_ABOVE] - exact).max() < 1e-6
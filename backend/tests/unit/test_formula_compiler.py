@@ -0,0 +1,146 @@
+"""
+Unit tests for compiled formulas.
+
+Tests that the restricted grammar rejects everything but arithmetic,
+scalar and array evaluation, division-by-zero handling, the compile cache,
+and parity of FormulaEngine factors with the values of the previous
+string-substitution parser.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.formula_compiler import (
+    MAX_NODES, CompiledFormula, FormulaError, clear_cache, compile_formula, get_cache_stats
+)
+from app.services.formula_engine import FormulaEngine
+
+LAYER_SCORES = {'market': 0.7, 'competitive': 0.6, 'financial': 0.8, 'consumer': 0.5,
+                'product': 0.6, 'experience': 0.7, 'operations': 0.6, 'brand': 0.5}
+# Produced by the string-substitution parser for LAYER_SCORES
+PREVIOUS_VALUES = {
+    'market_attractiveness': 0.7128,
+    'product_market_fit': 0.589,
+    'operational_efficiency': 0.0,
+    'brand_strength': 0.081432,
+    'technology_readiness': 0.265,
+    'financial_viability': 1.0,
+    'regulatory_compliance': 0.0,
+    'customer_experience': 0.1694832,
+    'competitive_advantage': 0.51156,
+    'innovation_potential': 0.10659,
+}
+
+
+@pytest.mark.unit
+class TestFormulaSafety:
+    @pytest.mark.parametrize('formula', [
+        "__import__('os').system('true')",
+        "open('/etc/passwd')",
+        "x.__class__",
+        "().__class__.__bases__[0]",
+        "values[0]",
+        "lambda: 1",
+        "[x for x in y]",
+        "x if y else z",
+        "x > 0",
+        "x and y",
+        "'text' * 3",
+        "True + 1",
+        "f'{x}'",
+        "max(x, key=y)",
+        "(x := 1)",
+        "x; y",
+        "import os",
+        "x = 1",
+        "_hidden + 1",
+        "eval('1')",
+        "x % 2",
+        "x // 2",
+        "x @ y",
+    ])
+    def test_rejects_non_arithmetic(self, formula):
+        with pytest.raises(FormulaError):
+            compile_formula(formula)
+
+    def test_size_and_nesting_limits(self):
+        with pytest.raises(FormulaError):
+            compile_formula(' + '.join(f"x{i}" for i in range(MAX_NODES)))
+        with pytest.raises(FormulaError):
+            compile_formula('(' * 500 + 'x' + ')' * 500)
+        with pytest.raises(FormulaError):
+            compile_formula('x' * 5000)
+
+    def test_large_powers_do_not_hang(self):
+        assert compile_formula('9 ** 9 ** 9')({}) == float('inf')
+        assert compile_formula('x ** 1000')({'x': 10.0}) == float('inf')
+
+    def test_missing_inputs(self):
+        with pytest.raises(FormulaError, match='b, c'):
+            compile_formula('a * b + c')({'a': 1.0})
+
+
+@pytest.mark.unit
+class TestFormulaEvaluation:
+    def test_scalar_semantics(self):
+        formula = compile_formula('(a * b - c) / d + -e ** 2 + max(a, b, 0.1) - sqrt(abs(c))')
+        values = {'a': 0.5, 'b': 0.8, 'c': -0.25, 'd': 2.0, 'e': 0.3}
+        expected = (0.5 * 0.8 + 0.25) / 2.0 + -0.3 ** 2 + 0.8 - 0.5
+        assert formula(values) == pytest.approx(expected)
+        assert isinstance(formula(values), float)
+        assert formula.variables == ('a', 'b', 'c', 'd', 'e')
+
+    def test_division_by_zero_is_zero(self):
+        assert compile_formula('a / b')({'a': 1.0, 'b': 0.0}) == 0.0
+        result = compile_formula('a / b')({'a': np.ones(3), 'b': np.array([2.0, 0.0, 4.0])})
+        np.testing.assert_array_equal(result, [0.5, 0.0, 0.25])
+        assert compile_formula('1 / 0 + a')({'a': 1.0}) == 1.0
+
+    def test_arrays_match_scalar_calls(self):
+        formula = compile_formula('(a * b * c) / d - min(a, c) + exp(log(b))')
+        rng = np.random.default_rng(0)
+        arrays = {name: rng.random(1000) for name in 'abcd'}
+        arrays['d'][::7] = 0.0
+        # Scalars broadcast against arrays
+        arrays['c'] = 0.4
+
+        vectorized = formula(arrays)
+        looped = [formula({name: value if np.ndim(value) == 0 else value[i] for name, value in arrays.items()})
+                  for i in range(1000)]
+        np.testing.assert_allclose(vectorized, looped, rtol=1e-14)
+
+    def test_cache_by_normalized_text(self):
+        clear_cache()
+        first = compile_formula('(a*b) / c')
+        second = compile_formula(' ( a * b )/c ')
+        assert first is second
+        assert isinstance(first, CompiledFormula)
+        assert get_cache_stats()['hits'] >= 1
+
+
+@pytest.mark.unit
+class TestFormulaEngine:
+    def test_factors_match_previous_parser(self):
+        engine = FormulaEngine()
+        calculations = asyncio.run(engine.calculate_all_factors(LAYER_SCORES, 'session'))
+
+        values = {calculation.factor_name: calculation.calculated_value for calculation in calculations}
+        assert values == pytest.approx(PREVIOUS_VALUES)
+        steps = calculations[0].calculation_steps
+        assert [step['step'] for step in steps][-2:] == ['final_evaluation', 'normalize_result']
+
+    def test_vectorized_factor_matches_per_sample(self):
+        engine = FormulaEngine()
+        rng = np.random.default_rng(1)
+        samples = {layer: np.clip(rng.normal(score, 0.1, 500), 0.01, 1.0) for layer, score in LAYER_SCORES.items()}
+
+        for factor_name in PREVIOUS_VALUES:
+            if factor_name == 'regulatory_compliance':
+                continue
+            vectorized = engine.evaluate_factor(factor_name, samples)
+            looped = [engine.evaluate_factor(factor_name, {layer: values[i] for layer, values in samples.items()})
+                      for i in range(0, 500, 25)]
+            np.testing.assert_allclose(vectorized[::25], looped, rtol=1e-12)
+            assert vectorized.min() >= 0.0 and vectorized.max() <= 1.0
@@ -0,0 +1,185 @@
+"""
+Unit tests for the matrix 210 -> 28 -> 5 hierarchy roll-up.
+
+Tests HierarchyRollup against the V2 engines' per-factor and per-segment
+loops (with missing layers), batch mat-mat roll-ups against single
+vectors, RollupState single-layer updates against full recomputes, and the
+V2 engines' use of the roll-up.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.core.aliases_config import aliases_config
+from app.core.hierarchy_rollup import (
+    DEFAULT_SCORE, SEGMENT_METRIC_WEIGHTS, SEGMENT_OUTPUTS, HierarchyRollup, overall_segment_score
+)
+
+
+def _loop_rollup(scores):
+    """The dict-and-loop roll-up the engines used"""
+    grouped = {}
+    for layer_id, score in scores.items():
+        grouped.setdefault(aliases_config.get_factor_for_layer(layer_id), []).append(score)
+    factors = {}
+    for factor_id in aliases_config.get_all_factor_ids():
+        layer_scores = grouped.get(factor_id)
+        factors[factor_id] = sum(layer_scores) / len(layer_scores) if layer_scores else DEFAULT_SCORE
+    segments = {}
+    for segment_id, formulas in SEGMENT_METRIC_WEIGHTS.items():
+        metrics = {metric: sum(factors.get(factor_id, 0.5) * weight for factor_id, weight in weights.items())
+                   for metric, weights in formulas.items()}
+        overall = (metrics['attractiveness'] * 0.35 + (1.0 - metrics['competitiveness']) * 0.25 +
+                   metrics['market_size'] * 0.20 + metrics['growth'] * 0.20)
+        segments[segment_id] = dict(metrics, overall=overall)
+    return factors, segments
+
+
+def _random_scores(rng, missing=0.3):
+    return {layer_id: float(rng.random()) for layer_id in aliases_config.get_all_layer_ids()
+            if rng.random() >= missing}
+
+
+@pytest.fixture(scope='module')
+def rollup():
+    return HierarchyRollup.from_aliases(aliases_config)
+
+
+@pytest.mark.unit
+class TestHierarchyRollup:
+    def test_structure(self, rollup):
+        assert (len(rollup.layer_ids), len(rollup.factor_ids), len(rollup.segment_ids)) == (210, 28, 5)
+        assert rollup.layer_factor.shape == (28, 210)
+        assert np.count_nonzero(rollup.layer_factor) == 210
+        np.testing.assert_allclose(rollup.layer_factor.sum(axis=1), 1.0)
+        assert rollup.segment_outputs.shape == (5 * len(SEGMENT_OUTPUTS), 28)
+
+    @pytest.mark.parametrize('missing', [0.0, 0.3, 0.95])
+    def test_matches_loop(self, rollup, missing):
+        rng = np.random.default_rng(11)
+        for _ in range(20):
+            scores = _random_scores(rng, missing)
+            expected_factors, expected_segments = _loop_rollup(scores)
+
+            factors, segments = rollup.rollup(rollup.layer_vector(scores))
+
+            np.testing.assert_allclose(factors, [expected_factors[f] for f in rollup.factor_ids], atol=1e-12)
+            for s, segment_id in enumerate(rollup.segment_ids):
+                np.testing.assert_allclose(
+                    segments[s], [expected_segments[segment_id][name] for name in SEGMENT_OUTPUTS], atol=1e-12)
+
+    def test_unknown_layers_ignored(self, rollup):
+        vector = rollup.layer_vector({'L1_1': 0.8, 'L99_1': 0.1, 'not_a_layer': 0.2})
+        assert np.count_nonzero(~np.isnan(vector)) == 1
+        factors = rollup.factor_scores(vector)
+        assert factors[rollup.factor_index['F1']] == 0.8
+        assert np.all(np.delete(factors, rollup.factor_index['F1']) == DEFAULT_SCORE)
+
+    def test_batch_matches_rows(self, rollup):
+        rng = np.random.default_rng(3)
+        batch = rng.random((500, len(rollup.layer_ids)))
+        batch[rng.random(batch.shape) < 0.2] = np.nan
+
+        factors, segments = rollup.rollup(batch)
+
+        assert factors.shape == (500, 28)
+        assert segments.shape == (500, 5, len(SEGMENT_OUTPUTS))
+        for row in (0, 17, 499):
+            row_factors, row_segments = rollup.rollup(batch[row])
+            np.testing.assert_allclose(factors[row], row_factors, atol=1e-14)
+            np.testing.assert_allclose(segments[row], row_segments, atol=1e-14)
+
+    def test_overall_score_formula(self):
+        metrics = {'attractiveness': 0.8, 'competitiveness': 0.3, 'market_size': 0.6, 'growth': 0.7}
+        assert overall_segment_score(metrics) == pytest.approx(
+            0.8 * 0.35 + (1 - 0.3) * 0.25 + 0.6 * 0.2 + 0.7 * 0.2)
+
+
+@pytest.mark.unit
+class TestRollupState:
+    def test_updates_match_full_recompute(self, rollup):
+        rng = np.random.default_rng(5)
+        state = rollup.state(rollup.layer_vector(_random_scores(rng, 0.5)))
+
+        for step in range(2000):
+            layer_id = rollup.layer_ids[rng.integers(len(rollup.layer_ids))]
+            score = None if rng.random() < 0.25 else float(rng.random())
+            state.update_layer(layer_id, score)
+            if step % 250 == 0:
+                factors, segments = rollup.rollup(state.layers)
+                np.testing.assert_allclose(state.factors, factors, atol=1e-12)
+                np.testing.assert_allclose(state.segments, segments, atol=1e-12)
+
+        factors, segments = rollup.rollup(state.layers)
+        np.testing.assert_allclose(state.factors, factors, atol=1e-12)
+        np.testing.assert_allclose(state.segments, segments, atol=1e-12)
+
+    def test_update_touches_one_factor_and_segment(self, rollup):
+        state = rollup.state(np.full(len(rollup.layer_ids), 0.5))
+        factors, segments = state.factors.copy(), state.segments.copy()
+
+        changed = state.update_layer('L18_3', 0.9)
+
+        assert changed == ('F18', 'S3')
+        assert np.flatnonzero(state.factors != factors).tolist() == [rollup.factor_index['F18']]
+        assert np.flatnonzero((state.segments != segments).any(axis=1)).tolist() == [rollup.segment_index['S3']]
+        assert state.factors[rollup.factor_index['F18']] == pytest.approx((9 * 0.5 + 0.9) / 10)
+
+    def test_clearing_every_layer_restores_default(self, rollup):
+        state = rollup.state()
+        assert np.all(state.factors == DEFAULT_SCORE)
+        for layer_id in aliases_config.get_layers_for_factor('F26'):
+            state.update_layer(layer_id, 0.9)
+        assert state.factor_dict()['F26'] == pytest.approx(0.9)
+        for layer_id in aliases_config.get_layers_for_factor('F26'):
+            state.update_layer(layer_id, None)
+        assert state.factor_dict()['F26'] == DEFAULT_SCORE
+        np.testing.assert_allclose(state.segments, rollup.state().segments, atol=1e-15)
+
+    def test_unknown_layer(self, rollup):
+        with pytest.raises(KeyError):
+            rollup.state().update_layer('L99_1', 0.5)
+
+
+@pytest.mark.unit
+class TestEngineParity:
+    """The V2 engines agree with the loop they replaced."""
+
+    @pytest.fixture
+    def engines(self):
+        pytest.importorskip("google.cloud.secretmanager")
+        from app.services.v2_factor_calculation_engine import V2FactorCalculationEngine
+        from app.services.v2_segment_analysis_engine import V2SegmentAnalysisEngine
+        return V2FactorCalculationEngine(), V2SegmentAnalysisEngine()
+
+    def test_factor_and_segment_engines(self, engines):
+        from app.services.v2_expert_persona_scorer import LayerScore
+
+        factor_engine, segment_engine = engines
+        rng = np.random.default_rng(8)
+        scores = _random_scores(rng, 0.2)
+        layer_scores = [
+            LayerScore(session_id='s', layer_id=layer_id, layer_name=layer_id, score=score,
+                       confidence=0.7, evidence_count=1, key_insights=[], evidence_summary='',
+                       expert_persona='test', created_at=datetime.now(timezone.utc))
+            for layer_id, score in scores.items()
+        ]
+        expected_factors, expected_segments = _loop_rollup(scores)
+
+        factors = asyncio.run(factor_engine.calculate_all_factors('s', layer_scores))
+        segments = asyncio.run(segment_engine.analyze_all_segments('s', factors))
+
+        for calculation in factors:
+            assert calculation.calculated_value == pytest.approx(expected_factors[calculation.factor_id], abs=5e-5)
+        for analysis in segments:
+            expected = expected_segments[analysis.segment_id]
+            assert analysis.attractiveness_score == pytest.approx(expected['attractiveness'], abs=1e-4)
+            assert analysis.overall_segment_score == pytest.approx(expected['overall'], abs=1e-4)
+
+        batch = factor_engine.calculate_factor_batch(np.tile(factor_engine.hierarchy.layer_vector(scores), (3, 1)))
+        np.testing.assert_allclose(batch[2], [expected_factors[f] for f in factor_engine.hierarchy.factor_ids])
+        segment_batch = segment_engine.analyze_segment_batch(batch)
+        assert segment_batch.shape == (3, 5, len(SEGMENT_OUTPUTS))
@@ -0,0 +1,202 @@
+"""
+Unit tests for the sharded L1 memory cache used by the Multi-Level Cache Manager.
+
+Tests W-TinyLFU admission, LFU/FIFO policies, byte budgets and TTL expiry.
+"""
+
+import time
+import pytest
+
+from app.services.enhanced_orchestration.cache_types import EvictionPolicy
+from app.services.enhanced_orchestration.l1_memory_cache import (
+    ShardedL1Cache,
+    CountMinSketch,
+    TinyLFUAdmission,
+    estimate_size
+)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestFrequencySketch:
+    """Test suite for the TinyLFU frequency structures."""
+
+    def test_count_min_sketch_counts_and_saturates(self):
+        sketch = CountMinSketch(width=256)
+        for _ in range(5):
+            sketch.increment(hash("hot"))
+        assert sketch.estimate(hash("hot")) >= 5
+        assert sketch.estimate(hash("cold")) <= 1
+
+        for _ in range(100):
+            sketch.increment(hash("hot"))
+        assert sketch.estimate(hash("hot")) == 15
+
+    def test_count_min_sketch_halving(self):
+        sketch = CountMinSketch(width=64)
+        for _ in range(8):
+            sketch.increment(hash("key"))
+        sketch.halve()
+        assert sketch.estimate(hash("key")) == 4
+
+    def test_doorkeeper_absorbs_first_access(self):
+        admission = TinyLFUAdmission(expected_entries=64)
+        key_hash = hash("one_off")
+        admission.record(key_hash)
+        assert admission.sketch.estimate(key_hash) == 0
+        assert admission.frequency(key_hash) == 1
+
+        admission.record(key_hash)
+        assert admission.frequency(key_hash) == 2
+
+    def test_aging_resets_doorkeeper(self):
+        admission = TinyLFUAdmission(expected_entries=16, sample_factor=1)
+        for i in range(16):
+            admission.record(hash(f"key_{i}"))
+        # Sample period reached: doorkeeper cleared
+        assert not admission.doorkeeper.contains(hash("key_0"))
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestShardedL1Cache:
+    """Test suite for the sharded L1 cache."""
+
+    def test_basic_operations(self):
+        cache = ShardedL1Cache(max_entries=100)
+        assert cache.set("key", {"score": 0.7})
+        assert cache.get("key") == {"score": 0.7}
+        assert "key" in cache
+        assert cache.delete("key")
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+        assert not cache.delete("key")
+
+    def test_replace_updates_bytes(self):
+        cache = ShardedL1Cache(max_entries=100, shards=1)
+        cache.set("key", "x", size_bytes=100)
+        cache.set("key", "y", size_bytes=300)
+        assert cache.memory_usage_bytes == 300
+        assert cache.get("key") == "y"
+        assert cache.size() == 1
+
+    def test_byte_budget_enforced(self):
+        cache = ShardedL1Cache(max_entries=1000, max_bytes=10_000, shards=1,
+                               tinylfu_admission=False)
+        for i in range(50):
+            cache.set(f"key_{i}", "v", size_bytes=1_000)
+        assert cache.memory_usage_bytes <= 10_000
+        assert cache.size() == 10
+        # Most recent entries survive plain LRU
+        assert cache.get("key_49") == "v"
+
+    def test_oversized_value_rejected(self):
+        cache = ShardedL1Cache(max_entries=10, max_bytes=1_000, shards=1)
+        assert not cache.set("huge", "v", size_bytes=5_000)
+        assert cache.get("huge") is None
+        assert cache.memory_usage_bytes == 0
+
+    def test_entry_limit_enforced(self):
+        cache = ShardedL1Cache(max_entries=64, shards=16)
+        for i in range(500):
+            cache.set(f"key_{i}", i)
+        assert cache.size() <= 64
+
+    def test_ttl_expiry(self):
+        cache = ShardedL1Cache(max_entries=10, ttl_seconds=0.05)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        time.sleep(0.06)
+        assert cache.get("key") is None
+        assert cache.size() == 0
+
+    def test_lru_policy_without_admission(self):
+        cache = ShardedL1Cache(max_entries=3, shards=1, tinylfu_admission=False)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("d", "d")
+        assert "b" not in cache
+        assert all(k in cache for k in ("a", "c", "d"))
+
+    def test_fifo_policy_ignores_hits(self):
+        cache = ShardedL1Cache(max_entries=3, shards=1, eviction_policy=EvictionPolicy.FIFO)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("d", "d")
+        assert "a" not in cache
+        assert all(k in cache for k in ("b", "c", "d"))
+
+    def test_lfu_policy_evicts_least_frequent(self):
+        cache = ShardedL1Cache(max_entries=3, shards=1, eviction_policy=EvictionPolicy.LFU)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        for _ in range(3):
+            cache.get("a")
+            cache.get("c")
+        cache.get("b")
+        cache.set("d", "d")
+        assert "b" not in cache
+        assert all(k in cache for k in ("a", "c", "d"))
+
+    def test_lfu_ties_break_by_age(self):
+        cache = ShardedL1Cache(max_entries=2, shards=1, eviction_policy=EvictionPolicy.LFU)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert "a" not in cache
+        assert "b" in cache and "c" in cache
+
+    def test_tinylfu_resists_scans(self):
+        cache = ShardedL1Cache(max_entries=200, shards=1)
+        hot_keys = [f"layer_{i}" for i in range(100)]
+        for _ in range(5):
+            for key in hot_keys:
+                if cache.get(key) is None:
+                    cache.set(key, key)
+
+        # One-off scan of scraped content larger than the cache
+        for i in range(2_000):
+            cache.set(f"scraped_{i}", i)
+
+        retained = sum(1 for key in hot_keys if key in cache)
+        assert retained >= 90
+        assert cache.get_stats()['rejections'] > 0
+
+    def test_plain_lru_is_flushed_by_scans(self):
+        cache = ShardedL1Cache(max_entries=200, shards=1, tinylfu_admission=False)
+        hot_keys = [f"layer_{i}" for i in range(100)]
+        for key in hot_keys:
+            cache.set(key, key)
+        for i in range(2_000):
+            cache.set(f"scraped_{i}", i)
+        assert sum(1 for key in hot_keys if key in cache) == 0
+
+    def test_keys_and_clear(self):
+        cache = ShardedL1Cache(max_entries=1000, shards=8)
+        for i in range(100):
+            cache.set(f"key_{i}", i)
+        assert sorted(cache.keys()) == sorted(f"key_{i}" for i in range(100))
+        cache.clear()
+        assert cache.size() == 0
+        assert cache.memory_usage_bytes == 0
+
+    def test_stats(self):
+        cache = ShardedL1Cache(max_entries=100)
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("missing")
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+        assert stats['entries'] == 1
+        assert stats['policy'] == 'lru'
+
+    def test_estimate_size_grows_with_payload(self):
+        small = estimate_size({"score": 0.5})
+        large = estimate_size({f"layer_{i}": {"score": 0.5, "evidence": "x" * 200}
+                               for i in range(210)})
+        assert large > small * 100
+        assert estimate_size("x" * 1000) >= 1000
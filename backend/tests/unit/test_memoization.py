@@ -0,0 +1,232 @@
+"""
+Unit tests for argument-aware memoization.
+
+Tests stable argument hashing (dicts, sets, numpy arrays, dataclasses),
+TTL/entry/byte bounds and statistics of MemoCache, and the memoizing
+PerformanceOptimizer decorator including async coalescing.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from app.core.memoization import MISSING, MemoCache, UnhashableArgument, stable_hash
+from app.core.performance_optimizer import OptimizationConfig, PerformanceOptimizer
+
+
+@dataclass
+class _Weights:
+    layer: str
+    values: tuple
+
+
+@pytest.fixture
+def optimizer():
+    optimizer = PerformanceOptimizer(OptimizationConfig(sample_interval_seconds=0.05))
+    yield optimizer
+    optimizer.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestStableHash:
+    """Content hashing of call arguments."""
+
+    def test_equal_values_hash_equal(self):
+        assert stable_hash({'a': 1, 'b': [1, 2]}) == stable_hash({'b': [1, 2], 'a': 1})
+        assert stable_hash({1, 2, 3}) == stable_hash({3, 2, 1})
+        assert stable_hash({1: 'x', 'k': 'y'}) == stable_hash({'k': 'y', 1: 'x'})
+        assert stable_hash(_Weights('L1', (0.5,))) == stable_hash(_Weights('L1', (0.5,)))
+
+    def test_distinguishes_types_and_values(self):
+        distinct = [1, 1.0, '1', True, None, (1,), [1], {'1': 1}, b'1',
+                    np.int64(1), np.float32(1), np.array([1]), np.array([1.0])]
+        assert len({stable_hash(value) for value in distinct}) == len(distinct)
+        assert stable_hash(['ab', 'c']) != stable_hash(['a', 'bc'])
+
+    def test_numpy_arrays_hash_by_content(self):
+        values = np.arange(12, dtype=np.float64)
+        assert stable_hash(values) == stable_hash(values.copy())
+        assert stable_hash(values.reshape(3, 4)) != stable_hash(values.reshape(4, 3))
+        # Non-contiguous views hash like their contiguous copy
+        view = values.reshape(3, 4).T
+        assert stable_hash(view) == stable_hash(np.ascontiguousarray(view))
+        changed = values.copy()
+        changed[5] += 1e-12
+        assert stable_hash(values) != stable_hash(changed)
+
+    def test_stable_across_processes(self):
+        value = {'layers': ['L1_1', 'L1_2'], 'weights': (0.25, 0.75), 'tags': {'x', 'y'}}
+        code = ("from app.core.memoization import stable_hash;"
+                "print(stable_hash({'layers': ['L1_1', 'L1_2'], 'weights': (0.25, 0.75), 'tags': {'x', 'y'}}))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True, env={'PYTHONHASHSEED': '123', 'PYTHONPATH': '.'})
+        assert output.stdout.strip() == stable_hash(value)
+
+    def test_unknown_objects_are_unhashable(self):
+        with pytest.raises(UnhashableArgument):
+            stable_hash(object())
+
+        class Keyed:
+            def __memo_key__(self):
+                return 'engine-v1'
+
+        assert stable_hash(Keyed()) == stable_hash(Keyed())
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestMemoCache:
+    """Bounds and statistics."""
+
+    def test_lru_entry_bound(self):
+        memo = MemoCache('lru', max_entries=2)
+        memo.put('a', 1)
+        memo.put('b', 2)
+        assert memo.get('a') == 1
+        memo.put('c', 3)
+        assert memo.get('b') is MISSING
+        assert memo.get('a') == 1 and memo.get('c') == 3
+        assert memo.stats.evictions == 1
+
+    def test_byte_bound(self):
+        memo = MemoCache('bytes', max_bytes=10_000)
+        for i in range(10):
+            memo.put(i, np.zeros(250))  # ~2 KB each
+        assert memo.total_bytes <= 10_000
+        assert len(memo) < 10 and memo.get(9) is not MISSING
+        memo.put('huge', np.zeros(10_000))
+        assert memo.get('huge') is MISSING
+
+    def test_ttl_expiry(self):
+        memo = MemoCache('ttl', ttl_seconds=0.05)
+        memo.put('k', 'v')
+        assert memo.get('k') == 'v'
+        time.sleep(0.07)
+        assert memo.get('k') is MISSING
+        assert memo.stats.expirations == 1
+
+    def test_stats(self):
+        memo = MemoCache('stats')
+        memo.get('k')
+        memo.put('k', 1)
+        memo.get('k')
+        stats = memo.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5 and stats['entries'] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestMemoizingDecorator:
+    """PerformanceOptimizer.optimize_function memoization."""
+
+    def test_cache_key_no_longer_ignores_arguments(self, optimizer):
+        calls = []
+
+        @optimizer.optimize_function(cache_key="layer_score")
+        def score(weights, values):
+            calls.append(1)
+            return float(np.dot(weights['w'], values))
+
+        values = np.array([1.0, 2.0])
+        assert score({'w': [1, 0]}, values) == 1.0
+        assert score({'w': [0, 1]}, values) == 2.0
+        assert score({'w': [1, 0]}, values.copy()) == 1.0
+        assert len(calls) == 2
+
+        stats = optimizer.get_memoization_stats()['layer_score']
+        assert stats['hits'] == 1 and stats['misses'] == 2
+
+    def test_unhashable_arguments_run_uncached(self, optimizer):
+        @optimizer.optimize_function(memoize=True)
+        def identity(value):
+            return value
+
+        marker = object()
+        assert identity(marker) is marker
+        assert identity(marker) is marker
+        stats = optimizer.get_memoization_stats()[identity.__qualname__]
+        assert stats['uncacheable'] == 2 and stats['entries'] == 0
+
+    def test_skip_self_for_methods(self, optimizer):
+        class Engine:
+            calls = 0
+
+            @optimizer.optimize_function(memoize=True, skip_self=True)
+            def compute(self, x):
+                Engine.calls += 1
+                return x * 2
+
+        assert Engine().compute(3) == 6
+        assert Engine().compute(3) == 6
+        assert Engine.calls == 1
+
+    def test_function_names_do_not_share_entries(self, optimizer):
+        @optimizer.optimize_function(cache_key="shared")
+        def double(x):
+            return x * 2
+
+        @optimizer.optimize_function(cache_key="shared")
+        def triple(x):
+            return x * 3
+
+        assert double(2) == 4 and triple(2) == 6
+        assert len(optimizer.memo_caches) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_identical_calls_coalesce(self, optimizer):
+        calls = []
+
+        @optimizer.optimize_function(memoize=True, ttl_seconds=60)
+        async def aggregate(layer_scores):
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return sum(layer_scores.values())
+
+        scores = {'L1_1': 0.5, 'L1_2': 0.25}
+        results = await asyncio.gather(*(aggregate(dict(scores)) for _ in range(10)))
+        assert results == [0.75] * 10
+        assert len(calls) == 1
+        assert await aggregate(scores) == 0.75
+        assert len(calls) == 1
+
+        stats = optimizer.get_memoization_stats()[aggregate.__qualname__]
+        assert stats['coalesced'] == 9 and stats['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_failures_are_not_cached(self, optimizer):
+        attempts = []
+
+        @optimizer.optimize_function(memoize=True)
+        async def flaky(x):
+            attempts.append(x)
+            if len(attempts) == 1:
+                raise RuntimeError("transient")
+            return x
+
+        with pytest.raises(RuntimeError):
+            await flaky(1)
+        assert await flaky(1) == 1
+        assert len(attempts) == 2
+
+    def test_stats_on_performance_summary(self, optimizer):
+        @optimizer.optimize_function(cache_key="factor", max_entries=2)
+        def factor(x):
+            return x
+
+        for x in (1, 2, 3, 1):
+            factor(x)
+
+        summary = optimizer.get_performance_summary()
+        stats = summary['memoization']['factor']
+        assert stats['evictions'] == 2 and stats['entries'] == 2
+        assert summary['performance_summary']['cache_size'] == 2
+
+        optimizer.clear_cache()
+        assert optimizer.get_memoization_stats()['factor']['entries'] == 0
@@ -0,0 +1,180 @@
+"""
+Unit tests for the batched metrics exporter.
+
+Tests in-memory aggregation (counters, gauges, distributions), batching at
+the Cloud Monitoring limit, retry of failed batches, the series bound with
+drop accounting, the local sinks, and performance_monitor integration.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from app.middleware import metrics_exporter as me
+from app.middleware.metrics_exporter import (
+    CloudMonitoringSink,
+    FileSink,
+    InMemorySink,
+    MetricsExporter,
+    MetricSink,
+    set_metrics_exporter
+)
+
+
+class FailingSink(MetricSink):
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.inner = InMemorySink()
+
+    async def write(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("monitoring unavailable")
+        await self.inner.write(batch)
+
+
+@pytest.fixture
+def exporter():
+    exporter = MetricsExporter(sink=InMemorySink(), flush_interval_seconds=3600)
+    set_metrics_exporter(exporter)
+    yield exporter
+    set_metrics_exporter(None)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestMetricsExporter:
+    """Aggregation and batched export."""
+
+    @pytest.mark.asyncio
+    async def test_aggregates_between_flushes(self, exporter):
+        for _ in range(5):
+            exporter.increment("test/errors", labels={"fn": "a"})
+        exporter.set_gauge("test/queue_depth", 3)
+        exporter.set_gauge("test/queue_depth", 7)
+        samples = [0.002, 0.004, 0.1, 2.5]
+        for value in samples:
+            exporter.observe("test/latency", value, labels={"fn": "a"})
+
+        assert await exporter.flush() == 3
+        sink = exporter.sink
+        assert sink.latest("test/errors", fn="a").value == 5
+        assert sink.latest("test/queue_depth").value == 7
+        distribution = sink.latest("test/latency", fn="a").value
+        assert distribution['count'] == 4
+        assert distribution['mean'] == pytest.approx(np.mean(samples))
+        assert distribution['sum_of_squared_deviation'] == pytest.approx(
+            np.sum((np.array(samples) - np.mean(samples)) ** 2))
+        assert sum(distribution['bucket_counts']) == 4
+
+        # Only changed series are exported; counters stay cumulative
+        exporter.increment("test/errors", labels={"fn": "a"})
+        assert await exporter.flush() == 1
+        assert sink.latest("test/errors", fn="a").value == 6
+
+    @pytest.mark.asyncio
+    async def test_batches_of_at_most_200(self, exporter):
+        for i in range(450):
+            exporter.increment("test/calls", labels={"fn": f"f{i}"})
+        assert await exporter.flush() == 450
+        assert [len(batch) for batch in exporter.sink.batches] == [200, 200, 50]
+        assert MetricsExporter(sink=InMemorySink(), batch_size=1000).batch_size == 200
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_retried_with_newer_totals(self):
+        sink = FailingSink(failures=1)
+        exporter = MetricsExporter(sink=sink, flush_interval_seconds=3600)
+        exporter.increment("test/calls")
+        assert await exporter.flush() == 0
+        assert exporter.stats.export_failures == 1
+
+        exporter.increment("test/calls")
+        assert await exporter.flush() == 1
+        assert sink.inner.latest("test/calls").value == 2
+
+    @pytest.mark.asyncio
+    async def test_series_bound_drops_and_counts(self):
+        exporter = MetricsExporter(sink=InMemorySink(), max_series=10)
+        for i in range(15):
+            exporter.increment("test/calls", labels={"fn": f"f{i}"})
+        exporter.increment("test/calls", labels={"fn": "f0"})
+
+        stats = exporter.get_stats()
+        assert stats['series'] == 10
+        assert stats['points_dropped'] == 5
+        assert await exporter.flush() == 10
+
+    def test_kind_mismatch_rejected(self, exporter):
+        exporter.increment("test/mixed")
+        with pytest.raises(ValueError):
+            exporter.observe("test/mixed", 1.0)
+
+    @pytest.mark.asyncio
+    async def test_background_flush(self):
+        exporter = MetricsExporter(sink=InMemorySink(), flush_interval_seconds=0.02)
+        exporter.increment("test/calls")
+        await asyncio.sleep(0.1)
+        assert exporter.sink.latest("test/calls").value == 1
+        await exporter.stop()
+        assert exporter._task is None
+
+    @pytest.mark.asyncio
+    async def test_file_sink_writes_json_lines(self, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        exporter = MetricsExporter(sink=FileSink(str(path)))
+        exporter.observe("test/latency", 0.25, labels={"fn": "b"})
+        await exporter.stop()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines[0]['metric_type'] == "test/latency"
+        assert lines[0]['value']['count'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cloud_sink_one_client_one_request_per_batch(self):
+        client = Mock()
+        sink = CloudMonitoringSink(project_id="test-project", client=client)
+        exporter = MetricsExporter(sink=sink)
+        for i in range(250):
+            exporter.observe("custom.googleapis.com/test/latency", 0.01, labels={"fn": f"f{i}"})
+        exporter.increment("custom.googleapis.com/test/errors")
+        await exporter.flush()
+
+        assert client.create_time_series.call_count == 2
+        kwargs = client.create_time_series.call_args_list[0].kwargs
+        assert kwargs['name'] == "projects/test-project"
+        assert len(kwargs['time_series']) == 200
+        series = kwargs['time_series'][0]
+        assert series.resource.labels['project_id'] == "test-project"
+        assert series.points[0].interval.start_time.timestamp() < series.points[0].interval.end_time.timestamp() + 1
+
+    @pytest.mark.asyncio
+    async def test_performance_monitor_records_without_network(self, exporter):
+        from app.middleware.monitoring import ERROR_METRIC, LATENCY_METRIC, performance_monitor
+
+        @performance_monitor
+        async def _score_async(x):
+            if x < 0:
+                raise ValueError("negative")
+            return x
+
+        assert await _score_async(1) == 1
+        with pytest.raises(ValueError):
+            await _score_async(-1)
+        await exporter.flush()
+
+        function_name = f"{_score_async.__module__}._score_async"
+        assert exporter.sink.latest(LATENCY_METRIC, function_name=function_name,
+                                    status="success").value['count'] == 1
+        assert exporter.sink.latest(ERROR_METRIC, function_name=function_name,
+                                    error_type="ValueError").value == 1
+
+    def test_default_sink_from_environment(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("METRICS_SINK", "memory")
+        assert isinstance(me.sink_from_env(), InMemorySink)
+        monkeypatch.setenv("METRICS_SINK", f"file:{tmp_path / 'm.jsonl'}")
+        assert isinstance(me.sink_from_env(), FileSink)
+        monkeypatch.delenv("METRICS_SINK")
+        assert isinstance(me.sink_from_env(), CloudMonitoringSink)
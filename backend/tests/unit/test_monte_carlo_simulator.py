@@ -0,0 +1,184 @@
+"""
+Unit tests for the vectorized Monte Carlo simulator.
+
+Tests seeded reproducibility, the per-distribution sample matrix, parity of
+the array business logic with the per-iteration formula, and the statistics
+computed from a single quantile pass.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+
+UNCERTAINTIES = {
+    'market_conditions': {'distribution': 'normal', 'mean': 0.05, 'std': 0.1},
+    'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.1},
+    'financial_performance': {'distribution': 'beta', 'alpha': 2, 'beta': 5, 'scale': 0.4},
+    'execution_risk': {'distribution': 'uniform', 'low': -0.15, 'high': 0.05},
+    'regulatory': {'distribution': 'lognormal', 'mu': -2.0, 'sigma': 0.3},
+    'other': {'distribution': 'cauchy'},
+}
+PATTERN = {'expected_score': 0.55, 'pattern_multiplier': 1.1, 'industry_factor': 0.95,
+           'time_decay_factor': 0.98}
+
+
+def _simulate(seed, iterations=20_000):
+    simulator = MonteCarloSimulator(SimulationParameters(iterations=iterations, random_seed=seed))
+    return asyncio.run(simulator.run_pattern_simulation(PATTERN, UNCERTAINTIES))
+
+
+def _scalar_business_logic(base_score, adjustments, pattern_data):
+    """Per-iteration formula the array implementation must reproduce"""
+    score = base_score
+    score += adjustments.get('market_conditions', 0.0) * 0.3
+    score += adjustments.get('competitive_dynamics', 0.0) * 0.25
+    score += adjustments.get('financial_performance', 0.0) * 0.25
+    score += adjustments.get('execution_risk', 0.0) * 0.2
+    score *= pattern_data.get('pattern_multiplier', 1.0)
+    score *= pattern_data.get('industry_factor', 1.0)
+    score *= pattern_data.get('time_decay_factor', 1.0)
+    return max(0.0, min(1.0, score))
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestMonteCarloSimulator:
+    """Vectorized sampling, scoring and statistics."""
+
+    def test_fixed_seed_is_reproducible(self):
+        first, second = _simulate(7), _simulate(7)
+        assert first.mean == second.mean
+        assert first.percentiles == second.percentiles
+        assert first.confidence_intervals == second.confidence_intervals
+        assert first.risk_metrics == second.risk_metrics
+        assert _simulate(8).mean != first.mean
+
+    def test_does_not_touch_global_random_state(self):
+        np.random.seed(123)
+        expected = np.random.random()
+        np.random.seed(123)
+        _simulate(7, iterations=1000)
+        assert np.random.random() == expected
+
+    def test_sample_matrix_follows_each_distribution(self):
+        simulator = MonteCarloSimulator(SimulationParameters(random_seed=1))
+        matrix = simulator._sample_uncertainties(UNCERTAINTIES, 200_000)
+        assert matrix.shape == (200_000, len(UNCERTAINTIES))
+        normal, triangular, beta, uniform, lognormal, default = matrix.T
+
+        assert normal.mean() == pytest.approx(0.05, abs=2e-3)
+        assert normal.std() == pytest.approx(0.1, rel=1e-2)
+        assert triangular.min() >= -0.2 and triangular.max() <= 0.1
+        assert triangular.mean() == pytest.approx((-0.2 + 0.0 + 0.1) / 3, abs=2e-3)
+        assert beta.min() >= 0 and beta.max() <= 0.4
+        assert beta.mean() == pytest.approx(0.4 * 2 / 7, abs=2e-3)
+        assert uniform.min() >= -0.15 and uniform.max() < 0.05
+        assert np.median(lognormal) == pytest.approx(np.exp(-2.0), rel=1e-2)
+        # Unknown distributions fall back to normal(0, 0.1)
+        assert default.mean() == pytest.approx(0.0, abs=2e-3)
+        assert default.std() == pytest.approx(0.1, rel=1e-2)
+
+    def test_array_business_logic_matches_scalar_formula(self):
+        simulator = MonteCarloSimulator(SimulationParameters(random_seed=3))
+        matrix = simulator._sample_uncertainties(UNCERTAINTIES, 5000)
+        columns = {name: matrix[:, i] for i, name in enumerate(UNCERTAINTIES)}
+
+        scores = simulator._apply_business_logic(PATTERN['expected_score'], columns, PATTERN)
+        expected = [
+            _scalar_business_logic(PATTERN['expected_score'],
+                                   {name: values[row] for name, values in columns.items()}, PATTERN)
+            for row in range(len(matrix))
+        ]
+        assert np.array_equal(scores, np.array(expected))
+        assert scores.min() >= 0.0 and scores.max() <= 1.0
+
+    def test_statistics_match_percentile_definitions(self):
+        simulator = MonteCarloSimulator(SimulationParameters(random_seed=5))
+        samples = np.random.default_rng(0).beta(3, 4, 10_001)
+        result = simulator._calculate_simulation_statistics(samples)
+
+        for name in ('1st', '5th', '10th', '25th', '50th', '75th', '90th', '95th', '99th'):
+            assert result.percentiles[name] == pytest.approx(np.percentile(samples, int(name[:-2])))
+        for level, (lower, upper) in result.confidence_intervals.items():
+            alpha = 1 - level
+            assert lower == pytest.approx(np.percentile(samples, alpha / 2 * 100))
+            assert upper == pytest.approx(np.percentile(samples, (1 - alpha / 2) * 100))
+        assert result.median == pytest.approx(np.median(samples))
+        assert result.std_dev == pytest.approx(np.std(samples))
+
+        risk = result.risk_metrics
+        assert risk['value_at_risk_5'] == result.percentiles['5th']
+        assert risk['expected_shortfall_5'] == pytest.approx(
+            samples[samples <= np.percentile(samples, 5)].mean())
+        assert risk['success_probability'] == pytest.approx(np.mean(samples >= 0.6))
+        assert result.distribution_params['normal_mu'] == pytest.approx(samples.mean())
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestScenarioAnalysis:
+    BASE = {'expected_score': 0.5, 'uncertainties': {
+        name: UNCERTAINTIES[name]
+        for name in ('market_conditions', 'competitive_dynamics', 'financial_performance', 'execution_risk')
+    }}
+
+    def _analyze(self, variations, **params):
+        simulator = MonteCarloSimulator(SimulationParameters(random_seed=11, **params))
+        return asyncio.run(simulator.run_scenario_analysis(self.BASE, variations))
+
+    def test_single_scenario_matches_pattern_simulation(self):
+        results = self._analyze([{}], iterations=4096, sampling='sobol')
+        simulator = MonteCarloSimulator(SimulationParameters(iterations=4096, random_seed=11, sampling='sobol'))
+        direct = asyncio.run(simulator.run_pattern_simulation(self.BASE, self.BASE['uncertainties']))
+
+        result = results['Scenario_1']
+        assert result.mean == pytest.approx(direct.mean, abs=1e-12)
+        for name, value in direct.percentiles.items():
+            assert result.percentiles[name] == pytest.approx(value, abs=1e-12)
+
+    def test_common_random_numbers_give_exact_shifts(self):
+        shifted = {**self.BASE['uncertainties'],
+                   'market_conditions': {'distribution': 'normal', 'mean': 0.15, 'std': 0.1}}
+        results = self._analyze([
+            {'name': 'base'},
+            {'name': 'higher_score', 'expected_score': 0.55},
+            {'name': 'better_market', 'uncertainties': shifted},
+        ], iterations=5000)
+
+        # Away from the clipping bounds every run moves by the same amount
+        assert results['higher_score'].percentiles['50th'] - results['base'].percentiles['50th'] == pytest.approx(0.05)
+        assert results['better_market'].mean - results['base'].mean == pytest.approx(0.1 * 0.3, abs=1e-4)
+        assert results['better_market'].std_dev == pytest.approx(results['base'].std_dev, rel=1e-3)
+
+    def test_chunked_tensor_and_streaming(self, monkeypatch):
+        from app.services.enhanced_analytical_engines import monte_carlo_simulator
+
+        variations = [{'name': f"S{i}", 'expected_score': 0.4 + 0.02 * i} for i in range(5)]
+        whole = self._analyze(variations, iterations=6000)
+        # Tensor chunks of 300 runs for 5 scenarios x 4 variables
+        monkeypatch.setattr(monte_carlo_simulator, 'SCENARIO_TENSOR_ELEMENTS', 6000)
+        chunked = self._analyze(variations, iterations=6000)
+        streamed = self._analyze(variations, iterations=6000, chunk_size=1000)
+
+        for name, result in whole.items():
+            assert chunked[name].mean == pytest.approx(result.mean, abs=5e-3)
+            assert streamed[name].mean == pytest.approx(chunked[name].mean, rel=1e-9)
+            assert abs(streamed[name].percentiles['50th'] - chunked[name].percentiles['50th']) <= 1 / 8192
+
+    def test_mixed_distributions_and_missing_variables(self):
+        results = self._analyze([
+            {'name': 'none', 'uncertainties': {}},
+            {'name': 'uniform', 'uncertainties': {'execution_risk': {'distribution': 'uniform', 'low': 0.0, 'high': 0.1}}},
+            {'name': 'triangular', 'uncertainties': {'execution_risk': {'distribution': 'triangular',
+                                                                         'low': 0.0, 'mode': 0.05, 'high': 0.1}}},
+        ], iterations=4000)
+
+        assert results['none'].std_dev == 0.0 and results['none'].mean == pytest.approx(0.5)
+        assert results['uniform'].mean == pytest.approx(0.51, abs=1e-3)
+        assert results['triangular'].mean == pytest.approx(0.51, abs=1e-3)
+        assert results['triangular'].std_dev < results['uniform'].std_dev
@@ -0,0 +1,127 @@
+"""
+Unit tests for MinHash/LSH near-duplicate search.
+
+Tests MinHash Jaccard estimates against exact shingle-set Jaccard, LSH
+candidate retrieval, the quick-ratio bounds of sequence_similarity, and
+NearDuplicateIndex decisions against the full pairwise SequenceMatcher scan
+the near-exact deduplication stage used.
+"""
+
+import random
+from difflib import SequenceMatcher
+
+import numpy as np
+import pytest
+
+from app.core.near_duplicates import (
+    LSHIndex, MinHasher, NearDuplicateIndex, estimate_jaccard, sequence_similarity
+)
+
+
+def _corpus(size, seed=4, duplicate_rate=0.3):
+    """Random pages with planted near-duplicates (and the index of their source)"""
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 10)))
+             for _ in range(4000)]
+    edits = [
+        lambda text: text.upper(),
+        lambda text: text + ' Read more on our site.',
+        lambda text: text[:-15],
+        lambda text: 'Updated: ' + text,
+        lambda text: text.replace(' ', '  ', 4),
+        lambda text: text[:len(text) // 2] + 'xy' + text[len(text) // 2 + 2:],
+    ]
+    texts, sources = [], []
+    for _ in range(size):
+        if texts and rng.random() < duplicate_rate:
+            source = rng.randrange(len(texts))
+            texts.append(rng.choice(edits)(texts[source]))
+            sources.append(source)
+        else:
+            length = rng.choice([8, 40, 110, 160])
+            texts.append(' '.join(rng.choice(words) for _ in range(length)).capitalize() + '.')
+            sources.append(None)
+    return texts, sources
+
+
+def _full_scan(texts, threshold=0.95):
+    """The near-exact stage before LSH: every text against every accepted one"""
+    accepted, decisions = [], []
+    for text in texts:
+        match = None
+        for position, existing in enumerate(accepted):
+            if SequenceMatcher(None, text.lower(), existing.lower()).ratio() > threshold:
+                match = position
+                break
+        decisions.append(match)
+        if match is None:
+            accepted.append(text)
+    return decisions
+
+
+@pytest.mark.unit
+class TestMinHash:
+    def test_estimates_track_exact_jaccard(self):
+        hasher = MinHasher()
+        texts, sources = _corpus(300, seed=1, duplicate_rate=0.6)
+        errors = []
+        for text, source in zip(texts, sources):
+            if source is None:
+                continue
+            first, second = hasher.shingles(text), hasher.shingles(texts[source])
+            exact = len(np.intersect1d(first, second)) / len(np.union1d(first, second))
+            errors.append(estimate_jaccard(hasher.signature(text), hasher.signature(texts[source])) - exact)
+
+        assert abs(np.mean(errors)) < 0.01
+        assert np.max(np.abs(errors)) < 0.2
+
+    def test_normalization_and_edge_cases(self):
+        hasher = MinHasher(num_perm=64)
+        np.testing.assert_array_equal(hasher.signature("Market  Size\nGrowth"),
+                                      hasher.signature("market size growth"))
+        assert hasher.signature("").shape == (64,)
+        assert hasher.signature("abc").dtype == np.uint32
+        assert estimate_jaccard(hasher.signature("abc"), hasher.signature("abc")) == 1.0
+        with pytest.raises(ValueError):
+            MinHasher(num_perm=0)
+
+    def test_lsh_candidates(self):
+        hasher = MinHasher()
+        index = LSHIndex(bands=32, rows=3)
+        texts, _ = _corpus(200, seed=2, duplicate_rate=0.0)
+        for position, text in enumerate(texts):
+            index.insert(position, hasher.signature(text))
+
+        assert 150 in index.query(hasher.signature(texts[150] + " (updated)"))
+        assert len(index) == 200
+        assert index.candidate_probability(0.5) == pytest.approx(1 - (1 - 0.125) ** 32)
+        with pytest.raises(ValueError):
+            LSHIndex(bands=64, rows=3).insert(0, hasher.signature("text"))
+
+
+@pytest.mark.unit
+class TestNearDuplicateIndex:
+    def test_sequence_similarity_bounds(self):
+        assert sequence_similarity("abcdef", "abcdeg", 0.5) == SequenceMatcher(None, "abcdef", "abcdeg").ratio()
+        # quick_ratio is an upper bound, so a pair it rules out is never a duplicate
+        assert sequence_similarity("aaaa", "bbbb", 0.5) == 0.0
+
+    def test_matches_full_scan(self):
+        texts, _ = _corpus(150)
+        index = NearDuplicateIndex()
+
+        decisions = [index.check(text)[0] for text in texts]
+
+        assert decisions == _full_scan(texts)
+        assert sum(decision is not None for decision in decisions) > 20
+        # Only candidates were verified, far fewer than the full scan's pairs
+        assert index.verified_pairs < len(texts)
+
+    def test_reports_similarity_and_accepts_unique(self):
+        index = NearDuplicateIndex(threshold=0.9)
+        base = "The pergola market grew strongly across residential segments in the last two years"
+        assert index.check(base) == (None, 0.0)
+        position, similarity = index.check(base.upper() + ".")
+        assert position == 0
+        assert similarity == pytest.approx(SequenceMatcher(None, (base + ".").lower(), base.lower()).ratio())
+        assert len(index) == 1
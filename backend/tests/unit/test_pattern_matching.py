@@ -0,0 +1,108 @@
+"""
+Unit tests for the compiled pattern condition matrix.
+
+Tests that PatternLibrary.pattern_confidences reproduces the per-pattern
+_calculate_pattern_match_confidence loop exactly (thresholds hit exactly
+included), that match_patterns keeps its matches and ordering, batch
+matching over array scores, and that the compile step is shared.
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.pattern_library import (
+    CONDITION_SOURCES, PatternLibrary, _compile_conditions, _condition_spec, pattern_library
+)
+
+SEGMENTS = ['consumer', 'experience', 'market', 'product', 'brand']
+FACTORS = ['F1', 'F2', 'F8', 'F9', 'F13', 'F14', 'F15', 'F22', 'F24']
+# Every threshold used in the library, so comparisons hit equality
+THRESHOLDS = sorted({condition['threshold'] for pattern in pattern_library.patterns
+                     for condition in pattern.get('trigger_conditions', {}).values()})
+
+
+def _score_rows(count, seed):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(count):
+        values = lambda: float(rng.choice(THRESHOLDS)) if rng.random() < 0.3 else float(rng.random())
+        segments = {name: values() for name in SEGMENTS if rng.random() < 0.9}
+        factors = {name: values() for name in FACTORS if rng.random() < 0.9}
+        rows.append((segments, factors))
+    return rows
+
+
+def _loop_confidences(library, segments, factors):
+    return [library._calculate_pattern_match_confidence(pattern, segments, factors)
+            for pattern in library.patterns]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_unmapped_warnings(caplog):
+    caplog.set_level(logging.ERROR)
+
+
+@pytest.mark.unit
+class TestConditionMatrix:
+    def test_confidences_match_loop_exactly(self):
+        for segments, factors in _score_rows(300, seed=1):
+            compiled = pattern_library.pattern_confidences(segments, factors)
+            assert compiled.shape == (1, len(pattern_library.patterns))
+            assert compiled[0].tolist() == _loop_confidences(pattern_library, segments, factors)
+
+    def test_match_patterns_unchanged(self):
+        for segments, factors in _score_rows(50, seed=2):
+            loop = _loop_confidences(pattern_library, segments, factors)
+            expected = sorted(
+                [(pattern['id'], confidence) for pattern, confidence in zip(pattern_library.patterns, loop)
+                 if confidence >= 0.6],
+                key=lambda item: item[1], reverse=True
+            )
+            matches = pattern_library.match_patterns(segments, factors)
+            assert [(match.pattern_id, match.confidence) for match in matches] == expected
+
+    def test_batch_matches_rows(self):
+        rows = _score_rows(200, seed=3)
+        segments = {name: np.array([row[0].get(name, 0.0) for row in rows]) for name in SEGMENTS}
+        factors = {name: np.array([row[1].get(name, 0.0) for row in rows]) for name in FACTORS}
+
+        batch = pattern_library.pattern_confidences(segments, factors)
+        assert batch.shape == (200, len(pattern_library.patterns))
+        for index, (row_segments, row_factors) in enumerate(rows):
+            assert batch[index].tolist() == _loop_confidences(pattern_library, row_segments, row_factors)
+
+        per_row = pattern_library.match_patterns_batch(segments, factors)
+        assert [match.pattern_id for match in per_row[7]] == \
+            [match.pattern_id for match in pattern_library.match_patterns(*rows[7])]
+
+    def test_scalar_lookup_uses_sources(self):
+        assert pattern_library._get_actual_score_for_condition('brand_loyalty', {}, {'F13': 0.4}) == 0.4
+        assert pattern_library._get_actual_score_for_condition('seasonal_factor', {}, {}) == 0.5
+        assert pattern_library._get_actual_score_for_condition('not_a_condition', {}, {}) == 0.0
+        assert set(source for source, _ in CONDITION_SOURCES.values()) <= {'segment', 'factor', 'constant'}
+
+    def test_compiled_once_and_read_only(self):
+        assert PatternLibrary().condition_matrix is pattern_library.condition_matrix
+        assert _compile_conditions.cache_info().hits >= 1
+        with pytest.raises(ValueError):
+            pattern_library.condition_matrix.thresholds[0, 0] = 0.0
+
+    def test_operators_and_patterns_without_conditions(self):
+        patterns = [
+            {'confidence': 0.8, 'trigger_conditions': {
+                'consumer_demand': {'threshold': 0.5, 'operator': '>='},
+                'brand_loyalty': {'threshold': 0.5, 'operator': '<='},
+                'market_access': {'threshold': 0.5, 'operator': '=='}}},
+            {'confidence': 0.9, 'trigger_conditions': {}},
+        ]
+        matrix = _compile_conditions(_condition_spec(patterns))
+        confidences = matrix.confidences(matrix.feature_matrix(
+            {'consumer': np.array([0.5, 0.4])}, {'F13': np.array([0.5, 0.6]), 'F2': 0.5}))
+
+        library = PatternLibrary()
+        for index, (consumer, loyalty) in enumerate([(0.5, 0.5), (0.4, 0.6)]):
+            expected = [library._calculate_pattern_match_confidence(
+                pattern, {'consumer': consumer}, {'F13': loyalty, 'F2': 0.5}) for pattern in patterns]
+            assert confidences[index].tolist() == expected
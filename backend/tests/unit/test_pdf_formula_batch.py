@@ -0,0 +1,160 @@
+"""
+Unit tests for batch F1-F28 calculation.
+
+Tests the array versions of the MathematicalModels normalizations against
+their scalar forms, and PDFFormulaEngine.calculate_factor_batch against
+calculate_all_factors session by session (several inputs per factor,
+missing keys and missing factors included).
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.enhanced_analytical_engines.mathematical_models import MathematicalModels
+from app.services.enhanced_analytical_engines.pdf_formula_engine import (
+    FactorBatch, FactorInput, PDFFormulaEngine
+)
+
+# raw_data keys read by each calculator, with a sampler for realistic values
+RAW_KEYS = {
+    'F1_market_size': {'total_addressable_market': lambda r: r.choice([0, 5e8, 2e10, 3e12]),
+                       'market_penetration': lambda r: r.uniform(0, 0.9),
+                       'market_growth_rate': lambda r: r.uniform(-0.1, 15)},
+    'F2_market_growth': {'market_growth_rate': lambda r: r.uniform(-0.2, 0.6),
+                         'growth_sustainability': lambda r: r.uniform()},
+    'F3_market_maturity': {'market_maturity_stage': lambda r: r.uniform(-1, 5)},
+    'F4_competitive_intensity': {'market_concentration': lambda r: r.uniform(),
+                                 'competitor_count': lambda r: int(r.integers(0, 150)),
+                                 'price_competition_level': lambda r: r.uniform()},
+    'F5_barrier_to_entry': {key: lambda r: r.uniform() for key in
+                            ('capital_requirements', 'regulatory_barriers', 'technology_barriers', 'brand_barriers')},
+    'F6_regulatory_environment': {key: lambda r: r.uniform() for key in
+                                  ('regulatory_clarity', 'regulatory_stability', 'compliance_cost')},
+    'F7_economic_sensitivity': {key: lambda r: r.uniform() for key in
+                                ('recession_resilience', 'income_elasticity', 'cyclical_dependency')},
+    'F15_revenue_growth': {'revenue_growth_rate': lambda r: r.uniform(-0.2, 0.8)},
+    'F16_profitability_margins': {'profit_margin': lambda r: r.uniform(-0.1, 0.4)},
+    'F22_brand_strength': {'brand_recognition': lambda r: r.uniform(), 'customer_loyalty': lambda r: r.uniform(),
+                           'brand_equity_value': lambda r: r.uniform(), 'market_share': lambda r: r.uniform(0, 0.4)},
+}
+PASSTHROUGH_KEYS = {
+    'F8_product_differentiation': 'product_differentiation', 'F9_innovation_capability': 'innovation_capability',
+    'F10_quality_reliability': 'quality_reliability', 'F11_scalability_potential': 'scalability_potential',
+    'F12_customer_stickiness': 'customer_stickiness', 'F13_pricing_power': 'pricing_power',
+    'F14_lifecycle_position': 'lifecycle_position', 'F17_cash_flow_generation': 'cash_flow_quality',
+    'F18_capital_efficiency': 'capital_efficiency', 'F19_financial_stability': 'financial_stability',
+    'F20_cost_structure': 'cost_efficiency', 'F21_working_capital': 'working_capital_efficiency',
+    'F23_management_quality': 'management_quality', 'F24_strategic_positioning': 'strategic_positioning',
+    'F25_operational_excellence': 'operational_excellence', 'F26_digital_transformation': 'digital_maturity',
+    'F27_sustainability_esg': 'esg_score', 'F28_strategic_flexibility': 'strategic_flexibility',
+}
+for _factor_id, _key in PASSTHROUGH_KEYS.items():
+    RAW_KEYS[_factor_id] = {_key: lambda r: r.uniform()}
+
+
+def _random_sessions(count, seed):
+    rng = np.random.default_rng(seed)
+    sessions = []
+    for _ in range(count):
+        inputs = []
+        for factor_id, keys in RAW_KEYS.items():
+            if rng.random() < 0.1:
+                continue  # factor missing from this session
+            for _ in range(int(rng.integers(1, 4))):
+                # Some keys missing, so the calculator defaults apply
+                raw_data = {key: sample(rng) for key, sample in keys.items() if rng.random() < 0.8}
+                inputs.append(FactorInput(factor_id, raw_data, {}))
+        sessions.append(inputs)
+    return sessions
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return PDFFormulaEngine()
+
+
+@pytest.mark.unit
+class TestArrayModels:
+    def test_logistic_normalize_array(self):
+        models = MathematicalModels()
+        raw = np.linspace(-20, 20, 401)
+        np.testing.assert_allclose(models.logistic_normalize_array(raw),
+                                   [models.logistic_normalize(x) for x in raw], rtol=1e-14)
+        assert models.logistic_normalize_array(raw[:400].reshape(20, 20)).shape == (20, 20)
+
+    def test_robust_normalize_rows(self):
+        models = MathematicalModels()
+        rows = np.random.default_rng(1).random((6, 28))
+        rows[2] = 0.4  # no spread
+        normalized = models.robust_normalize_array(rows, axis=1)
+        for row, expected in zip(normalized, rows):
+            np.testing.assert_allclose(row, models.robust_normalize(list(expected)), rtol=1e-14)
+        assert models.robust_normalize_array([]).size == 0
+
+    def test_temporal_decay_and_composite(self):
+        models = MathematicalModels()
+        scores, days = np.array([0.9, 0.5, 0.2]), np.array([0, 45, 365])
+        np.testing.assert_allclose(models.apply_temporal_decay_array(scores, days),
+                                   [models.apply_temporal_decay(s, d) for s, d in zip(scores, days)])
+
+        factor_scores = {'F1_market_size': np.array([0.2, np.nan]), 'F2_market_growth': np.array([0.6, 0.8]),
+                         'F9_innovation_capability': np.array([0.1, 0.1])}
+        composite = models.calculate_composite_score_array(factor_scores, 'market')
+        assert composite[0] == pytest.approx(models.calculate_composite_score(
+            {'F1_market_size': 0.2, 'F2_market_growth': 0.6}, 'market'))
+        assert composite[1] == pytest.approx(0.8)
+        assert models.calculate_composite_score_array(factor_scores, 'strategic') == 0.5
+
+
+@pytest.mark.unit
+class TestFactorBatch:
+    def test_matches_per_session_calculation(self, engine):
+        sessions = _random_sessions(25, seed=2)
+        batch = engine.calculate_factor_batch(FactorBatch.from_inputs(sessions))
+
+        for index, inputs in enumerate(sessions):
+            expected = asyncio.run(engine.calculate_all_factors(inputs)).result
+            for column, factor_id in enumerate(batch.factor_ids):
+                if factor_id in expected.factor_results:
+                    factor = expected.factor_results[factor_id]
+                    assert batch.raw_scores[index, column] == pytest.approx(factor.raw_score, rel=1e-12, abs=1e-15)
+                    assert batch.normalized_scores[index, column] == pytest.approx(factor.normalized_score, rel=1e-12)
+                else:
+                    assert np.isnan(batch.normalized_scores[index, column])
+            for category, score in expected.category_scores.items():
+                assert batch.category_scores[category][index] == pytest.approx(score, rel=1e-12)
+            assert batch.overall_scores[index] == pytest.approx(expected.overall_score, rel=1e-12)
+
+    def test_sample_arrays_for_sensitivity_sweeps(self, engine):
+        growth = np.linspace(0.0, 0.5, 11)
+        batch = FactorBatch.from_arrays({
+            'F2_market_growth': {'market_growth_rate': growth, 'growth_sustainability': 0.8},
+            'F22_brand_strength': {'market_share': 0.05},
+        })
+        result = engine.calculate_factor_batch(batch)
+
+        assert batch.size == 11
+        market = result.factor_scores('F2_market_growth')
+        assert np.all(np.diff(market) > 0)
+        # Unswept factors are constant; factors without inputs are missing
+        assert np.ptp(result.factor_scores('F22_brand_strength')) == 0
+        assert np.isnan(result.factor_scores('F1_market_size')).all()
+        np.testing.assert_allclose(result.category_scores['market'], market)
+        assert result.category_scores['product'].tolist() == [0.5] * 11
+
+
+@pytest.mark.unit
+class TestCalculateAllFactors:
+    def test_unknown_factor_ids_do_not_shift_results(self, engine):
+        inputs = [
+            FactorInput('F99_unknown', {}, {}),
+            FactorInput('F4_competitive_intensity', {'competitor_count': 30}, {}),
+            FactorInput('F2_market_growth', {'market_growth_rate': 0.3}, {}),
+        ]
+        results = asyncio.run(engine.calculate_all_factors(inputs)).result.factor_results
+
+        assert set(results) == {'F4_competitive_intensity', 'F2_market_growth'}
+        assert results['F4_competitive_intensity'].raw_score == pytest.approx((0.5 + 0.7 + 0.5) / 3)
+        assert results['F2_market_growth'].factor_id == 'F2_market_growth'
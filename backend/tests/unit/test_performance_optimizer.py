@@ -0,0 +1,223 @@
+"""
+Unit tests for PerformanceOptimizer metrics collection.
+
+Tests the background system sampler, the ring buffer and DDSketch
+aggregates it relies on, bounded metrics history, and that instrumented
+calls only read the latest snapshot instead of blocking on psutil.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.core import performance_optimizer as po
+from app.core.performance_optimizer import OptimizationConfig, PerformanceOptimizer, SystemSampler
+from app.core.streaming_stats import DDSketch, RingBuffer
+
+
+@pytest.fixture
+def optimizer():
+    optimizer = PerformanceOptimizer(OptimizationConfig(sample_interval_seconds=0.05))
+    yield optimizer
+    optimizer.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestStreamingStats:
+    """Ring buffer and quantile sketch."""
+
+    def test_ring_buffer_keeps_latest_window(self):
+        ring = RingBuffer(4)
+        assert ring.latest() is None and ring.snapshot() == []
+        for i in range(10):
+            ring.append(i)
+        assert ring.latest() == 9
+        assert ring.snapshot() == [6, 7, 8, 9]
+        assert ring.snapshot(last=2) == [8, 9]
+        assert len(ring) == 4 and ring.total == 10
+
+    def test_ring_buffer_concurrent_reader(self):
+        ring = RingBuffer(64)
+        done = threading.Event()
+        seen = []
+
+        def reader():
+            while not done.is_set():
+                window = ring.snapshot()
+                assert None not in window
+                assert window == sorted(window)
+                seen.append(len(window))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for i in range(50_000):
+            ring.append(i)
+        done.set()
+        thread.join()
+        assert ring.latest() == 49_999 and seen
+
+    def test_sketch_quantiles_within_relative_error(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(-6, 1.5) for _ in range(20_000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.9, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-12
+        assert sketch.count == len(values)
+        assert sketch.min == min(values) and sketch.max == max(values)
+        assert sketch.bin_count < 2048
+
+    def test_sketch_memory_is_bounded(self):
+        sketch = DDSketch(relative_accuracy=0.01, max_bins=64)
+        values = [10.0 ** (exponent / 10) for exponent in range(-300, 300)]
+        for value in values:
+            sketch.add(value)
+        assert sketch.bin_count <= 64
+        # Upper tail is preserved when low buckets are folded
+        exact = values[int(0.99 * (len(values) - 1))]
+        assert sketch.quantile(0.99) == pytest.approx(exact, rel=0.01)
+
+    def test_sketch_merge_and_signs(self):
+        left, right = DDSketch(), DDSketch()
+        for value in (-2.0, 0.0, 1.0):
+            left.add(value)
+        for value in (3.0, 4.0):
+            right.add(value)
+        left.merge(right)
+        assert left.count == 5
+        assert left.quantile(0) == -2.0 and left.quantile(1) == 4.0
+        assert left.quantile(0.25) == 0.0
+        assert left.quantile(0.5) == pytest.approx(1.0, rel=0.01)
+        with pytest.raises(ValueError):
+            left.merge(DDSketch(relative_accuracy=0.05))
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestSystemSampler:
+    """Background sampling of CPU, RSS and loop lag."""
+
+    def test_publishes_snapshots(self):
+        sampler = SystemSampler(interval=0.02, capacity=8)
+        sampler.start()
+        try:
+            time.sleep(0.3)
+        finally:
+            sampler.stop()
+        history = sampler.history()
+        assert len(history) == 8
+        assert all(snapshot.rss_mb > 0 for snapshot in history)
+        assert [s.monotonic for s in history] == sorted(s.monotonic for s in history)
+        assert not sampler.running
+
+    @pytest.mark.asyncio
+    async def test_measures_event_loop_lag(self):
+        sampler = SystemSampler(interval=0.01)
+        sampler.attach_loop(asyncio.get_running_loop())
+        sampler.start()
+        try:
+            await asyncio.sleep(0.05)
+            time.sleep(0.2)  # block the loop
+            await asyncio.sleep(0.05)
+        finally:
+            sampler.stop()
+        lags = [s.loop_lag_ms for s in sampler.history() if s.loop_lag_ms is not None]
+        assert max(lags) >= 100
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestNonBlockingMetrics:
+    """Instrumented calls read snapshots only."""
+
+    def test_recording_never_calls_blocking_psutil(self, optimizer):
+        @optimizer.optimize_function()
+        def work(x):
+            return x * 2
+
+        work(1)
+        with patch.object(po.psutil, 'cpu_percent', side_effect=AssertionError("blocking call")), \
+                patch.object(po.psutil, 'Process', side_effect=AssertionError("blocking call")):
+            for i in range(50):
+                assert work(i) == i * 2
+
+        assert optimizer._task_count == 51
+        assert optimizer.metrics_history[-1].memory_usage > 0
+
+    @pytest.mark.asyncio
+    async def test_async_operations_aggregated_per_operation(self, optimizer):
+        @optimizer.optimize_function()
+        async def fetch(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        @optimizer.optimize_function()
+        async def failing():
+            raise RuntimeError("boom")
+
+        for _ in range(5):
+            await fetch(0.01)
+        with pytest.raises(RuntimeError):
+            await failing()
+
+        stats = optimizer.get_operation_stats()
+        fetch_stats = stats[fetch.__qualname__]
+        assert fetch_stats['count'] == 5 and fetch_stats['errors'] == 0
+        assert 9 <= fetch_stats['p50'] <= 100
+        assert stats[failing.__qualname__]['errors'] == 1
+        assert optimizer.sampler._loop is asyncio.get_running_loop()
+
+    def test_metrics_history_bounded(self):
+        optimizer = PerformanceOptimizer(OptimizationConfig(metrics_history_size=10))
+        try:
+            for _ in range(25):
+                optimizer._record_metrics_sync(time.time(), 100.0, True)
+            assert len(optimizer.metrics_history) == 10
+            assert optimizer._task_count == 25
+        finally:
+            optimizer.shutdown()
+
+    def test_summary_does_not_block(self, optimizer):
+        @optimizer.optimize_function()
+        def work():
+            return 1
+
+        work()
+        start = time.perf_counter()
+        summary = optimizer.get_performance_summary()
+        assert time.perf_counter() - start < 0.05
+        assert summary['performance_summary']['total_tasks_executed'] == 1
+        assert work.__qualname__ in summary['operations']
+        assert 'event_loop_lag_ms' in summary['system_health']
+
+    def test_instrumentation_overhead_is_microseconds(self, optimizer):
+        def raw(x):
+            return x + 1
+
+        instrumented = optimizer.optimize_function()(raw)
+        instrumented(0)
+
+        def timed(fn, rounds=20_000):
+            start = time.perf_counter()
+            for i in range(rounds):
+                fn(i)
+            return (time.perf_counter() - start) / rounds
+
+        # Interleave and keep the best of each to filter scheduler noise
+        raw_best = instrumented_best = float('inf')
+        for _ in range(9):
+            raw_best = min(raw_best, timed(raw))
+            instrumented_best = min(instrumented_best, timed(instrumented))
+
+        overhead_us = (instrumented_best - raw_best) * 1e6
+        print(f"\nInstrumented call overhead: {overhead_us:.2f} us")
+        assert overhead_us < 5
@@ -0,0 +1,138 @@
+"""
+Unit tests for the variance-reduction samplers.
+
+Tests the uniform point sets (Latin hypercube strata, antithetic pairs,
+scrambled Sobol'), inverse CDFs against scipy, control-variate adjustment,
+and the sampling option of the Monte Carlo engines.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.core.samplers import (
+    SAMPLING_METHODS, control_variate_mean, distribution_mean, from_uniforms,
+    sample_uniforms, validate_method
+)
+from app.core.simulation_pool import SimulationTask, draw_samples
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+from app.services.segment_monte_carlo_engine import SegmentMonteCarloEngine
+
+SPECS = [
+    ('normal', {'mean': 0.1, 'std': 0.2}, stats.norm(0.1, 0.2)),
+    ('lognormal', {'mu': -0.5, 'sigma': 0.4}, stats.lognorm(0.4, scale=np.exp(-0.5))),
+    ('beta', {'alpha': 2, 'beta': 5, 'scale': 0.5}, stats.beta(2, 5, scale=0.5)),
+    ('triangular', {'low': -0.2, 'mode': 0.05, 'high': 0.3}, stats.triang(0.5, loc=-0.2, scale=0.5)),
+    ('uniform', {'low': -0.1, 'high': 0.3}, stats.uniform(-0.1, 0.4)),
+]
+UNCERTAINTIES = {
+    'market_conditions': {'distribution': 'normal', 'mean': 0.0, 'std': 0.1},
+    'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.2},
+    'execution_risk': {'distribution': 'uniform', 'low': -0.1, 'high': 0.1},
+}
+
+
+@pytest.mark.unit
+class TestUniforms:
+    @pytest.mark.parametrize('method', SAMPLING_METHODS)
+    def test_shape_and_range(self, method):
+        uniforms = sample_uniforms(method, np.random.default_rng(1), 1000, 3)
+        assert uniforms.shape == (1000, 3)
+        assert np.all((uniforms > 0) & (uniforms < 1))
+
+    def test_latin_hypercube_fills_every_stratum(self):
+        uniforms = sample_uniforms('lhs', np.random.default_rng(2), 256, 4)
+        for column in uniforms.T:
+            np.testing.assert_array_equal(np.sort(np.floor(column * 256)), np.arange(256))
+
+    def test_antithetic_pairs(self):
+        uniforms = sample_uniforms('antithetic', np.random.default_rng(3), 1001, 2)
+        np.testing.assert_allclose(uniforms[:500] + uniforms[501:1001], 1.0)
+
+    def test_sobol_is_balanced_and_rescrambled(self):
+        rng = np.random.default_rng(4)
+        first, second = sample_uniforms('sobol', rng, 1024, 2), sample_uniforms('sobol', rng, 1024, 2)
+        # A (0, m, 2) net: every 1/32 x 1/32 cell holds one point
+        cells = np.floor(first * 32).astype(int)
+        assert len({tuple(cell) for cell in cells}) == 1024
+        assert not np.array_equal(first, second)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            sample_uniforms('halton', np.random.default_rng(), 10, 1)
+        with pytest.raises(ValueError):
+            validate_method('halton')
+        assert validate_method(None) == 'random'
+
+
+@pytest.mark.unit
+class TestInverseCDFs:
+    @pytest.mark.parametrize('distribution_type, params, frozen', SPECS, ids=[s[0] for s in SPECS])
+    def test_matches_scipy_ppf(self, distribution_type, params, frozen):
+        uniforms = np.linspace(0.001, 0.999, 999)
+        np.testing.assert_allclose(from_uniforms(distribution_type, params, uniforms),
+                                   frozen.ppf(uniforms), rtol=1e-9, atol=1e-12)
+        assert distribution_mean(distribution_type, params) == pytest.approx(frozen.mean())
+
+
+@pytest.mark.unit
+class TestControlVariates:
+    def test_removes_correlated_variance(self):
+        rng = np.random.default_rng(5)
+        control = rng.normal(1.0, 1.0, 20_000)
+        values = 2.0 * control + rng.normal(0.0, 0.1, 20_000)
+
+        estimate = control_variate_mean(values, control, np.array([1.0]))
+        assert estimate['variance_reduction'] > 0.99
+        assert estimate['mean'] == pytest.approx(2.0, abs=5e-3)
+        assert estimate['standard_error'] < values.std() / np.sqrt(len(values)) / 10
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestEngineSampling:
+    PATTERN = {'expected_score': 0.5, 'pattern_multiplier': 1.1}
+
+    @pytest.mark.parametrize('method', ['sobol', 'lhs', 'antithetic'])
+    def test_simulator_methods_agree_with_random(self, method):
+        def run(sampling):
+            params = SimulationParameters(iterations=20_000, random_seed=6, sampling=sampling)
+            return asyncio.run(MonteCarloSimulator(params).run_pattern_simulation(self.PATTERN, UNCERTAINTIES))
+
+        reference, result = run('random'), run(method)
+        assert result.mean == pytest.approx(reference.mean, abs=3e-3)
+        assert result.percentiles['50th'] == pytest.approx(reference.percentiles['50th'], abs=5e-3)
+        assert np.sqrt(result.variance) == pytest.approx(np.sqrt(reference.variance), rel=0.03)
+        # Seeded runs repeat
+        assert run(method).percentiles == result.percentiles
+
+    def test_simulator_control_variate(self):
+        params = SimulationParameters(iterations=5_000, random_seed=7, control_variates=True)
+        result = asyncio.run(MonteCarloSimulator(params).run_pattern_simulation(self.PATTERN, UNCERTAINTIES))
+
+        estimate = result.distribution_params['control_variate']
+        assert result.mean == estimate['mean']
+        assert estimate['variance_reduction'] > 0.9
+        assert result.mean == pytest.approx(0.55, abs=1e-3)
+
+    def test_invalid_sampling_rejected(self):
+        with pytest.raises(ValueError):
+            SimulationParameters(sampling='grid')
+
+    def test_pattern_task_sampling(self):
+        seed = np.random.SeedSequence(8)
+        params = {'distribution': 'triangular', 'min': 0.5, 'mode': 0.7, 'max': 0.9}
+        samples = draw_samples(SimulationTask('P001', params, (), 4096, seed, sampling='sobol'))
+        assert samples.min() >= 0.5 and samples.max() <= 0.9
+        assert samples.mean() == pytest.approx(0.7, abs=1e-3)
+
+    def test_segment_engine_sampling(self):
+        engine = SegmentMonteCarloEngine(sampling='lhs', random_seed=9)
+        samples = engine._generate_samples('beta', [2, 5], 1000)
+        # beta(2, 5) scaled to [10, 60]
+        assert samples.min() >= 10 and samples.max() <= 60
+        assert samples.mean() == pytest.approx(10 + 50 * 2 / 7, abs=0.05)
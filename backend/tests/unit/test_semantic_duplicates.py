@@ -0,0 +1,158 @@
+"""
+Unit tests for blocked semantic duplicate search.
+
+Tests threshold_neighbors against a full similarity matrix,
+resolve_semantic_duplicates against the n x n double loop the semantic
+deduplication stage used, and the batched, bounded embedding cache of
+ContentDeduplicationService.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.semantic_duplicates import (
+    normalize_embeddings, resolve_semantic_duplicates, threshold_neighbors
+)
+
+
+def _embeddings(count, seed=3, dimension=32, duplicate_rate=0.3):
+    """Random unit-ish vectors with planted noisy copies of earlier rows"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(count):
+        if rows and rng.random() < duplicate_rate:
+            source = rows[rng.integers(len(rows))]
+            rows.append(source + rng.normal(0.0, rng.choice([0.05, 0.3, 0.6]), dimension))
+        else:
+            rows.append(rng.normal(size=dimension))
+    lengths = rng.integers(100, 5000, size=count).tolist()
+    return np.array(rows), lengths
+
+
+def _double_loop(embeddings, lengths, threshold):
+    """The semantic stage before blocking: full matrix and Python double loop"""
+    normalized = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+    matrix = np.dot(normalized, normalized.T)
+    duplicates = {}
+    for i in range(len(embeddings)):
+        if i in duplicates:
+            continue
+        for j in range(i + 1, len(embeddings)):
+            if j in duplicates:
+                continue
+            if matrix[i][j] > threshold:
+                if lengths[i] >= lengths[j]:
+                    duplicates[j] = (i, matrix[i][j])
+                else:
+                    duplicates[i] = (j, matrix[i][j])
+                    break
+    return duplicates
+
+
+@pytest.mark.unit
+class TestBlockedSearch:
+    def test_neighbors_match_full_matrix(self):
+        embeddings, _ = _embeddings(70)
+        normalized = normalize_embeddings(embeddings)
+        matrix = normalized @ normalized.T
+
+        for block_size in (1, 8, 64, 100):
+            found = {}
+            for start, neighbors in threshold_neighbors(normalized, 0.85, block_size):
+                for offset, (columns, similarities) in enumerate(neighbors):
+                    found[start + offset] = columns.tolist()
+                    np.testing.assert_allclose(similarities, matrix[start + offset, columns])
+            expected = {i: [j for j in range(i + 1, 70) if matrix[i, j] > 0.85] for i in range(70)}
+            assert found == expected
+
+    @pytest.mark.parametrize("block_size", [1, 16, 1024])
+    def test_matches_double_loop(self, block_size):
+        embeddings, lengths = _embeddings(200)
+        expected = _double_loop(embeddings, lengths, 0.85)
+
+        duplicates = resolve_semantic_duplicates(embeddings, lengths, 0.85, block_size=block_size)
+
+        assert duplicates.keys() == expected.keys()
+        assert len(duplicates) > 20
+        for index, (source, similarity) in duplicates.items():
+            assert source == expected[index][0]
+            assert similarity == pytest.approx(expected[index][1])
+
+    def test_shorter_document_is_duplicate(self):
+        base = np.array([1.0, 0.0, 0.0])
+        embeddings = np.array([base, base * 2, [0.0, 1.0, 0.0]])
+        assert resolve_semantic_duplicates(embeddings, [10, 50, 10], 0.85) == {0: (1, pytest.approx(1.0))}
+        assert resolve_semantic_duplicates(embeddings, [50, 10, 10], 0.85) == {1: (0, pytest.approx(1.0))}
+        assert resolve_semantic_duplicates(np.zeros((3, 4)), [1, 2, 3], 0.85) == {}
+
+    def test_rejects_bad_input(self):
+        with pytest.raises(ValueError):
+            resolve_semantic_duplicates(np.ones((3, 4)), [1, 2], 0.85)
+        with pytest.raises(ValueError):
+            normalize_embeddings(np.ones(4))
+        with pytest.raises(ValueError):
+            next(threshold_neighbors(np.ones((2, 2)), 0.85, block_size=0))
+
+
+class FakeEmbeddings:
+    def __init__(self, dimension=8):
+        self.dimension = dimension
+        self.calls = []
+
+    async def aembed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [np.random.default_rng(len(text)).normal(size=self.dimension).tolist() for text in texts]
+
+
+@pytest.fixture
+def service():
+    pytest.importorskip("google.cloud.aiplatform")
+    from app.services.content_deduplication_service import ContentDeduplicationService
+
+    service = ContentDeduplicationService()
+    service.embeddings = FakeEmbeddings()
+    service.semantic_search['embedding_batch_size'] = 4
+    return service
+
+
+@pytest.mark.unit
+class TestBatchedEmbeddings:
+    @pytest.mark.asyncio
+    async def test_batches_distinct_uncached_contents(self, service):
+        contents = [f"document {'x' * i}" for i in range(10)]
+
+        first = await service._generate_batch_embeddings(contents + contents[:3])
+        assert [len(call) for call in service.embeddings.calls] == [4, 4, 2]
+        np.testing.assert_array_equal(first[10:], first[:3])
+
+        second = await service._generate_batch_embeddings(contents[5:] + ["new document"])
+        assert service.embeddings.calls[-1] == ["new document"]
+        np.testing.assert_array_equal(second[:5], first[5:10])
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, service):
+        from app.core.memoization import MemoCache
+
+        service.semantic_embeddings_cache = MemoCache('semantic_embeddings', max_entries=5)
+        embeddings = await service._generate_batch_embeddings([f"page {i}" for i in range(20)])
+
+        assert embeddings.shape == (20, 8)
+        assert len(service.semantic_embeddings_cache) == 5
+
+    @pytest.mark.asyncio
+    async def test_semantic_stage_marks_shorter_duplicate(self, service):
+        documents = [
+            {'content': 'a' * 30, 'url': 'long'},
+            {'content': 'b' * 20, 'url': 'other'},
+            {'content': 'a' * 10, 'url': 'short'},
+        ]
+
+        async def embed(texts):
+            return [[1.0, 0.0] if text.startswith('a') else [0.0, 1.0] for text in texts]
+        service.embeddings.aembed_documents = embed
+
+        unique, removed = await service._remove_semantic_duplicates(documents, 0.85)
+
+        assert removed == 1
+        assert [doc['url'] for doc in unique] == ['long', 'other']
+        assert documents[2]['deduplication_info']['source_document'] == 'long'
@@ -0,0 +1,120 @@
+"""
+Unit tests for inverted-index partial-overlap search.
+
+Tests find_partial_duplicates decisions against the pairwise comparison of
+every document with every accepted one, the prefix and size filters at
+threshold boundaries, and the SimHash fingerprint pre-filter.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.core.sentence_overlap import (
+    OverlapIndex, WordVocabulary, find_partial_duplicates, hamming_distance, simhash,
+    word_overlap, word_set
+)
+
+
+def _word_sets(size, seed=5, duplicate_rate=0.4):
+    """Key-sentence word sets with planted partial copies of earlier documents"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(3000)]
+    common = vocabulary[:30]
+    sets = []
+    for _ in range(size):
+        if sets and rng.random() < duplicate_rate:
+            words = set(rng.choice(sets))
+            for _ in range(rng.randint(0, 8)):
+                words.discard(rng.choice(sorted(words)))
+                words.add(rng.choice(vocabulary))
+        else:
+            words = set(rng.sample(vocabulary, rng.randint(5, 60))) | set(rng.sample(common, 5))
+        sets.append(frozenset(words))
+    return sets
+
+
+def _pairwise(word_sets, threshold):
+    """The partial stage before indexing: every document against every accepted one"""
+    accepted, decisions = [], []
+    for document, words in enumerate(word_sets):
+        decision = (None, 0.0)
+        for existing in accepted:
+            overlap = word_overlap(word_sets[existing], words)
+            if overlap > threshold:
+                decision = (existing, overlap)
+                break
+        decisions.append(decision)
+        if decision[0] is None:
+            accepted.append(document)
+    return decisions
+
+
+@pytest.mark.unit
+class TestPartialOverlap:
+    @pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+    def test_matches_pairwise_comparison(self, threshold):
+        word_sets = _word_sets(400)
+        expected = _pairwise(word_sets, threshold)
+
+        decisions = find_partial_duplicates(word_sets, threshold)
+
+        assert decisions == expected
+        assert sum(source is not None for source, _ in decisions) > 20
+
+    def test_boundary_overlaps(self):
+        base = frozenset(f"w{i}" for i in range(5))
+        # 4 of 5 words: exactly 0.8 is not above the threshold
+        exactly = frozenset(sorted(base)[:4])
+        above = base | {"extra"}
+        word_sets = [base, exactly, frozenset(f"w{i}" for i in range(6)) | {"extra"}, above]
+
+        assert find_partial_duplicates(word_sets, 0.8) == _pairwise(word_sets, 0.8)
+        assert find_partial_duplicates(word_sets, 0.8)[1] == (None, 0.0)
+        assert find_partial_duplicates([base, above], 0.8)[1] == (0, pytest.approx(5 / 6))
+
+    def test_empty_documents_never_match(self):
+        word_sets = [frozenset(), frozenset(), word_set(["Market size grew"]), frozenset()]
+        assert find_partial_duplicates(word_sets, 0.8) == [(None, 0.0)] * 4
+
+    def test_word_set_lowercases_sentences(self):
+        assert word_set(["The Market", "market GREW"]) == {"the", "market", "grew"}
+        assert word_overlap(frozenset(), frozenset({"a"})) == 0.0
+
+    def test_index_verifies_only_candidates(self):
+        word_sets = _word_sets(400, duplicate_rate=0.0)
+        vocabulary = WordVocabulary(word_sets)
+        index = OverlapIndex(vocabulary, 0.8)
+        for words in word_sets:
+            index.check(vocabulary.encode(words))
+        assert len(index) == 400
+        # A tenth of the pairs the pairwise comparison would verify
+        assert index.verified_pairs < 400 * 399 // 20
+        with pytest.raises(ValueError):
+            OverlapIndex(vocabulary, 1.0)
+
+
+@pytest.mark.unit
+class TestSimHash:
+    def test_similar_sets_have_close_fingerprints(self):
+        rng = np.random.default_rng(0)
+        hashes = rng.integers(0, 2 ** 63, size=200, dtype=np.uint64)
+        near = np.concatenate([hashes[:190], rng.integers(0, 2 ** 63, size=10, dtype=np.uint64)])
+        far = rng.integers(0, 2 ** 63, size=200, dtype=np.uint64)
+
+        assert simhash(hashes) == simhash(hashes[::-1])
+        assert hamming_distance(simhash(hashes), simhash(near)) < hamming_distance(simhash(hashes), simhash(far))
+        assert simhash(np.empty(0, dtype=np.uint64)) == 0
+        assert hamming_distance(0b1011, 0b0001) == 2
+
+    def test_prefilter_only_removes_decisions(self):
+        word_sets = _word_sets(300)
+        exact = find_partial_duplicates(word_sets, 0.8)
+
+        filtered = find_partial_duplicates(word_sets, 0.8, simhash_distance=16)
+        unfiltered = find_partial_duplicates(word_sets, 0.8, simhash_distance=64)
+
+        assert unfiltered == exact
+        # Every pair the pre-filter keeps is still verified exactly
+        assert all(overlap > 0.8 for source, overlap in filtered if source is not None)
@@ -0,0 +1,102 @@
+"""
+Unit tests for sequential (early-stopping) Monte Carlo.
+
+Tests that runs stop sooner for low-variance metrics, that reported
+standard errors describe the actual error of the estimates, the
+max_iterations cap, and the adaptive modes of MonteCarloSimulator and
+SegmentMonteCarloEngine.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.sequential_monte_carlo import (
+    ConvergenceCriteria, SequentialMonteCarlo, concatenate_batches
+)
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+from app.services.segment_monte_carlo_engine import SegmentMonteCarloEngine
+
+
+def _normal_batches(seed, mean, std):
+    rng = np.random.default_rng(seed)
+    return lambda size: {'kpi': rng.normal(mean, std, size)}
+
+
+@pytest.mark.unit
+class TestSequentialMonteCarlo:
+    def test_stops_sooner_for_low_variance(self):
+        criteria = ConvergenceCriteria(relative_tolerance=0.002, batch_size=1000, min_iterations=4000)
+        _, calm = SequentialMonteCarlo(criteria).run(_normal_batches(0, 10.0, 0.5))
+        _, noisy = SequentialMonteCarlo(criteria).run(_normal_batches(0, 10.0, 2.0))
+
+        assert calm.converged and noisy.converged
+        assert calm.iterations <= 6000
+        # Standard errors scale with 1/sqrt(n): ~16x the runs for 4x the spread
+        assert noisy.iterations > 8 * calm.iterations
+        assert set(calm.metrics) == {'kpi.mean', 'kpi.q0.05', 'kpi.q0.5', 'kpi.q0.95'}
+        assert calm.worst_ratio <= 1.0
+
+    def test_standard_errors_are_calibrated(self):
+        criteria = ConvergenceCriteria(tolerance=0.02, relative_tolerance=0.0, batch_size=500)
+        errors, reported = [], []
+        for seed in range(40):
+            batches, report = SequentialMonteCarlo(criteria).run(_normal_batches(seed, 1.0, 1.0))
+            values = concatenate_batches(batches)['kpi']
+            errors.append(np.quantile(values, 0.95) - 1.0 - 1.6448536269514722)
+            reported.append(report.metrics['kpi.q0.95']['standard_error'])
+
+        # Realized spread of the estimate is close to the reported error
+        assert np.std(errors) == pytest.approx(np.mean(reported), rel=0.35)
+        assert np.abs(errors).max() < 4 * criteria.tolerance
+
+    def test_stops_at_max_iterations(self):
+        criteria = ConvergenceCriteria(relative_tolerance=1e-6, batch_size=1000, min_iterations=1000,
+                                       max_iterations=5500)
+        batches, report = SequentialMonteCarlo(criteria).run(_normal_batches(1, 1.0, 1.0))
+
+        assert not report.converged
+        assert report.iterations == 5500 and [len(b['kpi']) for b in batches][-1] == 500
+        assert report.to_dict()['worst_ratio'] > 1
+
+    def test_criteria_validation(self):
+        with pytest.raises(ValueError):
+            ConvergenceCriteria(tolerance=0.0, relative_tolerance=0.0)
+        with pytest.raises(ValueError):
+            ConvergenceCriteria(batch_size=10_000, max_iterations=5000)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestAdaptiveEngines:
+    def test_simulator_reports_convergence(self):
+        criteria = ConvergenceCriteria(tolerance=0.002, relative_tolerance=0.0, batch_size=2000)
+        params = SimulationParameters(random_seed=3, convergence=criteria)
+        uncertainties = {'market_conditions': {'distribution': 'normal', 'mean': 0.05, 'std': 0.1}}
+        result = asyncio.run(MonteCarloSimulator(params).run_pattern_simulation(
+            {'expected_score': 0.5}, uncertainties))
+
+        report = result.convergence
+        assert report['converged'] and report['iterations'] % 2000 == 0
+        assert report['metrics']['score.mean']['estimate'] == pytest.approx(result.mean, abs=1e-12)
+        assert report['metrics']['score.q0.5']['standard_error'] <= 0.002
+
+    def test_segment_scenarios_spend_more_on_volatile_kpis(self):
+        np.random.seed(5)
+        engine = SegmentMonteCarloEngine(convergence=ConvergenceCriteria(
+            relative_tolerance=0.01, batch_size=1000, min_iterations=2000))
+        patterns = [
+            {'id': 'calm', 'confidence': 0.9,
+             'kpi_anchors': {'share': {'distribution': 'normal', 'params': [20, 1]}}},
+            {'id': 'volatile', 'confidence': 0.8,
+             'kpi_anchors': {'share': {'distribution': 'normal', 'params': [20, 6]}}},
+        ]
+        scenarios = asyncio.run(engine.generate_segment_scenarios('experience', patterns, {}))
+
+        calm, volatile = scenarios
+        assert calm.convergence['converged'] and volatile.convergence['converged']
+        assert volatile.iterations_run > 4 * calm.iterations_run
+        assert calm.to_dict()['convergence']['iterations'] == calm.iterations_run
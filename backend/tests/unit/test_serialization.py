@@ -0,0 +1,202 @@
+"""
+Unit tests for the storage codec layer.
+
+Tests msgpack round trips (numpy, datetimes, tuples, sets), the pickle
+fallback, versioned headers, legacy payload decoding, zstd dictionaries and
+per-tier statistics, plus the codec integration in MultiLevelCacheManager.
+"""
+
+import gzip
+import json
+import pickle
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.serialization import (
+    StorageCodec,
+    decode_framed,
+    describe,
+    encode_json_text,
+    get_serialization_stats,
+    is_framed,
+    train_dictionary,
+    zstd_available
+)
+
+
+class _Opaque:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __eq__(self, other):
+        return isinstance(other, _Opaque) and other.payload == self.payload
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestStorageCodec:
+    """Test suite for header-framed codecs."""
+
+    def test_round_trip_preserves_types(self):
+        codec = StorageCodec('test_round_trip')
+        value = {
+            'scores': np.arange(12, dtype=np.float32).reshape(3, 4),
+            'mean': np.float64(0.25),
+            'count': np.int64(7),
+            'created_at': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'pair': (1, 'a'),
+            'tags': {'session:s1', 'topic:ev'},
+            'ordered': OrderedDict(b=1, a=2),
+            'nested': [{'layer_id': 'L1_1', 'score': 0.5, 'evidence': None}],
+            'blob': b'\x00\x01',
+            1: 'int key',
+        }
+        decoded = codec.decode(codec.encode(value))
+
+        np.testing.assert_array_equal(decoded['scores'], value['scores'])
+        assert decoded['scores'].dtype == np.float32
+        assert decoded['scores'].flags.writeable
+        assert decoded['mean'] == np.float64(0.25) and isinstance(decoded['mean'], np.float64)
+        assert decoded['count'] == 7 and isinstance(decoded['count'], np.int64)
+        assert decoded['created_at'] == value['created_at']
+        assert decoded['pair'] == (1, 'a')
+        assert decoded['tags'] == value['tags']
+        assert decoded['ordered'] == {'b': 1, 'a': 2}
+        assert decoded['nested'] == value['nested']
+        assert decoded['blob'] == b'\x00\x01'
+        assert decoded[1] == 'int key'
+
+    def test_unsupported_types_fall_back_to_pickle(self):
+        codec = StorageCodec('test_fallback')
+        data = codec.encode({'model': _Opaque([1, 2])})
+        assert describe(data)['codec'] == 'pickle'
+        assert codec.decode(data) == {'model': _Opaque([1, 2])}
+        assert codec.stats.pickle_fallbacks == 1
+
+    def test_small_payloads_not_compressed(self):
+        codec = StorageCodec('test_small', compression='gzip', min_compress_bytes=512)
+        assert describe(codec.encode({'score': 0.5}))['compression'] == 'none'
+        large = codec.encode({'insights': ['market evidence ' * 10] * 50})
+        assert describe(large)['compression'] == 'gzip'
+
+    def test_header_and_version(self):
+        codec = StorageCodec('test_header', codec='json', compression=None)
+        data = codec.encode([1, 2, 3])
+        assert is_framed(data)
+        assert describe(data) == {'framed': True, 'version': 1, 'codec': 'json',
+                                  'compression': 'none', 'dictionary_id': None,
+                                  'size': len(data)}
+
+        future = data[:2] + bytes([99]) + data[3:]
+        with pytest.raises(ValueError):
+            decode_framed(future)
+
+    def test_any_tier_decodes_any_framed_payload(self):
+        writer = StorageCodec('test_writer', codec='pickle', compression='gzip',
+                              min_compress_bytes=0)
+        reader = StorageCodec('test_reader', codec='msgpack')
+        assert reader.decode(writer.encode({'a': 1})) == {'a': 1}
+
+    def test_legacy_payloads_use_legacy_decoder(self):
+        legacy = gzip.compress(pickle.dumps({'score': 0.9}))
+        codec = StorageCodec('test_legacy',
+                             legacy_decoder=lambda d: pickle.loads(gzip.decompress(d)))
+        assert codec.decode(legacy) == {'score': 0.9}
+        assert codec.stats.legacy_decodes == 1
+
+        strict = StorageCodec('test_legacy_strict')
+        with pytest.raises(ValueError):
+            strict.decode(legacy)
+
+    @pytest.mark.skipif(not zstd_available(), reason="zstandard not installed")
+    def test_zstd_dictionary(self):
+        samples = [{'layer_id': f'L{i}_{j}', 'score': j / 10,
+                    'insights': ['Competitive landscape shows consolidation'] * 3}
+                   for i in range(50) for j in range(5)]
+        dictionary_id = train_dictionary(samples, dict_size=4096)
+        with_dict = StorageCodec('test_zstd_dict', dictionary_id=dictionary_id,
+                                 min_compress_bytes=0)
+        without = StorageCodec('test_zstd_plain', min_compress_bytes=0)
+
+        value = samples[7]
+        data = with_dict.encode(value)
+        assert describe(data)['dictionary_id'] == dictionary_id
+        assert len(data) < len(without.encode(value))
+        assert with_dict.decode(data) == value
+
+    def test_stats_per_tier(self):
+        codec = StorageCodec('test_stats', compression='gzip', min_compress_bytes=0)
+        data = codec.encode({'insights': ['x' * 100] * 20})
+        codec.decode(data)
+
+        stats = get_serialization_stats()['test_stats']
+        assert stats['encodes'] == 1 and stats['decodes'] == 1
+        assert stats['wire_bytes'] == len(data)
+        assert stats['compression_ratio'] > 1
+        assert stats['avg_encode_ms'] >= 0
+
+    def test_encode_json_text_handles_numpy(self):
+        text = encode_json_text({'score': np.float64(0.5), 'values': np.arange(3)},
+                                tier='test_json_text')
+        assert json.loads(text) == {'score': 0.5, 'values': [0, 1, 2]}
+        assert get_serialization_stats()['test_json_text']['encodes'] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCacheManagerCodecs:
+    """Codec integration in MultiLevelCacheManager."""
+
+    @pytest.fixture
+    def cache_manager(self, mock_gcp_settings):
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+
+        with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+            return mlcm.MultiLevelCacheManager(project_id="test-project")
+
+    def test_levels_use_framed_msgpack(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+        from app.services.enhanced_orchestration.cache_tags import TaggedValue
+
+        value = TaggedValue({'scores': np.ones(4)}, (('ns:layer', 2),))
+        for level in (CacheLevel.L2_REDIS, CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT):
+            data = cache_manager._serialize_for_storage(level, value)
+            assert describe(data)['codec'] == 'msgpack'
+            decoded = cache_manager._deserialize_from_storage(level, data)
+            assert isinstance(decoded, TaggedValue)
+            assert decoded.generations == (('ns:layer', 2),)
+            np.testing.assert_array_equal(decoded.value['scores'], np.ones(4))
+
+    def test_entries_from_previous_format_still_decode(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        old_l2 = gzip.compress(pickle.dumps({'score': 0.7}))
+        assert cache_manager._deserialize_from_storage(CacheLevel.L2_REDIS, old_l2) == {'score': 0.7}
+
+        old_json = gzip.compress(json.dumps({'score': 0.3}).encode('utf-8'))
+        assert cache_manager._deserialize_from_storage(CacheLevel.L3_MEMCACHED, old_json) == {'score': 0.3}
+
+    @pytest.mark.asyncio
+    async def test_l4_reads_old_text_documents(self, cache_manager):
+        doc = Mock(exists=True)
+        doc.to_dict.return_value = {
+            'value': pickle.dumps({'score': 0.4}).decode('latin-1'),
+            'serialization': 'pickle',
+            'created_at': datetime.now(timezone.utc),
+            'ttl_seconds': 3600,
+        }
+        doc_ref = Mock()
+        doc_ref.get.return_value = doc
+        cache_manager.firestore_client = Mock()
+        cache_manager.firestore_client.collection.return_value.document.return_value = doc_ref
+
+        assert await cache_manager._get_from_l4("layer:1") == {'score': 0.4}
+
+        doc.to_dict.return_value = cache_manager._l4_document_data("layer:1", {'score': 0.5}, None)
+        assert isinstance(doc.to_dict.return_value['value'], bytes)
+        assert await cache_manager._get_from_l4("layer:1") == {'score': 0.5}
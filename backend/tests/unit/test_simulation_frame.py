@@ -0,0 +1,117 @@
+"""
+Unit tests for the columnar SimulationFrame.
+
+Tests column adoption and validation, zero-copy row slicing, downsampling
+for responses, and spilling to memory-mapped files past the memory budget.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.core.simulation_frame import SimulationFrame
+
+
+def _frame(rows=1000, **kwargs):
+    rng = np.random.default_rng(0)
+    return SimulationFrame({'roi': rng.random(rows), 'adoption_rate': rng.random(rows),
+                            'F1': rng.normal(0.15, 0.05, rows)}, **kwargs)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestSimulationFrame:
+    """Columns, views and memory."""
+
+    def test_columns_are_adopted_and_validated(self):
+        roi = np.random.default_rng(0).random(100)
+        frame = SimulationFrame({'roi': roi, 'floor': 0.1})
+        assert frame['roi'] is roi
+        assert np.all(frame['floor'] == 0.1) and frame['floor'].flags.c_contiguous
+        assert frame.columns == ['roi', 'floor'] and len(frame) == 100
+        assert 'roi' in frame and frame.get('missing') is None
+
+        # Views and other dtypes are copied into contiguous columns
+        frame.add_column('strided', np.arange(200.0)[::2])
+        assert frame['strided'].flags.c_contiguous and frame['strided'][1] == 2.0
+        with pytest.raises(ValueError):
+            frame.add_column('short', np.zeros(99))
+
+    def test_float32_frames(self):
+        frame = SimulationFrame({'score': np.linspace(0, 1, 10)}, dtype=np.float32)
+        assert frame['score'].dtype == np.float32
+        frame.add_column('mask', np.arange(10) > 4)
+        assert frame['mask'].dtype == bool
+
+    def test_row_slices_share_memory(self):
+        frame = _frame()
+        window = frame[100:200]
+        assert len(window) == 100
+        assert np.shares_memory(window['roi'], frame['roi'])
+        window['roi'][0] = -1.0
+        assert frame['roi'][100] == -1.0
+
+        mask = frame['roi'] > 0.5
+        selected = frame[mask]
+        assert len(selected) == int(mask.sum())
+        assert not np.shares_memory(selected['roi'], frame['roi'])
+
+    def test_downsample(self):
+        frame = _frame(rows=10_001)
+        strided = frame.downsample(1000)
+        assert len(strided) <= 1000
+        assert np.shares_memory(strided['roi'], frame['roi'])
+        assert strided['roi'][1] == frame['roi'][len(frame) // 1000 + 1]
+
+        sampled = frame.downsample(500, method='random', seed=1)
+        assert len(sampled) == 500
+        assert np.all(np.isin(sampled['roi'], frame['roi']))
+        assert len(frame.downsample(50_000)) == len(frame)
+
+        records = frame.to_records(max_rows=10)
+        assert len(records) <= 10 and set(records[0]) == {'roi', 'adoption_rate', 'F1'}
+        assert isinstance(records[0]['roi'], float)
+
+    def test_quantiles(self):
+        frame = _frame()
+        assert np.allclose(frame.quantiles('roi', [0.25, 0.75]),
+                           np.percentile(frame['roi'], [25, 75]))
+
+    def test_spills_columns_past_memory_budget(self, tmp_path):
+        rows = 10_000
+        frame = SimulationFrame(length=rows, memory_budget_bytes=2 * rows * 8, spill_dir=str(tmp_path))
+        frame.add_column('a', np.ones(rows))
+        frame.add_column('b', np.full(rows, 2.0))
+        frame.add_column('c', np.full(rows, 3.0))
+        allocated = frame.allocate('d', fill_value=4.0)
+
+        assert frame.spilled_columns == ['c', 'd']
+        assert isinstance(allocated, np.memmap)
+        assert frame.memory_nbytes == 2 * rows * 8 and frame.nbytes == 4 * rows * 8
+        assert float(frame['c'].sum()) == 3.0 * rows and float(frame['d'][:10].sum()) == 40.0
+        spill_files = [path for path in tmp_path.rglob('*.npy')]
+        assert len(spill_files) == 2
+
+        # Slices of spilled columns are still views; closing deletes the files
+        assert np.shares_memory(frame[10:20]['c'], frame['c'])
+        frame.close()
+        assert not any(os.path.exists(path) for path in spill_files)
+
+    def test_spill_files_removed_when_collected(self, tmp_path):
+        frame = SimulationFrame({'a': np.ones(1000)}, memory_budget_bytes=1, spill_dir=str(tmp_path))
+        assert frame.spilled_columns == ['a']
+        del frame
+        assert not list(tmp_path.rglob('*.npy'))
+
+    def test_budget_zero_disables_spilling(self):
+        frame = SimulationFrame({'a': np.ones(1000)}, memory_budget_bytes=0)
+        assert frame.spilled_columns == []
+
+    def test_concat(self):
+        parts = [_frame(rows=300, attrs={'driver_ids': ['F1']}), _frame(rows=200)]
+        frame = SimulationFrame.concat(parts)
+        assert len(frame) == 500 and frame.columns == ['roi', 'adoption_rate', 'F1']
+        assert frame.attrs == {'driver_ids': ['F1']}
+        np.testing.assert_array_equal(frame['roi'], np.concatenate([parts[0]['roi'], parts[1]['roi']]))
+        assert len(SimulationFrame.concat([])) == 0
@@ -0,0 +1,146 @@
+"""
+Unit tests for the simulation process pool.
+
+Tests that worker-process results (chunked, through shared memory) are
+identical to the serial path, failure rows, cancellation, and that the
+pattern library engine gives the same analysis for any worker count.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.simulation_pool import (
+    STAT_FIELDS, STATUS_DONE, STATUS_FAILED, SimulationPool, SimulationTask,
+    draw_samples, run_serial, simulation_statistics
+)
+
+PARAMS = [
+    {'distribution': 'triangular', 'min': 0.5, 'mode': 0.75, 'max': 0.95},
+    {'distribution': 'normal', 'mean': 0.6, 'std': 0.15},
+    {'distribution': 'beta', 'alpha': 2, 'beta': 3, 'scale': 0.5},
+    {'distribution': 'log_normal', 'mu': -0.7, 'sigma': 0.2},
+    {'distribution': 'uniform', 'min': 0.3, 'max': 0.7},
+]
+
+
+def _tasks(seed=7, iterations=20_000, count=10):
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    return [
+        SimulationTask(task_id=f"T{i}", params=PARAMS[i % len(PARAMS)],
+                       adjustments=(0.01 * i, -0.02), iterations=iterations, seed=seeds[i])
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def pool():
+    pool = SimulationPool(max_workers=2, chunk_size=2, min_parallel_samples=0)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.unit
+class TestSimulationPool:
+    def test_serial_rows_match_direct_statistics(self):
+        tasks = _tasks(count=3)
+        table = run_serial(tasks)
+
+        assert table.shape == (3, len(STAT_FIELDS) + 1)
+        assert np.all(table[:, -1] == STATUS_DONE)
+        for task, row in zip(tasks, table):
+            samples = draw_samples(task)
+            assert samples.min() >= 0.0 and samples.max() <= 1.0
+            np.testing.assert_array_equal(row[:-1], simulation_statistics(samples))
+
+    def test_workers_match_serial_exactly(self, pool):
+        tasks = _tasks()
+        parallel = asyncio.run(pool.run(tasks))
+        # Different chunking, same streams
+        pool.chunk_size = 3
+        rechunked = asyncio.run(pool.run(tasks))
+
+        np.testing.assert_array_equal(parallel, run_serial(tasks))
+        np.testing.assert_array_equal(rechunked, parallel)
+
+    def test_failed_task_row(self, pool):
+        tasks = _tasks(count=3)
+        tasks[1].params = {'distribution': 'triangular', 'min': 0.9, 'mode': 0.5, 'max': 0.1}
+        table = asyncio.run(pool.run(tasks))
+
+        assert table[1, -1] == STATUS_FAILED
+        assert np.all(np.isnan(table[1, :-1]))
+        assert table[0, -1] == table[2, -1] == STATUS_DONE
+
+    def test_cancellation(self, pool):
+        tasks = _tasks(iterations=2_000_000, count=8)
+
+        async def cancel_run():
+            run = asyncio.ensure_future(pool.run(tasks))
+            await asyncio.sleep(0.5)
+            run.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await run
+            # The pool stays usable
+            return await pool.run(_tasks(count=2))
+
+        table = asyncio.run(cancel_run())
+        np.testing.assert_array_equal(table, run_serial(_tasks(count=2)))
+
+    def test_small_batches_run_in_process(self):
+        pool = SimulationPool(max_workers=4)
+        table = asyncio.run(pool.run(_tasks(count=2)))
+
+        assert not pool.get_stats()['started']
+        np.testing.assert_array_equal(table, run_serial(_tasks(count=2)))
+
+
+@pytest.mark.unit
+class TestPatternEngineParallel:
+    def _analyze(self, seed, max_workers, min_parallel_samples=0):
+        from app.services.pattern_library_monte_carlo import PatternLibraryMonteCarloEngine
+        engine = PatternLibraryMonteCarloEngine(random_seed=seed, max_workers=max_workers)
+        engine.simulation_pool.min_parallel_samples = min_parallel_samples
+        try:
+            analysis = asyncio.run(engine.analyze_all_patterns(
+                ["market growth and adoption " * 50], {'market_growth_rate': 0.2}
+            ))
+        finally:
+            engine.simulation_pool.shutdown()
+        return {pid: result.monte_carlo_result for pid, result in analysis.pattern_results.items()}
+
+    def test_identical_for_any_worker_count(self):
+        serial = self._analyze(seed=11, max_workers=1)
+        parallel = self._analyze(seed=11, max_workers=2)
+
+        assert list(serial) == list(parallel)
+        for pattern_id, result in serial.items():
+            assert result.simulations_run == 10000
+            # repr compares NaN risk metrics (fully clipped patterns) as equal
+            assert repr(parallel[pattern_id]) == repr(result)
+
+    def test_seed_controls_streams(self):
+        first = self._analyze(seed=11, max_workers=1)
+        again = self._analyze(seed=11, max_workers=1)
+        other = self._analyze(seed=12, max_workers=1)
+
+        assert repr(first) == repr(again)
+        assert first['P001'].mean_score != other['P001'].mean_score
+
+    def test_engines_share_the_application_pool(self, monkeypatch):
+        from app.core import simulation_pool as pool_module
+        from app.services.pattern_library_monte_carlo import PatternLibraryMonteCarloEngine
+        monkeypatch.setattr(pool_module, '_shared_pool', None)
+
+        first, second = PatternLibraryMonteCarloEngine(), PatternLibraryMonteCarloEngine()
+        assert first.simulation_pool is second.simulation_pool is pool_module.get_simulation_pool()
+        # The default analysis (41 patterns x 10k iterations) goes to processes
+        assert 41 * first.simulation_iterations >= first.simulation_pool.min_parallel_samples
+
+        first.simulation_pool.min_parallel_samples = 0
+        first.simulation_pool.max_workers = 2
+        asyncio.run(first.simulation_pool.run(_tasks(count=2)))
+        assert first.simulation_pool.get_stats()['started']
+        pool_module.shutdown_simulation_pool()
+        assert not first.simulation_pool.get_stats()['started']
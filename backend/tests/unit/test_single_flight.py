@@ -0,0 +1,326 @@
+"""
+Unit tests for cache stampede protection.
+
+Tests in-process single flight, Redis lease coordination, XFetch early refresh
+and the coalescing behaviour of MultiLevelCacheManager.get/get_or_compute.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.enhanced_orchestration.single_flight import (
+    SingleFlight,
+    SingleFlightStats,
+    RedisLease,
+    xfetch_should_refresh
+)
+
+
+class FakeAsyncRedis:
+    """Minimal in-memory stand-in for redis.asyncio used by the lease tests"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.get_calls = 0
+
+    def _alive(self, key):
+        expires = self.expiry.get(key)
+        if expires is not None and time.monotonic() >= expires:
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        if px:
+            self.expiry[key] = time.monotonic() + px / 1000
+        return True
+
+    async def get(self, key):
+        self.get_calls += 1
+        return self.data.get(key) if self._alive(key) else None
+
+    async def exists(self, key):
+        return 1 if self._alive(key) else 0
+
+    async def eval(self, script, numkeys, key, token):
+        if self._alive(key) and self.data[key] == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestSingleFlight:
+    """Test suite for in-process single flight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"context": "session"}
+
+        results = await asyncio.gather(*[flight.do("ctx", load) for _ in range(210)])
+
+        assert calls == 1
+        assert all(r == {"context": "session"} for r in results)
+        assert flight.stats.leaders == 1
+        assert flight.stats.coalesced_waiters == 209
+        assert not flight.in_flight("ctx")
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_do_not_coalesce(self):
+        flight = SingleFlight()
+
+        async def load(value):
+            await asyncio.sleep(0.001)
+            return value
+
+        results = await asyncio.gather(*[flight.do(i, lambda i=i: load(i)) for i in range(5)])
+        assert results == list(range(5))
+        assert flight.stats.leaders == 5
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+
+        results = await asyncio.gather(*[flight.do("k", fail) for _ in range(3)],
+                                       return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.stats.leader_failures == 1
+
+        # Failures are not cached
+        async def ok():
+            return 1
+        assert await flight.do("k", ok) == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_leader_cancelled(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        leader = asyncio.ensure_future(flight.do("k", slow))
+        await started.wait()
+
+        async def fast():
+            return "recomputed"
+
+        waiter = asyncio.ensure_future(flight.do("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == "recomputed"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    @pytest.mark.asyncio
+    async def test_sync_loader_supported(self):
+        flight = SingleFlight()
+        assert await flight.do("k", lambda: 42) == 42
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_deduplicated(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        assert flight.refresh_in_background("k", load)
+        assert not flight.refresh_in_background("k", load)
+        await flight.drain()
+        assert calls == 1
+        assert flight.stats.early_refreshes == 1
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestXFetch:
+    """Test suite for probabilistic early refresh."""
+
+    def test_never_refreshes_without_cost_or_ttl(self):
+        assert not xfetch_should_refresh(0.0, None, 1.0, now=100.0)
+        assert not xfetch_should_refresh(0.0, 300, 0.0, now=299.0)
+
+    def test_refreshes_after_expiry(self):
+        assert xfetch_should_refresh(0.0, 300, 0.5, now=301.0, rand=lambda: 0.0)
+
+    def test_probability_rises_towards_expiry(self):
+        import random
+        rng = random.Random(7)
+
+        def rate(now):
+            return sum(
+                xfetch_should_refresh(0.0, 300, 2.0, now=now, rand=rng.random)
+                for _ in range(2_000)
+            ) / 2_000
+
+        early, late = rate(200.0), rate(298.0)
+        assert early == 0.0
+        assert 0.3 < late < 0.5  # P = exp(-gap / delta) = exp(-1) ~ 0.37
+
+    def test_beta_scales_eagerness(self):
+        kwargs = dict(created_at=0.0, ttl_seconds=300, delta_seconds=1.0, now=297.0,
+                      rand=lambda: 0.5)
+        assert not xfetch_should_refresh(beta=1.0, **kwargs)
+        assert xfetch_should_refresh(beta=5.0, **kwargs)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestRedisLease:
+    """Test suite for distributed single flight via Redis lease."""
+
+    @pytest.mark.asyncio
+    async def test_only_one_holder(self):
+        redis = FakeAsyncRedis()
+        lease = RedisLease(redis)
+        token = await lease.acquire("session:1")
+        assert token
+        assert await lease.acquire("session:1") is None
+
+        await lease.release("session:1", "not-the-owner")
+        assert await lease.acquire("session:1") is None
+
+        await lease.release("session:1", token)
+        assert await lease.acquire("session:1")
+
+    @pytest.mark.asyncio
+    async def test_waiter_receives_holder_value(self):
+        redis = FakeAsyncRedis()
+        stats = SingleFlightStats()
+        lease = RedisLease(redis, stats=stats, poll_interval=0.005)
+        token = await lease.acquire("k")
+
+        async def holder():
+            await asyncio.sleep(0.03)
+            await redis.set("k", "value")
+            await lease.release("k", token)
+
+        holder_task = asyncio.ensure_future(holder())
+        value = await lease.wait_for_value("k", lambda: redis.get("k"))
+        await holder_task
+
+        assert value == "value"
+        assert stats.lease_waits == 1
+        assert stats.lease_wait_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_gives_up_when_holder_dies(self):
+        redis = FakeAsyncRedis()
+        lease = RedisLease(redis, lease_ttl_ms=30, poll_interval=0.005)
+        await lease.acquire("k")
+        value = await lease.wait_for_value("k", lambda: redis.get("k"))
+        assert value is None
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCacheManagerStampedeProtection:
+    """Coalescing through MultiLevelCacheManager."""
+
+    @pytest.fixture
+    def cache_manager(self, mock_gcp_settings):
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+            manager = mlcm.MultiLevelCacheManager(project_id="test-project")
+        for level in (CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT):
+            manager.cache_configs[level].enabled = False
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_hit_redis_once(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+        cache_manager.cache_configs[CacheLevel.L2_REDIS].enabled = True
+        redis = FakeAsyncRedis()
+
+        async def slow_get(key):
+            redis.get_calls += 1
+            await asyncio.sleep(0.01)
+            return None
+
+        redis.get = slow_get
+        cache_manager.redis_client = redis
+
+        results = await asyncio.gather(*[cache_manager.get("ctx", "miss") for _ in range(50)])
+
+        assert results == ["miss"] * 50
+        assert redis.get_calls == 1
+        assert cache_manager.single_flight_stats.coalesced_waiters == 49
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_runs_loader_once(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+        cache_manager.cache_configs[CacheLevel.L2_REDIS].enabled = False
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"layers": 210}
+
+        results = await asyncio.gather(*[
+            cache_manager.get_or_compute("session:ctx", compute) for _ in range(210)
+        ])
+
+        assert calls == 1
+        assert all(r == {"layers": 210} for r in results)
+        assert await cache_manager.get("session:ctx") == {"layers": 210}
+
+        entry = cache_manager.l1_cache.get_entry("session:ctx")
+        assert entry.compute_seconds > 0
+
+        stats = await cache_manager.get_cache_stats()
+        assert stats['single_flight']['coalesced_waiters'] == 209
+
+    @pytest.mark.asyncio
+    async def test_redis_lease_waiter_uses_other_instance_result(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+        cache_manager.cache_configs[CacheLevel.L2_REDIS].enabled = True
+        redis = FakeAsyncRedis()
+        cache_manager.redis_client = redis
+        cache_manager.redis_lease = RedisLease(redis, stats=cache_manager.single_flight_stats,
+                                               poll_interval=0.005)
+        cache_manager._get_from_l2 = lambda key: redis.get(key)
+
+        # Another instance holds the lease and publishes the value shortly
+        token = await cache_manager.redis_lease.acquire("k")
+
+        async def other_instance():
+            await asyncio.sleep(0.02)
+            await redis.set("k", "from-other-instance")
+            await cache_manager.redis_lease.release("k", token)
+
+        compute = Mock(return_value="recomputed")
+        other = asyncio.ensure_future(other_instance())
+        value = await cache_manager.get_or_compute("k", compute)
+        await other
+
+        assert value == "from-other-instance"
+        compute.assert_not_called()
@@ -0,0 +1,183 @@
+"""
+Unit tests for the streaming Monte Carlo summaries.
+
+Tests chunked and merged Moments against numpy/scipy, FixedHistogram and
+DDSketch quantile error bounds against exact quantiles, and the chunked
+MonteCarloSimulator mode against exact statistics of the same samples.
+"""
+
+import asyncio
+import pickle
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.core.streaming_stats import DDSketch, FixedHistogram, Moments
+from app.services.enhanced_analytical_engines.monte_carlo_simulator import (
+    MonteCarloSimulator, SimulationParameters
+)
+
+LEVELS = [0.001, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.975, 0.99, 0.999]
+
+
+def _samples(size=200_003, seed=3):
+    rng = np.random.default_rng(seed)
+    return {
+        'clipped_normal': np.clip(rng.normal(0.6, 0.2, size), 0.0, 1.0),
+        'beta': rng.beta(2, 5, size),
+        'bimodal': np.concatenate([rng.normal(0.2, 0.03, size // 2), rng.normal(0.8, 0.05, size - size // 2)]),
+    }
+
+
+@pytest.mark.unit
+class TestMoments:
+    @pytest.mark.parametrize('name', ['clipped_normal', 'beta', 'bimodal'])
+    def test_chunked_and_merged_match_exact(self, name):
+        values = _samples()[name]
+        chunked = Moments()
+        for chunk in np.array_split(values, 13):
+            chunked.update(chunk)
+        merged = Moments()
+        for part in np.array_split(values, 4):
+            merged.merge(pickle.loads(pickle.dumps(Moments.from_array(part))))
+
+        for moments in (chunked, merged):
+            assert moments.count == len(values)
+            assert moments.mean == pytest.approx(np.mean(values), rel=1e-12)
+            assert moments.variance == pytest.approx(np.var(values), rel=1e-10)
+            assert moments.skewness == pytest.approx(stats.skew(values), rel=1e-8, abs=1e-12)
+            assert moments.kurtosis == pytest.approx(stats.kurtosis(values), rel=1e-8, abs=1e-12)
+            assert (moments.min, moments.max) == (values.min(), values.max())
+
+    def test_empty_and_constant(self):
+        assert np.isnan(Moments().variance)
+        constant = Moments.from_array(np.full(10, 0.5))
+        assert constant.variance == 0.0
+        assert np.isnan(constant.skewness)
+
+
+@pytest.mark.unit
+class TestFixedHistogram:
+    @pytest.mark.parametrize('name', ['clipped_normal', 'beta', 'bimodal'])
+    def test_quantiles_within_one_bin(self, name):
+        values = _samples()[name]
+        histogram = FixedHistogram(0.0, 1.0, bins=1024)
+        for chunk in np.array_split(values, 7):
+            histogram.update(chunk)
+
+        error = np.abs(histogram.quantiles(LEVELS) - np.quantile(values, LEVELS))
+        assert error.max() <= histogram.width
+
+    def test_merge_equals_single_pass(self):
+        values = _samples()['beta']
+        single = FixedHistogram(bins=512)
+        single.update(values)
+        merged = FixedHistogram(bins=512)
+        for part in np.array_split(values, 3):
+            worker = FixedHistogram(bins=512)
+            worker.update(part)
+            merged.merge(pickle.loads(pickle.dumps(worker)))
+
+        np.testing.assert_array_equal(merged.counts, single.counts)
+        np.testing.assert_array_equal(merged.quantiles(LEVELS), single.quantiles(LEVELS))
+        with pytest.raises(ValueError):
+            merged.merge(FixedHistogram(bins=256))
+
+    def test_tail_statistics(self):
+        values = _samples()['clipped_normal']
+        histogram = FixedHistogram(bins=4096)
+        histogram.update(values)
+        mean = values.mean()
+        var_5 = np.quantile(values, 0.05)
+
+        tolerance = histogram.width
+        assert histogram.mean_below(mean) == pytest.approx(values[values < mean].mean(), abs=tolerance)
+        assert histogram.mean_above(mean) == pytest.approx(values[values > mean].mean(), abs=tolerance)
+        assert histogram.std_below(mean) == pytest.approx(values[values < mean].std(), abs=tolerance)
+        assert histogram.mean_below(var_5) == pytest.approx(values[values <= var_5].mean(), abs=tolerance)
+        assert histogram.fraction_at_least(0.6) == pytest.approx(np.mean(values >= 0.6), abs=1e-3)
+
+    def test_out_of_range_values(self):
+        values = np.array([-2.0, -1.0, 0.25, 0.5, 0.75, 3.0])
+        histogram = FixedHistogram(0.0, 1.0, bins=4)
+        histogram.update(values)
+
+        assert histogram.count == 6
+        assert histogram.quantiles([0.0, 1.0]).tolist() == [-2.0, 3.0]
+        summary = histogram.to_dict()
+        assert (summary['underflow'], summary['overflow']) == (2, 1)
+        assert sum(count for _, count in summary['bins']) == 3
+
+
+@pytest.mark.unit
+class TestDDSketchArrays:
+    def test_add_array_matches_scalar_adds(self):
+        values = np.random.default_rng(5).lognormal(0.0, 1.5, 5000) - 1.0
+        scalar, vector = DDSketch(), DDSketch()
+        for value in values:
+            scalar.add(float(value))
+        vector.add_array(values)
+
+        assert vector.count == scalar.count
+        assert vector.zero_count == scalar.zero_count
+        assert vector._positive == scalar._positive
+        assert vector._negative == scalar._negative
+        assert vector.quantiles(LEVELS) == scalar.quantiles(LEVELS)
+
+    def test_relative_error_bound(self):
+        values = np.random.default_rng(6).lognormal(-1.0, 0.8, 300_000)
+        left, right = DDSketch(relative_accuracy=0.01), DDSketch(relative_accuracy=0.01)
+        left.add_array(values[:100_000])
+        right.add_array(values[100_000:])
+        left.merge(right)
+
+        exact = np.quantile(values, LEVELS, method='lower')
+        estimated = np.array(left.quantiles(LEVELS))
+        assert np.all(np.abs(estimated - exact) <= 0.01 * exact * (1 + 1e-9))
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestStreamingSimulation:
+    UNCERTAINTIES = {
+        'market_conditions': {'distribution': 'normal', 'mean': 0.05, 'std': 0.1},
+        'competitive_dynamics': {'distribution': 'triangular', 'low': -0.2, 'mode': 0.0, 'high': 0.1},
+        'execution_risk': {'distribution': 'uniform', 'low': -0.15, 'high': 0.05},
+    }
+    PATTERN = {'expected_score': 0.55, 'pattern_multiplier': 1.1}
+
+    def test_chunked_run_matches_exact_statistics_of_same_samples(self):
+        iterations, chunk_size = 250_000, 40_000
+        params = SimulationParameters(iterations=iterations, random_seed=9, chunk_size=chunk_size)
+        streamed = asyncio.run(MonteCarloSimulator(params).run_pattern_simulation(self.PATTERN, self.UNCERTAINTIES))
+
+        # The same chunks, kept in memory
+        replay = MonteCarloSimulator(SimulationParameters(iterations=iterations, random_seed=9))
+        samples = np.concatenate([
+            replay._simulate_scores(self.PATTERN, self.UNCERTAINTIES, size)
+            for size in [chunk_size] * (iterations // chunk_size) + [iterations % chunk_size]
+        ])
+        exact = replay._calculate_simulation_statistics(samples)
+
+        bin_width = 1.0 / 8192
+        assert streamed.mean == pytest.approx(exact.mean, rel=1e-12)
+        assert streamed.variance == pytest.approx(exact.variance, rel=1e-9)
+        assert streamed.skewness == pytest.approx(exact.skewness, rel=1e-6)
+        for name, value in exact.percentiles.items():
+            assert abs(streamed.percentiles[name] - value) <= bin_width
+        for level, (low, high) in exact.confidence_intervals.items():
+            assert abs(streamed.confidence_intervals[level][0] - low) <= bin_width
+            assert abs(streamed.confidence_intervals[level][1] - high) <= bin_width
+        for name in ('expected_shortfall_5', 'downside_risk', 'upside_potential'):
+            assert streamed.risk_metrics[name] == pytest.approx(exact.risk_metrics[name], abs=2 * bin_width)
+        assert streamed.risk_metrics['success_probability'] == pytest.approx(
+            exact.risk_metrics['success_probability'], abs=1e-3)
+
+    def test_small_runs_keep_exact_path(self):
+        params = SimulationParameters(iterations=5_000, random_seed=9, chunk_size=10_000)
+        chunked = asyncio.run(MonteCarloSimulator(params).run_pattern_simulation(self.PATTERN, self.UNCERTAINTIES))
+        exact = asyncio.run(MonteCarloSimulator(SimulationParameters(iterations=5_000, random_seed=9))
+                            .run_pattern_simulation(self.PATTERN, self.UNCERTAINTIES))
+
+        assert chunked.percentiles == exact.percentiles
@@ -0,0 +1,168 @@
+"""
+Unit tests for performance_monitor and span tracing.
+
+Tests coroutine detection (async functions are timed across their awaits,
+sync functions return plain values whatever their name), parent/child span
+nesting across awaits and tasks, sampling, and the flame aggregation.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.middleware.metrics_exporter import InMemorySink, MetricsExporter, set_metrics_exporter
+from app.middleware.monitoring import LATENCY_METRIC, performance_monitor
+from app.middleware.tracing import FlameAggregator, Tracer, current_span, trace_span, tracer
+
+
+@pytest.fixture(autouse=True)
+def isolated_tracing():
+    exporter = MetricsExporter(sink=InMemorySink(), flush_interval_seconds=3600)
+    set_metrics_exporter(exporter)
+    tracer.flame.reset()
+    sample_rate = tracer.sample_rate
+    tracer.sample_rate = 1.0
+    yield exporter
+    tracer.sample_rate = sample_rate
+    tracer.flame.reset()
+    set_metrics_exporter(None)
+
+
+class Pipeline:
+    @performance_monitor
+    async def run(self):
+        with trace_span("load"):
+            await asyncio.sleep(0.02)
+        await asyncio.gather(self.score("a"), self.score("b"))
+        return self._combine([1, 2])
+
+    @performance_monitor
+    async def score(self, name):
+        await asyncio.sleep(0.03)
+        return name
+
+    @performance_monitor
+    def _combine(self, values):
+        time.sleep(0.01)
+        return sum(values)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestPerformanceMonitor:
+    """Coroutine detection and recorded latency."""
+
+    @pytest.mark.asyncio
+    async def test_async_functions_timed_across_awaits(self, isolated_tracing):
+        @performance_monitor
+        async def fetch_documents():
+            await asyncio.sleep(0.05)
+            return 3
+
+        assert asyncio.iscoroutinefunction(fetch_documents)
+        assert await fetch_documents() == 3
+        await isolated_tracing.flush()
+        latency = isolated_tracing.sink.latest(
+            LATENCY_METRIC, function_name=f"{__name__}.fetch_documents").value
+        assert latency['count'] == 1 and latency['mean'] >= 0.05
+
+    def test_sync_functions_return_values_whatever_their_name(self):
+        @performance_monitor
+        def _private_helper(x):
+            return x + 1
+
+        @performance_monitor
+        def compute_async(x):
+            return x * 2
+
+        assert _private_helper(1) == 2
+        assert compute_async(2) == 4
+
+    def test_decorator_accepts_sample_rate(self):
+        @performance_monitor(sample_rate=0.0)
+        def rarely_traced():
+            return current_span()
+
+        assert rarely_traced() is None
+        assert tracer.flame.tree("rarely_traced") is None
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestSpans:
+    """Nesting, sampling and flame aggregation."""
+
+    @pytest.mark.asyncio
+    async def test_nested_spans_across_awaits_and_tasks(self):
+        assert await Pipeline().run() == 3
+
+        tree = tracer.flame.tree("Pipeline.run")
+        children = {child['name']: child for child in tree['children']}
+        assert set(children) == {"load", "Pipeline.score", "Pipeline._combine"}
+        assert children["Pipeline.score"]['calls'] == 2
+        assert children["load"]['total_ms'] >= 20
+        assert children["Pipeline._combine"]['total_ms'] >= 10
+        # Concurrent children overlap, so self time is clamped at zero
+        assert 0 <= tree['self_ms'] < tree['total_ms']
+        assert tree['total_ms'] >= 60
+
+    @pytest.mark.asyncio
+    async def test_unsampled_traces_record_no_spans(self):
+        tracer.sample_rate = 0.0
+        assert await Pipeline().run() == 3
+        assert tracer.flame.tree("Pipeline.run") is None
+        assert current_span() is None
+
+    def test_span_context_restored_after_errors(self):
+        with pytest.raises(RuntimeError):
+            with trace_span("outer"):
+                with trace_span("inner"):
+                    raise RuntimeError("boom")
+        assert current_span() is None
+        assert "outer;inner" in tracer.flame.folded()
+
+    def test_folded_stacks_and_bounds(self):
+        flame = FlameAggregator(max_paths=2)
+        local = Tracer(flame=flame)
+        with local.span("root"):
+            with local.span("child"):
+                pass
+            with local.span("other"):
+                pass
+        lines = dict(line.rsplit(' ', 1) for line in flame.folded().splitlines())
+        # Spans finish innermost first; the root arrived after the bound was hit
+        assert set(lines) == {"root;child", "root;other"}
+        assert flame.get_stats()['dropped_spans'] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCompleteAnalysisBreakdown:
+    """execute_complete_analysis feeds the flame aggregation."""
+
+    @pytest.mark.asyncio
+    async def test_phases_appear_under_execute_complete_analysis(self):
+        pytest.importorskip("asyncpg")
+        from app.services import v2_strategic_analysis_orchestrator as orchestrator_module
+
+        with patch.object(orchestrator_module, 'V2ExpertPersonaScorer'), \
+                patch.object(orchestrator_module, 'V2FactorCalculationEngine'), \
+                patch.object(orchestrator_module, 'V2SegmentAnalysisEngine'):
+            orchestrator = orchestrator_module.V2StrategicAnalysisOrchestrator()
+
+        orchestrator._execute_layer_scoring_phase = AsyncMock(return_value=[])
+        orchestrator.factor_engine.calculate_all_factors = AsyncMock(return_value=[])
+        orchestrator.segment_engine.analyze_all_segments = AsyncMock(return_value=[])
+        orchestrator._calculate_overall_business_case_score = Mock(return_value=0.5)
+        orchestrator._generate_strategic_scenarios = Mock(return_value=[])
+        orchestrator._calculate_overall_confidence = Mock(return_value=0.5)
+        orchestrator._store_complete_analysis = AsyncMock()
+
+        await orchestrator.execute_complete_analysis("session_1", {'content_items': []})
+
+        breakdown = orchestrator.get_time_breakdown()
+        phases = {child['name'] for child in breakdown['children']}
+        assert {"layer_scoring", "factor_calculation", "segment_analysis",
+                "store_complete_analysis"} <= phases
@@ -0,0 +1,408 @@
+"""
+Unit tests for the WRITE_BACK cache strategy.
+
+Tests coalescing, backpressure, retry/crash consistency and flush-on-shutdown
+of the write-back buffer, and the batched Redis pipeline / Memcached
+set_multi / Firestore batch flush of MultiLevelCacheManager using local fakes.
+"""
+
+import asyncio
+import random
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.enhanced_orchestration.write_back import WriteBackBuffer
+
+
+class CrashingSink:
+    """Flush target that fails randomly, standing in for a flaky backend"""
+
+    def __init__(self, failure_rate: float = 0.0, seed: int = 7):
+        self.store = {}
+        self.batches = []
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    async def __call__(self, entries):
+        await asyncio.sleep(0)
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError("backend crashed mid-flush")
+        self.batches.append(len(entries))
+        for entry in entries:
+            self.store[entry.key] = entry.value
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, data):
+        self.commands.append((key, ttl, data))
+        return self
+
+    async def execute(self):
+        self.redis.executions += 1
+        for key, ttl, data in self.commands:
+            self.redis.data[key] = data
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.executions = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match=None, count=None):
+        import fnmatch
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def close(self):
+        pass
+
+
+class FakeMemcached:
+    def __init__(self):
+        self.data = {}
+        self.set_multi_calls = 0
+
+    def set_multi(self, mapping, time=0):
+        self.set_multi_calls += 1
+        self.data.update(mapping)
+        return []
+
+    def set(self, key, data, time=0):
+        self.data[key] = data
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+
+class FakeFirestoreBatch:
+    def __init__(self, client):
+        self.client = client
+        self.writes = []
+
+    def set(self, doc_ref, data):
+        self.writes.append((doc_ref, data))
+
+    def commit(self):
+        assert len(self.writes) <= 500
+        self.client.commits.append(len(self.writes))
+        for doc_ref, data in self.writes:
+            self.client.docs[doc_ref] = data
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs = {}
+        self.commits = []
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return doc_id
+
+    def batch(self):
+        return FakeFirestoreBatch(self)
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestWriteBackBuffer:
+    """Test suite for the write-back buffer."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_writes_coalesce(self):
+        sink = CrashingSink()
+        buffer = WriteBackBuffer(sink, flush_interval_seconds=60)
+        for i in range(100):
+            await buffer.put("session:1", i)
+        assert len(buffer) == 1
+
+        await buffer.stop()
+        assert sink.store == {"session:1": 99}
+        assert buffer.stats.coalesced_writes == 99
+        assert buffer.stats.flushed_entries == 1
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_bounded_batches(self):
+        sink = CrashingSink()
+        buffer = WriteBackBuffer(sink, batch_size=500, flush_interval_seconds=60)
+        for i in range(1_210):
+            await buffer.put(f"layer:{i}", i)
+        await buffer.flush()
+
+        assert sink.batches == [500, 500, 210]
+        assert len(sink.store) == 1_210
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_background_flush_on_interval(self):
+        sink = CrashingSink()
+        buffer = WriteBackBuffer(sink, flush_interval_seconds=0.01)
+        await buffer.put("k", "v")
+        await asyncio.sleep(0.05)
+        assert sink.store == {"k": "v"}
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_blocks_until_flushed(self):
+        release = asyncio.Event()
+        flushed = []
+
+        async def slow_sink(entries):
+            await release.wait()
+            flushed.extend(e.key for e in entries)
+
+        buffer = WriteBackBuffer(slow_sink, max_dirty=10, batch_size=10,
+                                 flush_interval_seconds=60)
+        for i in range(10):
+            await buffer.put(f"k{i}", i)
+
+        writer = asyncio.ensure_future(buffer.put("overflow", 1))
+        await asyncio.sleep(0.01)
+        # Flusher has taken the batch but the sink has not returned; the
+        # dirty set has room again so the writer may proceed.
+        release.set()
+        await asyncio.wait_for(writer, timeout=1)
+        await buffer.stop()
+
+        assert buffer.stats.backpressure_waits == 1
+        assert set(flushed) == {f"k{i}" for i in range(10)} | {"overflow"}
+
+    @pytest.mark.asyncio
+    async def test_crash_consistency_latest_value_always_persisted(self):
+        """Random sink failures never lose or regress the latest write"""
+        sink = CrashingSink(failure_rate=0.3, seed=11)
+        buffer = WriteBackBuffer(sink, batch_size=16, flush_interval_seconds=0.001,
+                                 max_attempts=1_000)
+        rng = random.Random(3)
+        latest = {}
+        for i in range(2_000):
+            key = f"key:{rng.randrange(100)}"
+            latest[key] = i
+            await buffer.put(key, i)
+            if i % 50 == 0:
+                await asyncio.sleep(0)
+
+        await buffer.stop()
+        while len(buffer):
+            await buffer.flush()
+
+        assert buffer.stats.flush_failures > 0
+        assert buffer.stats.requeued_entries > 0
+        assert sink.store == latest
+
+    @pytest.mark.asyncio
+    async def test_retry_does_not_overwrite_newer_write(self):
+        calls = 0
+        store = {}
+        gate = asyncio.Event()
+
+        async def sink(entries):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await gate.wait()
+                raise ConnectionError("first flush fails")
+            for entry in entries:
+                store[entry.key] = entry.value
+
+        buffer = WriteBackBuffer(sink, flush_interval_seconds=60)
+        await buffer.put("k", "old")
+        first = asyncio.ensure_future(buffer.flush())
+        await asyncio.sleep(0)
+        await buffer.put("k", "new")
+        gate.set()
+        await first
+        await buffer.flush()
+
+        assert store == {"k": "new"}
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_retry_does_not_resurrect_discarded_write(self):
+        gate = asyncio.Event()
+        store = {}
+
+        async def sink(entries):
+            if not gate.is_set():
+                await gate.wait()
+                raise ConnectionError("flush fails")
+            for entry in entries:
+                store[entry.key] = entry.value
+
+        buffer = WriteBackBuffer(sink, flush_interval_seconds=60)
+        await buffer.put("k", "deleted")
+        first = asyncio.ensure_future(buffer.flush())
+        await asyncio.sleep(0)
+        buffer.discard("k")
+        gate.set()
+        await first
+
+        assert len(buffer) == 0
+        assert buffer.pending_value("k") is None
+        await buffer.flush()
+        assert store == {}
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_entries_dropped_after_max_attempts(self):
+        async def broken(entries):
+            raise ConnectionError("down")
+
+        buffer = WriteBackBuffer(broken, max_attempts=2, flush_interval_seconds=60)
+        await buffer.put("k", "v")
+        await buffer.flush()
+        await buffer.flush()
+        assert len(buffer) == 0
+        assert buffer.stats.dropped_entries == 1
+
+    @pytest.mark.asyncio
+    async def test_pending_value_and_discard(self):
+        buffer = WriteBackBuffer(CrashingSink(), flush_interval_seconds=60)
+        await buffer.put("analysis:1", {"score": 0.8})
+        await buffer.put("analysis:2", {"score": 0.4})
+        await buffer.put("topic:x", {"score": 0.1})
+        assert buffer.pending_value("analysis:1") == {"score": 0.8}
+
+        assert buffer.discard("topic:x")
+        assert buffer.discard_where(lambda k: k.startswith("analysis:")) == 2
+        assert buffer.pending_value("analysis:1") is None
+
+        await buffer.put("layer:1", 0.5)
+        assert buffer.clear() == 1
+        assert len(buffer) == 0
+        await buffer.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.phase_e
+class TestCacheManagerWriteBack:
+    """WRITE_BACK through MultiLevelCacheManager with fake backends."""
+
+    @pytest.fixture
+    def cache_manager(self, mock_gcp_settings):
+        from app.services.enhanced_orchestration import multi_level_cache_manager as mlcm
+        from app.services.enhanced_orchestration.cache_types import CacheLevel
+
+        with patch.object(mlcm, 'GCPSettings', return_value=mock_gcp_settings), \
+                patch.object(mlcm.monitoring_v3, 'MetricServiceClient', Mock()):
+            manager = mlcm.MultiLevelCacheManager(project_id="test-project")
+        for level in (CacheLevel.L2_REDIS, CacheLevel.L3_MEMCACHED, CacheLevel.L4_PERSISTENT):
+            manager.cache_configs[level].enabled = True
+        manager.redis_client = FakeRedis()
+        manager.memcached_client = FakeMemcached()
+        manager.firestore_client = FakeFirestore()
+        manager.write_back.flush_interval_seconds = 60
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_write_back_defers_lower_levels(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        assert await cache_manager.set("layer:1", {"score": 0.5},
+                                       strategy=CacheStrategy.WRITE_BACK)
+        assert await cache_manager.get("layer:1") == {"score": 0.5}
+        assert cache_manager.redis_client.data == {}
+        assert cache_manager.firestore_client.docs == {}
+
+        await cache_manager.write_back.flush()
+        assert "layer:1" in cache_manager.redis_client.data
+        assert "layer:1" in cache_manager.memcached_client.data
+        assert len(cache_manager.firestore_client.docs) == 1
+        await cache_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_batched_flush_to_all_levels(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        for i in range(1_200):
+            await cache_manager.set(f"layer:{i}", {"score": i / 1_200},
+                                    strategy=CacheStrategy.WRITE_BACK)
+        await cache_manager.shutdown()
+
+        redis = cache_manager.redis_client
+        assert len(redis.data) == 1_200
+        assert redis.executions == 3
+        assert cache_manager.memcached_client.set_multi_calls == 3
+        assert cache_manager.firestore_client.commits == [500, 500, 200]
+
+        stats = cache_manager.write_back.stats
+        assert stats.flushed_entries == 1_200
+        assert stats.pending_entries == 0
+
+    @pytest.mark.asyncio
+    async def test_pending_write_readable_after_l1_eviction(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        await cache_manager.set("session:ctx", "value", strategy=CacheStrategy.WRITE_BACK)
+        cache_manager.l1_cache.clear()
+        assert await cache_manager.get("session:ctx") == "value"
+        await cache_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_delete_discards_pending_write(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        await cache_manager.set("k", "v", strategy=CacheStrategy.WRITE_BACK)
+        await cache_manager.delete("k")
+        await cache_manager.shutdown()
+        assert "k" not in cache_manager.redis_client.data
+        assert cache_manager.firestore_client.docs == {}
+
+    @pytest.mark.asyncio
+    async def test_clear_all_caches_drops_pending_writes(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        await cache_manager.set("layer:1", {"score": 0.5}, strategy=CacheStrategy.WRITE_BACK)
+        await cache_manager.clear_all_caches()
+        assert await cache_manager.get("layer:1") is None
+
+        await cache_manager.write_back.flush()
+        await cache_manager.shutdown()
+        assert "layer:1" not in cache_manager.redis_client.data
+        assert "layer:1" not in cache_manager.memcached_client.data
+        assert cache_manager.firestore_client.docs == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, cache_manager):
+        from app.services.enhanced_orchestration.cache_types import CacheStrategy
+
+        redis = cache_manager.redis_client
+        original = redis.pipeline
+        failures = {"left": 1}
+
+        def flaky_pipeline(transaction=True):
+            pipe = original(transaction)
+            if failures["left"]:
+                failures["left"] -= 1
+
+                async def crash():
+                    raise ConnectionError("redis went away")
+                pipe.execute = crash
+            return pipe
+
+        redis.pipeline = flaky_pipeline
+        await cache_manager.set("k", "v", strategy=CacheStrategy.WRITE_BACK)
+        await cache_manager.write_back.flush()
+        assert cache_manager.write_back.stats.flush_failures == 1
+        await cache_manager.shutdown()
+        assert "k" in redis.data
+
+        stats = await cache_manager.get_cache_stats()
+        assert stats['write_back']['requeued_entries'] == 1